@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+STT Backend Benchmark
+Compare Vietnamese STT backends (real-time factor, p95 latency, WER) on a local audio corpus
+
+Usage:
+    python benchmark_stt.py --corpus data/stt_corpus \\
+        --config ctranslate2:models/phowhisper-medium-ct2:int8 \\
+        --config ctranslate2:models/phowhisper-small-ct2:int8 \\
+        --config onnx:models/phowhisper-medium-onnx-int8 \\
+        --concurrency 4
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+from datetime import datetime
+
+# Add src to path
+sys.path.insert(0, '.')
+
+from src.speech.backends import make_backend
+from src.speech.benchmark import benchmark_pool, load_corpus
+from src.speech.cpu_budget import CpuBudget, cpu_budget_settings
+from src.speech.stt_pool import SttInferencePool, stt_settings
+
+
+def parse_config(spec: str) -> dict:
+    """backend:model[:compute_type]"""
+    parts = spec.split(":")
+    if len(parts) < 2:
+        raise argparse.ArgumentTypeError(f"Expected backend:model[:compute_type], got '{spec}'")
+    return {"backend": parts[0], "model": parts[1], "compute_type": parts[2] if len(parts) > 2 else "auto"}
+
+
+async def main() -> int:
+    settings = stt_settings()
+    parser = argparse.ArgumentParser(description="Benchmark STT backends on a local corpus")
+    parser.add_argument("--corpus", required=True, help="Directory with manifest.jsonl or *.wav + *.txt")
+    parser.add_argument("--config", action="append", type=parse_config, default=[],
+                        help="backend:model[:compute_type]; repeat to compare (default: STT_* env)")
+    parser.add_argument("--device", default=settings["device"])
+    parser.add_argument("--language", default="vi")
+    parser.add_argument("--concurrency", type=int, default=1, help="Utterances in flight (concurrent calls)")
+    parser.add_argument("--workers", type=int, default=settings["workers"])
+    parser.add_argument("--max-batch", type=int, default=settings["max_batch"])
+    parser.add_argument("--speech-share", type=float, default=0.3,
+                        help="Fraction of a call the user speaks (for the capacity estimate)")
+    parser.add_argument("--output", default="stt_benchmark_results.json")
+    args = parser.parse_args()
+
+    configs = args.config or [{
+        "backend": settings["backend"], "model": settings["model"], "compute_type": settings["compute_type"]
+    }]
+
+    corpus = load_corpus(args.corpus)
+    if not corpus:
+        print(f"❌ No audio found in {args.corpus}")
+        return 1
+    print(f"🎧 Corpus: {len(corpus)} utterances, {sum(len(i['audio']) for i in corpus) / 16000:.1f}s of audio")
+    print(f"🧮 CPU cores: {os.cpu_count()}, concurrency {args.concurrency}, workers {args.workers}")
+    budget = CpuBudget.from_settings(cpu_budget_settings())
+
+    results = []
+    for config in configs:
+        label = f"{config['backend']}:{os.path.basename(config['model'].rstrip('/'))}:{config['compute_type']}"
+        print(f"\n⚡ Benchmarking {label}...")
+        backend = make_backend(
+            config["model"], device=args.device, compute_type=config["compute_type"],
+            workers=args.workers, backend=config["backend"]
+        )
+        pool = SttInferencePool(backend, workers=args.workers, max_batch=args.max_batch)
+        try:
+            result = await benchmark_pool(pool, corpus, language=args.language,
+                                          concurrency=args.concurrency, label=label)
+        except Exception as e:
+            print(f"❌ {label} failed: {e}")
+            results.append({"label": label, "error": str(e)})
+            continue
+        finally:
+            await pool.close()
+        results.append(result)
+        print(f"   Load: {result['load_seconds']}s")
+        print(f"   RTF: {result['rtf']} ({result['throughput_x_realtime']}x realtime overall)")
+        print(f"   Latency p50/p95: {result['latency_p50_ms']} / {result['latency_p95_ms']} ms")
+        print(f"   WER: {result['wer']}")
+        # Meaningful when STT_CPU_THREADS matches CPU_STT_THREADS_PER_JOB (threads of one decode)
+        result["estimated_max_calls"] = budget.estimate_max_calls(result["rtf"], args.speech_share)
+        print(f"   Capacity: ~{result['estimated_max_calls']} concurrent calls "
+              f"({budget.engine('stt').slots} STT slots of the {budget.total_threads}-thread budget)")
+
+    print("\n" + "=" * 78)
+    print(f"{'Backend':<40} {'RTF':>8} {'p95 ms':>10} {'WER':>8} {'x RT':>8}")
+    print("-" * 78)
+    for result in results:
+        if "error" in result:
+            print(f"{result['label']:<40} {'failed':>8}")
+            continue
+        print(f"{result['label']:<40} {result['rtf']:>8} {result['latency_p95_ms']:>10} "
+              f"{result['wer'] if result['wer'] is not None else '-':>8} {result['throughput_x_realtime']:>8}")
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({
+            "timestamp": datetime.now().isoformat(),
+            "corpus": args.corpus,
+            "cpu_count": os.cpu_count(),
+            "results": results,
+        }, f, ensure_ascii=False, indent=2)
+    print(f"\n💾 Results saved to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -7,11 +7,13 @@ interface Session {
   session_id: string;
   started_at: string;
   ended_at?: string;
-  messages: Array<{
+  // Session list items are headers: messages come with GET /api/sessions/{id}
+  messages?: Array<{
     role: string;
     content: string;
     timestamp?: string;
   }>;
+  message_count?: number;
   created_at: number;
 }
 
@@ -51,6 +53,20 @@ export function SessionHistory({ isOpen, onClose }: SessionHistoryProps) {
     }
   };
 
+  const openSession = async (session: Session) => {
+    setSelectedSession(session);
+    if (session.messages) return;
+    try {
+      const response = await fetch(API_ENDPOINTS.SESSIONS.GET(session.session_id));
+      const data = await response.json();
+      if (data.success && data.session) {
+        setSelectedSession(data.session);
+      }
+    } catch (err) {
+      console.error('Error fetching session:', err);
+    }
+  };
+
   const formatDate = (dateStr: string) => {
     try {
       const date = new Date(dateStr);
@@ -81,7 +97,7 @@ export function SessionHistory({ isOpen, onClose }: SessionHistoryProps) {
   };
 
   const getMessageCount = (session: Session) => {
-    return session.messages?.length || 0;
+    return session.message_count ?? session.messages?.length ?? 0;
   };
 
   const formatMessageLines = (text: string): string[] => {
@@ -128,7 +144,7 @@ export function SessionHistory({ isOpen, onClose }: SessionHistoryProps) {
                   {sessions.map((session) => (
                     <button
                       key={session.session_id}
-                      onClick={() => setSelectedSession(session)}
+                      onClick={() => openSession(session)}
                       className={`w-full text-left p-4 rounded-xl border transition ${
                         selectedSession?.session_id === session.session_id
                           ? 'border-emerald-500 bg-emerald-50'
@@ -20,6 +20,7 @@ interface SessionApiResponse {
   started_at: string;
   ended_at?: string;
   messages?: Array<{ role: string; content: string; timestamp?: string }>;
+  message_count?: number;
 }
 
 export function useTranscripts() {
@@ -42,7 +43,7 @@ export function useTranscripts() {
           id: session.session_id,
           started_at: session.started_at,
           ended_at: session.ended_at,
-          message_count: session.messages?.length || 0,
+          message_count: session.message_count ?? session.messages?.length ?? 0,
         }));
         setTranscripts(sessions);
       } else {
@@ -40,6 +40,7 @@ class WebRTCClient {
   public connected = false;
   public onStateChange?: (state: string) => void;
   public onLocalAudioTrack?: (track: MediaStreamTrack) => void;
+  public onSessionId?: (sessionId: string) => void;
 
   constructor() {
     this.pc = new RTCPeerConnection({
@@ -244,6 +245,11 @@ class WebRTCClient {
         hasIceCandidates: answer.sdp?.includes("a=candidate"),
       });
 
+      // Subscribe the transcript WebSocket to this call's session
+      if (answer.session_id) {
+        this.onSessionId?.(answer.session_id);
+      }
+
       // Check if peer connection is in correct state before setting remote description
       if (this.pc?.signalingState === "have-local-offer") {
         await this.pc.setRemoteDescription(answer);
@@ -425,6 +431,7 @@ const ChatPage = ({ accessToken, onSignOut }: ChatPageProps) => {
   const [liveUrl, setLiveUrl] = useState<string | null>(null);
 
   const wsRef = useRef<WebSocket | null>(null);
+  const callSessionRef = useRef<string | null>(null);
   const historyListRef = useRef<HTMLDivElement>(null);
   const settingsRef = useRef<HTMLDivElement>(null);
   const userMenuRef = useRef<HTMLDivElement>(null);
@@ -453,10 +460,22 @@ const ChatPage = ({ accessToken, onSignOut }: ChatPageProps) => {
     client.onLocalAudioTrack = (track) => {
       setMicTrack(track);
     };
+    client.onSessionId = (sessionId) => {
+      const ws = wsRef.current;
+      const previous = callSessionRef.current;
+      callSessionRef.current = sessionId;
+      if (ws?.readyState === WebSocket.OPEN) {
+        if (previous && previous !== sessionId) {
+          ws.send(JSON.stringify({ type: "unsubscribe", session_id: previous }));
+        }
+        ws.send(JSON.stringify({ type: "subscribe", session_id: sessionId }));
+      }
+    };
 
     return () => {
       client.onStateChange = undefined;
       client.onLocalAudioTrack = undefined;
+      client.onSessionId = undefined;
     };
   }, [client]);
 
@@ -522,6 +541,10 @@ const ChatPage = ({ accessToken, onSignOut }: ChatPageProps) => {
 
       ws.onopen = () => {
         reconnectAttempts = 0; // Reset on successful connection
+        // (Re)subscribe to the current call; the server replays its recent messages
+        if (callSessionRef.current) {
+          ws.send(JSON.stringify({ type: "subscribe", session_id: callSessionRef.current }));
+        }
         if (import.meta.env.DEV) {
           console.log("WebSocket connected for transcript streaming");
         }
@@ -76,6 +76,46 @@ resource "aws_dynamodb_table" "vpbank_sessions_optimized" {
   }
 }
 
+# Transcript messages: one item per message (session_id + seq), the session item keeps a small header.
+# Writing a message costs the same at the first and the thousandth message, and a session is not
+# limited by the 400 KB item size. Read a transcript with Query, page by page.
+resource "aws_dynamodb_table" "vpbank_session_messages" {
+  name         = "vpbank-session-messages"
+  billing_mode = "PAY_PER_REQUEST"
+  hash_key     = "session_id"
+  range_key    = "seq"
+
+  attribute {
+    name = "session_id"
+    type = "S"
+  }
+
+  attribute {
+    name = "seq"
+    type = "N"
+  }
+
+  ttl {
+    attribute_name = "ttl"
+    enabled        = true
+  }
+
+  point_in_time_recovery {
+    enabled = true
+  }
+
+  server_side_encryption {
+    enabled = true
+  }
+
+  tags = {
+    Name        = "vpbank-session-messages"
+    Environment = var.environment
+    Service     = "voice-agent"
+    ManagedBy   = "terraform"
+  }
+}
+
 # Variables
 variable "environment" {
   description = "Environment name (dev, staging, production)"
@@ -94,3 +134,7 @@ output "dynamodb_table_arn" {
   value       = aws_dynamodb_table.vpbank_sessions_optimized.arn
 }
 
+output "dynamodb_messages_table_name" {
+  description = "Name of the DynamoDB transcript messages table"
+  value       = aws_dynamodb_table.vpbank_session_messages.name
+}
@@ -16,6 +16,7 @@ from aiohttp.web import RouteTableDef
 from dotenv import load_dotenv
 from loguru import logger
 import json
+from typing import Callable, Optional, Tuple
 
 # Add src to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
@@ -47,13 +48,24 @@ from src.monitoring.middleware import setup_metrics_endpoint
 from src.utils.logging_config import (
     configure_logging,
     CorrelationIdMiddleware,
-    get_correlation_id
+    get_correlation_id,
+    set_correlation_id
 )
-from src.nlp import extract_structured_instructions
+from src.nlp import detect_form_type, extract_structured_instructions
 
 # LLM caching
 from src.cost.llm_cache import llm_cache
 
+# Multi-process browser sharding
+from src.automation.sharding import ShardedBrowserAgent, sharding_settings
+
+# Async workflow jobs
+from src.automation.jobs import JobQueueFull, job_manager
+from src.automation.preemption import preemption_settings
+from src.automation.progress import progress_hub
+from src.automation.conversation import ContextResync, conversation_store
+from src.automation.form_schema import get_form_urls
+
 load_dotenv(override=True)
 
 # Configure logging with correlation IDs
@@ -72,39 +84,121 @@ validate_browser_service_env()
 
 routes = RouteTableDef()
 
-# No workflow; we call browser_agent directly
+# No workflow; we call browser_agent directly.
+# In sharded mode the same calls are routed to browser worker processes.
+_sharding = sharding_settings()
+if _sharding["enabled"]:
+    browser_agent = ShardedBrowserAgent(_sharding["shards"])
 
 
-@routes.post("/api/execute")
-async def execute_workflow(request):
+async def _form_state_token(session_id: str) -> str:
+    """Current form-state token of a session (proxied to the owning shard if sharded)."""
+    token = browser_agent.form_state_token(session_id)
+    return await token if asyncio.iscoroutine(token) else token
+
+
+# A newer request sees the whole conversation so far, so it supersedes older ones
+PREEMPT_SUPERSEDED = preemption_settings()["enabled"]
+
+
+async def _preempt_session(session_id: str, reason: str = "superseded") -> bool:
+    """Stop the session's in-flight agent run at its next step (proxied if sharded)."""
+    try:
+        result = browser_agent.preempt_freeform(session_id=session_id, reason=reason)
+        result = await result if asyncio.iscoroutine(result) else result
+        return bool(result.get("preempted"))
+    except Exception as e:
+        logger.warning(f"⚠️  Could not preempt session {session_id}: {e}")
+        return False
+
+
+def _resolve_context(data: dict) -> dict:
     """
-    Execute workflow từ user message
-    
-    Body:
-    {
-        "user_message": "full conversation context",
-        "session_id": "session_123"
+    Turn a delta request into a full one
+
+    A delta request carries "messages" ([{"seq", "role", "content"}]) past the
+    sender's "base_seq" cursor, plus optional "instructions" lines; the
+    conversation itself is kept per session in conversation_store. Requests
+    with a plain "user_message" pass through unchanged.
+
+    Raises:
+        InvalidInputError: malformed delta
+        ContextResync: the delta does not continue the stored conversation
+    """
+    if "messages" not in data:
+        return data
+
+    session_id = data.get("session_id", "")
+    if not session_id or not validate_session_id(session_id):
+        raise InvalidInputError(field="session_id", reason="Required for message deltas")
+    messages = data.get("messages")
+    instructions = data.get("instructions") or []
+    if not isinstance(messages, list) or not isinstance(instructions, list):
+        raise InvalidInputError(field="messages", reason="Must be a list")
+
+    # Only the delta is sanitized, so per-turn cost does not grow with the session
+    delta = [
+        {**m, "content": sanitize_user_message(m["content"]) or ""}
+        if isinstance(m, dict) and isinstance(m.get("content"), str) else m
+        for m in messages
+    ]
+    try:
+        conversation = conversation_store.apply(
+            session_id, delta,
+            base_seq=data.get("base_seq"),
+            reset=bool(data.get("reset"))
+        )
+    except ValueError as e:
+        raise InvalidInputError(field="messages", reason=str(e))
+
+    context = conversation.render(conversation_store.max_chars)
+    resolved = {k: v for k, v in data.items() if k not in ("messages", "instructions", "base_seq", "reset")}
+    resolved["user_message"] = "\n".join([context, *[str(line) for line in instructions]]).strip()
+    resolved["context_seq"] = conversation.seq
+    return resolved
+
+
+def _resync_payload(e: ContextResync, request_id: str = "unknown") -> dict:
+    logger.warning(f"🔁 {e}")
+    return {
+        "success": False,
+        "resync": True,
+        "context_seq": e.context_seq,
+        "error": f"Context resync required: {e.reason}",
+        "session_id": e.session_id,
+        "request_id": request_id
     }
-    
+
+
+async def run_workflow(data: dict, progress: Optional[Callable[..., None]] = None,
+                       endpoint: str = "/api/execute") -> Tuple[dict, int]:
+    """
+    Execute workflow từ user message
+
+    Shared by the synchronous /api/execute route and the job workers.
+
+    Args:
+        data: Request body ({"user_message", "session_id", "request_id"}, or a
+            message delta instead of user_message - see _resolve_context)
+        progress: Optional callback progress(stage, message) for job status
+        endpoint: Endpoint label for HTTP metrics
+
     Returns:
-    {
-        "success": true/false,
-        "result": "workflow result message",
-        "error": "error message if failed"
-    }
+        (response payload, HTTP status)
     """
     start_time = time.time()
     request_id = "unknown"
     session_id = "unknown"
     form_type = "unknown"
+    report = progress or (lambda stage, message="": None)
     
     service_name = "browser-agent"
 
     try:
-        data = await request.json()
+        request_id = data.get("request_id", "unknown")
+        data = _resolve_context(data)
         user_message = data.get("user_message", "")
         session_id = data.get("session_id", "")
-        request_id = data.get("request_id", "unknown")
         
         # Get correlation ID from logging context
         correlation_id = get_correlation_id()
@@ -150,26 +244,20 @@ async def execute_workflow(request):
                 field="session_id",
                 reason="Invalid format"
             )
+        # One key for the agent run, its progress events, preemption and the job queue
+        session_id = session_id or "default"
 
-        # Detect form type from user message
-        msg_lower = user_message.lower()
-        if "loan" in msg_lower or "vay" in msg_lower:
-            form_type = "loan"
-        elif "crm" in msg_lower or "khách hàng" in msg_lower:
-            form_type = "crm"
-        elif "hr" in msg_lower or "nhân sự" in msg_lower:
-            form_type = "hr"
-        elif "compliance" in msg_lower or "tuân thủ" in msg_lower:
-            form_type = "compliance"
-        elif "operations" in msg_lower or "giao dịch" in msg_lower:
-            form_type = "operations"
+        form_type = detect_form_type(user_message) or "unknown"
 
         logger.info(f"🚀 Received workflow request for session {session_id}")
         logger.debug(f"   Message length: {len(user_message)} chars")
         logger.debug(f"   Detected form type: {form_type}")
         
-        # Attempt to serve from cache first (reduce GPT-4 browser costs)
-        cache_key = f"{form_type}:{user_message}"
+        # Attempt to serve from cache first (reduce GPT-4 browser costs).
+        # A cached result is only valid while the session's form is still in the
+        # state that result produced, so the key carries the form-state token.
+        state_token = await _form_state_token(session_id)
+        cache_key = f"{session_id}:{state_token}:{form_type}:{user_message}"
         cached_response = llm_cache.get(cache_key, model="browser-agent", temperature=0.0)
         if cached_response:
             llm_cache_hits_total.labels(cache_type="browser_agent").inc()
@@ -179,16 +267,17 @@ async def execute_workflow(request):
             http_requests_total.labels(
                 service=service_name,
                 method="POST",
-                endpoint="/api/execute",
+                endpoint=endpoint,
                 status_code="200"
             ).inc()
             http_request_duration_seconds.labels(
                 service=service_name,
                 method="POST",
-                endpoint="/api/execute"
+                endpoint=endpoint
             ).observe(duration)
 
-            return web.json_response({
+            report("cached", "Served from cache")
+            return {
                 "success": True,
                 "result": cached_response,
                 "session_id": session_id,
@@ -196,15 +285,16 @@ async def execute_workflow(request):
                 "correlation_id": correlation_id,
                 "duration_seconds": round(duration, 2),
                 "cached": True
-            })
+            }, 200
 
         # Extract structured INSTRUCTION lines and execute deterministic actions first
         cleaned_message, structured_instructions = extract_structured_instructions(user_message)
         instruction_results = []
-        effective_session = session_id or "default"
+        effective_session = session_id
 
         if structured_instructions:
             logger.info(f"🧭 Structured instructions detected: {structured_instructions}")
+            report("instructions", f"{len(structured_instructions)} structured instructions")
 
             for instruction in structured_instructions:
                 action_type = instruction.get("type")
@@ -270,13 +360,13 @@ async def execute_workflow(request):
             http_requests_total.labels(
                 service=service_name,
                 method="POST",
-                endpoint="/api/execute",
+                endpoint=endpoint,
                 status_code=status_code
             ).inc()
             http_request_duration_seconds.labels(
                 service=service_name,
                 method="POST",
-                endpoint="/api/execute"
+                endpoint=endpoint
             ).observe(duration)
 
             if not all_successful:
@@ -297,16 +387,44 @@ async def execute_workflow(request):
             }
 
             status = 200 if all_successful else 500
-            return web.json_response(response_payload, status=status)
+            return response_payload, status
 
         # Cache miss -> execute via browser agent (freeform instruction)
         llm_cache_misses_total.labels(cache_type="browser_agent").inc()
         logger.info(f"🔄 Executing via browser agent (cache miss)...")
+        report("browser_agent", "Executing via browser agent")
         agent_result = await browser_agent.execute_freeform(user_message, session_id=session_id)
         
         # Track metrics
         duration = time.time() - start_time
         
+        if agent_result.get("superseded"):
+            # A newer request for this session took over; it resumes from this page
+            logger.info(
+                f"⏭️ Request ID: {request_id} - Superseded after {agent_result.get('steps', 0)} steps"
+            )
+            browser_sessions_total.labels(
+                status="superseded",
+                form_type=form_type
+            ).inc()
+            http_requests_total.labels(
+                service=service_name,
+                method="POST",
+                endpoint=endpoint,
+                status_code="409"
+            ).inc()
+            return {
+                "success": False,
+                "superseded": True,
+                "error": agent_result.get("error"),
+                "observed_fields": agent_result.get("observed_fields", {}),
+                "session_id": session_id,
+                "request_id": request_id,
+                "correlation_id": correlation_id,
+                "duration_seconds": round(duration, 2),
+                "instruction_results": instruction_results
+            }, 409
+
         if agent_result.get("success"):
             # Success metrics
             browser_sessions_total.labels(
@@ -329,19 +447,21 @@ async def execute_workflow(request):
             http_requests_total.labels(
                 service=service_name,
                 method="POST",
-                endpoint="/api/execute",
+                endpoint=endpoint,
                 status_code="200"
             ).inc()
             http_request_duration_seconds.labels(
                 service=service_name,
                 method="POST",
-                endpoint="/api/execute"
+                endpoint=endpoint
             ).observe(duration)
 
-            # Cache successful result for future reuse (temperature 0 for deterministic behavior)
+            # Cache successful result against the form state it left behind
+            state_token = await _form_state_token(session_id)
+            cache_key = f"{session_id}:{state_token}:{form_type}:{user_message}"
             llm_cache.put(cache_key, final_message, model="browser-agent", temperature=0.0)
 
-            return web.json_response({
+            return {
                 "success": True,
                 "result": final_message,
                 "session_id": session_id,
@@ -350,7 +470,7 @@ async def execute_workflow(request):
                 "duration_seconds": round(duration, 2),
                 "cached": False,
                 "instruction_results": instruction_results
-            })
+            }, 200
         else:
             # Failure metrics
             browser_sessions_total.labels(
@@ -373,7 +493,11 @@ async def execute_workflow(request):
     except InvalidInputError as e:
         # Validation errors - 400
         logger.warning(f"⚠️  Validation error: {e.message}")
-        return web.json_response(e.to_dict(), status=400)
+        return e.to_dict(), 400
+
+    except ContextResync as e:
+        # Sender resends from our cursor (or resets) - 409
+        return _resync_payload(e, request_id), 409
         
     except BrowserExecutionError as e:
         # Browser execution errors - 500
@@ -383,7 +507,7 @@ async def execute_workflow(request):
             error_type="browser",
             error_code=e.error_code
         ).inc()
-        return web.json_response({
+        return {
             "success": False,
             "error": error_msg,
             "session_id": session_id,
@@ -391,7 +515,7 @@ async def execute_workflow(request):
             "correlation_id": correlation_id,
             "duration_seconds": round(duration, 2),
             "instruction_results": instruction_results
-        }, status=500)
+        }, 500
         
     except Exception as e:
         # Unexpected errors - 500
@@ -399,13 +523,13 @@ async def execute_workflow(request):
         http_requests_total.labels(
             service=service_name,
             method="POST",
-            endpoint="/api/execute",
+            endpoint=endpoint,
             status_code="500"
         ).inc()
         http_request_duration_seconds.labels(
             service=service_name,
             method="POST",
-            endpoint="/api/execute"
+            endpoint=endpoint
         ).observe(duration)
 
         logger.error(
@@ -423,16 +547,276 @@ async def execute_workflow(request):
             error_code="INTERNAL_SERVER_ERROR",
             details={"request_id": request_id, "session_id": session_id}
         )
-        return web.json_response(error.to_dict(), status=500)
+        return error.to_dict(), 500
+
+
+@routes.post("/api/execute")
+async def execute_workflow(request):
+    """
+    Execute workflow từ user message (holds the request open until done)
+    
+    Body:
+    {
+        "user_message": "full conversation context",
+        "session_id": "session_123"
+    }
+    
+    Returns:
+    {
+        "success": true/false,
+        "result": "workflow result message",
+        "error": "error message if failed"
+    }
+    """
+    try:
+        data = await request.json()
+    except json.JSONDecodeError:
+        return web.json_response(InvalidInputError(field="body", reason="Invalid JSON").to_dict(), status=400)
+
+    if PREEMPT_SUPERSEDED and data.get("session_id") and validate_session_id(data["session_id"]):
+        await _preempt_session(data["session_id"])
+
+    payload, status = await run_workflow(data)
+    return web.json_response(payload, status=status)
+
+
+def _job_links(job) -> dict:
+    return {
+        "status_url": f"/api/jobs/{job.id}",
+        "result_url": f"/api/jobs/{job.id}/result",
+        "events_url": f"/api/jobs/{job.id}/events",
+    }
+
+
+# Seconds between SSE keepalive comments on an idle event stream
+SSE_KEEPALIVE = float(os.getenv("BROWSER_SSE_KEEPALIVE", "15"))
+
+
+def _sse(event: str, data: dict, event_id: Optional[int] = None) -> bytes:
+    lines = [f"event: {event}"]
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"data: {json.dumps(data, ensure_ascii=False, default=str)}")
+    return ("\n".join(lines) + "\n\n").encode("utf-8")
+
+
+@routes.post("/api/jobs")
+async def submit_job(request):
+    """
+    Queue a workflow as a job and return its id immediately
+
+    Body: same as /api/execute. Returns 202 with job_id, or 429 with
+    Retry-After when the job queue is full. A message delta is applied
+    here, at submission, so it survives the job being superseded.
+    """
+    try:
+        data = await request.json()
+    except json.JSONDecodeError:
+        return web.json_response(InvalidInputError(field="body", reason="Invalid JSON").to_dict(), status=400)
+
+    try:
+        data = _resolve_context(data)
+    except InvalidInputError as e:
+        return web.json_response(e.to_dict(), status=400)
+    except ContextResync as e:
+        return web.json_response(_resync_payload(e, data.get("request_id", "unknown")), status=409)
+
+    session_id = data.get("session_id", "")
+    if not data.get("user_message"):
+        return web.json_response(InvalidInputError(field="user_message", reason="Field is required").to_dict(), status=400)
+    if session_id and not validate_session_id(session_id):
+        return web.json_response(InvalidInputError(field="session_id", reason="Invalid format").to_dict(), status=400)
+
+    correlation_id = get_correlation_id()
+
+    async def runner(job):
+        # Runs in its own task: carry the submitting request's correlation id over
+        set_correlation_id(correlation_id)
+        # Browser events of this session land in the job's event stream while it runs
+        unsubscribe = progress_hub.subscribe(job.session_id, job.publish)
+        try:
+            return await run_workflow(data, progress=job.report, endpoint="/api/jobs")
+        finally:
+            unsubscribe()
+
+    try:
+        job = job_manager.submit(
+            session_id or "default", runner,
+            request_id=data.get("request_id"),
+            supersede=PREEMPT_SUPERSEDED
+        )
+        if PREEMPT_SUPERSEDED:
+            await _preempt_session(session_id or "default")
+    except JobQueueFull as e:
+        logger.warning(f"⚠️  {e} - rejecting job for session {session_id}")
+        return web.json_response(
+            {"success": False, "error": "Browser job queue is full", "retry_after": e.retry_after},
+            status=429,
+            headers={"Retry-After": str(e.retry_after)}
+        )
+
+    return web.json_response({
+        "success": True,
+        "job_id": job.id,
+        "status": job.status,
+        "queue_position": job_manager.queue_position(job),
+        **({"context_seq": data["context_seq"]} if "context_seq" in data else {}),
+        **_job_links(job)
+    }, status=202)
+
+
+@routes.get("/api/jobs")
+async def job_stats(request):
+    """Worker pool and queue statistics."""
+    return web.json_response({"success": True, **job_manager.get_stats()})
+
+
+@routes.get("/api/jobs/{job_id}")
+async def job_status(request):
+    """Status and progress of a job."""
+    job = job_manager.get(request.match_info["job_id"])
+    if job is None:
+        return web.json_response({"success": False, "error": "Job not found"}, status=404)
+    return web.json_response({
+        "success": True,
+        **job.to_dict(),
+        "queue_position": job_manager.queue_position(job),
+        **_job_links(job)
+    })
+
+
+@routes.get("/api/jobs/{job_id}/result")
+async def job_result(request):
+    """
+    Result of a finished job (the /api/execute payload and status)
+
+    Query:
+        wait: Optional seconds to wait for the job to finish (long poll, max 30)
+    """
+    job = job_manager.get(request.match_info["job_id"])
+    if job is None:
+        return web.json_response({"success": False, "error": "Job not found"}, status=404)
+
+    try:
+        wait = min(float(request.query.get("wait", "0")), 30.0)
+    except ValueError:
+        wait = 0.0
+    if wait > 0 and not job.done:
+        await job.wait(wait)
+
+    if not job.done:
+        return web.json_response({"success": False, **job.to_dict()}, status=202)
+    if job.status == "cancelled":
+        return web.json_response({"success": False, "superseded": bool(job.superseded_by), **job.to_dict()}, status=409)
+    return web.json_response({**job.result, "job_id": job.id, "status": job.status}, status=job.http_status)
+
+
+@routes.get("/api/jobs/{job_id}/events")
+async def job_events(request):
+    """
+    Server-sent events stream of a job's progress
+
+    Emits stage, step, navigation, field and verification events as they
+    happen, then one final `result` event with the job and its payload.
+    Reconnecting clients resume after Last-Event-ID (or ?after=<seq>).
+    """
+    job = job_manager.get(request.match_info["job_id"])
+    if job is None:
+        return web.json_response({"success": False, "error": "Job not found"}, status=404)
+    try:
+        after = int(request.headers.get("Last-Event-ID") or request.query.get("after", "0"))
+    except ValueError:
+        after = 0
+
+    response = web.StreamResponse(headers={
+        "Content-Type": "text/event-stream",
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",
+    })
+    await response.prepare(request)
+    try:
+        async for event in job.follow(after, keepalive=SSE_KEEPALIVE):
+            if event is None:
+                await response.write(b": keepalive\n\n")
+                continue
+            await response.write(_sse(event["event"], event, event["seq"]))
+        await response.write(_sse("result", job.to_dict(include_result=True)))
+    except ConnectionResetError:
+        logger.debug(f"Event stream of job {job.id[:8]} closed by client")
+    return response
+
+
+@routes.delete("/api/jobs/{job_id}")
+async def cancel_job(request):
+    """Cancel a queued or running job."""
+    job = job_manager.get(request.match_info["job_id"])
+    if job is None:
+        return web.json_response({"success": False, "error": "Job not found"}, status=404)
+    if job.done:
+        return web.json_response({"success": False, "error": f"Job already {job.status}", **job.to_dict()}, status=409)
+
+    if job.status == "running":
+        # Stop the agent between steps; cancelling the job alone only stops waiting for it
+        await _preempt_session(job.session_id, reason="cancelled")
+    job = await job_manager.cancel(job.id)
+    return web.json_response({"success": job.status == "cancelled", **job.to_dict()})
+
+
+@routes.post("/api/prepare")
+async def prepare_form(request):
+    """
+    Speculatively open a form for the session's next run
+
+    Body: {"session_id": "...", "form_type": "loan"}. Sent by the voice bot
+    when a partial transcript already names the form; the run started by
+    the final transcript picks the open page up. Best effort: a busy
+    session is reported as {"prepared": false}.
+    """
+    try:
+        data = await request.json()
+    except json.JSONDecodeError:
+        return web.json_response(InvalidInputError(field="body", reason="Invalid JSON").to_dict(), status=400)
+
+    session_id = data.get("session_id", "")
+    form_type = data.get("form_type", "")
+    if not session_id or not validate_session_id(session_id):
+        return web.json_response(InvalidInputError(field="session_id", reason="Invalid format").to_dict(), status=400)
+    if form_type not in get_form_urls():
+        return web.json_response(InvalidInputError(field="form_type", reason="Unknown form type").to_dict(), status=400)
+
+    result = await browser_agent.prepare_form(form_type, session_id=session_id)
+    return web.json_response(result, status=200 if result.get("success") else 500)
 
 
 @routes.get("/api/health")
 async def health_check(request):
     """Health check endpoint"""
-    return web.json_response({
+    payload = {
         "status": "healthy",
         "service": "browser-agent-service"
-    })
+    }
+    if browser_agent.page_pool:
+        payload["page_pool"] = browser_agent.page_pool.get_stats()
+    if isinstance(browser_agent, ShardedBrowserAgent):
+        payload["sharding"] = browser_agent.get_stats()
+    payload["conversations"] = conversation_store.get_stats()
+    return web.json_response(payload)
+
+
+@routes.get("/api/sessions/stats")
+async def session_stats(request):
+    """Per-session memory and prompt-token footprint of live browser sessions."""
+    session_id = request.query.get("session_id")
+    if session_id and not validate_session_id(session_id):
+        return web.json_response({"success": False, "error": "Invalid session_id format"}, status=400)
+
+    if isinstance(browser_agent, ShardedBrowserAgent):
+        # Session state lives in the worker that owns it
+        if not session_id:
+            return web.json_response({"success": True, "sharding": browser_agent.get_stats()})
+        return web.json_response(await browser_agent.get_session_stats(session_id=session_id))
+
+    return web.json_response(browser_agent.get_session_stats(session_id=session_id))
 
 
 @routes.get("/api/live")
@@ -489,8 +873,8 @@ def create_app():
                 logger.warning(f"Blocked CORS request from unauthorized origin: {origin}")
                 response.headers['Access-Control-Allow-Origin'] = 'http://localhost:7860'  # Default to Voice Bot
 
-            response.headers['Access-Control-Allow-Methods'] = 'GET, POST, OPTIONS'
-            response.headers['Access-Control-Allow-Headers'] = 'Content-Type, X-Correlation-ID'
+            response.headers['Access-Control-Allow-Methods'] = 'GET, POST, DELETE, OPTIONS'
+            response.headers['Access-Control-Allow-Headers'] = 'Content-Type, X-Correlation-ID, Last-Event-ID'
             return response
         return middleware_handler
     
@@ -498,6 +882,57 @@ def create_app():
     
     # Setup Prometheus metrics endpoint
     setup_metrics_endpoint(app, path="/metrics")
+
+    # Worker pool for /api/jobs
+    async def start_job_pool(app):
+        job_manager.start()
+
+    async def stop_job_pool(app):
+        await job_manager.stop()
+
+    app.on_startup.append(start_job_pool)
+    app.on_cleanup.append(stop_job_pool)
+
+    # Browser worker processes own their page pools and schema warmups
+    if isinstance(browser_agent, ShardedBrowserAgent):
+        async def start_shards(app):
+            await browser_agent.start()
+
+        async def stop_shards(app):
+            await browser_agent.stop()
+
+        app.on_startup.append(start_shards)
+        app.on_cleanup.append(stop_shards)
+
+    # Optionally crawl all form schemas once per deploy (runs in background)
+    elif os.getenv("FORM_SCHEMA_WARMUP", "false").lower() == "true":
+        async def warm_form_schemas(app):
+            app['schema_warmup'] = asyncio.create_task(browser_agent.warm_form_schemas())
+        app.on_startup.append(warm_form_schemas)
+
+    # Evict idle browser sessions in the background
+    if not isinstance(browser_agent, ShardedBrowserAgent):
+        async def start_session_reaper(app):
+            browser_agent.start_session_reaper()
+
+        async def stop_session_reaper(app):
+            if browser_agent._reaper_task:
+                browser_agent._reaper_task.cancel()
+
+        app.on_startup.append(start_session_reaper)
+        app.on_cleanup.append(stop_session_reaper)
+
+    # Pre-load form pages so new sessions skip the LLM navigation steps
+    if not isinstance(browser_agent, ShardedBrowserAgent) and int(os.getenv("BROWSER_PAGE_POOL_SIZE", "0")) > 0:
+        async def start_page_pool(app):
+            app['page_pool_start'] = asyncio.create_task(browser_agent.start_page_pool())
+
+        async def close_page_pool(app):
+            if browser_agent.page_pool:
+                await browser_agent.page_pool.close()
+
+        app.on_startup.append(start_page_pool)
+        app.on_cleanup.append(close_page_pool)
     
     logger.info("✅ Browser Agent application configured with:")
     logger.info("   - Correlation ID tracking")
@@ -513,9 +948,15 @@ if __name__ == "__main__":
     logger.info("📡 Service runs on port 7863")
     logger.info("🔗 Endpoints:")
     logger.info("   POST   /api/execute - Execute workflow")
+    logger.info("   POST   /api/jobs - Queue workflow job (GET/DELETE /api/jobs/{id})")
     logger.info("   GET    /api/health - Health check")
     logger.info("   GET    /api/live  - Current browser live URL")
     
+    # Optionally also listen on a Unix socket for a Voice Bot on the same host (BROWSER_SERVICE_UDS)
+    unix_socket = os.getenv("BROWSER_SERVICE_UDS") or None
+    if unix_socket:
+        logger.info(f"🔌 Also listening on unix:{unix_socket}")
+
     app = create_app()
-    web.run_app(app, host="0.0.0.0", port=7863)
+    web.run_app(app, host="0.0.0.0", port=7863, path=unix_socket)
 
@@ -32,9 +32,9 @@ sys.stderr = FilteredStderr(sys.stderr)
 # Add src to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
-# Import voice bot
-from src.voice_bot import create_app
+# The voice bot itself is imported in __main__ (worker processes import it after setting their env)
 from src.env_validator import validate_voice_bot_env, warn_optional_env_vars
+from src.voice_workers import VoiceSupervisor, worker_settings
 from aiohttp import web
 from loguru import logger
 from dotenv import load_dotenv
@@ -68,6 +68,13 @@ if __name__ == "__main__":
     logger.info("   GET    /api/sessions (List sessions)")
     logger.info("   GET    /api/sessions/{id} (Get session)")
     
-    app = create_app()
-    web.run_app(app, host=HOST, port=PORT)
+    workers = worker_settings()
+    if workers["workers"] > 1:
+        # N voice bot processes on one SO_REUSEPORT port; STT weights loaded once in this process
+        VoiceSupervisor(HOST, PORT, workers["workers"], workers["model_host_socket"]).run()
+    else:
+        from src.voice_bot import create_app
+
+        app = create_app()
+        web.run_app(app, host=HOST, port=PORT)
 
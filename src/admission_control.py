@@ -0,0 +1,215 @@
+"""
+Admission Control
+Accept, queue or turn away new WebRTC calls based on this node's session count, inference backlog and event-loop lag
+"""
+import asyncio
+import math
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+from loguru import logger
+
+from src.monitoring.metrics import (
+    admission_active_sessions,
+    admission_decisions_total,
+    admission_limits,
+    admission_queue_length,
+    admission_wait_seconds,
+    event_loop_lag_seconds,
+)
+
+
+def admission_settings() -> Dict[str, Any]:
+    """Per-node admission limits from environment."""
+    return {
+        "enabled": os.getenv("ADMISSION_ENABLED", "true").lower() == "true",
+        "max_sessions": int(os.getenv("ADMISSION_MAX_SESSIONS", "20")),
+        # Offers held while every session slot is taken
+        "max_queued": int(os.getenv("ADMISSION_MAX_QUEUED", "5")),
+        # Longest an offer is held; a longer estimated wait is rejected at once
+        "max_wait_secs": float(os.getenv("ADMISSION_MAX_WAIT_SECS", "10")),
+        # Speech segments and VAD windows waiting for inference
+        "max_inference_queue": int(os.getenv("ADMISSION_MAX_INFERENCE_QUEUE", "32")),
+        "max_loop_lag_secs": float(os.getenv("ADMISSION_MAX_LOOP_LAG_MS", "250")) / 1000.0,
+        # Starting estimate of a call's length, refined from finished calls
+        "session_secs": float(os.getenv("ADMISSION_SESSION_SECS", "180")),
+        "retry_after_secs": int(os.getenv("ADMISSION_RETRY_AFTER_SECS", "5")),
+    }
+
+
+@dataclass
+class AdmissionDecision:
+    """Outcome of one admission request"""
+    admitted: bool
+    reason: str  # accepted, queued | loop_lag, inference_queue, queue_full, wait_too_long, timeout
+    waited: float = 0.0
+    estimated_wait: float = 0.0
+    retry_after: int = 0
+
+
+class AdmissionController:
+    """
+    Session gate in front of run_bot
+
+    admit() accepts a call while the node has a free session slot, holds
+    it in a bounded FIFO when a slot is expected within max_wait_secs
+    (the estimate is queue position x average call length / max_sessions),
+    and rejects it with a Retry-After otherwise. Overload signals (event
+    loop lag, inference backlog) reject new calls outright so that the
+    calls already up keep their latency. Every admitted call must be
+    release()d when it ends.
+
+    Example:
+        decision = await admission.admit()
+        if not decision.admitted:
+            return 503 with Retry-After: decision.retry_after
+        try:
+            await run_bot(...)
+        finally:
+            admission.release(call_seconds)
+    """
+
+    def __init__(self, max_sessions: int = 20, max_queued: int = 5, max_wait_secs: float = 10.0,
+                 max_inference_queue: int = 32, max_loop_lag_secs: float = 0.25,
+                 session_secs: float = 180.0, retry_after_secs: int = 5,
+                 inference_depth: Optional[Callable[[], int]] = None, lag_interval: float = 0.5):
+        self.max_sessions = max(1, max_sessions)
+        self.max_queued = max(0, max_queued)
+        self.max_wait_secs = max_wait_secs
+        self.max_inference_queue = max_inference_queue
+        self.max_loop_lag_secs = max_loop_lag_secs
+        self.avg_session_secs = session_secs
+        self.retry_after_secs = max(1, retry_after_secs)
+        self.inference_depth = inference_depth or (lambda: 0)
+        self.lag_interval = lag_interval
+        self.active = 0
+        self.loop_lag = 0.0
+        self._waiters: List[asyncio.Future] = []
+        self._lag_task: Optional[asyncio.Task] = None
+        self.stats = {"accepted": 0, "queued": 0, "rejected": 0}
+        for limit, value in (("max_sessions", self.max_sessions), ("max_queued", self.max_queued),
+                             ("max_wait_secs", max_wait_secs), ("max_inference_queue", max_inference_queue),
+                             ("max_loop_lag_secs", max_loop_lag_secs)):
+            admission_limits.labels(limit=limit).set(value)
+
+    @classmethod
+    def from_settings(cls, settings: Optional[Dict[str, Any]] = None, **kwargs) -> "AdmissionController":
+        settings = dict(settings or admission_settings())
+        settings.pop("enabled", None)
+        return cls(**settings, **kwargs)
+
+    def estimate_wait(self, position: int) -> float:
+        """Seconds until the position-th queued call gets a slot, if calls end evenly spread."""
+        return position * self.avg_session_secs / self.max_sessions
+
+    def _overload(self) -> Optional[str]:
+        if self.loop_lag > self.max_loop_lag_secs:
+            return "loop_lag"
+        if self.inference_depth() > self.max_inference_queue:
+            return "inference_queue"
+        return None
+
+    def _reject(self, reason: str, estimated_wait: float = 0.0, waited: float = 0.0) -> AdmissionDecision:
+        self.stats["rejected"] += 1
+        admission_decisions_total.labels(decision="rejected", reason=reason).inc()
+        retry_after = max(self.retry_after_secs, math.ceil(estimated_wait))
+        logger.warning(f"🚦 Call rejected ({reason}): {self.active}/{self.max_sessions} sessions, "
+                       f"{len(self._waiters)} queued, retry in {retry_after}s")
+        return AdmissionDecision(False, reason, waited=waited, estimated_wait=estimated_wait, retry_after=retry_after)
+
+    def _accept(self, reason: str, waited: float = 0.0, estimated_wait: float = 0.0) -> AdmissionDecision:
+        self.stats[reason] += 1
+        admission_decisions_total.labels(decision="accepted", reason=reason).inc()
+        admission_wait_seconds.observe(waited)
+        return AdmissionDecision(True, reason, waited=waited, estimated_wait=estimated_wait)
+
+    def _set_gauges(self) -> None:
+        admission_active_sessions.set(self.active)
+        admission_queue_length.set(len(self._waiters))
+
+    async def admit(self) -> AdmissionDecision:
+        """Take a session slot for a new call, waiting in the queue if worthwhile."""
+        overload = self._overload()
+        if overload:
+            return self._reject(overload)
+        if self.active < self.max_sessions and not self._waiters:
+            self.active += 1
+            self._set_gauges()
+            return self._accept("accepted")
+
+        position = len(self._waiters) + 1
+        estimated = self.estimate_wait(position)
+        if position > self.max_queued:
+            return self._reject("queue_full", estimated)
+        if estimated > self.max_wait_secs:
+            return self._reject("wait_too_long", estimated)
+
+        start = time.monotonic()
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._set_gauges()
+        logger.info(f"⏳ Call queued at position {position}, estimated wait {estimated:.1f}s")
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.max_wait_secs)
+        except asyncio.TimeoutError:
+            if not waiter.done():
+                self._waiters.remove(waiter)
+                waiter.cancel()
+                self._set_gauges()
+                return self._reject("timeout", self.estimate_wait(len(self._waiters) + 1), time.monotonic() - start)
+        except asyncio.CancelledError:
+            # Client went away: give up the place, or the slot handed over meanwhile
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+                self._set_gauges()
+            elif waiter.done() and not waiter.cancelled():
+                self.release()
+            raise
+        return self._accept("queued", time.monotonic() - start, estimated)
+
+    def release(self, session_secs: Optional[float] = None) -> None:
+        """Free the slot of an ended call (hands it to the oldest queued call)."""
+        if session_secs is not None and session_secs > 0:
+            self.avg_session_secs = 0.9 * self.avg_session_secs + 0.1 * session_secs
+        while self._waiters:
+            waiter = self._waiters.pop(0)
+            if not waiter.done():
+                waiter.set_result(None)  # the slot passes on; active stays the same
+                self._set_gauges()
+                return
+        self.active = max(0, self.active - 1)
+        self._set_gauges()
+
+    async def _watch_loop_lag(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.lag_interval)
+            lag = max(0.0, loop.time() - start - self.lag_interval)
+            # Rise at once, decay over a few samples
+            self.loop_lag = max(lag, 0.5 * self.loop_lag)
+            event_loop_lag_seconds.set(self.loop_lag)
+
+    def start(self) -> None:
+        if self._lag_task is None or self._lag_task.done():
+            self._lag_task = asyncio.create_task(self._watch_loop_lag())
+
+    async def stop(self) -> None:
+        if self._lag_task is not None:
+            self._lag_task.cancel()
+            await asyncio.gather(self._lag_task, return_exceptions=True)
+            self._lag_task = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "active": self.active,
+            "queued_now": len(self._waiters),
+            "max_sessions": self.max_sessions,
+            "max_queued": self.max_queued,
+            "loop_lag_ms": round(self.loop_lag * 1000, 1),
+            "inference_queue": self.inference_depth(),
+            "avg_session_secs": round(self.avg_session_secs, 1),
+        }
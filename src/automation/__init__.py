@@ -0,0 +1,151 @@
+"""
+Deterministic browser automation helpers
+Playwright fast paths used by BrowserAgentHandler before falling back to the LLM agent
+"""
+from src.automation.dom_filler import (
+    DOM_ACTION_TIMEOUT,
+    get_session_page,
+    fill_fields_dom,
+    fill_field_dom,
+)
+from src.automation.actions import (
+    clear_form,
+    focus_field,
+    go_to_step,
+    read_fields,
+    search_fields,
+    show_section,
+    submit_form_dom,
+)
+from src.automation.form_schema import (
+    EXTRACT_SCHEMA_JS,
+    FormField,
+    FormSchema,
+    FormSchemaCache,
+    form_schema_cache,
+    get_form_urls,
+    is_form_page,
+)
+from src.automation.page_pool import (
+    FormPagePool,
+    PooledForm,
+    page_pool_settings,
+)
+from src.automation.form_state import (
+    FormState,
+    ReconcileOp,
+)
+from src.automation.session_store import (
+    SessionStore,
+    compact_agent_history,
+    session_footprint,
+    session_limits,
+)
+from src.automation.macros import (
+    Macro,
+    MacroCache,
+    MacroStep,
+    macro_cache,
+    record_macro,
+    replay_macro,
+)
+from src.automation.session_actor import (
+    SessionActor,
+    SessionActors,
+    serialized,
+)
+from src.automation.jobs import (
+    Job,
+    JobManager,
+    JobQueueFull,
+    job_manager,
+    job_settings,
+)
+from src.automation.preemption import (
+    AgentRun,
+    PreemptionRegistry,
+    ResumePoint,
+    RunPreempted,
+    observe_form,
+    preemption_settings,
+)
+from src.automation.progress import (
+    ProgressHub,
+    emit_progress,
+    progress_hub,
+    step_events,
+)
+from src.automation.conversation import (
+    ContextCursor,
+    ContextResync,
+    Conversation,
+    ConversationStore,
+    conversation_settings,
+    conversation_store,
+)
+from src.automation.sharding import (
+    ShardedBrowserAgent,
+    sharding_settings,
+)
+
+__all__ = [
+    "DOM_ACTION_TIMEOUT",
+    "get_session_page",
+    "fill_fields_dom",
+    "fill_field_dom",
+    "clear_form",
+    "focus_field",
+    "go_to_step",
+    "read_fields",
+    "search_fields",
+    "show_section",
+    "submit_form_dom",
+    "EXTRACT_SCHEMA_JS",
+    "FormField",
+    "FormSchema",
+    "FormSchemaCache",
+    "form_schema_cache",
+    "get_form_urls",
+    "is_form_page",
+    "FormPagePool",
+    "PooledForm",
+    "page_pool_settings",
+    "FormState",
+    "ReconcileOp",
+    "SessionStore",
+    "compact_agent_history",
+    "session_footprint",
+    "session_limits",
+    "Macro",
+    "MacroCache",
+    "MacroStep",
+    "macro_cache",
+    "record_macro",
+    "replay_macro",
+    "SessionActor",
+    "SessionActors",
+    "serialized",
+    "Job",
+    "JobManager",
+    "JobQueueFull",
+    "job_manager",
+    "job_settings",
+    "AgentRun",
+    "PreemptionRegistry",
+    "ResumePoint",
+    "RunPreempted",
+    "observe_form",
+    "preemption_settings",
+    "ProgressHub",
+    "emit_progress",
+    "progress_hub",
+    "step_events",
+    "ContextCursor",
+    "ContextResync",
+    "Conversation",
+    "ConversationStore",
+    "conversation_settings",
+    "conversation_store",
+    "ShardedBrowserAgent",
+    "sharding_settings",
+]
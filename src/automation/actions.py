@@ -0,0 +1,451 @@
+"""
+Deterministic Form Actions
+Scripted Playwright actions (wizard steps, sections, submit, clear, focus, read, search) for the known form layouts
+"""
+import asyncio
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+
+from src.automation.dom_filler import DOM_ACTION_TIMEOUT
+
+
+# How long submit_form_dom waits for a toast, form reset or HTTP response
+SUBMIT_CONFIRM_TIMEOUT = float(os.getenv("BROWSER_SUBMIT_CONFIRM_TIMEOUT", "5.0"))
+
+
+# Shared helpers: field lookup (name -> id -> label -> placeholder, as in the DOM
+# filler), wizard panes ([data-step] sections toggled with .is-hidden) and
+# stepping between panes through their own next/prev buttons.
+_PRELUDE = r"""
+  const normalize = (s) => (s || "").toString()
+    .normalize("NFD").replace(/[\u0300-\u036f]/g, "")
+    .replace(/đ/g, "d").replace(/Đ/g, "D")
+    .toLowerCase().replace(/[*:]/g, "").replace(/\s+/g, " ").trim();
+  const isField = (el) => el && /^(INPUT|SELECT|TEXTAREA)$/.test(el.tagName);
+  const SKIP_TYPES = ["hidden", "submit", "button", "reset", "image", "file"];
+
+  const labelOf = (el) => {
+    if (!el) return "";
+    if (el.id) {
+      const byFor = document.querySelector(`label[for="${CSS.escape(el.id)}"]`);
+      if (byFor) return byFor.textContent.replace(/\s+/g, " ").trim();
+    }
+    const wrap = el.closest("label") || (el.closest(".form-group, .field, .form-field") || {}).querySelector?.("label");
+    return wrap ? wrap.textContent.replace(/\s+/g, " ").trim() : "";
+  };
+
+  const findField = (key) => {
+    const byName = document.querySelector(`[name="${CSS.escape(key)}"]`);
+    if (isField(byName)) return byName;
+    const byId = document.getElementById(key);
+    if (isField(byId)) return byId;
+    const target = normalize(key);
+    if (!target) return null;
+    const labelled = (label) => {
+      if (label.htmlFor) {
+        const el = document.getElementById(label.htmlFor);
+        if (isField(el)) return el;
+      }
+      return label.querySelector("input, select, textarea");
+    };
+    // Exact text wins; a substring match only counts when it names a single field
+    const pick = (candidates) => {
+      const exact = candidates.filter((c) => c.text === target && c.el);
+      if (exact.length) return exact[0].el;
+      const partial = new Set(candidates.filter((c) => c.text.includes(target) && c.el).map((c) => c.el));
+      return partial.size === 1 ? [...partial][0] : null;
+    };
+    const labels = Array.from(document.querySelectorAll("label"))
+      .map((label) => ({ text: normalize(label.textContent), el: labelled(label) }))
+      .filter((c) => c.text);
+    const byLabel = pick(labels);
+    if (byLabel) return byLabel;
+    return pick(Array.from(document.querySelectorAll("input[placeholder], textarea[placeholder]"))
+      .map((el) => ({ text: normalize(el.placeholder), el })));
+  };
+
+  const panes = () => Array.from(document.querySelectorAll(".wizard-step-pane[data-step], section[data-step]"));
+  const activePane = () => panes().find((p) => !p.classList.contains("is-hidden")) || null;
+  const currentStep = () => { const p = activePane(); return p ? Number(p.dataset.step) || null : null; };
+  const stepOf = (el) => { const p = el && el.closest("[data-step]"); return p ? Number(p.dataset.step) || null : null; };
+
+  const NEXT_WORDS = ["tiep tuc", "tiep theo", "next", "continue"];
+  const PREV_WORDS = ["quay lai", "tro lai", "back", "previous"];
+  const buttonIn = (root, selector, words) => root.querySelector(selector)
+    || Array.from(root.querySelectorAll("button, a, input[type=button]"))
+      .find((b) => words.some((w) => normalize(b.textContent || b.value).includes(w))) || null;
+
+  const clickStep = (direction) => {
+    const pane = activePane() || document;
+    const button = direction === "next"
+      ? buttonIn(pane, ".wizard-next", NEXT_WORDS)
+      : buttonIn(pane, ".wizard-prev", PREV_WORDS);
+    if (!button) return false;
+    button.click();
+    return true;
+  };
+
+  // Walk the wizard to `target` with its own buttons; false if it refuses to move
+  const showStep = (target) => {
+    if (!target) return true;
+    for (let i = 0; i < 10; i++) {
+      const current = currentStep();
+      if (current === null) return false;
+      if (current === target) return true;
+      if (!clickStep(current < target ? "next" : "prev") || currentStep() === current) return false;
+    }
+    return currentStep() === target;
+  };
+
+  const valueOf = (el) => {
+    const type = (el.type || "").toLowerCase();
+    if (type === "radio") {
+      const checked = document.querySelector(`[name="${CSS.escape(el.name)}"]:checked`);
+      return { value: checked ? checked.value : "", text: checked ? labelOf(checked) : "" };
+    }
+    if (type === "checkbox") return { value: el.checked ? (el.value || "on") : "", text: el.checked ? labelOf(el) : "" };
+    if (el.tagName === "SELECT") {
+      const opt = el.selectedOptions[0];
+      return { value: el.value, text: el.value && opt ? opt.textContent.replace(/\s+/g, " ").trim() : "" };
+    }
+    return { value: el.value, text: el.value };
+  };
+
+  // Whether a field still holds what the page rendered it with (placeholder option, unticked box...)
+  const atDefault = (el) => {
+    const type = (el.type || "").toLowerCase();
+    if (type === "radio") {
+      const group = el.name ? Array.from(document.querySelectorAll(`[name="${CSS.escape(el.name)}"]`)) : [el];
+      return group.every((r) => r.checked === r.defaultChecked);
+    }
+    if (type === "checkbox") return el.checked === el.defaultChecked;
+    if (el.tagName === "SELECT") {
+      const options = Array.from(el.options);
+      const initial = options.find((o) => o.defaultSelected) || (el.multiple ? null : options[0]);
+      return options.every((o) => o.selected === (o === initial));
+    }
+    return el.value === el.defaultValue;
+  };
+
+  const describe = (el) => ({
+    found: true,
+    name: el.name || el.id,
+    type: (el.type || el.tagName).toLowerCase(),
+    label: labelOf(el),
+    step: stepOf(el),
+    changed: !atDefault(el),
+    ...valueOf(el),
+  });
+
+  // Toasts/alerts as { text, shown }; snapshotted before a submit click and compared after it
+  const toasts = () => Array.from(document.querySelectorAll("#toast, .toast, [role=alert], [role=status]")).map((el) => {
+    const style = getComputedStyle(el);
+    const shown = el.classList.contains("show") || (style.display !== "none" && style.visibility !== "hidden" && style.opacity !== "0");
+    return { text: el.textContent.replace(/\s+/g, " ").trim(), shown };
+  });
+
+  const allFields = () => {
+    const seen = new Set();
+    return Array.from(document.querySelectorAll("input, select, textarea")).filter((el) => {
+      const key = el.name || el.id;
+      if (!key || SKIP_TYPES.includes((el.type || "").toLowerCase()) || seen.has(key)) return false;
+      seen.add(key);
+      return true;
+    });
+  };
+"""
+
+
+def _action_js(body: str) -> str:
+    return "(args) => {\n" + _PRELUDE + body + "\n}"
+
+
+WIZARD_STEP_JS = _action_js(r"""
+  const from = currentStep();
+  if (from === null) return { found: false, reason: "no_wizard" };
+  const steps = panes().map((p) => Number(p.dataset.step)).filter(Boolean);
+  const target = args.direction === "next" ? from + 1 : args.direction === "prev" ? from - 1 : Number(args.step);
+  if (!steps.includes(target)) {
+    return { found: true, moved: false, from_step: from, to_step: from, steps, reason: "no_such_step" };
+  }
+  const moved = showStep(target);
+  const pane = activePane();
+  const heading = pane && pane.querySelector("h1, h2, h3, legend, .section-title");
+  if (pane) pane.scrollIntoView({ block: "start" });
+  return {
+    found: true, moved, from_step: from, to_step: currentStep(), steps,
+    title: heading ? heading.textContent.replace(/\s+/g, " ").trim() : "",
+    reason: moved ? null : "blocked",
+  };
+""")
+
+
+SECTION_JS = _action_js(r"""
+  const query = normalize(args.query);
+  if (!query) return { found: false };
+  const matches = (text) => { const t = normalize(text); return t.length > 2 && (t === query || t.includes(query) || query.includes(t)); };
+  const candidates = [
+    ...document.querySelectorAll(".wizard-step[data-step]"),
+    ...document.querySelectorAll("h1, h2, h3, h4, legend, .section-title, [aria-label]"),
+  ];
+  const hit = candidates.find((el) => matches(el.getAttribute("aria-label") || el.textContent));
+  if (!hit) return { found: false };
+  const step = hit.classList.contains("wizard-step") ? Number(hit.dataset.step) || null : stepOf(hit);
+  const shown = showStep(step);
+  const target = hit.classList.contains("wizard-step") ? (activePane() || hit) : hit;
+  const details = hit.closest("details");
+  if (details) details.open = true;
+  target.scrollIntoView({ block: "start" });
+  return { found: true, shown, step: currentStep(), title: hit.textContent.replace(/\s+/g, " ").trim() };
+""")
+
+
+FOCUS_FIELD_JS = _action_js(r"""
+  const el = findField(args.key);
+  if (!el) return { found: false };
+  const shown = showStep(stepOf(el));
+  el.scrollIntoView({ block: "center" });
+  el.focus({ preventScroll: true });
+  return { ...describe(el), shown, focused: document.activeElement === el };
+""")
+
+
+READ_FIELDS_JS = _action_js(r"""
+  if (!args.keys) {
+    const fields = {};
+    allFields().forEach((el) => { fields[el.name || el.id] = describe(el); });
+    return { fields, step: currentStep() };
+  }
+  const fields = {};
+  for (const key of args.keys) {
+    const el = findField(key);
+    fields[key] = el ? describe(el) : { found: false };
+  }
+  return { fields, step: currentStep() };
+""")
+
+
+SEARCH_FIELDS_JS = _action_js(r"""
+  const query = normalize(args.query);
+  const tokens = query.split(" ").filter((t) => t.length > 1);
+  if (!tokens.length) return { matches: [] };
+  const scored = allFields().map((el) => {
+    const hay = normalize([el.name, el.id, labelOf(el), el.placeholder].join(" "));
+    const score = tokens.filter((t) => hay.includes(t)).length / tokens.length + (hay.includes(query) ? 1 : 0);
+    return { el, score };
+  }).filter((m) => m.score > 0).sort((a, b) => b.score - a.score);
+  return {
+    matches: scored.slice(0, args.limit || 5).map(({ el, score }) => ({
+      name: el.name || el.id, label: labelOf(el), step: stepOf(el), score: Math.round(score * 100) / 100,
+    })),
+  };
+""")
+
+
+CLEAR_FORM_JS = _action_js(r"""
+  const form = document.querySelector("form");
+  if (!form) return { found: false };
+  const button = document.getElementById("clearBtn") || form.querySelector("button[type=reset], input[type=reset]");
+  if (button) {
+    button.click();
+  } else {
+    form.reset();
+    allFields().forEach((el) => el.dispatchEvent(new Event("change", { bubbles: true })));
+  }
+  const left = allFields().filter((el) => valueOf(el).value && el.type !== "checkbox" && el.type !== "radio"
+    && el.defaultValue !== el.value).map((el) => el.name || el.id);
+  return { found: true, method: button ? "button" : "reset", remaining: left, step: currentStep() };
+""")
+
+
+SUBMIT_FORM_JS = _action_js(r"""
+  const forms = Array.from(document.forms);
+  const form = forms.find((f) => f.querySelector("button[type=submit], input[type=submit]")) || forms[0];
+  if (!form) return { found: false, reason: "no_form" };
+  const button = form.querySelector("button[type=submit], input[type=submit]")
+    || buttonIn(form, "#submitBtn", ["gui", "nop", "submit", "dang ky", "xac nhan", "hoan tat"]);
+
+  const invalid = Array.from(form.elements).filter((el) => el.willValidate && !el.checkValidity());
+  if (invalid.length) {
+    showStep(stepOf(invalid[0]));
+    invalid[0].focus({ preventScroll: false });
+    return {
+      found: true, submitted: false, reason: "invalid",
+      invalid: invalid.map((el) => ({ name: el.name || el.id, label: labelOf(el), step: stepOf(el), message: el.validationMessage })),
+    };
+  }
+
+  const toastsBefore = toasts();
+  const filled = allFields().filter((el) => valueOf(el).value).length;
+  if (button) {
+    showStep(stepOf(button));
+    button.click();
+  } else if (form.requestSubmit) {
+    form.requestSubmit();
+  } else {
+    return { found: true, submitted: false, reason: "no_submit_button" };
+  }
+  return {
+    found: true, submitted: true,
+    action: form.hasAttribute("action") ? form.action : null,
+    toasts_before: toastsBefore,
+    filled_before: filled,
+  };
+""")
+
+
+# Polled after submit: a toast that was not already showing before the click,
+# or the form being reset, means the page accepted it
+SUBMIT_SIGNAL_JS = _action_js(r"""
+  const before = {};
+  for (const t of args.toasts_before || []) {
+    if (t.shown) before[t.text] = (before[t.text] || 0) + 1;
+  }
+  const toast = toasts().find((t) => t.text && t.shown && !(before[t.text]-- > 0));
+  if (toast) {
+    const failed = ["loi", "that bai", "error", "failed", "khong hop le"].some((w) => normalize(toast.text).includes(w));
+    return { signal: "toast", message: toast.text, ok: !failed };
+  }
+  if (args.filled_before > 0 && allFields().every((el) => !valueOf(el).value)) {
+    return { signal: "reset", message: "", ok: true };
+  }
+  return null;
+""")
+
+
+async def _evaluate(page, script: str, args: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+    raw = await asyncio.wait_for(page.evaluate(script, args), timeout)
+    if not isinstance(raw, dict):
+        raise TypeError(f"Unexpected evaluate result: {type(raw).__name__}")
+    return raw
+
+
+def _timed(start: float, result: Dict[str, Any]) -> Dict[str, Any]:
+    result["duration_ms"] = round((time.perf_counter() - start) * 1000, 2)
+    return result
+
+
+async def go_to_step(page, direction: str = "next", step: Optional[int] = None, timeout: float = DOM_ACTION_TIMEOUT) -> Dict[str, Any]:
+    """
+    Move the form wizard one step forward/back or to a given step
+
+    Returns:
+        dict with found (page has a wizard), moved, from_step, to_step, steps,
+        pane title and duration_ms
+    """
+    start = time.perf_counter()
+    return _timed(start, await _evaluate(page, WIZARD_STEP_JS, {"direction": direction, "step": step}, timeout))
+
+
+async def show_section(page, query: str, timeout: float = DOM_ACTION_TIMEOUT) -> Dict[str, Any]:
+    """Bring the wizard step / heading matching `query` into view."""
+    start = time.perf_counter()
+    return _timed(start, await _evaluate(page, SECTION_JS, {"query": query}, timeout))
+
+
+async def focus_field(page, key: str, timeout: float = DOM_ACTION_TIMEOUT) -> Dict[str, Any]:
+    """Switch to the field's wizard step, scroll it into view and focus it."""
+    start = time.perf_counter()
+    return _timed(start, await _evaluate(page, FOCUS_FIELD_JS, {"key": key}, timeout))
+
+
+async def read_fields(page, keys: Optional[List[str]] = None, timeout: float = DOM_ACTION_TIMEOUT) -> Dict[str, Any]:
+    """
+    Read field values in one round trip
+
+    Args:
+        page: Playwright Page
+        keys: Field names/labels to read (None = every named field on the form)
+
+    Returns:
+        dict with "fields" ({key: {found, name, type, label, step, changed, value, text}},
+        changed meaning the value differs from the page's default),
+        the current wizard "step" and duration_ms
+    """
+    start = time.perf_counter()
+    result = await _evaluate(page, READ_FIELDS_JS, {"keys": keys}, timeout)
+    if not isinstance(result.get("fields"), dict):
+        raise TypeError("Unexpected read result")
+    return _timed(start, result)
+
+
+async def search_fields(page, query: str, limit: int = 5, timeout: float = DOM_ACTION_TIMEOUT) -> Dict[str, Any]:
+    """Rank form fields whose name, label or placeholder match the query."""
+    start = time.perf_counter()
+    return _timed(start, await _evaluate(page, SEARCH_FIELDS_JS, {"query": query, "limit": limit}, timeout))
+
+
+async def clear_form(page, timeout: float = DOM_ACTION_TIMEOUT) -> Dict[str, Any]:
+    """Reset the whole form through its clear/reset button (or form.reset())."""
+    start = time.perf_counter()
+    return _timed(start, await _evaluate(page, CLEAR_FORM_JS, {}, timeout))
+
+
+async def submit_form_dom(page, timeout: float = SUBMIT_CONFIRM_TIMEOUT) -> Dict[str, Any]:
+    """
+    Submit the form and confirm the outcome without the LLM agent
+
+    Required fields are checked first (nothing is clicked if any is invalid).
+    After the click, non-GET HTTP responses are intercepted while the page is
+    polled for a toast or a form reset; whichever signal arrives first wins.
+
+    Returns:
+        dict with found, submitted, confirmed, ok, signal ("toast", "reset" or
+        "response"), message, status, invalid fields and duration_ms
+    """
+    start = time.perf_counter()
+    responses: List[Dict[str, Any]] = []
+    response_seen = asyncio.Event()
+    action_url: Dict[str, Optional[str]] = {"url": None}
+
+    def on_response(response):
+        request = response.request
+        if request.method == "GET":
+            return
+        responses.append({"url": response.url, "status": response.status, "method": request.method})
+        if action_url["url"] and response.url.startswith(action_url["url"]):
+            response_seen.set()
+
+    page.on("response", on_response)
+    try:
+        result = await _evaluate(page, SUBMIT_FORM_JS, {}, DOM_ACTION_TIMEOUT)
+        if not result.get("submitted"):
+            return _timed(start, {**result, "confirmed": False, "ok": False})
+
+        action_url["url"] = result.get("action")
+        if action_url["url"] and any(r["url"].startswith(action_url["url"]) for r in responses):
+            response_seen.set()
+
+        signal_task = asyncio.ensure_future(page.wait_for_function(
+            SUBMIT_SIGNAL_JS,
+            arg={"toasts_before": result.get("toasts_before", []), "filled_before": result.get("filled_before", 0)},
+            timeout=timeout * 1000,
+            polling=100,
+        ))
+        response_task = asyncio.ensure_future(response_seen.wait())
+        done, pending = await asyncio.wait({signal_task, response_task}, timeout=timeout + 0.5,
+                                           return_when=asyncio.FIRST_COMPLETED)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+        outcome = {"found": True, "submitted": True, "confirmed": False, "ok": True, "signal": None,
+                   "message": "", "status": None, "responses": responses}
+        if response_task in done:
+            response = next(r for r in responses if r["url"].startswith(action_url["url"]))
+            outcome.update(confirmed=True, signal="response", status=response["status"],
+                           ok=200 <= response["status"] < 400)
+        elif signal_task in done and not signal_task.cancelled() and signal_task.exception() is None:
+            signal = await signal_task.result().json_value()
+            outcome.update(confirmed=True, signal=signal["signal"], message=signal["message"], ok=signal["ok"])
+        else:
+            logger.warning("⚠️ Submit clicked but no confirmation signal arrived")
+        failed = [r for r in responses if r["status"] >= 400]
+        if failed and outcome["signal"] is None:
+            outcome.update(ok=False, status=failed[0]["status"])
+        return _timed(start, outcome)
+    finally:
+        page.remove_listener("response", on_response)
@@ -0,0 +1,223 @@
+"""
+Conversation Context Protocol
+Per-session conversation kept by the browser service; the voice bot sends only new messages plus a sequence cursor
+"""
+import os
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, List, Optional
+
+from loguru import logger
+
+from src.automation.session_store import SessionStore
+
+
+def conversation_settings() -> Dict[str, Any]:
+    """Conversation window limits from environment."""
+    return {
+        "window": int(os.getenv("BROWSER_CONTEXT_WINDOW", "40")),
+        "max_chars": int(os.getenv("BROWSER_CONTEXT_MAX_CHARS", "20000")),
+        "idle_ttl": float(os.getenv("BROWSER_CONTEXT_IDLE_TTL", "1800")),
+        "max_sessions": int(os.getenv("BROWSER_CONTEXT_MAX_SESSIONS", "500")),
+    }
+
+
+class ContextResync(Exception):
+    """The sender's cursor does not line up with the stored conversation"""
+
+    def __init__(self, session_id: str, context_seq: int, reason: str):
+        super().__init__(f"Context of {session_id} needs resync at seq {context_seq}: {reason}")
+        self.session_id = session_id
+        self.context_seq = context_seq
+        self.reason = reason
+
+
+class Conversation:
+    """
+    Sliding window of one session's messages
+
+    seq counts every message ever applied; only the last `window` are kept,
+    so memory and render cost stay constant however long the session runs.
+    """
+
+    def __init__(self, window: int):
+        self.seq = 0
+        self.messages: Deque[Dict[str, Any]] = deque(maxlen=max(1, window))
+
+    def append(self, message: Dict[str, Any]) -> None:
+        self.messages.append(message)
+        self.seq = message["seq"]
+
+    def render(self, max_chars: int = 0) -> str:
+        """Prompt context as "role: content" lines, newest kept when over max_chars."""
+        lines: List[str] = []
+        size = 0
+        for message in reversed(self.messages):
+            line = f"{message['role']}: {message['content']}"
+            if max_chars and lines and size + len(line) + 1 > max_chars:
+                break
+            lines.append(line)
+            size += len(line) + 1
+        return "\n".join(reversed(lines))
+
+
+def _normalize(messages: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    normalized = []
+    for message in messages:
+        if not isinstance(message, dict):
+            raise ValueError("messages must be objects")
+        seq, role, content = message.get("seq"), message.get("role"), message.get("content")
+        if not isinstance(seq, int) or isinstance(seq, bool) or seq < 1:
+            raise ValueError("message seq must be a positive integer")
+        if not isinstance(role, str) or not isinstance(content, str):
+            raise ValueError("message role and content must be strings")
+        normalized.append({"seq": seq, "role": role, "content": content})
+    normalized.sort(key=lambda m: m["seq"])
+    for previous, current in zip(normalized, normalized[1:]):
+        if current["seq"] != previous["seq"] + 1:
+            raise ValueError(f"message seq jumps from {previous['seq']} to {current['seq']}")
+    return normalized
+
+
+class ConversationStore:
+    """
+    session_id -> Conversation with idle/LRU eviction
+
+    apply() is idempotent for messages the store already has (seq <= cursor),
+    so overlapping deltas from retried or superseded requests are harmless.
+    A gap (first new seq beyond cursor + 1) or a base_seq the store never
+    reached raises ContextResync; the sender then resends from the returned
+    cursor or replaces the conversation with reset=True.
+
+    Example:
+        conversation = conversation_store.apply("session-1", [
+            {"seq": 1, "role": "user", "content": "Tên tôi là An"},
+        ], base_seq=0)
+        conversation.render()  # "user: Tên tôi là An"
+    """
+
+    def __init__(self, window: Optional[int] = None, max_chars: Optional[int] = None,
+                 idle_ttl: Optional[float] = None, max_sessions: Optional[int] = None):
+        settings = conversation_settings()
+        self.window = window if window is not None else settings["window"]
+        self.max_chars = max_chars if max_chars is not None else settings["max_chars"]
+        self.idle_ttl = idle_ttl if idle_ttl is not None else settings["idle_ttl"]
+        self.max_sessions = max_sessions if max_sessions is not None else settings["max_sessions"]
+        self._conversations: SessionStore = SessionStore()
+        self.resyncs = 0
+
+    def apply(self, session_id: str, messages: Iterable[Dict[str, Any]],
+              base_seq: Optional[int] = None, reset: bool = False) -> Conversation:
+        """
+        Append a delta to the session's conversation
+
+        Args:
+            session_id: Browser session id
+            messages: [{"seq", "role", "content"}] with contiguous seq numbers
+            base_seq: Cursor the sender believes the store is at
+            reset: Replace the stored conversation with these messages
+
+        Returns:
+            The updated Conversation
+
+        Raises:
+            ValueError: malformed messages
+            ContextResync: the delta does not continue the stored conversation
+        """
+        delta = _normalize(messages)
+        self._evict(session_id)
+
+        conversation = self._conversations.get(session_id)
+        if reset or conversation is None:
+            if not reset and delta and delta[0]["seq"] != 1:
+                self.resyncs += 1
+                raise ContextResync(session_id, 0, "unknown session")
+            conversation = Conversation(self.window)
+        self._conversations[session_id] = conversation
+
+        if base_seq is not None and base_seq > conversation.seq and not reset:
+            self.resyncs += 1
+            raise ContextResync(session_id, conversation.seq, f"cursor {base_seq} is ahead")
+
+        new = [m for m in delta if m["seq"] > conversation.seq]
+        if new and not reset and new[0]["seq"] != conversation.seq + 1:
+            self.resyncs += 1
+            raise ContextResync(session_id, conversation.seq, f"gap before seq {new[0]['seq']}")
+
+        for message in new:
+            conversation.append(message)
+        if new:
+            logger.debug(f"🧵 Context {session_id}: +{len(new)} messages (seq {conversation.seq})")
+        return conversation
+
+    def render(self, session_id: str) -> str:
+        conversation = self._conversations.get(session_id)
+        return conversation.render(self.max_chars) if conversation else ""
+
+    def cursor(self, session_id: str) -> int:
+        conversation = self._conversations.get(session_id)
+        return conversation.seq if conversation else 0
+
+    def discard(self, session_id: str) -> None:
+        self._conversations.pop(session_id, None)
+
+    def _evict(self, session_id: str) -> None:
+        for sid in self._conversations.idle_sessions(self.idle_ttl):
+            self._conversations.pop(sid, None)
+        reserve = 0 if session_id in self._conversations else 1
+        for sid in self._conversations.lru_overflow(self.max_sessions, reserve=reserve):
+            self._conversations.pop(sid, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "sessions": len(self._conversations),
+            "window": self.window,
+            "resyncs": self.resyncs,
+        }
+
+
+class ContextCursor:
+    """
+    Sender side of the protocol (voice bot)
+
+    Wraps the transcript list the bot already keeps (append-only) and tracks
+    the seq the browser service has acknowledged.
+    """
+
+    def __init__(self, messages: List[Dict[str, Any]], window: Optional[int] = None):
+        self.messages = messages
+        self.window = window if window is not None else conversation_settings()["window"]
+        self.acked = 0
+
+    def _entries(self, start: int) -> List[Dict[str, Any]]:
+        return [
+            {"seq": i + 1, "role": m["role"], "content": m["content"]}
+            for i, m in enumerate(self.messages[start:], start=start)
+        ]
+
+    def delta(self) -> Dict[str, Any]:
+        """Request fields carrying the messages not yet acknowledged."""
+        return {"messages": self._entries(self.acked), "base_seq": self.acked}
+
+    def sent_seq(self) -> int:
+        return len(self.messages)
+
+    def ack(self, seq: int) -> None:
+        self.acked = max(self.acked, min(seq, len(self.messages)))
+
+    def resync(self, context_seq: int) -> Dict[str, Any]:
+        """
+        Request fields after a resync response
+
+        Resends from the service's cursor when it is one of ours; otherwise
+        replaces the stored conversation with our latest window.
+        """
+        if 0 <= context_seq <= len(self.messages):
+            self.acked = context_seq
+            return self.delta()
+        self.acked = 0
+        start = max(0, len(self.messages) - self.window)
+        return {"messages": self._entries(start), "reset": True}
+
+
+# Global store used by the browser service
+conversation_store = ConversationStore()
@@ -0,0 +1,249 @@
+"""
+Deterministic DOM Filler
+Sets form field values directly through Playwright, bypassing the LLM agent loop
+"""
+import asyncio
+import os
+import time
+from typing import Any, Dict
+
+from loguru import logger
+
+from src.automation.form_schema import is_form_page
+from src.utils.date_parser import VietnameseDateParser
+
+
+# Hard cap for a single page.evaluate round trip
+DOM_ACTION_TIMEOUT = float(os.getenv("BROWSER_DOM_ACTION_TIMEOUT", "5.0"))
+
+
+# Resolves each field by name -> id -> <label> text -> placeholder, sets the value
+# through the native setter (so framework bindings see it), fires input/change and
+# reads the value back in the same round trip. Fields already holding the target
+# value are left untouched; {clear: true} empties a field or unticks its group.
+FILL_FIELDS_JS = r"""
+(args) => {
+  const normalize = (s) => (s || "").toString()
+    .normalize("NFD").replace(/[\u0300-\u036f]/g, "")
+    .replace(/đ/g, "d").replace(/Đ/g, "D")
+    .toLowerCase().replace(/[*:]/g, "").replace(/\s+/g, " ").trim();
+  const isField = (el) => el && /^(INPUT|SELECT|TEXTAREA)$/.test(el.tagName);
+
+  const findField = (key) => {
+    const byName = document.querySelector(`[name="${CSS.escape(key)}"]`);
+    if (isField(byName)) return byName;
+    const byId = document.getElementById(key);
+    if (isField(byId)) return byId;
+    const target = normalize(key);
+    if (!target) return null;
+    const labelled = (label) => {
+      if (label.htmlFor) {
+        const el = document.getElementById(label.htmlFor);
+        if (isField(el)) return el;
+      }
+      return label.querySelector("input, select, textarea");
+    };
+    // Exact text wins; a substring match only counts when it names a single field
+    // ("so dien thoai" must not land in "so dien thoai nguoi than")
+    const pick = (candidates) => {
+      const exact = candidates.filter((c) => c.text === target && c.el);
+      if (exact.length) return exact[0].el;
+      const partial = new Set(candidates.filter((c) => c.text.includes(target) && c.el).map((c) => c.el));
+      return partial.size === 1 ? [...partial][0] : null;
+    };
+    const labels = Array.from(document.querySelectorAll("label"))
+      .map((label) => ({ text: normalize(label.textContent), el: labelled(label) }))
+      .filter((c) => c.text);
+    const byLabel = pick(labels);
+    if (byLabel) return byLabel;
+    return pick(Array.from(document.querySelectorAll("input[placeholder], textarea[placeholder]"))
+      .map((el) => ({ text: normalize(el.placeholder), el })));
+  };
+
+  const setNative = (el, value) => {
+    const proto = el.tagName === "TEXTAREA" ? HTMLTextAreaElement.prototype
+      : el.tagName === "SELECT" ? HTMLSelectElement.prototype
+      : HTMLInputElement.prototype;
+    Object.getOwnPropertyDescriptor(proto, "value").set.call(el, value);
+  };
+
+  const fire = (el) => {
+    el.dispatchEvent(new Event("input", { bubbles: true }));
+    el.dispatchEvent(new Event("change", { bubbles: true }));
+  };
+
+  const results = {};
+  for (const [key, spec] of Object.entries(args.fields)) {
+    const el = findField(key);
+    if (!el) { results[key] = { found: false }; continue; }
+
+    const tag = el.tagName.toLowerCase();
+    const type = (el.type || "").toLowerCase();
+    const name = el.name || el.id || key;
+    const want = normalize(spec.value);
+
+    if (type === "radio" || type === "checkbox") {
+      const group = el.name
+        ? Array.from(document.querySelectorAll(`[name="${CSS.escape(el.name)}"]`))
+        : [el];
+      if (spec.clear) {
+        const ticked = group.filter((r) => r.checked);
+        ticked.forEach((r) => { r.checked = false; fire(r); });
+        results[key] = { found: true, tag, type, name, expected: "", observed: "",
+                         verified: true, unchanged: ticked.length === 0 };
+        continue;
+      }
+      const matched = group.find((r) => normalize(r.value) === want)
+        || group.find((r) => r.labels && Array.from(r.labels).some((l) => normalize(l.textContent) === want));
+      const target = matched || (type === "checkbox" && group.length === 1 ? el : null);
+      if (!target) {
+        results[key] = { found: true, tag, type, name, verified: false, reason: "option_not_found" };
+        continue;
+      }
+      // A lone checkbox takes a boolean-ish value; otherwise the matched option is ticked
+      const checked = matched ? true : ["true", "1", "yes", "co", "x", "on"].includes(want);
+      const unchanged = target.checked === checked;
+      if (!unchanged) {
+        target.checked = checked;
+        fire(target);
+      }
+      results[key] = { found: true, tag, type, name, expected: spec.value,
+                       observed: target.checked ? target.value : "", verified: true, unchanged };
+      continue;
+    }
+
+    let expected = spec.value;
+    if (spec.clear) {
+      expected = "";
+    } else if (tag === "select") {
+      const options = Array.from(el.options);
+      const opt = options.find((o) => normalize(o.value) === want)
+        || options.find((o) => normalize(o.textContent) === want)
+        || options.find((o) => want && o.value && normalize(o.textContent).includes(want));
+      if (!opt) {
+        results[key] = { found: true, tag, type, name, verified: false, reason: "option_not_found" };
+        continue;
+      }
+      expected = opt.value;
+    } else if (type === "date" && spec.date_value) {
+      expected = spec.date_value;
+    }
+
+    // Target state already on the page: no events, no re-render
+    if (el.value === expected) {
+      results[key] = { found: true, tag, type, name, expected, observed: expected, verified: true, unchanged: true };
+      continue;
+    }
+
+    el.focus({ preventScroll: true });
+    setNative(el, expected);
+    fire(el);
+    el.blur();
+
+    const observed = el.value;
+    results[key] = { found: true, tag, type, name, expected, observed, verified: observed === expected };
+  }
+  return results;
+}
+"""
+
+
+async def get_session_page(session: Dict[str, Any]):
+    """
+    Resolve the Playwright page behind a browser session
+
+    Args:
+        session: Entry from BrowserAgentHandler.sessions
+
+    Returns:
+        Playwright Page, or None if the session has no live page or the page
+        is no longer on the session's form (nothing to fill there)
+    """
+    page = session.get("page")
+    if page is not None:
+        return page
+
+    agent = session.get("agent")
+    browser_context = getattr(agent, "browser_context", None)
+    if browser_context is None or not hasattr(browser_context, "get_current_page"):
+        return None
+
+    try:
+        page = await asyncio.wait_for(browser_context.get_current_page(), DOM_ACTION_TIMEOUT)
+    except Exception as e:
+        logger.debug(f"⚠️ No current page for session: {e}")
+        return None
+
+    form_url = (session.get("session_data") or {}).get("url")
+    if form_url and not is_form_page(page.url, form_url):
+        logger.debug(f"⚠️ Session page {page.url} is not the form {form_url}")
+        return None
+    return page
+
+
+def _build_payload(fields: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Normalize values and pre-compute ISO dates for <input type=date> (None clears)."""
+    payload = {}
+    for name, value in fields.items():
+        if value is None:
+            payload[name] = {"value": "", "date_value": None, "clear": True}
+            continue
+        text = str(value)
+        payload[name] = {
+            "value": text,
+            "date_value": VietnameseDateParser.parse(text) if text else None,
+        }
+    return payload
+
+
+async def fill_fields_dom(page, fields: Dict[str, Any], timeout: float = DOM_ACTION_TIMEOUT) -> Dict[str, Any]:
+    """
+    Fill several fields in a single page.evaluate round trip
+
+    Args:
+        page: Playwright Page
+        fields: Dictionary of {field_name: value} (None clears the field)
+        timeout: Max seconds to wait for the evaluate call
+
+    Returns:
+        dict with per-field results, the list of fields that need the LLM
+        fallback, the fields actually changed and the round-trip duration in
+        milliseconds
+    """
+    start = time.perf_counter()
+    raw = await asyncio.wait_for(
+        page.evaluate(FILL_FIELDS_JS, {"fields": _build_payload(fields)}),
+        timeout,
+    )
+    duration_ms = round((time.perf_counter() - start) * 1000, 2)
+
+    if not isinstance(raw, dict):
+        raise TypeError(f"Unexpected evaluate result: {type(raw).__name__}")
+
+    results = {name: raw.get(name) or {"found": False} for name in fields}
+    unresolved = [name for name, r in results.items() if not (r.get("found") and r.get("verified"))]
+    changed = [name for name, r in results.items() if r.get("verified") and not r.get("unchanged")]
+
+    logger.debug(
+        f"⚡ DOM fill {len(fields) - len(unresolved)}/{len(fields)} fields "
+        f"({len(changed)} changed) in {duration_ms}ms"
+    )
+    return {
+        "results": results,
+        "unresolved": unresolved,
+        "changed": changed,
+        "duration_ms": duration_ms,
+    }
+
+
+async def fill_field_dom(page, field_name: str, value: Any, timeout: float = DOM_ACTION_TIMEOUT) -> Dict[str, Any]:
+    """
+    Fill a single field directly through the DOM
+
+    Returns:
+        dict with found/verified flags, observed value and duration_ms
+    """
+    batch = await fill_fields_dom(page, {field_name: value}, timeout=timeout)
+    result = dict(batch["results"][field_name])
+    result["duration_ms"] = batch["duration_ms"]
+    return result
@@ -0,0 +1,410 @@
+"""
+Form Schema Crawler and Cache
+Extracts the inputs/selects/textareas of the VPBank forms once and caches them
+(in memory and on disk) keyed by URL + DOM content hash
+"""
+import asyncio
+import hashlib
+import json
+import os
+import time
+import unicodedata
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+
+from src.utils.field_mapper import FieldMapper
+
+
+def get_form_urls() -> Dict[str, str]:
+    """Form type -> URL for the five supported forms (env overridable)."""
+    return {
+        "loan": os.getenv("LOAN_FORM_URL", "https://vpbank-shared-form-fastdeploy.vercel.app/"),
+        "crm": os.getenv("CRM_FORM_URL", "https://case2-ten.vercel.app/"),
+        "hr": os.getenv("HR_FORM_URL", "https://case3-seven.vercel.app/"),
+        "compliance": os.getenv("COMPLIANCE_FORM_URL", "https://case4-beta.vercel.app/"),
+        "operations": os.getenv("OPERATIONS_FORM_URL", "https://case5-chi.vercel.app/"),
+    }
+
+
+def is_form_page(page_url: Optional[str], form_url: str) -> bool:
+    """Whether a page is (still) showing the form at form_url."""
+    return bool(page_url) and page_url.startswith(form_url.rstrip("/"))
+
+
+EXTRACT_SCHEMA_JS = r"""
+() => {
+  const clean = (s) => (s || "").replace(/\s+/g, " ").replace(/\*/g, "").trim();
+  const labelFor = (el) => {
+    if (el.labels && el.labels.length) return clean(el.labels[0].textContent);
+    const aria = el.getAttribute("aria-label");
+    if (aria) return clean(aria);
+    const group = el.closest(".form-group, .form-field, .field");
+    const label = group && group.querySelector("label");
+    return label ? clean(label.textContent) : "";
+  };
+  const stepOf = (el) => {
+    const pane = el.closest("[data-step]");
+    return pane ? (Number(pane.dataset.step) || null) : null;
+  };
+
+  const fields = [];
+  document.querySelectorAll("input, select, textarea").forEach((el) => {
+    const type = (el.type || el.tagName).toLowerCase();
+    if (["hidden", "submit", "button", "reset", "image"].includes(type)) return;
+    fields.push({
+      name: el.name || "",
+      id: el.id || "",
+      tag: el.tagName.toLowerCase(),
+      type,
+      label: labelFor(el),
+      placeholder: el.placeholder || "",
+      required: !!el.required,
+      step: stepOf(el),
+      options: el.tagName === "SELECT"
+        ? Array.from(el.options).map((o) => ({ value: o.value, text: clean(o.textContent) }))
+        : (type === "radio" || type === "checkbox") ? [{ value: el.value, text: labelFor(el) }] : [],
+    });
+  });
+
+  const steps = Array.from(document.querySelectorAll("section[data-step], .wizard-step-pane[data-step]"))
+    .map((p) => Number(p.dataset.step)).filter(Boolean);
+  return {
+    fields,
+    steps: Array.from(new Set(steps)).sort((a, b) => a - b),
+    form_ids: Array.from(document.forms).map((f) => f.id).filter(Boolean),
+    title: document.title || "",
+  };
+}
+"""
+
+
+def _normalize(text: str) -> str:
+    """Lowercase, strip accents and collapse whitespace for label matching."""
+    text = unicodedata.normalize("NFD", text or "")
+    text = "".join(c for c in text if unicodedata.category(c) != "Mn")
+    text = text.replace("đ", "d").replace("Đ", "D")
+    return " ".join(text.lower().replace(":", " ").split())
+
+
+@dataclass
+class FormField:
+    """Single input/select/textarea discovered on a form"""
+    name: str
+    id: str = ""
+    tag: str = "input"
+    type: str = "text"
+    label: str = ""
+    placeholder: str = ""
+    required: bool = False
+    step: Optional[int] = None
+    options: List[Dict[str, str]] = field(default_factory=list)
+
+    @property
+    def key(self) -> str:
+        """Selector key used by the DOM filler (name, falling back to id)."""
+        return self.name or self.id
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass
+class FormSchema:
+    """Schema of one form page"""
+    url: str
+    content_hash: str
+    fields: List[FormField]
+    form_type: str = "unknown"
+    steps: List[int] = field(default_factory=list)
+    form_ids: List[str] = field(default_factory=list)
+    title: str = ""
+    extracted_at: float = field(default_factory=time.time)
+
+    def __post_init__(self):
+        self._index: Dict[str, FormField] = {}
+        for f in self.fields:
+            for alias in (f.name, f.id, f.label, f.placeholder):
+                if alias:
+                    self._index.setdefault(_normalize(alias), f)
+
+    @property
+    def field_names(self) -> List[str]:
+        return [f.key for f in self.fields if f.key]
+
+    def get_field(self, key: str) -> Optional[FormField]:
+        """Exact lookup by name, id, label or placeholder (accent-insensitive)."""
+        return self._index.get(_normalize(key))
+
+    def resolve_field(self, spoken_name: str) -> Optional[FormField]:
+        """
+        Resolve a user/LLM supplied field name to a field on this form
+
+        Tries the exact index first, then the Vietnamese FieldMapper, then a
+        substring match on labels.
+        """
+        found = self.get_field(spoken_name)
+        if found:
+            return found
+
+        mapped = FieldMapper.get_best_match(spoken_name, self.field_names)
+        if mapped:
+            return self.get_field(mapped)
+
+        target = _normalize(spoken_name)
+        if not target:
+            return None
+        for f in self.fields:
+            if f.label and target in _normalize(f.label):
+                return f
+        return None
+
+    def fields_for_step(self, step: int) -> List[FormField]:
+        return [f for f in self.fields if f.step == step]
+
+    def describe(self) -> str:
+        """Compact one-line-per-field description for LLM prompts."""
+        lines = []
+        for f in self.fields:
+            parts = [f'name="{f.key}"', f.type]
+            if f.label:
+                parts.append(f"label: {f.label}")
+            if f.step:
+                parts.append(f"step {f.step}")
+            if f.options and f.tag == "select":
+                choices = [o["value"] for o in f.options if o.get("value")]
+                parts.append("options: " + "|".join(choices[:12]))
+            lines.append("- " + ", ".join(parts))
+        return "\n".join(lines)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "url": self.url,
+            "content_hash": self.content_hash,
+            "form_type": self.form_type,
+            "steps": list(self.steps),
+            "form_ids": list(self.form_ids),
+            "title": self.title,
+            "extracted_at": self.extracted_at,
+            "fields": [f.to_dict() for f in self.fields],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "FormSchema":
+        return cls(
+            url=data["url"],
+            content_hash=data["content_hash"],
+            form_type=data.get("form_type", "unknown"),
+            steps=list(data.get("steps", [])),
+            form_ids=list(data.get("form_ids", [])),
+            title=data.get("title", ""),
+            extracted_at=data.get("extracted_at", time.time()),
+            fields=[FormField(**f) for f in data.get("fields", [])],
+        )
+
+    @classmethod
+    def from_extraction(cls, url: str, raw: Dict[str, Any], form_type: str = "unknown") -> "FormSchema":
+        """Build a schema from EXTRACT_SCHEMA_JS output, merging radio groups."""
+        merged: Dict[str, FormField] = {}
+        ordered: List[FormField] = []
+        for item in raw.get("fields", []):
+            f = FormField(**{**item, "options": [dict(o) for o in item.get("options", [])]})
+            group_key = f.name if f.type in ("radio", "checkbox") and f.name else None
+            if group_key and group_key in merged:
+                merged[group_key].options.extend(f.options)
+                continue
+            if group_key:
+                merged[group_key] = f
+            ordered.append(f)
+
+        steps = list(raw.get("steps", []))
+        return cls(
+            url=url,
+            content_hash=compute_content_hash(ordered, steps),
+            fields=ordered,
+            form_type=form_type,
+            steps=steps,
+            form_ids=list(raw.get("form_ids", [])),
+            title=raw.get("title", ""),
+        )
+
+
+def compute_content_hash(fields: List[FormField], steps: List[int]) -> str:
+    """
+    Hash of the form structure (fields, labels, options, steps)
+
+    Values, visibility classes and inline styles are excluded so that wizard
+    navigation or typed values do not invalidate the cache.
+    """
+    signature = json.dumps(
+        {"fields": [f.to_dict() for f in fields], "steps": steps},
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(signature.encode("utf-8")).hexdigest()[:16]
+
+
+class FormSchemaCache:
+    """
+    Two-level (memory + disk) cache of form schemas
+
+    Example:
+        schema = await form_schema_cache.ensure(page, url, form_type="loan")
+        field = schema.resolve_field("số điện thoại")  # -> phoneNumber
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, extract_timeout: float = 10.0):
+        """
+        Initialize cache
+
+        Args:
+            cache_dir: Directory for JSON snapshots (None disables disk cache)
+            extract_timeout: Max seconds for a schema extraction evaluate call
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.extract_timeout = extract_timeout
+        self._schemas: Dict[str, FormSchema] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+
+    def _path_for(self, url: str) -> Optional[Path]:
+        if not self.cache_dir:
+            return None
+        digest = hashlib.sha1(url.encode("utf-8")).hexdigest()[:16]
+        return self.cache_dir / f"{digest}.json"
+
+    def get(self, url: str, content_hash: Optional[str] = None) -> Optional[FormSchema]:
+        """
+        Get cached schema for URL (optionally requiring a specific content hash)
+
+        Falls back to the disk snapshot when the schema is not in memory.
+        """
+        schema = self._schemas.get(url)
+        if schema is None:
+            schema = self._load_from_disk(url)
+            if schema is not None:
+                self._schemas[url] = schema
+
+        if schema is None or (content_hash and schema.content_hash != content_hash):
+            return None
+        return schema
+
+    def put(self, schema: FormSchema) -> None:
+        """Store schema in memory and persist it to disk."""
+        self._schemas[schema.url] = schema
+        path = self._path_for(schema.url)
+        if path is None:
+            return
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(schema.to_dict(), ensure_ascii=False, indent=2), encoding="utf-8")
+            tmp.replace(path)
+        except OSError as e:
+            logger.warning(f"⚠️ Could not persist form schema for {schema.url}: {e}")
+
+    def _load_from_disk(self, url: str) -> Optional[FormSchema]:
+        path = self._path_for(url)
+        if path is None or not path.exists():
+            return None
+        try:
+            return FormSchema.from_dict(json.loads(path.read_text(encoding="utf-8")))
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"⚠️ Ignoring corrupt form schema snapshot {path}: {e}")
+            return None
+
+    def get_by_type(self, form_type: str) -> Optional[FormSchema]:
+        """Lookup by form type using the configured form URLs."""
+        url = get_form_urls().get(form_type)
+        return self.get(url) if url else None
+
+    async def ensure(self, page, url: Optional[str] = None, form_type: str = "unknown") -> FormSchema:
+        """
+        Return the schema for the page, extracting it only when the structure changed
+
+        Args:
+            page: Playwright Page already navigated to the form
+            url: Cache key (defaults to page.url)
+            form_type: Form type label stored with the schema
+
+        An extraction that finds no fields is not cached; the cached schema
+        (if any) is returned instead.
+        """
+        url = url or page.url
+        lock = self._locks.setdefault(url, asyncio.Lock())
+        async with lock:
+            raw = await asyncio.wait_for(page.evaluate(EXTRACT_SCHEMA_JS), self.extract_timeout)
+            if not isinstance(raw, dict):
+                raise TypeError(f"Unexpected schema extraction result: {type(raw).__name__}")
+
+            fresh = FormSchema.from_extraction(url, raw, form_type=form_type)
+            cached = self.get(url)
+            if not fresh.fields:
+                # A blank or half-loaded page never replaces (or becomes) the cached schema
+                logger.warning(f"⚠️ No form fields found on {page.url} for {url}, keeping cached schema")
+                return cached or fresh
+            if cached and cached.content_hash == fresh.content_hash:
+                self.hits += 1
+                return cached
+
+            if cached:
+                self.refreshes += 1
+                logger.info(f"🔄 Form schema changed for {url} ({cached.content_hash} → {fresh.content_hash})")
+            else:
+                self.misses += 1
+                logger.info(f"🗺️  Extracted form schema for {url}: {len(fresh.fields)} fields, steps={fresh.steps}")
+
+            self.put(fresh)
+            return fresh
+
+    async def crawl(self, playwright_browser, urls: Optional[Dict[str, str]] = None, timeout_ms: int = 30000) -> Dict[str, FormSchema]:
+        """
+        Load each form once in a throwaway context and cache its schema
+
+        Args:
+            playwright_browser: Playwright Browser instance
+            urls: form_type -> URL (defaults to get_form_urls())
+            timeout_ms: Navigation timeout per form
+
+        Returns:
+            form_type -> FormSchema for the forms that loaded successfully
+        """
+        urls = urls or get_form_urls()
+        schemas: Dict[str, FormSchema] = {}
+        context = await playwright_browser.new_context()
+        try:
+            for form_type, url in urls.items():
+                page = await context.new_page()
+                try:
+                    await page.goto(url, wait_until="domcontentloaded", timeout=timeout_ms)
+                    schemas[form_type] = await self.ensure(page, url, form_type=form_type)
+                except Exception as e:
+                    logger.warning(f"⚠️ Could not crawl {form_type} form at {url}: {e}")
+                finally:
+                    await page.close()
+        finally:
+            await context.close()
+        return schemas
+
+    def clear(self) -> None:
+        """Drop in-memory schemas (disk snapshots are kept)."""
+        self._schemas.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "schemas": len(self._schemas),
+            "hits": self.hits,
+            "misses": self.misses,
+            "refreshes": self.refreshes,
+            "cache_dir": str(self.cache_dir) if self.cache_dir else None,
+        }
+
+
+# Global schema cache
+form_schema_cache = FormSchemaCache(
+    cache_dir=os.getenv("FORM_SCHEMA_CACHE_DIR", ".cache/form_schemas")
+)
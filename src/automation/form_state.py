@@ -0,0 +1,148 @@
+"""
+Form State Reconciler
+Indexed desired/observed field state per session, planned into minimal fill/replace/clear operations
+"""
+import uuid
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional
+
+
+FILL = "fill"
+REPLACE = "replace"
+CLEAR = "clear"
+
+
+@dataclass(frozen=True)
+class ReconcileOp:
+    """One DOM operation needed to move a field to its desired value"""
+    op: str
+    field: str
+    value: Optional[str] = None
+
+    @property
+    def dom_value(self) -> Optional[str]:
+        """Value for fill_fields_dom (None means clear)."""
+        return None if self.op == CLEAR else self.value
+
+
+class FormState:
+    """
+    Desired vs observed values of one session's form
+
+    `desired` holds what the user asked for (None = should be empty), `observed`
+    what was last verified on the page (missing = unknown). Fields whose two
+    values differ, or whose page value is unknown, are dirty and produce
+    operations in plan().
+
+    Example:
+        state = FormState()
+        state.desire("customerName", "Nguyen Van An")
+        ops = state.plan()  # [ReconcileOp("fill", "customerName", "Nguyen Van An")]
+        state.mark_applied(ops)
+    """
+
+    def __init__(self):
+        self.desired: Dict[str, Optional[str]] = {}
+        self.observed: Dict[str, str] = {}
+        self.dirty: set = set()
+        # epoch distinguishes state objects; version counts page changes within one
+        self.epoch = uuid.uuid4().hex[:8]
+        self.version = 0
+
+    @classmethod
+    def from_fields_filled(cls, fields_filled: Iterable[Dict[str, Any]]) -> "FormState":
+        """Rebuild state from the legacy session_data["fields_filled"] list."""
+        state = cls()
+        for item in fields_filled:
+            name, value = item.get("field"), item.get("value")
+            if name is None:
+                continue
+            value = "" if value is None else str(value)
+            state.desired[name] = value
+            state.observed[name] = value
+        return state
+
+    def _refresh(self, name: str) -> None:
+        if name in self.observed and (self.desired.get(name) or "") == self.observed[name]:
+            self.dirty.discard(name)
+        else:
+            self.dirty.add(name)
+
+    def is_applied(self, name: str, value: Any) -> bool:
+        """True if the page already shows this value for the field."""
+        return name in self.observed and self.observed[name] == ("" if value is None else str(value))
+
+    def desire(self, name: str, value: Any) -> None:
+        self.desired[name] = "" if value is None else str(value)
+        self._refresh(name)
+
+    def desire_clear(self, name: str) -> None:
+        self.desired[name] = None
+        self._refresh(name)
+
+    def desire_many(self, fields: Dict[str, Any]) -> None:
+        for name, value in fields.items():
+            self.desire(name, value)
+
+    def plan(self, names: Optional[Iterable[str]] = None) -> List[ReconcileOp]:
+        """
+        Minimal operations for dirty fields (optionally restricted to `names`)
+
+        Returns:
+            fill for empty fields, replace for fields holding another value and
+            clear for fields that should be empty
+        """
+        candidates = self.desired if names is None else names
+        scope = [n for n in dict.fromkeys(candidates) if n in self.dirty]
+        ops = []
+        for name in scope:
+            wanted = self.desired.get(name)
+            if not wanted:
+                ops.append(ReconcileOp(CLEAR, name))
+            elif self.observed.get(name):
+                ops.append(ReconcileOp(REPLACE, name, wanted))
+            else:
+                ops.append(ReconcileOp(FILL, name, wanted))
+        return ops
+
+    def mark_applied(self, ops: Iterable[ReconcileOp], changed: Optional[Iterable[str]] = None) -> None:
+        """
+        Record operations as verified on the page
+
+        Args:
+            ops: Applied operations
+            changed: Fields the page reported as actually modified (None = assume all)
+        """
+        ops = list(ops)
+        modified = {op.field for op in ops} if changed is None else set(changed)
+        for op in ops:
+            self.observed[op.field] = op.value or ""
+            if op.op == CLEAR and self.desired.get(op.field) is None:
+                self.desired.pop(op.field, None)
+            self._refresh(op.field)
+        if any(op.field in modified for op in ops):
+            self.bump()
+
+    def forget(self) -> None:
+        """Drop everything (e.g. after the form was reset or submitted)."""
+        if self.desired or self.observed:
+            self.bump()
+        self.desired.clear()
+        self.observed.clear()
+        self.dirty.clear()
+
+    def bump(self) -> None:
+        """Mark that the page changed in a way this state may not fully describe."""
+        self.version += 1
+
+    def to_fields_filled(self) -> List[Dict[str, str]]:
+        """Legacy list view of fields with a non-empty desired value."""
+        return [{"field": name, "value": value} for name, value in self.desired.items() if value]
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "desired": dict(self.desired),
+            "observed": dict(self.observed),
+            "dirty": sorted(self.dirty),
+            "version": self.version,
+        }
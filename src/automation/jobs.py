@@ -0,0 +1,398 @@
+"""
+Browser Workflow Jobs
+Bounded worker pool that runs /api/execute workflows as jobs with per-session FIFO ordering
+"""
+import asyncio
+import os
+import time
+import uuid
+from collections import deque
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, List, Optional, Set, Tuple
+
+from loguru import logger
+
+from src.monitoring.metrics import (
+    browser_job_queue_depth,
+    browser_job_wait_seconds,
+    browser_jobs_running,
+    browser_jobs_total,
+)
+
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED = (SUCCEEDED, FAILED, CANCELLED)
+
+# Progress events kept per job for late or reconnecting followers
+JOB_EVENT_BUFFER = 200
+
+
+def job_settings() -> Dict[str, float]:
+    """Job pool limits from environment."""
+    return {
+        "workers": int(os.getenv("BROWSER_JOB_WORKERS", "4")),
+        "max_queued": int(os.getenv("BROWSER_JOB_MAX_QUEUED", "50")),
+        "result_ttl": float(os.getenv("BROWSER_JOB_RESULT_TTL", "600")),
+    }
+
+
+class JobQueueFull(Exception):
+    """Raised when the job queue is at capacity; retry_after is a hint in seconds"""
+
+    def __init__(self, queued: int, retry_after: int):
+        super().__init__(f"Job queue full ({queued} queued)")
+        self.queued = queued
+        self.retry_after = retry_after
+
+
+# Runner receives its Job (for progress reports) and returns (payload, http_status)
+JobRunner = Callable[["Job"], Awaitable[Tuple[Dict[str, Any], int]]]
+
+
+class Job:
+    """One queued workflow execution and its observable state"""
+
+    def __init__(self, session_id: str, runner: JobRunner, request_id: Optional[str] = None):
+        self.id = uuid.uuid4().hex
+        self.session_id = session_id
+        self.request_id = request_id
+        self.runner = runner
+        self.status = QUEUED
+        self.events: Deque[Dict[str, Any]] = deque(maxlen=JOB_EVENT_BUFFER)
+        self._seq = 0
+        self._changed = asyncio.Event()
+        self.progress: Dict[str, Any] = {"stage": QUEUED, "message": "", "updated_at": time.time()}
+        self.result: Optional[Dict[str, Any]] = None
+        self.http_status: Optional[int] = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.superseded_by: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+        self._done = asyncio.Event()
+
+    @property
+    def done(self) -> bool:
+        return self.status in FINISHED
+
+    def report(self, stage: str, message: str = "", **details) -> None:
+        """Record the current stage of the run (exposed through the status endpoint)."""
+        self.progress = {"stage": stage, "message": message, **details, "updated_at": time.time()}
+        self.publish({"event": "stage", "session_id": self.session_id, "stage": stage, "message": message,
+                      **details, "ts": self.progress["updated_at"]})
+        logger.debug(f"📍 Job {self.id[:8]} ({self.session_id}): {stage} {message}")
+
+    def publish(self, event: Dict[str, Any]) -> None:
+        """Append a progress event (ProgressHub sink) and wake followers."""
+        self._seq += 1
+        self.events.append({**event, "seq": self._seq, "job_id": self.id})
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    async def follow(self, after: int = 0, keepalive: Optional[float] = None) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        """
+        Yield progress events with seq > after, live, until the job has finished
+
+        Yields None when keepalive seconds pass without an event.
+        """
+        while True:
+            changed = self._changed
+            for event in list(self.events):
+                if event["seq"] > after:
+                    after = event["seq"]
+                    yield event
+            if self.done:
+                return
+            try:
+                await asyncio.wait_for(changed.wait(), keepalive)
+            except asyncio.TimeoutError:
+                yield None
+
+    async def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait until the job finishes; returns False on timeout."""
+        try:
+            await asyncio.wait_for(self._done.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def _finish(self, status: str, result: Optional[Dict[str, Any]] = None,
+                http_status: Optional[int] = None, error: Optional[str] = None) -> None:
+        self.status = status
+        self.result = result
+        self.http_status = http_status
+        self.error = error
+        self.finished_at = time.time()
+        self.report(status, error or "")
+        self._done.set()
+        browser_jobs_total.labels(status=status).inc()
+
+    def to_dict(self, include_result: bool = False) -> Dict[str, Any]:
+        end = self.finished_at or time.time()
+        data = {
+            "job_id": self.id,
+            "session_id": self.session_id,
+            "request_id": self.request_id,
+            "status": self.status,
+            "progress": self.progress,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "duration_seconds": round(end - self.started_at, 2) if self.started_at else None,
+        }
+        if self.error:
+            data["error"] = self.error
+        if self.superseded_by:
+            data["superseded_by"] = self.superseded_by
+        if include_result and self.done:
+            data["http_status"] = self.http_status
+            data["result"] = self.result
+        return data
+
+
+class JobManager:
+    """
+    Runs workflow jobs on a fixed number of workers
+
+    Jobs of one session run strictly one after another in submission order;
+    different sessions run in parallel up to the worker count. Submissions
+    beyond max_queued waiting jobs are rejected with JobQueueFull.
+
+    Example:
+        job = job_manager.submit("session-1", runner, request_id="req-1")
+        await job.wait(timeout=30)
+        print(job.to_dict(include_result=True))
+    """
+
+    def __init__(self, workers: Optional[int] = None, max_queued: Optional[int] = None,
+                 result_ttl: Optional[float] = None):
+        settings = job_settings()
+        self.workers = max(1, workers if workers is not None else settings["workers"])
+        self.max_queued = max_queued if max_queued is not None else settings["max_queued"]
+        self.result_ttl = result_ttl if result_ttl is not None else settings["result_ttl"]
+        self._jobs: Dict[str, Job] = {}
+        self._sessions: Dict[str, Deque[Job]] = {}
+        self._scheduled: Set[str] = set()  # sessions waiting in _ready or running a job
+        self._current: Dict[str, Job] = {}  # running job per session
+        self._ready: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._running = 0
+        self._avg_run_seconds = 10.0
+        self._stopping = False
+
+    # ---- lifecycle -------------------------------------------------------
+
+    @property
+    def started(self) -> bool:
+        return bool(self._tasks)
+
+    def start(self) -> None:
+        if self.started:
+            return
+        self._stopping = False
+        self._ready = asyncio.Queue()
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"browser-job-worker-{i}")
+            for i in range(self.workers)
+        ]
+        logger.info(f"🧵 Browser job pool started: {self.workers} workers, max {self.max_queued} queued")
+
+    async def stop(self) -> None:
+        """Stop the workers; running and queued jobs end as cancelled."""
+        self._stopping = True
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        for queue in self._sessions.values():
+            while queue:
+                job = queue.popleft()
+                if not job.done:
+                    job._finish(CANCELLED, error="Job pool stopped")
+        self._sessions.clear()
+        self._scheduled.clear()
+        self._update_gauges()
+
+    # ---- public API ------------------------------------------------------
+
+    @property
+    def queued(self) -> int:
+        return sum(1 for queue in self._sessions.values() for job in queue if job.status == QUEUED)
+
+    def submit(self, session_id: str, runner: JobRunner, request_id: Optional[str] = None,
+               supersede: bool = False) -> Job:
+        """
+        Queue a job behind earlier jobs of the same session
+
+        Args:
+            supersede: Drop the session's still-queued jobs (the new request
+                carries the full, newer context) and mark its running job as
+                superseded; stopping that run is up to the caller.
+        """
+        self.start()
+        self._prune()
+        job = Job(session_id, runner, request_id=request_id)
+
+        # Capacity first, counting the queued jobs this one would replace: a
+        # rejected request must leave the session's earlier jobs untouched
+        queued = self.queued
+        if supersede:
+            queued -= sum(1 for old in self._sessions.get(session_id, ()) if old.status == QUEUED)
+        if queued >= self.max_queued:
+            browser_jobs_total.labels(status="rejected").inc()
+            raise JobQueueFull(queued, self.retry_after())
+        if supersede:
+            self._supersede(session_id, job)
+
+        self._jobs[job.id] = job
+        self._sessions.setdefault(session_id, deque()).append(job)
+        if session_id not in self._scheduled:
+            self._scheduled.add(session_id)
+            self._ready.put_nowait(session_id)
+        self._update_gauges()
+        logger.info(f"📥 Job {job.id[:8]} queued for session {session_id} ({queued + 1} waiting)")
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def running_job(self, session_id: str) -> Optional[Job]:
+        return self._current.get(session_id)
+
+    def _supersede(self, session_id: str, newer: Job) -> None:
+        queue = self._sessions.get(session_id)
+        while queue:
+            old = queue.popleft()
+            if not old.done:
+                old.superseded_by = newer.id
+                old._finish(CANCELLED, error="Superseded by a newer request")
+                logger.info(f"⏭️ Job {old.id[:8]} superseded by {newer.id[:8]} ({session_id})")
+        running = self._current.get(session_id)
+        if running is not None:
+            running.superseded_by = newer.id
+        self._update_gauges()
+
+    async def cancel(self, job_id: str, timeout: float = 5.0) -> Optional[Job]:
+        """
+        Cancel a queued or running job
+
+        A queued job is dropped from its session queue. A running job's task is
+        cancelled; the browser operation it already handed to the session actor
+        still runs to completion, but its result is discarded.
+        """
+        job = self._jobs.get(job_id)
+        if job is None or job.done:
+            return job
+        if job.status == QUEUED:
+            queue = self._sessions.get(job.session_id)
+            if queue is not None and job in queue:
+                queue.remove(job)
+            job._finish(CANCELLED, error="Job cancelled")
+            self._update_gauges()
+        elif job._task is not None:
+            job._task.cancel()
+            await job.wait(timeout)
+        logger.info(f"🛑 Job {job.id[:8]} cancelled ({job.session_id})")
+        return job
+
+    def queue_position(self, job: Job) -> Optional[int]:
+        """1-based position among all waiting jobs (oldest first)."""
+        if job.status != QUEUED:
+            return None
+        waiting = [j for j in self._jobs.values() if j.status == QUEUED]
+        return waiting.index(job) + 1
+
+    def retry_after(self) -> int:
+        """Seconds until a queue slot is likely to free up."""
+        backlog = self.queued + self._running
+        return int(min(60, max(1, backlog * self._avg_run_seconds / self.workers)))
+
+    def get_stats(self) -> Dict[str, Any]:
+        self._prune()
+        counts: Dict[str, int] = {}
+        for job in self._jobs.values():
+            counts[job.status] = counts.get(job.status, 0) + 1
+        return {
+            "workers": self.workers,
+            "max_queued": self.max_queued,
+            "queued": self.queued,
+            "running": self._running,
+            "sessions": len(self._scheduled),
+            "avg_run_seconds": round(self._avg_run_seconds, 2),
+            "jobs": counts,
+        }
+
+    # ---- workers ---------------------------------------------------------
+
+    async def _worker(self) -> None:
+        while True:
+            session_id = await self._ready.get()
+            queue = self._sessions.get(session_id)
+            job = None
+            while queue:
+                candidate = queue.popleft()
+                if candidate.status == QUEUED:
+                    job = candidate
+                    break
+            if job is not None:
+                await self._run(job)
+            # Requeue the session only after its job finished (per-session FIFO)
+            if queue:
+                self._ready.put_nowait(session_id)
+            else:
+                self._sessions.pop(session_id, None)
+                self._scheduled.discard(session_id)
+
+    async def _run(self, job: Job) -> None:
+        job.status = RUNNING
+        job.started_at = time.time()
+        job.report(RUNNING)
+        browser_job_wait_seconds.observe(job.started_at - job.created_at)
+        self._running += 1
+        self._current[job.session_id] = job
+        self._update_gauges()
+        job._task = asyncio.create_task(job.runner(job), name=f"browser-job-{job.id[:8]}")
+        try:
+            payload, status = await job._task
+        except asyncio.CancelledError:
+            job._finish(CANCELLED, error="Job cancelled")
+            if self._stopping:
+                raise
+        except Exception as e:
+            logger.error(f"❌ Job {job.id[:8]} failed: {e}", exc_info=True)
+            job._finish(FAILED, result={"success": False, "error": str(e)}, http_status=500, error=str(e))
+        else:
+            if payload.get("superseded"):
+                # The run was preempted by a newer request of the same session
+                job._finish(CANCELLED, result=payload, http_status=status, error=payload.get("error"))
+            else:
+                job._finish(SUCCEEDED if status < 400 else FAILED, result=payload, http_status=status,
+                            error=None if status < 400 else payload.get("error"))
+        finally:
+            self._running -= 1
+            self._current.pop(job.session_id, None)
+            elapsed = time.time() - job.started_at
+            self._avg_run_seconds = 0.8 * self._avg_run_seconds + 0.2 * elapsed
+            self._update_gauges()
+            logger.info(f"🏁 Job {job.id[:8]} {job.status} in {elapsed:.1f}s ({job.session_id})")
+
+    # ---- housekeeping ----------------------------------------------------
+
+    def _update_gauges(self) -> None:
+        browser_job_queue_depth.set(self.queued)
+        browser_jobs_running.set(self._running)
+
+    def _prune(self) -> None:
+        """Forget finished jobs whose results are older than result_ttl."""
+        cutoff = time.time() - self.result_ttl
+        expired = [job_id for job_id, job in self._jobs.items() if job.done and job.finished_at < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+
+# Global job manager used by the browser service
+job_manager = JobManager()
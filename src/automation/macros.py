@@ -0,0 +1,314 @@
+"""
+Browser Macro Cache
+Records successful browser_use action traces as reusable macros and replays them through Playwright
+"""
+import hashlib
+import json
+import os
+import time
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from loguru import logger
+
+from src.utils.date_parser import VietnameseDateParser
+
+
+MACRO_STEP_TIMEOUT = float(os.getenv("BROWSER_MACRO_STEP_TIMEOUT", "5.0"))
+
+GOTO = "goto"
+FILL = "fill"
+SELECT = "select"
+CHECK = "check"
+CLICK = "click"
+
+
+@dataclass
+class MacroStep:
+    """One replayable action; `slot` names the field whose value is typed in"""
+    op: str
+    selector: str = ""
+    slot: Optional[str] = None
+    value_type: str = "text"
+    url: str = ""
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass
+class Macro:
+    """Action trace for one form URL, schema hash and field set"""
+    url: str
+    schema_hash: str
+    slots: List[str]
+    steps: List[MacroStep]
+    hits: int = 0
+    failures: int = 0
+    created_at: float = field(default_factory=time.time)
+
+    @property
+    def key(self) -> str:
+        return macro_key(self.url, self.schema_hash, self.slots)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "url": self.url,
+            "schema_hash": self.schema_hash,
+            "slots": list(self.slots),
+            "steps": [s.to_dict() for s in self.steps],
+            "hits": self.hits,
+            "failures": self.failures,
+            "created_at": self.created_at,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Macro":
+        return cls(
+            url=data["url"],
+            schema_hash=data.get("schema_hash", ""),
+            slots=list(data["slots"]),
+            steps=[MacroStep(**s) for s in data["steps"]],
+            hits=data.get("hits", 0),
+            failures=data.get("failures", 0),
+            created_at=data.get("created_at", time.time()),
+        )
+
+
+def macro_key(url: str, schema_hash: str, slots: Iterable[str]) -> str:
+    return f"{url}|{schema_hash}|{','.join(sorted(set(slots)))}"
+
+
+def _selector_for(element) -> str:
+    """Stable Playwright selector for a DOMHistoryElement (name > id > xpath)."""
+    attrs = getattr(element, "attributes", {}) or {}
+    if attrs.get("name"):
+        return f'[name="{attrs["name"]}"]'
+    if attrs.get("id"):
+        return f'[id="{attrs["id"]}"]'
+    xpath = getattr(element, "xpath", "") or ""
+    return f"xpath={xpath if xpath.startswith('/') else '/' + xpath}" if xpath else ""
+
+
+def _value_type(element) -> str:
+    attrs = getattr(element, "attributes", {}) or {}
+    if getattr(element, "tag_name", "") == "select":
+        return "select"
+    return (attrs.get("type") or "text").lower()
+
+
+def _is_submit(element) -> bool:
+    attrs = getattr(element, "attributes", {}) or {}
+    tag = (getattr(element, "tag_name", "") or "").lower()
+    kind = (attrs.get("type") or "").strip().lower()
+    if kind == "submit" or (tag == "input" and kind == "image"):
+        return True
+    # A <button> without an explicit type defaults to submitting its form
+    return tag == "button" and not kind
+
+
+def record_macro(history, url: Optional[str] = None, schema_hash: str = "") -> Optional[Macro]:
+    """
+    Build a macro from a finished browser_use AgentHistoryList
+
+    Only successful runs are recorded; scrolls, waits, extraction and the final
+    `done` action are dropped and submit clicks are never recorded.
+
+    Args:
+        history: agent.history of a successful run
+        url: Form URL (defaults to the page URL of the first recorded field)
+        schema_hash: Content hash of the form schema the trace was recorded on
+
+    Returns:
+        Macro or None when the run did not finish cleanly or filled no fields
+    """
+    items = getattr(history, "history", None)
+    if not isinstance(items, list) or not items:
+        return None
+    if hasattr(history, "is_done") and not history.is_done():
+        return None
+
+    steps: List[MacroStep] = []
+    slots: List[str] = []
+    page_url = url
+    for item in items:
+        output = getattr(item, "model_output", None)
+        if output is None:
+            continue
+        if any(getattr(r, "error", None) for r in getattr(item, "result", []) or []):
+            return None  # a failed step means the trace is not trustworthy
+        elements = list(getattr(item.state, "interacted_element", []) or [])
+        for i, action in enumerate(output.action):
+            data = action.model_dump(exclude_none=True)
+            if not data:
+                continue
+            name, params = next(iter(data.items()))
+            element = elements[i] if i < len(elements) else None
+
+            if name == "go_to_url":
+                steps.append(MacroStep(GOTO, url=params.get("url", "")))
+            elif name in ("input_text", "select_dropdown_option") and element is not None:
+                selector = _selector_for(element)
+                slot = (element.attributes or {}).get("name") or (element.attributes or {}).get("id")
+                if not selector or not slot:
+                    continue
+                value_type = _value_type(element)
+                op = SELECT if name == "select_dropdown_option" or value_type == "select" else FILL
+                steps.append(MacroStep(op, selector=selector, slot=slot, value_type=value_type))
+                slots.append(slot)
+                page_url = page_url or item.state.url
+            elif name == "click_element" and element is not None and not _is_submit(element):
+                value_type = _value_type(element)
+                if value_type in ("radio", "checkbox") and (element.attributes or {}).get("name"):
+                    slot = element.attributes["name"]
+                    steps.append(MacroStep(CHECK, selector=f'[name="{slot}"]', slot=slot, value_type=value_type))
+                    slots.append(slot)
+                else:
+                    selector = _selector_for(element)
+                    if selector:
+                        steps.append(MacroStep(CLICK, selector=selector))
+
+    if not slots or not page_url:
+        return None
+    return Macro(url=page_url, schema_hash=schema_hash, slots=sorted(set(slots)), steps=steps)
+
+
+async def replay_macro(page, macro: Macro, values: Dict[str, Any], timeout: float = MACRO_STEP_TIMEOUT) -> Dict[str, Any]:
+    """
+    Replay a macro on a Playwright page with new slot values
+
+    Returns:
+        dict with success flag, number of steps executed, the failing step index
+        and error (if any) and duration_ms
+    """
+    start = time.perf_counter()
+    timeout_ms = timeout * 1000
+    for index, step in enumerate(macro.steps):
+        try:
+            if step.op == GOTO:
+                if page.url.rstrip("/") != step.url.rstrip("/"):
+                    await page.goto(step.url, wait_until="load", timeout=max(timeout_ms, 30000))
+                continue
+
+            if step.op == CLICK:
+                await page.locator(step.selector).first.click(timeout=timeout_ms)
+                continue
+
+            value = values.get(step.slot)
+            if value is None:
+                continue
+            text = str(value)
+
+            if step.op == SELECT:
+                locator = page.locator(step.selector).first
+                try:
+                    await locator.select_option(value=text, timeout=timeout_ms)
+                except Exception:
+                    await locator.select_option(label=text, timeout=timeout_ms)
+            elif step.op == CHECK:
+                target = f'{step.selector}[value="{text}"]' if step.value_type == "radio" else step.selector
+                await page.locator(target).first.check(timeout=timeout_ms)
+            else:
+                if step.value_type == "date":
+                    text = VietnameseDateParser.parse(text) or text
+                await page.locator(step.selector).first.fill(text, timeout=timeout_ms)
+        except Exception as e:
+            return {
+                "success": False,
+                "steps": index,
+                "failed_step": index,
+                "error": str(e),
+                "duration_ms": round((time.perf_counter() - start) * 1000, 2),
+            }
+
+    return {
+        "success": True,
+        "steps": len(macro.steps),
+        "failed_step": None,
+        "error": None,
+        "duration_ms": round((time.perf_counter() - start) * 1000, 2),
+    }
+
+
+class MacroCache:
+    """
+    Memory + disk store of recorded macros keyed by URL, schema hash and field set
+
+    Macros that fail `max_failures` replays in a row are dropped so the next
+    successful LLM run can record a fresh trace.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, max_failures: int = 2):
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.max_failures = max_failures
+        self._macros: Dict[str, Macro] = {}
+        self.hits = 0
+        self.misses = 0
+        self._load_all()
+
+    def _path_for(self, key: str) -> Optional[Path]:
+        if not self.cache_dir:
+            return None
+        return self.cache_dir / f"{hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]}.json"
+
+    def _load_all(self) -> None:
+        if not self.cache_dir or not self.cache_dir.exists():
+            return
+        for path in self.cache_dir.glob("*.json"):
+            try:
+                macro = Macro.from_dict(json.loads(path.read_text(encoding="utf-8")))
+                self._macros[macro.key] = macro
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                logger.warning(f"⚠️ Ignoring corrupt macro {path}: {e}")
+
+    def _persist(self, macro: Macro) -> None:
+        path = self._path_for(macro.key)
+        if path is None:
+            return
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(macro.to_dict(), ensure_ascii=False, indent=2), encoding="utf-8")
+            tmp.replace(path)
+        except OSError as e:
+            logger.warning(f"⚠️ Could not persist macro for {macro.url}: {e}")
+
+    def lookup(self, url: str, schema_hash: str, fields: Iterable[str]) -> Optional[Macro]:
+        macro = self._macros.get(macro_key(url, schema_hash, fields))
+        if macro is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return macro
+
+    def store(self, macro: Macro) -> None:
+        self._macros[macro.key] = macro
+        self._persist(macro)
+        logger.info(f"📼 Recorded macro for {macro.url} ({len(macro.steps)} steps, slots={macro.slots})")
+
+    def record_success(self, macro: Macro) -> None:
+        macro.hits += 1
+        macro.failures = 0
+        self._persist(macro)
+
+    def record_failure(self, macro: Macro) -> None:
+        macro.failures += 1
+        if macro.failures >= self.max_failures:
+            self.invalidate(macro)
+        else:
+            self._persist(macro)
+
+    def invalidate(self, macro: Macro) -> None:
+        self._macros.pop(macro.key, None)
+        path = self._path_for(macro.key)
+        if path is not None and path.exists():
+            path.unlink()
+        logger.info(f"🗑️  Dropped macro for {macro.url} (slots={macro.slots})")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"macros": len(self._macros), "hits": self.hits, "misses": self.misses}
+
+
+# Global macro cache
+macro_cache = MacroCache(cache_dir=os.getenv("BROWSER_MACRO_CACHE_DIR", ".cache/macros"))
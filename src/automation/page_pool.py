@@ -0,0 +1,263 @@
+"""
+Pre-warmed Form Page Pool
+Keeps isolated browser contexts already navigated to each form so new sessions can start instantly
+"""
+import asyncio
+import os
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+
+from loguru import logger
+
+
+# JS run on release to wipe the form origin's script-visible storage; cookies,
+# permissions and extra pages are cleared on the context itself (see _reset)
+RESET_STORAGE_JS = """async () => {
+    try { localStorage.clear(); sessionStorage.clear(); } catch (e) {}
+    try {
+        if (indexedDB.databases) {
+            for (const db of await indexedDB.databases()) { if (db.name) indexedDB.deleteDatabase(db.name); }
+        }
+    } catch (e) {}
+    try { if (self.caches) { for (const key of await caches.keys()) { await caches.delete(key); } } } catch (e) {}
+    try {
+        if (navigator.serviceWorker) {
+            for (const reg of await navigator.serviceWorker.getRegistrations()) { await reg.unregister(); }
+        }
+    } catch (e) {}
+}"""
+
+
+def _playwright_context(context: Any) -> Any:
+    """Underlying Playwright context of a browser_use BrowserContext (or the context itself)."""
+    session = getattr(context, "session", None)
+    return getattr(session, "context", None) or context
+
+
+@dataclass
+class PooledForm:
+    """Browser context checked out from (or waiting in) the pool"""
+    form_type: str
+    url: str
+    context: Any
+    uses: int = 0
+    created_at: float = field(default_factory=time.time)
+    last_used: float = field(default_factory=time.time)
+
+    async def get_page(self):
+        return await self.context.get_current_page()
+
+
+class FormPagePool:
+    """
+    Pool of pre-navigated browser contexts per form type
+
+    Contexts are created by `context_factory` (e.g. a browser_use BrowserContext),
+    navigated to the form URL and kept idle until a session checks one out.
+    Checked-out contexts are refilled in the background; returned contexts are
+    reset and reused until `max_uses`, then closed and replaced.
+
+    Example:
+        pool = FormPagePool(factory, get_form_urls(), size_per_form=1)
+        await pool.start()
+        pooled = await pool.acquire("loan")
+        ...
+        await pool.release(pooled)
+    """
+
+    def __init__(
+        self,
+        context_factory: Callable[[], Awaitable[Any]],
+        form_urls: Dict[str, str],
+        size_per_form: int = 1,
+        max_uses: int = 20,
+        load_timeout: float = 30.0,
+        health_timeout: float = 2.0,
+    ):
+        """
+        Initialize pool
+
+        Args:
+            context_factory: Async callable returning a new isolated browser context
+            form_urls: form_type -> URL to pre-load
+            size_per_form: Idle contexts kept ready per form type
+            max_uses: Sessions served by one context before it is recycled
+            load_timeout: Seconds allowed for navigating a new context
+            health_timeout: Seconds allowed for the checkout health probe
+        """
+        self.context_factory = context_factory
+        self.form_urls = dict(form_urls)
+        self.size_per_form = size_per_form
+        self.max_uses = max_uses
+        self.load_timeout = load_timeout
+        self.health_timeout = health_timeout
+
+        self._idle: Dict[str, Deque[PooledForm]] = {ft: deque() for ft in self.form_urls}
+        self._refilling: Dict[str, asyncio.Task] = {}
+        self._checked_out = 0
+        self._closed = False
+
+        self.hits = 0
+        self.misses = 0
+        self.recycled = 0
+        self.unhealthy = 0
+
+    def available(self, form_type: str) -> int:
+        """Number of idle contexts ready for the form type."""
+        return len(self._idle.get(form_type, ()))
+
+    async def start(self) -> None:
+        """Fill the pool for every form type (failures are logged, not raised)."""
+        await asyncio.gather(*(self._refill(ft) for ft in self.form_urls))
+        logger.info(f"🏊 Form page pool ready: { {ft: self.available(ft) for ft in self.form_urls} }")
+
+    async def acquire(self, form_type: str, url: Optional[str] = None) -> Optional[PooledForm]:
+        """
+        Check out a healthy pre-loaded context
+
+        Args:
+            form_type: Form type key
+            url: Expected form URL (pool is bypassed if it differs)
+
+        Returns:
+            PooledForm or None when nothing is ready (caller falls back to a cold start)
+        """
+        expected = self.form_urls.get(form_type)
+        if self._closed or expected is None or (url and url != expected):
+            return None
+
+        idle = self._idle[form_type]
+        pooled = None
+        while idle:
+            candidate = idle.popleft()
+            if await self._is_healthy(candidate):
+                pooled = candidate
+                break
+            self.unhealthy += 1
+            await self._dispose(candidate)
+
+        self._schedule_refill(form_type)
+        if pooled is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._checked_out += 1
+        pooled.uses += 1
+        pooled.last_used = time.time()
+        return pooled
+
+    async def release(self, pooled: PooledForm) -> None:
+        """Return a context: reset and re-queue it, or recycle it after max_uses."""
+        self._checked_out = max(0, self._checked_out - 1)
+        idle = self._idle.get(pooled.form_type)
+
+        if self._closed or idle is None or pooled.uses >= self.max_uses or len(idle) >= self.size_per_form:
+            self.recycled += 1
+            await self._dispose(pooled)
+            self._schedule_refill(pooled.form_type)
+            return
+
+        try:
+            await self._reset(pooled)
+            idle.append(pooled)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not reset pooled {pooled.form_type} page, recycling: {e}")
+            self.recycled += 1
+            await self._dispose(pooled)
+            self._schedule_refill(pooled.form_type)
+
+    async def close(self) -> None:
+        """Close every idle context and stop refilling."""
+        self._closed = True
+        for task in self._refilling.values():
+            task.cancel()
+        await asyncio.gather(*self._refilling.values(), return_exceptions=True)
+        self._refilling.clear()
+        for idle in self._idle.values():
+            while idle:
+                await self._dispose(idle.popleft())
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "idle": {ft: len(q) for ft, q in self._idle.items()},
+            "checked_out": self._checked_out,
+            "hits": self.hits,
+            "misses": self.misses,
+            "recycled": self.recycled,
+            "unhealthy": self.unhealthy,
+        }
+
+    def _schedule_refill(self, form_type: str) -> None:
+        if self._closed:
+            return
+        running = self._refilling.get(form_type)
+        if running and not running.done():
+            return
+        self._refilling[form_type] = asyncio.create_task(self._refill(form_type))
+
+    async def _refill(self, form_type: str) -> None:
+        idle = self._idle[form_type]
+        while not self._closed and len(idle) < self.size_per_form:
+            try:
+                idle.append(await self._create(form_type))
+            except Exception as e:
+                logger.warning(f"⚠️ Could not pre-load {form_type} form: {e}")
+                return
+
+    async def _create(self, form_type: str) -> PooledForm:
+        url = self.form_urls[form_type]
+        context = await self.context_factory()
+        pooled = PooledForm(form_type=form_type, url=url, context=context)
+        try:
+            page = await pooled.get_page()
+            await asyncio.wait_for(page.goto(url, wait_until="load"), self.load_timeout)
+        except BaseException:
+            await self._dispose(pooled)
+            raise
+        logger.debug(f"🏊 Pre-loaded {form_type} form")
+        return pooled
+
+    async def _is_healthy(self, pooled: PooledForm) -> bool:
+        try:
+            page = await pooled.get_page()
+            if page.is_closed() or not page.url.startswith(pooled.url.rstrip("/")):
+                return False
+            state = await asyncio.wait_for(page.evaluate("() => document.readyState"), self.health_timeout)
+            return state in ("interactive", "complete")
+        except Exception as e:
+            logger.debug(f"⚠️ Pooled {pooled.form_type} page failed health check: {e}")
+            return False
+
+    async def _reset(self, pooled: PooledForm) -> None:
+        """Wipe everything the previous customer's session left in the context."""
+        page = await pooled.get_page()
+        context = _playwright_context(pooled.context)
+        for other in list(getattr(context, "pages", ())):
+            if other is not page:
+                await other.close()
+        await context.clear_cookies()
+        await context.clear_permissions()
+        if page.is_closed():
+            raise RuntimeError("pooled page was closed")
+        if not page.url.startswith(pooled.url.rstrip("/")):
+            # Storage is per origin: clear the form's origin, not wherever the agent ended up
+            await asyncio.wait_for(page.goto(pooled.url, wait_until="load"), self.load_timeout)
+        await asyncio.wait_for(page.evaluate(RESET_STORAGE_JS), self.health_timeout)
+        await asyncio.wait_for(page.goto(pooled.url, wait_until="load"), self.load_timeout)
+
+    async def _dispose(self, pooled: PooledForm) -> None:
+        try:
+            await pooled.context.close()
+        except Exception as e:
+            logger.debug(f"⚠️ Error closing pooled context: {e}")
+
+
+def page_pool_settings() -> Dict[str, int]:
+    """Pool sizing from environment (BROWSER_PAGE_POOL_SIZE=0 disables the pool)."""
+    return {
+        "size_per_form": int(os.getenv("BROWSER_PAGE_POOL_SIZE", "0")),
+        "max_uses": int(os.getenv("BROWSER_PAGE_POOL_MAX_USES", "20")),
+    }
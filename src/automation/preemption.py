@@ -0,0 +1,225 @@
+"""
+Preemptible Agent Runs
+Per-session tracking of in-flight browser-use runs so a newer request can stop a superseded one between steps
+"""
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+from src.automation.actions import read_fields
+from src.monitoring.metrics import browser_runs_preempted_total, browser_runs_resumed_total
+
+
+def preemption_settings() -> Dict[str, Any]:
+    """Preemption switches from environment."""
+    return {
+        "enabled": os.getenv("BROWSER_PREEMPT_SUPERSEDED", "true").lower() == "true",
+        "resume_ttl": float(os.getenv("BROWSER_RESUME_TTL", "120")),
+    }
+
+
+class RunPreempted(Exception):
+    """Raised inside a preempted agent run at its next step boundary"""
+
+    def __init__(self, session_id: str, reason: str):
+        super().__init__(f"Agent run for {session_id} preempted: {reason}")
+        self.session_id = session_id
+        self.reason = reason
+
+
+class AgentRun:
+    """
+    One in-flight browser-use run of a session
+
+    preempt() only sets a flag; the run stops when its current step (LLM call
+    plus the actions it chose) has finished, so no action is cut in half.
+    """
+
+    def __init__(self, session_id: str, agent, context, on_step: Optional[Callable[["AgentRun"], None]] = None):
+        self.session_id = session_id
+        self.agent = agent
+        self.context = context
+        self.on_step = on_step
+        self.started_at = time.monotonic()
+        self.steps = 0
+        self.preempted_reason: Optional[str] = None
+
+    @property
+    def preempted(self) -> bool:
+        return self.preempted_reason is not None
+
+    def preempt(self, reason: str) -> None:
+        if self.preempted_reason is None:
+            self.preempted_reason = reason
+
+    def guard(self) -> None:
+        """Wrap agent.step so the run checks for preemption before every step."""
+        step = self.agent.step
+
+        async def guarded_step(*args, **kwargs):
+            if self.preempted:
+                raise RunPreempted(self.session_id, self.preempted_reason)
+            self.steps += 1
+            result = await step(*args, **kwargs)
+            if self.on_step is not None:
+                try:
+                    self.on_step(self)
+                except Exception as e:
+                    logger.debug(f"Step hook failed: {e}")
+            return result
+
+        self.agent.step = guarded_step
+
+
+class ResumePoint:
+    """
+    Browser context and form state left behind by a preempted run
+
+    A speculative point is a form opened ahead of time from a partial
+    transcript (see prepare_form); the next run starts on it the same way.
+    """
+
+    def __init__(self, context, url: str = "", fields: Optional[Dict[str, str]] = None, steps: int = 0,
+                 speculative: bool = False):
+        self.context = context
+        self.url = url
+        self.fields = fields or {}
+        self.steps = steps
+        self.speculative = speculative
+        self.created_at = time.monotonic()
+
+    def hint(self) -> str:
+        """Task preamble telling the next agent where the previous run stopped."""
+        if self.speculative:
+            lines = ["RESUME CONTEXT:", "The form was opened in advance while the user was still speaking."]
+        else:
+            lines = [
+                "RESUME CONTEXT:",
+                "An earlier run for this conversation was stopped because the user changed the instruction.",
+            ]
+        if self.url:
+            lines.append(f"The browser is already on {self.url}; do not navigate again if this is the requested form.")
+        if self.fields:
+            lines.append("These fields already hold values on the page:")
+            lines.extend(f"- {name}: {value}" for name, value in self.fields.items())
+            lines.append("Keep values that still match the USER INSTRUCTION; only change or clear the ones that differ.")
+        return "\n".join(lines) + "\n\n"
+
+
+async def observe_form(context) -> Tuple[str, Dict[str, str]]:
+    """Current URL and non-empty field values of the context's page."""
+    page = await context.get_current_page()
+    url = getattr(page, "url", "") or ""
+    try:
+        snapshot = await read_fields(page)
+    except Exception as e:
+        logger.debug(f"Form observation skipped: {e}")
+        return url, {}
+    fields = {
+        name: str(info.get("text") or info.get("value"))
+        for name, info in snapshot["fields"].items()
+        if info.get("found", True) and info.get("value") not in (None, "", False)
+    }
+    return url, fields
+
+
+async def _close(context) -> None:
+    try:
+        await context.close()
+    except Exception as e:
+        logger.warning(f"⚠️ Error closing resumable context: {e}")
+
+
+class PreemptionRegistry:
+    """
+    In-flight agent runs and parked resume points, keyed by session id
+
+    Example:
+        run = registry.begin(session_id, agent, context)
+        ...
+        registry.preempt(session_id, reason="superseded")  # from the newer request
+        point = await registry.take(session_id)            # in the newer run
+    """
+
+    def __init__(self, resume_ttl: Optional[float] = None):
+        self.resume_ttl = resume_ttl if resume_ttl is not None else preemption_settings()["resume_ttl"]
+        self._runs: Dict[str, AgentRun] = {}
+        self._parked: Dict[str, ResumePoint] = {}
+        self.preempted = 0
+        self.resumed = 0
+        self.prepared = 0
+        self.prepared_used = 0
+
+    def begin(self, session_id: str, agent, context,
+              on_step: Optional[Callable[[AgentRun], None]] = None) -> AgentRun:
+        run = AgentRun(session_id, agent, context, on_step=on_step)
+        run.guard()
+        self._runs[session_id] = run
+        return run
+
+    def end(self, run: AgentRun) -> None:
+        if self._runs.get(run.session_id) is run:
+            del self._runs[run.session_id]
+
+    def is_busy(self, session_id: str) -> bool:
+        """Whether the session has a run in flight or a page already parked."""
+        return session_id in self._runs or session_id in self._parked
+
+    def preempt(self, session_id: str, reason: str = "superseded") -> bool:
+        """Ask the session's in-flight run to stop at its next step boundary."""
+        run = self._runs.get(session_id)
+        if run is None or run.preempted:
+            return False
+        run.preempt(reason)
+        self.preempted += 1
+        browser_runs_preempted_total.inc()
+        logger.info(f"⏹️ Preempting agent run for {session_id} after {run.steps} steps ({reason})")
+        return True
+
+    async def park(self, session_id: str, point: ResumePoint) -> None:
+        previous = self._parked.pop(session_id, None)
+        if previous is not None and previous.context is not point.context:
+            await _close(previous.context)
+        self._parked[session_id] = point
+        if point.speculative:
+            self.prepared += 1
+
+    async def take(self, session_id: str) -> Optional[ResumePoint]:
+        """Claim the session's resume point if it has not expired."""
+        point = self._parked.pop(session_id, None)
+        if point is None:
+            return None
+        if time.monotonic() - point.created_at > self.resume_ttl:
+            await _close(point.context)
+            return None
+        if point.speculative:
+            self.prepared_used += 1
+        else:
+            self.resumed += 1
+            browser_runs_resumed_total.inc()
+        return point
+
+    async def discard(self, session_id: str) -> None:
+        point = self._parked.pop(session_id, None)
+        if point is not None:
+            await _close(point.context)
+
+    async def expire(self) -> List[str]:
+        """Close resume points nobody claimed within resume_ttl."""
+        now = time.monotonic()
+        expired = [sid for sid, point in self._parked.items() if now - point.created_at > self.resume_ttl]
+        for session_id in expired:
+            await self.discard(session_id)
+        return expired
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": {sid: {"steps": run.steps, "preempted": run.preempted} for sid, run in self._runs.items()},
+            "parked": list(self._parked),
+            "preempted": self.preempted,
+            "resumed": self.resumed,
+            "prepared": self.prepared,
+            "prepared_used": self.prepared_used,
+        }
@@ -0,0 +1,141 @@
+"""
+Browser Progress Events
+Per-session fan-out of browser-run events (steps, navigation, field fills, verification)
+"""
+import time
+from typing import Any, Callable, Dict, List
+
+from loguru import logger
+
+
+# Event types emitted while a request runs
+STAGE = "stage"                  # service-level stage of the workflow
+STEP = "step"                    # one browser_use agent step finished
+NAVIGATION = "navigation"        # page URL changed
+FIELD = "field"                  # a field value was written
+VERIFICATION = "verification"    # a step/submit result was checked
+
+ProgressSink = Callable[[Dict[str, Any]], None]
+
+
+class ProgressHub:
+    """
+    Delivers progress events to whoever follows a session
+
+    Sinks are plain callables and must not block; the job runner subscribes
+    its Job while it runs, browser shards forward everything to the parent.
+
+    Example:
+        unsubscribe = progress_hub.subscribe("session-1", events.append)
+        progress_hub.emit("session-1", FIELD, field="customerName", value="An")
+        unsubscribe()
+    """
+
+    def __init__(self):
+        self._sinks: Dict[str, List[ProgressSink]] = {}
+        self._taps: List[ProgressSink] = []
+
+    def subscribe(self, session_id: str, sink: ProgressSink) -> Callable[[], None]:
+        self._sinks.setdefault(session_id, []).append(sink)
+
+        def unsubscribe() -> None:
+            sinks = self._sinks.get(session_id, [])
+            if sink in sinks:
+                sinks.remove(sink)
+            if not sinks:
+                self._sinks.pop(session_id, None)
+
+        return unsubscribe
+
+    def tap(self, sink: ProgressSink) -> Callable[[], None]:
+        """Receive the events of every session."""
+        self._taps.append(sink)
+        return lambda: self._taps.remove(sink) if sink in self._taps else None
+
+    def emit(self, session_id: str, event: str, **data) -> Dict[str, Any]:
+        payload = {"event": event, "session_id": session_id, "ts": time.time(), **data}
+        self.publish(payload)
+        return payload
+
+    def publish(self, payload: Dict[str, Any]) -> None:
+        """Deliver an already built event (e.g. one forwarded by a browser shard)."""
+        for sink in self._taps + self._sinks.get(payload.get("session_id"), []):
+            try:
+                sink(payload)
+            except Exception as e:
+                logger.warning(f"⚠️ Progress sink failed for {payload.get('session_id')}: {e}")
+
+    def has_subscribers(self, session_id: str) -> bool:
+        return bool(self._taps or self._sinks.get(session_id))
+
+
+def step_events(item, step: int, previous_url: str = "") -> List[Dict[str, Any]]:
+    """
+    Progress events for one browser_use AgentHistory item
+
+    Args:
+        item: agent.history.history[-1] after a step
+        step: 1-based step number
+        previous_url: Page URL before this step (navigation is reported on change)
+
+    Returns:
+        list of event dicts (with an "event" key) for emit_progress(session_id, **event)
+    """
+    events: List[Dict[str, Any]] = []
+    state = getattr(item, "state", None)
+    output = getattr(item, "model_output", None)
+    results = list(getattr(item, "result", None) or [])
+    brain = getattr(output, "current_state", None)
+
+    errors = [r.error for r in results if getattr(r, "error", None)]
+    events.append({
+        "event": STEP,
+        "step": step,
+        "goal": getattr(brain, "next_goal", "") or "",
+        "actions": [next(iter(a.model_dump(exclude_none=True)), "") for a in getattr(output, "action", None) or []],
+        "ok": not errors,
+    })
+
+    url = getattr(state, "url", "") or ""
+    if url and url != previous_url:
+        events.append({"event": NAVIGATION, "step": step, "url": url, "title": getattr(state, "title", "") or ""})
+
+    elements = list(getattr(state, "interacted_element", None) or [])
+    for i, action in enumerate(getattr(output, "action", None) or []):
+        data = action.model_dump(exclude_none=True)
+        if not data:
+            continue
+        name, params = next(iter(data.items()))
+        element = elements[i] if i < len(elements) else None
+        if name not in ("input_text", "select_dropdown_option") or element is None:
+            continue
+        attrs = getattr(element, "attributes", None) or {}
+        error = results[i].error if i < len(results) else None
+        events.append({
+            "event": FIELD,
+            "step": step,
+            "field": attrs.get("name") or attrs.get("id") or attrs.get("placeholder") or "",
+            "value": params.get("text", ""),
+            "status": "failed" if error else "filled",
+            "path": "agent",
+        })
+
+    evaluation = getattr(brain, "evaluation_previous_goal", "") or ""
+    if evaluation or errors:
+        events.append({
+            "event": VERIFICATION,
+            "step": step,
+            "ok": not errors and not evaluation.lower().startswith("failed"),
+            "message": errors[0] if errors else evaluation,
+        })
+    return events
+
+
+# Global hub used by the browser agent and the job runner
+progress_hub = ProgressHub()
+
+
+def emit_progress(session_id: str, event: str, **data) -> None:
+    """Emit on the global hub when somebody follows the session."""
+    if progress_hub.has_subscribers(session_id):
+        progress_hub.emit(session_id, event, **data)
@@ -0,0 +1,222 @@
+"""
+Browser Session Actors
+Per-session operation queues that run one operation at a time and merge pending field fills
+"""
+import asyncio
+import contextvars
+import functools
+import inspect
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+from loguru import logger
+
+from src.monitoring.metrics import browser_fill_requests_coalesced_total
+
+
+# Session whose actor is running the current task (re-entrant calls bypass the queue)
+_active_session: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("browser_session_actor", default=None)
+
+
+class _Operation:
+    """Queued unit of work; `fields` is set for mergeable fill batches"""
+
+    __slots__ = ("fn", "args", "kwargs", "fields", "futures")
+
+    def __init__(self, fn: Callable[..., Awaitable], args: tuple = (), kwargs: Optional[Dict[str, Any]] = None,
+                 fields: Optional[Dict[str, Any]] = None):
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs or {}
+        self.fields = fields
+        self.futures: List[asyncio.Future] = []
+
+    def can_merge(self, apply: Callable, kwargs: Dict[str, Any]) -> bool:
+        return self.fields is not None and self.fn == apply and self.kwargs == kwargs
+
+
+class SessionActor:
+    """
+    Runs the operations of one browser session strictly in submission order
+
+    While an operation is in flight, fill requests queued behind it are merged
+    into a single batch (last value per field wins); every caller's future
+    resolves with the result of the batch that applied its fields.
+    """
+
+    def __init__(self, session_id: str, on_idle: Optional[Callable[["SessionActor"], None]] = None):
+        self.session_id = session_id
+        self.on_idle = on_idle
+        self._queue: Deque[_Operation] = deque()
+        self._worker: Optional[asyncio.Task] = None
+        self.current: Optional[_Operation] = None
+        self.processed = 0
+        self.coalesced = 0
+
+    @property
+    def pending(self) -> int:
+        return len(self._queue)
+
+    @property
+    def busy(self) -> bool:
+        return self.current is not None or bool(self._queue)
+
+    def submit(self, fn: Callable[..., Awaitable], /, *args, **kwargs) -> asyncio.Future:
+        """Queue an operation; the returned future resolves with its result."""
+        return self._enqueue(_Operation(fn, args, kwargs))
+
+    def submit_fill(self, fields: Dict[str, Any], apply: Callable[..., Awaitable], /, **kwargs) -> asyncio.Future:
+        """
+        Queue a field fill, merging it into the fill batch at the tail of the queue
+
+        Args:
+            fields: {field_name: value} requested by this caller
+            apply: Coroutine function called as apply(merged_fields, **kwargs)
+        """
+        future = asyncio.get_running_loop().create_future()
+        tail = self._queue[-1] if self._queue else None
+        if tail is not None and tail.can_merge(apply, kwargs):
+            tail.fields.update(fields)
+            tail.futures.append(future)
+            self.coalesced += 1
+            browser_fill_requests_coalesced_total.inc()
+            logger.debug(f"🧮 Coalesced fill {list(fields)} into pending batch for {self.session_id}")
+            return future
+        operation = _Operation(apply, kwargs=kwargs, fields=dict(fields))
+        operation.futures.append(future)
+        self._schedule(operation)
+        return future
+
+    def _enqueue(self, operation: _Operation) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        operation.futures.append(future)
+        self._schedule(operation)
+        return future
+
+    def _schedule(self, operation: _Operation) -> None:
+        self._queue.append(operation)
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._drain(), name=f"session-actor-{self.session_id}")
+
+    async def _drain(self) -> None:
+        token = _active_session.set(self.session_id)
+        try:
+            while self._queue:
+                operation = self.current = self._queue.popleft()
+                try:
+                    if operation.fields is not None:
+                        result = await operation.fn(dict(operation.fields), **operation.kwargs)
+                    else:
+                        result = await operation.fn(*operation.args, **operation.kwargs)
+                except asyncio.CancelledError:
+                    self._settle(operation, cancel=True)
+                    raise
+                except Exception as e:
+                    self._settle(operation, error=e)
+                else:
+                    self._settle(operation, result=result)
+                finally:
+                    self.current = None
+                    self.processed += 1
+        finally:
+            _active_session.reset(token)
+            self._worker = None
+            while self._queue:
+                self._settle(self._queue.popleft(), error=RuntimeError(f"Session actor for {self.session_id} stopped"))
+            if self.on_idle is not None:
+                self.on_idle(self)
+
+    @staticmethod
+    def _settle(operation: _Operation, result: Any = None, error: Optional[BaseException] = None, cancel: bool = False) -> None:
+        for future in operation.futures:
+            if future.done():
+                continue  # caller gave up waiting
+            if cancel:
+                future.cancel()
+            elif error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+    async def stop(self) -> None:
+        """Cancel the in-flight operation and fail everything queued behind it."""
+        if self._worker is not None and not self._worker.done():
+            self._worker.cancel()
+            await asyncio.gather(self._worker, return_exceptions=True)
+
+
+class SessionActors:
+    """
+    Registry of per-session actors
+
+    Actors are created on first use and dropped again once their queue drains.
+
+    Example:
+        actors = SessionActors()
+        result = await actors.run("session-1", handler._submit, session_id="session-1")
+        batch = await actors.fill("session-1", {"customerName": "An"}, apply_batch)
+    """
+
+    def __init__(self):
+        self._actors: Dict[str, SessionActor] = {}
+
+    def get(self, session_id: str) -> SessionActor:
+        actor = self._actors.get(session_id)
+        if actor is None:
+            actor = self._actors[session_id] = SessionActor(session_id, on_idle=self._on_idle)
+        return actor
+
+    def busy(self, session_id: str) -> bool:
+        actor = self._actors.get(session_id)
+        return actor is not None and actor.busy
+
+    def _on_idle(self, actor: SessionActor) -> None:
+        if not actor.busy and self._actors.get(actor.session_id) is actor:
+            del self._actors[actor.session_id]
+
+    async def run(self, session_id: str, fn: Callable[..., Awaitable], /, *args, **kwargs) -> Any:
+        """Run fn after every earlier operation of the session has finished."""
+        if _active_session.get() == session_id:
+            return await fn(*args, **kwargs)
+        return await self.get(session_id).submit(fn, *args, **kwargs)
+
+    async def fill(self, session_id: str, fields: Dict[str, Any], apply: Callable[..., Awaitable], /, **kwargs) -> Any:
+        """Queue a mergeable fill; resolves with the result of the batch that applied it."""
+        if _active_session.get() == session_id:
+            return await apply(dict(fields), **kwargs)
+        return await self.get(session_id).submit_fill(fields, apply, **kwargs)
+
+    async def stop(self, session_id: str) -> None:
+        actor = self._actors.pop(session_id, None)
+        if actor is not None:
+            await actor.stop()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            session_id: {
+                "in_flight": actor.current is not None,
+                "queued": actor.pending,
+                "processed": actor.processed,
+                "coalesced": actor.coalesced,
+            }
+            for session_id, actor in self._actors.items()
+        }
+
+
+def serialized(method: Callable[..., Awaitable]) -> Callable[..., Awaitable]:
+    """
+    Run a BrowserAgentHandler coroutine method through its session's actor
+
+    The session is taken from the method's `session_id` argument; the handler
+    must expose a SessionActors instance as `self.actors`.
+    """
+    signature = inspect.signature(method)
+
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        bound = signature.bind(self, *args, **kwargs)
+        bound.apply_defaults()
+        session_id = bound.arguments.get("session_id") or "default"
+        return await self.actors.run(session_id, method, self, *args, **kwargs)
+
+    return wrapper
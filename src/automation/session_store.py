@@ -0,0 +1,181 @@
+"""
+Browser Session Store
+LRU-ordered session registry with idle tracking, agent-history compaction and footprint stats
+"""
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+
+
+def session_limits() -> Dict[str, float]:
+    """Session lifecycle limits from environment."""
+    return {
+        "idle_ttl": float(os.getenv("BROWSER_SESSION_IDLE_TTL", "1800")),
+        "max_sessions": int(os.getenv("BROWSER_MAX_SESSIONS", "20")),
+        "keep_messages": int(os.getenv("BROWSER_HISTORY_KEEP_MESSAGES", "6")),
+        "compact_tokens": int(os.getenv("BROWSER_HISTORY_COMPACT_TOKENS", "8000")),
+        "reap_interval": float(os.getenv("BROWSER_SESSION_REAP_INTERVAL", "60")),
+    }
+
+
+class SessionStore(dict):
+    """
+    dict of session_id -> session entry that remembers last access
+
+    Reading an entry (store[sid]) marks it as most recently used.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.last_used: Dict[str, float] = {}
+        self.created: Dict[str, float] = {}
+        super().__init__(*args, **kwargs)
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        now = time.monotonic()
+        self.created.setdefault(key, now)
+        self.last_used[key] = now
+
+    def __getitem__(self, key):
+        value = super().__getitem__(key)
+        self.touch(key)
+        return value
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self.last_used.pop(key, None)
+        self.created.pop(key, None)
+
+    def pop(self, key, *default):
+        if key in self:
+            value = super().__getitem__(key)
+            del self[key]
+            return value
+        if default:
+            return default[0]
+        raise KeyError(key)
+
+    def clear(self):
+        super().clear()
+        self.last_used.clear()
+        self.created.clear()
+
+    def touch(self, key) -> None:
+        if key in self:
+            self.last_used[key] = time.monotonic()
+
+    def idle_seconds(self, key) -> float:
+        return time.monotonic() - self.last_used.get(key, time.monotonic())
+
+    def idle_sessions(self, ttl: float) -> List[str]:
+        """Session ids idle for longer than ttl seconds."""
+        now = time.monotonic()
+        return [sid for sid in self.keys() if now - self.last_used.get(sid, now) > ttl]
+
+    def lru_overflow(self, max_sessions: int, reserve: int = 0) -> List[str]:
+        """Least recently used session ids to evict so that len + reserve <= max."""
+        excess = len(self) + reserve - max_sessions
+        if excess <= 0:
+            return []
+        return sorted(self.keys(), key=lambda sid: self.last_used.get(sid, 0.0))[:excess]
+
+
+def _message_history(agent):
+    manager = getattr(agent, "message_manager", None)
+    history = getattr(manager, "history", None)
+    messages = getattr(history, "messages", None)
+    return (history, messages) if isinstance(messages, list) else (None, None)
+
+
+def _agent_steps(agent) -> list:
+    steps = getattr(getattr(agent, "history", None), "history", None)
+    return steps if isinstance(steps, list) else []
+
+
+def describe_form_state(session_data: Dict[str, Any]) -> str:
+    """Short text of the current form state used to replace old agent history."""
+    filled = ", ".join(f"{f['field']}={f['value']}" for f in session_data.get("fields_filled", []))
+    return (
+        f"Context summary: form '{session_data.get('type', 'unknown')}' is open at {session_data.get('url', '')}. "
+        f"Fields already filled: {filled or 'none'}. Earlier steps were completed successfully; continue from this state."
+    )
+
+
+def compact_agent_history(agent, form_state: str, keep_last: int = 6, min_tokens: int = 0) -> Optional[Dict[str, int]]:
+    """
+    Shrink a browser_use Agent's prompt history between incremental tasks
+
+    Keeps the system prompt and example tool call, replaces everything older
+    than the last `keep_last` messages with a single form-state summary and drops
+    old step records (which hold screenshots).
+
+    Args:
+        agent: browser_use Agent
+        form_state: Summary injected in place of the dropped messages
+        keep_last: Number of most recent messages to keep verbatim
+        min_tokens: Skip compaction while the history is below this size
+
+    Returns:
+        dict with token/message counts before and after, or None if nothing was done
+    """
+    history, messages = _message_history(agent)
+    if history is None:
+        return None
+
+    prefix = 2  # system prompt + example tool call
+    if len(messages) <= prefix + keep_last + 1 or history.total_tokens < min_tokens:
+        return None
+
+    from langchain_core.messages import HumanMessage
+    from browser_use.agent.message_manager.views import ManagedMessage, MessageMetadata
+
+    tail = messages[-keep_last:] if keep_last else []
+    # A kept AI message must not lose the human message it answers
+    while tail and tail[0].message.type == "ai":
+        tail = tail[1:]
+
+    before_tokens, before_messages = history.total_tokens, len(messages)
+    summary_tokens = len(form_state) // 3
+    summary = ManagedMessage(
+        message=HumanMessage(content=form_state),
+        metadata=MessageMetadata(input_tokens=summary_tokens),
+    )
+    history.messages = messages[:prefix] + [summary] + tail
+    history.total_tokens = sum(m.metadata.input_tokens for m in history.messages)
+
+    steps = _agent_steps(agent)
+    if len(steps) > keep_last:
+        del steps[:len(steps) - keep_last]
+
+    stats = {
+        "tokens_before": before_tokens,
+        "tokens_after": history.total_tokens,
+        "messages_before": before_messages,
+        "messages_after": len(history.messages),
+    }
+    logger.debug(f"🗜️  Compacted agent history: {stats}")
+    return stats
+
+
+def session_footprint(session: Dict[str, Any]) -> Dict[str, Any]:
+    """Approximate memory and prompt-token footprint of one session entry."""
+    agent = session.get("agent")
+    history, messages = _message_history(agent)
+    steps = _agent_steps(agent)
+
+    message_bytes = sum(len(str(m.message.content)) for m in messages) if messages else 0
+    screenshot_bytes = sum(
+        len(getattr(getattr(step, "state", None), "screenshot", None) or "") for step in steps
+    )
+    session_data = session.get("session_data", {})
+    return {
+        "messages": len(messages) if messages else 0,
+        "prompt_tokens": history.total_tokens if history is not None else 0,
+        "agent_steps": len(steps),
+        "approx_bytes": message_bytes + screenshot_bytes,
+        "fields_filled": len(session_data.get("fields_filled", [])),
+        "form_type": session_data.get("type"),
+        "pooled": session.get("pooled") is not None,
+    }
@@ -0,0 +1,409 @@
+"""
+Multi-process Browser Sharding
+Runs several browser worker processes and routes sessions to them over a local IPC pipe
+"""
+import asyncio
+import importlib
+import inspect
+import itertools
+import multiprocessing
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+
+from src.automation.progress import progress_hub
+from src.automation.session_store import session_limits
+from src.monitoring.metrics import browser_shard_sessions, browser_shard_inflight
+
+
+DEFAULT_HANDLER = "src.browser_agent:BrowserAgentHandler"
+
+# Methods that end a session; their shard assignment is dropped afterwards
+SESSION_CLOSING_METHODS = {"submit_form_incremental"}
+
+# Probes that only read session state; they never create a shard assignment
+READ_ONLY_METHODS = {"form_state_token", "preempt_freeform", "get_filled_fields", "get_session_stats"}
+
+
+def sharding_settings() -> Dict[str, Any]:
+    """Sharding config from environment (BROWSER_SHARDING=true enables it)."""
+    return {
+        "enabled": os.getenv("BROWSER_SHARDING", "false").lower() == "true",
+        "shards": int(os.getenv("BROWSER_SHARDS", str(os.cpu_count() or 1))),
+    }
+
+
+def _load_handler(path: str):
+    module_name, _, attr = path.partition(":")
+    return getattr(importlib.import_module(module_name), attr)
+
+
+def _shard_main(conn, handler_path: str, shard_id: int) -> None:
+    """Worker process entry point: one event loop and one handler per process."""
+    asyncio.run(_serve_shard(conn, handler_path, shard_id))
+
+
+async def _serve_shard(conn, handler_path: str, shard_id: int) -> None:
+    loop = asyncio.get_running_loop()
+    handler = _load_handler(handler_path)()
+    inbox: asyncio.Queue = asyncio.Queue()
+
+    # Per-process warmups (page pool and schema cache live inside each shard)
+    for warmup in ("start_page_pool",):
+        if hasattr(handler, warmup):
+            asyncio.create_task(getattr(handler, warmup)())
+    if os.getenv("FORM_SCHEMA_WARMUP", "false").lower() == "true" and hasattr(handler, "warm_form_schemas"):
+        asyncio.create_task(handler.warm_form_schemas())
+    if hasattr(handler, "start_session_reaper"):
+        handler.start_session_reaper()
+
+    # Job event streams live in the parent; forward this worker's progress events there
+    progress_hub.tap(lambda event: conn.send({"event": event}))
+    # Sessions the shard evicts itself (idle reaper, LRU cap) free their parent assignment
+    if hasattr(handler, "on_session_closed"):
+        handler.on_session_closed = lambda session_id: conn.send({"closed": session_id})
+
+    def reader():
+        while True:
+            try:
+                message = conn.recv()
+            except (EOFError, OSError):
+                message = None
+            loop.call_soon_threadsafe(inbox.put_nowait, message)
+            if message is None:
+                return
+
+    threading.Thread(target=reader, name=f"shard-{shard_id}-reader", daemon=True).start()
+
+    async def handle(message: Dict[str, Any]):
+        try:
+            method = getattr(handler, message["method"])
+            result = method(*message.get("args", ()), **message.get("kwargs", {}))
+            if inspect.isawaitable(result):
+                result = await result
+            reply = {"id": message["id"], "result": result}
+        except Exception as e:
+            reply = {"id": message["id"], "error": f"{type(e).__name__}: {e}"}
+        try:
+            conn.send(reply)
+        except Exception as e:
+            conn.send({"id": message["id"], "error": f"Unserializable result: {e}"})
+
+    tasks = set()
+    while True:
+        message = await inbox.get()
+        if message is None:
+            break
+        task = asyncio.create_task(handle(message))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+class BrowserShard:
+    """Parent-side handle of one browser worker process"""
+
+    def __init__(self, shard_id: int, handler_path: str, mp_context, on_closed=None):
+        self.shard_id = shard_id
+        self.handler_path = handler_path
+        self.mp_context = mp_context
+        self.process = None
+        self.conn = None
+        self.pending: Dict[int, asyncio.Future] = {}
+        self.sessions: set = set()
+        self.on_closed = on_closed
+        self._ids = itertools.count(1)
+        self._send_lock = threading.Lock()
+
+    @property
+    def alive(self) -> bool:
+        return self.process is not None and self.process.is_alive()
+
+    @property
+    def load(self) -> tuple:
+        return (len(self.sessions), len(self.pending))
+
+    def start(self, loop: asyncio.AbstractEventLoop) -> None:
+        parent_conn, child_conn = self.mp_context.Pipe(duplex=True)
+        self.process = self.mp_context.Process(
+            target=_shard_main,
+            args=(child_conn, self.handler_path, self.shard_id),
+            name=f"browser-shard-{self.shard_id}",
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+        self.conn = parent_conn
+        threading.Thread(target=self._reader, args=(loop,), name=f"shard-{self.shard_id}-results", daemon=True).start()
+        logger.info(f"🧩 Browser shard {self.shard_id} started (pid {self.process.pid})")
+
+    def _reader(self, loop: asyncio.AbstractEventLoop) -> None:
+        conn = self.conn
+        while True:
+            try:
+                reply = conn.recv()
+                loop.call_soon_threadsafe(self._resolve, reply)
+            except (EOFError, OSError):
+                try:
+                    loop.call_soon_threadsafe(self._fail_pending, "Browser shard exited", conn)
+                except RuntimeError:
+                    pass  # event loop already closed
+                return
+            except RuntimeError:
+                return
+
+    def _resolve(self, reply: Dict[str, Any]) -> None:
+        if "event" in reply:
+            progress_hub.publish(reply["event"])
+            return
+        if "closed" in reply:
+            if self.on_closed is not None:
+                self.on_closed(self, reply["closed"])
+            return
+        future = self.pending.pop(reply.get("id"), None)
+        browser_shard_inflight.labels(shard=str(self.shard_id)).set(len(self.pending))
+        if future is None or future.done():
+            return
+        if "error" in reply:
+            future.set_exception(RuntimeError(reply["error"]))
+        else:
+            future.set_result(reply.get("result"))
+
+    def _fail_pending(self, reason: str, conn=None) -> None:
+        if conn is not None and conn is not self.conn:
+            return  # late notification from a connection replaced by a respawn
+        pending, self.pending = self.pending, {}
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(RuntimeError(reason))
+        self.sessions.clear()
+        browser_shard_inflight.labels(shard=str(self.shard_id)).set(0)
+        browser_shard_sessions.labels(shard=str(self.shard_id)).set(0)
+
+    async def call(self, method: str, args: tuple, kwargs: Dict[str, Any]) -> Any:
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self.pending[request_id] = future
+        browser_shard_inflight.labels(shard=str(self.shard_id)).set(len(self.pending))
+        with self._send_lock:
+            self.conn.send({"id": request_id, "method": method, "args": list(args), "kwargs": kwargs})
+        return await future
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        """Ask the worker to exit and wait for it (blocking; run in a thread)."""
+        if self.conn is not None:
+            try:
+                with self._send_lock:
+                    self.conn.send(None)
+            except (OSError, ValueError):
+                pass
+        if self.process is not None:
+            self.process.join(timeout)
+            if self.process.is_alive():
+                self.process.terminate()
+                self.process.join(timeout)
+        if self.conn is not None:
+            self.conn.close()
+
+
+class ShardedBrowserAgent:
+    """
+    Drop-in async facade over N BrowserAgentHandler worker processes
+
+    Each session is pinned to the least-loaded live shard on first use and stays
+    there (its browser state lives in that process) until the session is closed,
+    the shard evicts it, or it sits idle past the shard's own idle TTL. Calls
+    to methods without a session (e.g. fill_form) go to the least-loaded shard
+    and are not pinned.
+
+    Example:
+        agent = ShardedBrowserAgent(shards=4)
+        await agent.start()
+        result = await agent.execute_freeform("Điền tên ...", session_id="abc")
+    """
+
+    def __init__(self, shards: int, handler_path: str = DEFAULT_HANDLER):
+        """
+        Initialize sharded agent
+
+        Args:
+            shards: Number of browser worker processes
+            handler_path: "module:Class" of the handler each worker instantiates
+        """
+        self.handler_path = handler_path
+        self._handler_cls = _load_handler(handler_path)
+        self._mp = multiprocessing.get_context("spawn")
+        self.shards: List[BrowserShard] = [
+            BrowserShard(i, handler_path, self._mp, on_closed=self._on_shard_closed) for i in range(max(1, shards))
+        ]
+        self.assignments: Dict[str, BrowserShard] = {}
+        self.last_used: Dict[str, float] = {}
+        self.inflight: Dict[str, int] = {}
+        limits = session_limits()
+        # Outlive the shard reaper by one sweep so the shard drops a session before we do
+        self.idle_ttl = limits["idle_ttl"] + limits["reap_interval"]
+        self.reap_interval = limits["reap_interval"]
+        self._reaper_task: Optional[asyncio.Task] = None
+        self._rotation = itertools.count()
+        self.page_pool = None  # pools live inside the shards
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def start(self) -> None:
+        """Spawn all worker processes."""
+        self._loop = asyncio.get_running_loop()
+        for shard in self.shards:
+            if not shard.alive:
+                shard.start(self._loop)
+        if self._reaper_task is None or self._reaper_task.done():
+            self._reaper_task = asyncio.create_task(self._reap_loop())
+
+    async def stop(self) -> None:
+        """Shut down all worker processes."""
+        if self._reaper_task is not None:
+            self._reaper_task.cancel()
+            self._reaper_task = None
+        await asyncio.gather(*(asyncio.to_thread(shard.shutdown) for shard in self.shards))
+        for shard in self.shards:
+            shard._fail_pending("Browser shard stopped")
+        self.assignments.clear()
+        self.last_used.clear()
+
+    async def _reap_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.reap_interval)
+            self.reap_idle_assignments()
+
+    def reap_idle_assignments(self) -> List[str]:
+        """Drop assignments idle longer than the shards' session TTL."""
+        now = time.monotonic()
+        idle = [
+            sid for sid, used in self.last_used.items()
+            if now - used > self.idle_ttl and not self.inflight.get(sid)
+        ]
+        for session_id in idle:
+            self.release_session(session_id)
+        return idle
+
+    def _on_shard_closed(self, shard: BrowserShard, session_id: str) -> None:
+        if self.assignments.get(session_id) is shard:
+            self.release_session(session_id)
+
+    def _least_loaded_shard(self) -> BrowserShard:
+        for s in self.shards:
+            if not s.alive and self._loop is not None:
+                logger.warning(f"⚠️ Browser shard {s.shard_id} is down, respawning")
+                for session_id in [sid for sid, shard in self.assignments.items() if shard is s]:
+                    self.release_session(session_id)
+                s.start(self._loop)
+
+        live = [s for s in self.shards if s.alive]
+        if not live:
+            raise RuntimeError("No live browser shards")
+        # Rotate the starting point so ties (e.g. idle shards) are broken round-robin
+        start = next(self._rotation) % len(live)
+        return min(live[start:] + live[:start], key=lambda s: s.load)
+
+    def shard_for(self, session_id: str) -> BrowserShard:
+        """Sticky shard for a session, assigning the least-loaded live shard if needed."""
+        shard = self.assignments.get(session_id)
+        if shard is not None and shard.alive:
+            return shard
+
+        shard = self._least_loaded_shard()
+        shard.sessions.add(session_id)
+        self.assignments[session_id] = shard
+        browser_shard_sessions.labels(shard=str(shard.shard_id)).set(len(shard.sessions))
+        return shard
+
+    def release_session(self, session_id: str) -> None:
+        """Forget a session's shard assignment."""
+        shard = self.assignments.pop(session_id, None)
+        self.last_used.pop(session_id, None)
+        if shard is not None:
+            shard.sessions.discard(session_id)
+            browser_shard_sessions.labels(shard=str(shard.shard_id)).set(len(shard.sessions))
+
+    def _session_id_for(self, method: str, args: tuple, kwargs: Dict[str, Any]) -> Optional[str]:
+        """
+        Session a call belongs to, or None for stateless methods
+
+        Omitting session_id means the handler's default ("default"), which is
+        a real session; only methods without a session (no session_id
+        parameter, or one defaulting to None) are stateless.
+        """
+        target = getattr(self._handler_cls, method)
+        try:
+            bound = inspect.signature(target).bind(None, *args, **kwargs)
+            bound.apply_defaults()
+            return bound.arguments.get("session_id")
+        except TypeError:
+            return kwargs.get("session_id")
+
+    def _route(self, method: str, session_id: Optional[str]) -> BrowserShard:
+        if session_id is None:
+            return self._least_loaded_shard()
+        if method in READ_ONLY_METHODS:
+            shard = self.assignments.get(session_id)
+            return shard if shard is not None and shard.alive else self._least_loaded_shard()
+        return self.shard_for(session_id)
+
+    async def call(self, method: str, *args, **kwargs) -> Any:
+        """Run a handler method on the session's shard (any shard if stateless)."""
+        if self._loop is None:
+            await self.start()
+
+        session_id = self._session_id_for(method, args, kwargs)
+        sticky = session_id is not None and method not in READ_ONLY_METHODS
+        if sticky:
+            self.inflight[session_id] = self.inflight.get(session_id, 0) + 1
+        try:
+            shard = self._route(method, session_id)
+            result = await shard.call(method, args, kwargs)
+        except Exception as e:
+            logger.error(f"❌ Sharded call {method} failed for session {session_id}: {e}")
+            if sticky:
+                self.release_session(session_id)
+            return {"success": False, "error": str(e)}
+        finally:
+            if sticky:
+                remaining = self.inflight.pop(session_id) - 1
+                if remaining:
+                    self.inflight[session_id] = remaining
+                if session_id in self.assignments:
+                    self.last_used[session_id] = time.monotonic()
+
+        if method in SESSION_CLOSING_METHODS and session_id is not None:
+            self.release_session(session_id)
+        return result
+
+    def __getattr__(self, name: str):
+        handler_cls = self.__dict__.get("_handler_cls")
+        if name.startswith("_") or handler_cls is None or not callable(getattr(handler_cls, name, None)):
+            raise AttributeError(name)
+
+        async def proxy(*args, **kwargs):
+            return await self.call(name, *args, **kwargs)
+
+        proxy.__name__ = name
+        return proxy
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "shards": [
+                {
+                    "shard": s.shard_id,
+                    "alive": s.alive,
+                    "pid": s.process.pid if s.process else None,
+                    "sessions": len(s.sessions),
+                    "inflight": len(s.pending),
+                }
+                for s in self.shards
+            ],
+            "sessions": len(self.assignments),
+        }
@@ -8,6 +8,8 @@ Licensed under the MIT License - see LICENSE file for details
 """
 import asyncio
 import os
+from collections import OrderedDict
+from typing import Callable
 from dotenv import load_dotenv
 from loguru import logger
 from langsmith import traceable
@@ -15,9 +17,50 @@ from langsmith import traceable
 from browser_use import Agent as BrowserUseAgent
 from browser_use import Browser
 from browser_use.browser.browser import BrowserConfig
+from browser_use.browser.context import BrowserContext
 from langchain_openai import ChatOpenAI  # v0.1.19 uses langchain ChatOpenAI
 from playwright.async_api import async_playwright
 
+from src.automation import (
+    get_session_page,
+    fill_fields_dom,
+    form_schema_cache,
+    get_form_urls,
+    is_form_page,
+    macro_cache,
+    record_macro,
+    replay_macro,
+    FormPagePool,
+    page_pool_settings,
+    SessionActors,
+    serialized,
+)
+from src.automation.actions import (
+    clear_form,
+    focus_field,
+    go_to_step,
+    read_fields,
+    search_fields,
+    show_section,
+    submit_form_dom,
+)
+from src.automation.form_state import FormState
+from src.automation.preemption import PreemptionRegistry, ResumePoint, RunPreempted, observe_form
+from src.automation.progress import FIELD, NAVIGATION, VERIFICATION, emit_progress, progress_hub, step_events
+from src.automation.session_store import (
+    SessionStore,
+    compact_agent_history,
+    describe_form_state,
+    session_footprint,
+    session_limits,
+)
+from src.monitoring.metrics import (
+    browser_actions_total,
+    browser_action_duration_seconds,
+    forms_submitted_total,
+)
+from src.nlp import FORM_TYPE_KEYWORDS
+
 
 load_dotenv(override=True)
 
@@ -43,9 +86,25 @@ class BrowserAgentHandler:
     """Wrapper tương thích multi-agent, dùng Agent(ChatOpenAI, BrowserProfile)."""
 
     def __init__(self):
-        self.sessions: dict[str, dict] = {}
+        # LRU-tracked sessions; idle/over-cap entries are evicted by the reaper
+        self.sessions: SessionStore = SessionStore()
+        self.session_limits = session_limits()
+        self._reaper_task: asyncio.Task | None = None
+        # Called with the session id of every evicted session (sharding releases its assignment)
+        self.on_session_closed: Callable[[str], None] | None = None
+        # One in-order operation queue per session; queued fills are merged
+        self.actors = SessionActors()
+        # In-flight freeform agent runs that a newer request may preempt
+        self.preemption = PreemptionRegistry()
+        # Desired/observed form state per session id (bounded LRU)
+        self.form_states: OrderedDict[str, FormState] = OrderedDict()
+        self.max_form_states = 1000
         self.llm = None
         self.browser: Browser | None = None
+        # Deterministic Playwright path for known selectors; LLM agent is the fallback
+        self.dom_fast_path = os.getenv("BROWSER_DOM_FAST_PATH", "true").lower() == "true"
+        # Pre-navigated contexts per form type (see start_page_pool)
+        self.page_pool: FormPagePool | None = None
         logger.info("🌐 BrowserAgentHandler initialized")
 
     def _get_llm(self):
@@ -71,31 +130,338 @@ class BrowserAgentHandler:
             logger.info("🟢 Persistent browser started")
         return self.browser
 
+    async def start_page_pool(self) -> dict:
+        """Create and fill the pre-warmed form page pool (BROWSER_PAGE_POOL_SIZE > 0)."""
+        settings = page_pool_settings()
+        if settings["size_per_form"] <= 0 or self.page_pool is not None:
+            return {"success": True, "enabled": self.page_pool is not None}
+        try:
+            browser = await self._ensure_browser()
+
+            async def new_context():
+                context = BrowserContext(browser=browser)
+                await context.get_session()
+                return context
+
+            self.page_pool = FormPagePool(new_context, get_form_urls(), **settings)
+            await self.page_pool.start()
+            return {"success": True, "enabled": True, "stats": self.page_pool.get_stats()}
+        except Exception as e:
+            logger.error(f"❌ Error starting page pool: {e}", exc_info=True)
+            return {"success": False, "error": str(e)}
+
+    def _queue_task(self, session: dict, task: str):
+        """Compact the agent's history down to the form state, then queue the next task."""
+        agent = session["agent"]
+        try:
+            compacted = compact_agent_history(
+                agent,
+                describe_form_state(session.get("session_data", {})),
+                keep_last=self.session_limits["keep_messages"],
+                min_tokens=self.session_limits["compact_tokens"],
+            )
+            if compacted:
+                session["compactions"] = session.get("compactions", 0) + 1
+        except Exception as e:
+            logger.warning(f"⚠️ Agent history compaction skipped: {e}")
+        agent.add_new_task(task)
+
+    async def evict_session(self, session_id: str, reason: str = "evicted") -> bool:
+        """Drop a session and close its page/context."""
+        if session_id not in self.sessions:
+            return False
+        logger.info(f"🧹 Evicting browser session {session_id} ({reason})")
+        await self._close_session(session_id)
+        if self.on_session_closed is not None:
+            try:
+                self.on_session_closed(session_id)
+            except Exception as e:
+                logger.warning(f"⚠️ Session close listener failed for {session_id}: {e}")
+        return True
+
+    async def reap_idle_sessions(self) -> list[str]:
+        """Evict sessions idle longer than BROWSER_SESSION_IDLE_TTL."""
+        evicted = []
+        await self.preemption.expire()
+        for session_id in self.sessions.idle_sessions(self.session_limits["idle_ttl"]):
+            if self.actors.busy(session_id):
+                continue
+            if await self.evict_session(session_id, reason="idle"):
+                evicted.append(session_id)
+        return evicted
+
+    async def _enforce_session_cap(self, reserve: int = 1) -> list[str]:
+        """Evict least recently used sessions so a new one fits under BROWSER_MAX_SESSIONS."""
+        evicted = []
+        for session_id in self.sessions.lru_overflow(self.session_limits["max_sessions"], reserve=reserve):
+            if self.actors.busy(session_id):
+                continue
+            if await self.evict_session(session_id, reason="lru"):
+                evicted.append(session_id)
+        return evicted
+
+    def start_session_reaper(self) -> asyncio.Task:
+        """Run reap_idle_sessions every BROWSER_SESSION_REAP_INTERVAL seconds."""
+        if self._reaper_task is None or self._reaper_task.done():
+            async def reaper():
+                while True:
+                    await asyncio.sleep(self.session_limits["reap_interval"])
+                    try:
+                        await self.reap_idle_sessions()
+                    except Exception as e:
+                        logger.error(f"❌ Session reaper error: {e}")
+
+            self._reaper_task = asyncio.create_task(reaper())
+        return self._reaper_task
+
+    def get_session_stats(self, session_id: str | None = None) -> dict:
+        """Per-session memory and prompt-token footprint."""
+        ids = [session_id] if session_id else list(self.sessions.keys())
+        stats = {}
+        for sid in ids:
+            session = self.sessions.get(sid)
+            if session is None:
+                continue
+            stats[sid] = {
+                **session_footprint(session),
+                "idle_seconds": round(self.sessions.idle_seconds(sid), 1),
+                "compactions": session.get("compactions", 0),
+            }
+        return {
+            "success": True,
+            "sessions": stats,
+            "total_sessions": len(self.sessions),
+            "max_sessions": self.session_limits["max_sessions"],
+            "actors": self.actors.get_stats(),
+            "preemption": self.preemption.get_stats(),
+        }
+
+    async def _fill_fields_fast(self, session: dict, fields: dict[str, str]) -> dict:
+        """
+        Try to fill fields directly through the session's Playwright page
+
+        Returns:
+            dict with "filled" (fields set and verified on the DOM), "unresolved"
+            (fields the LLM agent still has to handle), "changed" (fields whose
+            page value actually changed) and "duration_ms"
+        """
+        outcome = {"filled": {}, "unresolved": list(fields), "changed": list(fields), "duration_ms": 0.0}
+        if not self.dom_fast_path or not fields:
+            return outcome
+
+        page = await get_session_page(session)
+        if page is None:
+            return outcome
+
+        # Map spoken/Vietnamese names onto the cached schema's field names
+        schema = session.get("schema")
+        resolved = {}
+        for name in fields:
+            match = schema.resolve_field(name) if schema else None
+            resolved[name] = match.key if match else name
+
+        try:
+            batch = await fill_fields_dom(page, {resolved[k]: v for k, v in fields.items()})
+        except Exception as e:
+            logger.warning(f"⚠️ DOM fast path unavailable, falling back to agent: {e}")
+            browser_actions_total.labels(action_type="fill_dom", status="failed").inc()
+            return outcome
+
+        browser_action_duration_seconds.labels(action_type="fill_dom").observe(batch["duration_ms"] / 1000)
+        outcome["filled"] = {k: v for k, v in fields.items() if resolved[k] not in batch["unresolved"]}
+        outcome["unresolved"] = [k for k in fields if k not in outcome["filled"]]
+        outcome["changed"] = [k for k in fields if resolved[k] in batch.get("changed", [])]
+        outcome["duration_ms"] = batch["duration_ms"]
+
+        if outcome["filled"]:
+            browser_actions_total.labels(action_type="fill_dom", status="success").inc(len(outcome["filled"]))
+        if outcome["unresolved"]:
+            logger.info(f"↪️  DOM fast path could not resolve {outcome['unresolved']}, using agent")
+            browser_actions_total.labels(action_type="fill_dom", status="fallback").inc(len(outcome["unresolved"]))
+        return outcome
+
+    async def _run_action(self, session: dict, action, *args, **kwargs) -> dict | None:
+        """Run a scripted page action; None means the agent has to handle it."""
+        if not self.dom_fast_path:
+            return None
+        page = await get_session_page(session)
+        if page is None:
+            return None
+        try:
+            result = await action(page, *args, **kwargs)
+        except Exception as e:
+            logger.warning(f"⚠️ Scripted {action.__name__} unavailable, falling back to agent: {e}")
+            browser_actions_total.labels(action_type=action.__name__, status="failed").inc()
+            return None
+        browser_actions_total.labels(action_type=action.__name__, status="success").inc()
+        browser_action_duration_seconds.labels(action_type=action.__name__).observe(result.get("duration_ms", 0.0) / 1000)
+        return result
+
+    @staticmethod
+    def _field_key(session: dict, field_name: str) -> str:
+        """HTML name for a spoken/Vietnamese field name when the schema knows it."""
+        schema = session.get("schema")
+        match = schema.resolve_field(field_name) if schema else None
+        return match.key if match and match.key else field_name
+
+    def _form_state(self, session_id: str) -> FormState:
+        """Indexed form state for a session, seeded from its fields_filled list."""
+        state = self.form_states.get(session_id)
+        if state is None:
+            session = self.sessions.get(session_id)
+            filled = session["session_data"].get("fields_filled", []) if session else []
+            state = FormState.from_fields_filled(filled)
+            self.form_states[session_id] = state
+            while len(self.form_states) > self.max_form_states:
+                self.form_states.popitem(last=False)
+        self.form_states.move_to_end(session_id)
+        return state
+
+    def _sync_fields_filled(self, session_id: str) -> None:
+        """Refresh the legacy fields_filled list from the form state."""
+        session = self.sessions.get(session_id)
+        if session is not None:
+            session["session_data"]["fields_filled"] = self._form_state(session_id).to_fields_filled()
+
+    async def _reconcile(self, session_id: str, names: list[str] | None = None) -> dict:
+        """
+        Apply the minimal operations for dirty fields in one DOM evaluation
+
+        Returns:
+            dict with planned "ops", "applied" ops, "unresolved" ops (left for the
+            agent) and the DOM "duration_ms"
+        """
+        state = self._form_state(session_id)
+        ops = state.plan(names)
+        if not ops:
+            return {"ops": [], "applied": [], "unresolved": [], "duration_ms": 0.0}
+
+        fast = await self._fill_fields_fast(self.sessions[session_id], {op.field: op.dom_value for op in ops})
+        applied = [op for op in ops if op.field in fast["filled"]]
+        state.mark_applied(applied, changed=fast["changed"])
+        for op in applied:
+            # The DOM path reads every value back, so these are verified
+            emit_progress(session_id, FIELD, field=op.field, value=op.value, status="filled", path="dom", verified=True)
+        return {
+            "ops": ops,
+            "applied": applied,
+            "unresolved": [op for op in ops if op.field not in fast["filled"]],
+            "duration_ms": fast["duration_ms"],
+        }
+
+    @serialized
+    async def reconcile_form_state(self, fields: dict[str, str | None], session_id: str = "default") -> dict:
+        """
+        Bring the page to a target state ({field: value}, None = empty)
+
+        Only fields whose observed value differs are touched; a target state that
+        is already on the page costs no DOM or LLM work.
+        """
+        try:
+            if session_id not in self.sessions:
+                return {"success": False, "error": f"No active session for {session_id}. Call start_form_session() first."}
+            state = self._form_state(session_id)
+            for name, value in fields.items():
+                if value is None:
+                    state.desire_clear(name)
+                else:
+                    state.desire(name, value)
+            outcome = await self._reconcile(session_id, list(fields))
+            self._sync_fields_filled(session_id)
+            return {
+                "success": not outcome["unresolved"],
+                "ops": [{"op": op.op, "field": op.field, "value": op.value} for op in outcome["ops"]],
+                "unresolved": [op.field for op in outcome["unresolved"]],
+                "duration_ms": outcome["duration_ms"],
+                "state": state.snapshot(),
+            }
+        except Exception as e:
+            logger.error(f"❌ Error reconciling form state: {e}", exc_info=True)
+            return {"success": False, "error": str(e)}
+
+    def form_state_token(self, session_id: str = "default") -> str:
+        """Opaque token that changes whenever the session's form may have changed."""
+        if session_id not in self.form_states and session_id not in self.sessions:
+            # Unknown session (stateless request, cache-key lookup): no entry in the form state LRU
+            return "0"
+        state = self._form_state(session_id)
+        return f"{state.epoch}.{state.version}"
+
+    async def _load_form_schema(self, session: dict, form_url: str, form_type: str):
+        """Attach the cached (or freshly extracted) form schema to a session."""
+        page = await get_session_page(session)
+        if page is None or not is_form_page(page.url, form_url):
+            session["schema"] = form_schema_cache.get(form_url)
+            return session["schema"]
+        try:
+            session["schema"] = await form_schema_cache.ensure(page, form_url, form_type=form_type)
+        except Exception as e:
+            logger.warning(f"⚠️ Form schema extraction failed for {form_url}: {e}")
+            session["schema"] = form_schema_cache.get(form_url)
+        return session["schema"]
+
+    async def warm_form_schemas(self) -> dict:
+        """Crawl every configured form once so schemas are cached before the first request."""
+        try:
+            browser = await self._ensure_browser()
+            playwright_browser = await browser.get_playwright_browser()
+            schemas = await form_schema_cache.crawl(playwright_browser)
+            logger.info(f"🗺️  Warmed {len(schemas)} form schemas")
+            return {"success": True, "forms": sorted(schemas)}
+        except Exception as e:
+            logger.error(f"❌ Error warming form schemas: {e}", exc_info=True)
+            return {"success": False, "error": str(e)}
+
     @traceable(name="start_form_session")
+    @serialized
     async def start_form_session(self, form_url: str, form_type: str, session_id: str = "default") -> dict:
         try:
             logger.info(f"🚀 Starting form session: {form_type} (session_id: {session_id})")
 
-            if session_id in self.sessions:
+            pool_ready = self.page_pool is not None and self.page_pool.available(form_type) > 0
+            if session_id in self.sessions and not pool_ready:
                 logger.info(f"♻️  Reusing existing session for {session_id}")
-                agent = self.sessions[session_id]["agent"]
-                agent.add_new_task(f"Open {form_url} and wait for page to fully load.")
-                await agent.run(max_steps=4)
+                session = self.sessions[session_id]
+                self._queue_task(session, f"Open {form_url} and wait for page to fully load.")
+                await session["agent"].run(max_steps=4)
+                self.sessions.touch(session_id)
                 return {"success": True, "message": f"Reusing session for {form_type}", "session": self.sessions[session_id]["session_data"]}
+            if session_id in self.sessions:
+                await self._close_session(session_id)
+            await self._enforce_session_cap()
 
             browser = await self._ensure_browser()
             llm = self._get_llm()
-            
-            initial_task = (
-                f"Open {form_url} and wait for the form to fully load. Do not submit or fill yet."
-            )
-            agent = BrowserUseAgent(
-                task=initial_task,
-                llm=llm,
-                browser=browser,
-            )
 
-            await agent.run(max_steps=4)
+            pooled = await self.page_pool.acquire(form_type, form_url) if self.page_pool else None
+            if pooled:
+                # Form is already loaded in the pooled context; no LLM steps needed to open it
+                logger.info(f"🏊 Checked out pre-loaded {form_type} form for {session_id}")
+                agent = BrowserUseAgent(
+                    task=f"The form {form_url} is already open in the current tab. Wait for instructions.",
+                    llm=llm,
+                    browser=browser,
+                    browser_context=pooled.context,
+                )
+            else:
+                initial_task = (
+                    f"Open {form_url} and wait for the form to fully load. Do not submit or fill yet."
+                )
+                # The session owns its context so the form page outlives agent.run
+                # (the DOM fast path and scripted actions work on that page)
+                context = BrowserContext(browser=browser)
+                agent = BrowserUseAgent(
+                    task=initial_task,
+                    llm=llm,
+                    browser=browser,
+                    browser_context=context,
+                )
+
+                try:
+                    await agent.run(max_steps=4)
+                except BaseException:
+                    await context.close()
+                    raise
 
             session_data = {
                 "url": form_url,
@@ -103,253 +469,387 @@ class BrowserAgentHandler:
                 "fields_filled": [],
                 "start_time": asyncio.get_event_loop().time(),
                 "session_id": session_id,
+                "pooled": pooled is not None,
             }
-            self.sessions[session_id] = {"agent": agent, "session_data": session_data}
+            self.sessions[session_id] = {"agent": agent, "session_data": session_data, "pooled": pooled}
+            schema = await self._load_form_schema(self.sessions[session_id], form_url, form_type)
+            if schema:
+                session_data["schema_hash"] = schema.content_hash
+            emit_progress(session_id, NAVIGATION, url=form_url, form_type=form_type)
             return {"success": True, "message": f"Form {form_type} opened successfully", "session": session_data}
         except Exception as e:
             logger.error(f"❌ Error starting session: {e}", exc_info=True)
             return {"success": False, "error": str(e)}
 
-    @traceable(name="fill_field_incremental")
-    async def fill_field_incremental(self, field_name: str, value: str, session_id: str = "default") -> dict:
-        try:
-            if session_id not in self.sessions:
-                return {"success": False, "error": f"No active session for {session_id}. Call start_form_session() first."}
-
-            session = self.sessions[session_id]
-            agent = session["agent"]
-            session_data = session["session_data"]
-
-            if any(f.get("field") == field_name and f.get("value") == value for f in session_data["fields_filled"]):
-                return {"success": True, "field": field_name, "value": value, "skipped": True, "message": f"Field {field_name} already has value {value}"}
-
-            filled_fields_info = ", ".join([f"{f['field']}={f['value']}" for f in session_data["fields_filled"]])
-            task = f"""
-            On the current page, fill only the field with HTML name="{field_name}" with value: {value}.
-            Memory: {filled_fields_info if filled_fields_info else 'None'}.
-            Verify the field now shows the exact value. Do not submit or navigate.
-            """
-            agent.add_new_task(task)
-            await agent.run()
-
-            session_data["fields_filled"].append({"field": field_name, "value": value})
-            return {"success": True, "field": field_name, "value": value, "fields_filled": len(session_data["fields_filled"]), "message": f"Filled {field_name} = {value}"}
-        except Exception as e:
-            logger.error(f"❌ Error filling field {field_name}: {e}", exc_info=True)
-            return {"success": False, "error": str(e)}
-
-    async def fill_fields_parallel(self, fields: dict[str, str], session_id: str = "default") -> dict:
+    async def _apply_fills(self, fields: dict[str, str], session_id: str = "default") -> dict:
         """
-        Fill multiple form fields in parallel for better performance
-
-        Args:
-            fields: Dictionary of {field_name: value}
-            session_id: Session identifier
+        Apply one (possibly coalesced) batch of field values to a session's form
 
-        Returns:
-            dict with success status and results
+        DOM fast path first; whatever it cannot resolve goes to the agent in a
+        single multi-field task. Runs inside the session's actor.
         """
         try:
             if session_id not in self.sessions:
                 return {"success": False, "error": f"No active session for {session_id}. Call start_form_session() first."}
 
             session = self.sessions[session_id]
-            agent = session["agent"]
             session_data = session["session_data"]
+            state = self._form_state(session_id)
 
             # Filter out already-filled fields with same values
-            fields_to_fill = {
-                k: v for k, v in fields.items()
-                if not any(f.get("field") == k and f.get("value") == v for f in session_data["fields_filled"])
-            }
+            fields_to_fill = {k: v for k, v in fields.items() if not state.is_applied(k, v)}
 
             if not fields_to_fill:
-                return {"success": True, "message": "All fields already filled with requested values", "skipped": True}
+                return {"success": True, "fields": {}, "batch": dict(fields), "paths": {}, "skipped": True,
+                        "total_filled": len(session_data["fields_filled"]), "duration_ms": 0.0,
+                        "message": "All fields already filled with requested values"}
 
-            # Build multi-field task for parallel execution
-            fields_desc = "\n".join([f"- {k}: {v}" for k, v in fields_to_fill.items()])
-            filled_fields_info = ", ".join([f"{f['field']}={f['value']}" for f in session_data["fields_filled"]])
+            logger.info(f"🚀 Parallel filling {len(fields_to_fill)} fields: {list(fields_to_fill.keys())}")
 
-            task = f"""
-            On the current page, fill the following fields in a single pass (use multi-action sequences):
-            {fields_desc}
+            state.desire_many(fields_to_fill)
+            outcome = await self._reconcile(session_id, list(fields_to_fill))
+            agent_fields = {op.field: op.value for op in outcome["unresolved"]}
 
-            Memory (already filled): {filled_fields_info if filled_fields_info else 'None'}.
+            if agent_fields:
+                # Build multi-field task for the fields the DOM path could not resolve
+                fields_desc = "\n".join([f"- {k}: {v}" for k, v in agent_fields.items()])
+                filled_fields_info = ", ".join([f"{f['field']}={f['value']}" for f in session_data["fields_filled"]])
 
-            Verify all fields show the exact values. Do not submit or navigate.
-            """
+                task = f"""
+                On the current page, fill the following fields in a single pass (use multi-action sequences):
+                {fields_desc}
 
-            logger.info(f"🚀 Parallel filling {len(fields_to_fill)} fields: {list(fields_to_fill.keys())}")
+                Memory (already filled): {filled_fields_info if filled_fields_info else 'None'}.
 
-            agent.add_new_task(task)
-            await agent.run()
+                Verify all fields show the exact values. Do not submit or navigate.
+                """
 
-            # Update session data
-            for field_name, value in fields_to_fill.items():
-                session_data["fields_filled"].append({"field": field_name, "value": value})
+                self._queue_task(session, task)
+                await session["agent"].run()
+                state.mark_applied(outcome["unresolved"])
+                for name, value in agent_fields.items():
+                    emit_progress(session_id, FIELD, field=name, value=value, status="filled", path="agent", verified=False)
+
+            self._sync_fields_filled(session_id)
+
+            paths = {k: ("agent" if k in agent_fields else "dom") for k in fields_to_fill}
+            path = "agent" if len(agent_fields) == len(fields_to_fill) else ("dom" if not agent_fields else "mixed")
 
             return {
                 "success": True,
                 "fields": fields_to_fill,
+                "batch": dict(fields),
                 "fields_count": len(fields_to_fill),
                 "total_filled": len(session_data["fields_filled"]),
+                "path": path,
+                "paths": paths,
+                "duration_ms": outcome["duration_ms"],
                 "message": f"Filled {len(fields_to_fill)} fields in parallel"
             }
         except Exception as e:
-            logger.error(f"❌ Error filling fields in parallel: {e}", exc_info=True)
+            logger.error(f"❌ Error filling fields {list(fields)}: {e}", exc_info=True)
             return {"success": False, "error": str(e)}
 
+    async def _queue_fills(self, fields: dict[str, str], session_id: str) -> dict:
+        """Queue fields on the session actor, merged with fills already waiting there."""
+        return await self.actors.fill(session_id, fields, self._apply_fills, session_id=session_id)
+
+    @traceable(name="fill_field_incremental")
+    async def fill_field_incremental(self, field_name: str, value: str, session_id: str = "default") -> dict:
+        batch = await self._queue_fills({field_name: value}, session_id)
+        if not batch.get("success"):
+            return batch
+
+        applied_value = batch["batch"].get(field_name, value)
+        result = {"success": True, "field": field_name, "value": value, "fields_filled": batch["total_filled"],
+                  "duration_ms": batch["duration_ms"], "coalesced": len(batch["batch"]) > 1}
+        if applied_value != value:
+            # A later request for the same field won the merge
+            result.update(superseded=True, applied_value=applied_value, message=f"{field_name} superseded by {applied_value}")
+        elif field_name not in batch["fields"]:
+            result.update(skipped=True, message=f"Field {field_name} already has value {value}")
+        else:
+            result.update(path=batch["paths"][field_name], message=f"Filled {field_name} = {value}")
+        return result
+
+    async def fill_fields_parallel(self, fields: dict[str, str], session_id: str = "default") -> dict:
+        """
+        Fill multiple form fields in parallel for better performance
+
+        Requests arriving while the session is busy are merged into one batch
+        (last value per field wins).
+
+        Args:
+            fields: Dictionary of {field_name: value}
+            session_id: Session identifier
+
+        Returns:
+            dict with success status and results
+        """
+        batch = await self._queue_fills(fields, session_id)
+        if not batch.get("success") or batch.get("skipped"):
+            return batch
+
+        mine = {k: v for k, v in batch["fields"].items() if k in fields}
+        if not mine:
+            return {"success": True, "message": "All fields already filled with requested values", "skipped": True}
+        return {
+            **batch,
+            "fields": mine,
+            "fields_count": len(mine),
+            "paths": {k: batch["paths"][k] for k in mine},
+            "coalesced": len(batch["batch"]) > len(fields),
+            "superseded": [k for k, v in fields.items() if batch["batch"].get(k) != v],
+        }
+
+    @serialized
     async def upsert_field_incremental(self, field_name: str, value: str, session_id: str = "default") -> dict:
         try:
             if session_id not in self.sessions:
                 return {"success": False, "error": f"No active session for {session_id}. Call start_form_session() first."}
             session = self.sessions[session_id]
-            agent = session["agent"]
-            session_data = session["session_data"]
-            task = f"""
-            Locate HTML field name="{field_name}" and set/replace its content with: {value}. Verify final value.
-            Only modify this field.
-            """
-            agent.add_new_task(task)
-            await agent.run()
-            # upsert memory
-            updated = False
-            for f in session_data["fields_filled"]:
-                if f.get("field") == field_name:
-                    f["value"] = value
-                    updated = True
-                    break
-            if not updated:
-                session_data["fields_filled"].append({"field": field_name, "value": value})
-            return {"success": True, "field": field_name, "value": value, "message": "Field upserted"}
+            state = self._form_state(session_id)
+            state.desire(field_name, value)
+            outcome = await self._reconcile(session_id, [field_name])
+            if outcome["unresolved"]:
+                task = f"""
+                Locate HTML field name="{field_name}" and set/replace its content with: {value}. Verify final value.
+                Only modify this field.
+                """
+                self._queue_task(session, task)
+                await session["agent"].run()
+                state.mark_applied(outcome["unresolved"])
+                path = "agent"
+            else:
+                path = "dom"
+            self._sync_fields_filled(session_id)
+            return {"success": True, "field": field_name, "value": value, "path": path, "duration_ms": outcome["duration_ms"], "message": "Field upserted"}
         except Exception as e:
             logger.error(f"❌ Error upserting field {field_name}: {e}", exc_info=True)
             return {"success": False, "error": str(e)}
 
+    @serialized
     async def remove_field_incremental(self, field_name: str, session_id: str = "default") -> dict:
         try:
             if session_id not in self.sessions:
                 return {"success": False, "error": f"No active session for {session_id}. Call start_form_session() first."}
             session = self.sessions[session_id]
-            agent = session["agent"]
-            session_data = session["session_data"]
-            task = f"""
-            Clear the field with HTML name="{field_name}" (empty the input or reset select to placeholder). Verify cleared.
-            """
-            agent.add_new_task(task)
-            await agent.run()
-            session_data["fields_filled"] = [f for f in session_data["fields_filled"] if f.get("field") != field_name]
+            state = self._form_state(session_id)
+            state.desire_clear(field_name)
+            outcome = await self._reconcile(session_id, [field_name])
+            if outcome["unresolved"]:
+                task = f"""
+                Clear the field with HTML name="{field_name}" (empty the input or reset select to placeholder). Verify cleared.
+                """
+                self._queue_task(session, task)
+                await session["agent"].run()
+                state.mark_applied(outcome["unresolved"])
+            self._sync_fields_filled(session_id)
             return {"success": True, "field": field_name, "message": "Field cleared and removed from memory"}
         except Exception as e:
             logger.error(f"❌ Error removing field {field_name}: {e}", exc_info=True)
             return {"success": False, "error": str(e)}
 
+    @serialized
     async def remove_fields_incremental(self, field_names: list[str], session_id: str = "default") -> dict:
         try:
             if session_id not in self.sessions:
                 return {"success": False, "error": f"No active session for {session_id}. Call start_form_session() first."}
             session = self.sessions[session_id]
-            agent = session["agent"]
-            session_data = session["session_data"]
-            fields_str = ", ".join(field_names)
-            task = f"""
-            Clear the following fields by HTML name: {fields_str}. Verify each is empty or reset to placeholder.
-            """
-            agent.add_new_task(task)
-            await agent.run()
-            session_data["fields_filled"] = [f for f in session_data["fields_filled"] if f.get("field") not in set(field_names)]
+            state = self._form_state(session_id)
+            for name in field_names:
+                state.desire_clear(name)
+            outcome = await self._reconcile(session_id, field_names)
+            if outcome["unresolved"]:
+                fields_str = ", ".join(op.field for op in outcome["unresolved"])
+                task = f"""
+                Clear the following fields by HTML name: {fields_str}. Verify each is empty or reset to placeholder.
+                """
+                self._queue_task(session, task)
+                await session["agent"].run()
+                state.mark_applied(outcome["unresolved"])
+            self._sync_fields_filled(session_id)
             return {"success": True, "fields": list(field_names), "message": "Fields cleared and removed from memory"}
         except Exception as e:
             logger.error(f"❌ Error removing fields {field_names}: {e}", exc_info=True)
             return {"success": False, "error": str(e)}
 
+    @serialized
     async def clear_all_fields_incremental(self, session_id: str = "default") -> dict:
         try:
             if session_id not in self.sessions:
                 return {"success": False, "error": f"No active session for {session_id}. Call start_form_session() first."}
             session = self.sessions[session_id]
-            agent = session["agent"]
-            session_data = session["session_data"]
-            task = """
-            Try clicking a 'Reset/Clear' button to reset the entire form. If not found, clear all visible inputs/selects to default.
-            Verify the form is cleared.
-            """
-            agent.add_new_task(task)
-            await agent.run()
-            session_data["fields_filled"] = []
-            return {"success": True, "message": "All fields cleared and memory reset"}
+            state = self._form_state(session_id)
+
+            # With a known schema every field can be cleared in one DOM round trip
+            schema = session.get("schema")
+            path = "dom"
+            if schema:
+                for name in set(schema.field_names) | set(state.desired):
+                    state.desire_clear(name)
+                outcome = await self._reconcile(session_id)
+                cleared = not outcome["unresolved"]
+            else:
+                cleared = False
+
+            if not cleared:
+                # Otherwise use the form's own clear/reset button
+                reset = await self._run_action(session, clear_form)
+                cleared = bool(reset and reset.get("found") and not reset.get("remaining"))
+
+            if not cleared:
+                task = """
+                Try clicking a 'Reset/Clear' button to reset the entire form. If not found, clear all visible inputs/selects to default.
+                Verify the form is cleared.
+                """
+                self._queue_task(session, task)
+                await session["agent"].run()
+                path = "agent"
+            state.forget()
+            self._sync_fields_filled(session_id)
+            return {"success": True, "message": "All fields cleared and memory reset", "path": path}
         except Exception as e:
             logger.error(f"❌ Error clearing all fields: {e}", exc_info=True)
             return {"success": False, "error": str(e)}
 
+    @serialized
     async def focus_field_incremental(self, field_name: str, session_id: str = "default") -> dict:
         try:
             if session_id not in self.sessions:
                 return {"success": False, "error": f"No active session for {session_id}. Call start_form_session() first."}
             session = self.sessions[session_id]
+
+            focused = await self._run_action(session, focus_field, self._field_key(session, field_name))
+            if focused and focused.get("found"):
+                return {"success": True, "field": field_name, "name": focused["name"], "step": focused.get("step"),
+                        "path": "dom", "duration_ms": focused["duration_ms"], "message": f"Focused field {field_name}"}
+
             agent = session["agent"]
             task = f"""
             Scroll to and focus/highlight the field with HTML name or label matching "{field_name}".
             If inside a collapsed section, expand it first. Do not modify values.
             Acknowledge once the field is visible and focused.
             """
-            agent.add_new_task(task)
+            self._queue_task(session, task)
             await agent.run(max_steps=3)
-            return {"success": True, "field": field_name, "message": f"Focused field {field_name}"}
+            return {"success": True, "field": field_name, "path": "agent", "message": f"Focused field {field_name}"}
         except Exception as e:
             logger.error(f"❌ Error focusing field {field_name}: {e}", exc_info=True)
             return {"success": False, "error": str(e)}
 
+    @serialized
+    async def go_to_next_step(self, session_id: str = "default") -> dict:
+        """Click the wizard's 'Tiếp tục' button and report the step now shown."""
+        try:
+            if session_id not in self.sessions:
+                return {"success": False, "error": f"No active session for {session_id}. Call start_form_session() first."}
+            session = self.sessions[session_id]
+
+            step = await self._run_action(session, go_to_step, "next")
+            if step and step.get("found"):
+                if step.get("moved"):
+                    self._form_state(session_id).bump()
+                    return {"success": True, "from_step": step["from_step"], "step": step["to_step"],
+                            "title": step.get("title", ""), "path": "dom", "duration_ms": step["duration_ms"],
+                            "message": f"Moved to step {step['to_step']}"}
+                reason = "Already on the last step" if step.get("reason") == "no_such_step" else "The form did not move to the next step"
+                return {"success": False, "step": step["from_step"], "path": "dom", "error": reason}
+
+            task = (
+                "Click nút có text 'Tiếp tục' ở cuối trang để chuyển sang bước tiếp theo. "
+                "Sau khi click, chờ trang tải xong (đợi tiêu đề phần kế tiếp xuất hiện), "
+                "tuyệt đối không đóng trình duyệt."
+            )
+            self._queue_task(session, task)
+            await session["agent"].run(max_steps=8)
+            self._form_state(session_id).bump()
+            return {"success": True, "path": "agent", "message": "Moved to next step"}
+        except Exception as e:
+            logger.error(f"❌ Error moving to next step: {e}", exc_info=True)
+            return {"success": False, "error": str(e)}
+
+    @serialized
     async def navigate_to_section(self, section_name: str, session_id: str = "default") -> dict:
         try:
             if session_id not in self.sessions:
                 return {"success": False, "error": f"No active session for {session_id}. Call start_form_session() first."}
             session = self.sessions[session_id]
+
+            section = await self._run_action(session, show_section, section_name)
+            if section and section.get("found"):
+                return {"success": True, "section": section_name, "title": section.get("title", ""),
+                        "step": section.get("step"), "path": "dom", "duration_ms": section["duration_ms"],
+                        "message": f"Navigated to section {section_name}"}
+
             agent = session["agent"]
             task = f"""
             Locate the section or accordion that corresponds to "{section_name}" (match heading, label, or aria-label ignoring accents).
             Expand or scroll to it so it is visible and ready for input. Do not submit or modify fields.
             Confirm the section is in view.
             """
-            agent.add_new_task(task)
+            self._queue_task(session, task)
             await agent.run(max_steps=3)
-            return {"success": True, "section": section_name, "message": f"Navigated to section {section_name}"}
+            return {"success": True, "section": section_name, "path": "agent", "message": f"Navigated to section {section_name}"}
         except Exception as e:
             logger.error(f"❌ Error navigating to section {section_name}: {e}", exc_info=True)
             return {"success": False, "error": str(e)}
 
+    @serialized
     async def summarize_filled_fields(self, session_id: str = "default") -> dict:
         if session_id not in self.sessions:
             return {"success": False, "error": f"No active session for {session_id}. Call start_form_session() first."}
 
         session = self.sessions[session_id]
-        fields = session["session_data"].get("fields_filled", [])
+
+        # The form page is the source of truth; memory covers sessions whose tab is not on the form
+        page_read = await self._run_action(session, read_fields)
+        if page_read is not None and page_read["fields"]:
+            # Selects and boxes still at the page's default were not filled by the user
+            filled = [f for f in page_read["fields"].values() if f.get("value") and f.get("changed", True)]
+            fields = [{"field": f["name"], "value": f.get("text") or f["value"]} for f in filled]
+            summary_lines = [f"- {f.get('label') or f['name']}: {f.get('text') or f['value']}" for f in filled]
+            path = "dom"
+        else:
+            fields = session["session_data"].get("fields_filled", [])
+            summary_lines = [f"- {item['field']}: {item['value']}" for item in fields]
+            path = "memory"
 
         if not fields:
             message = "Chưa có trường nào được điền."
         else:
-            summary_lines = [
-                f"- {item['field']}: {item['value']}" for item in fields
-            ]
             message = "Tôi đã điền các trường sau:\n" + "\n".join(summary_lines)
 
         return {
             "success": True,
             "fields": list(fields),
+            "path": path,
             "message": message
         }
 
+    @serialized
     async def read_field_value(self, field_name: str, session_id: str = "default") -> dict:
         if session_id not in self.sessions:
             return {"success": False, "error": f"No active session for {session_id}. Call start_form_session() first."}
 
         session = self.sessions[session_id]
+        page_read = await self._run_action(session, read_fields, [self._field_key(session, field_name)])
+        found = next(iter(page_read["fields"].values())) if page_read else None
+        if found and found.get("found"):
+            value = found.get("text") or found.get("value")
+            if value:
+                message = f"Trường {found.get('label') or field_name} hiện đang có giá trị: {value}"
+                return {"success": True, "field": field_name, "value": value, "raw_value": found.get("value"),
+                        "path": "dom", "message": message}
+            return {"success": False, "field": field_name, "path": "dom",
+                    "message": f"Chưa có giá trị nào được lưu cho trường {field_name}"}
+
         fields = session["session_data"].get("fields_filled", [])
         stored = next((f for f in fields if f.get("field") == field_name), None)
 
         if stored:
             message = f"Trường {field_name} hiện đang có giá trị: {stored['value']}"
-            return {"success": True, "field": field_name, "value": stored["value"], "message": message}
+            return {"success": True, "field": field_name, "value": stored["value"], "path": "memory", "message": message}
 
         return {
             "success": False,
@@ -364,6 +864,7 @@ class BrowserAgentHandler:
         return {"success": True, "fields": list(session["session_data"].get("fields_filled", []))}
 
     @traceable(name="submit_form_incremental")
+    @serialized
     async def submit_form_incremental(self, session_id: str = "default") -> dict:
         try:
             if session_id not in self.sessions:
@@ -372,25 +873,111 @@ class BrowserAgentHandler:
             agent = session["agent"]
             session_data = session["session_data"]
             form_type = session_data.get("type", "loan")
+
+            submitted = await self._run_action(session, submit_form_dom)
+            if submitted and submitted.get("found") and submitted.get("reason") != "no_submit_button":
+                emit_progress(session_id, VERIFICATION, action="submit", ok=bool(submitted.get("ok")),
+                              confirmed=bool(submitted.get("confirmed")), message=submitted.get("message") or "",
+                              invalid=[f.get("name") for f in submitted.get("invalid") or []])
+                if submitted.get("reason") == "invalid":
+                    missing = [f.get("label") or f.get("name") for f in submitted["invalid"]]
+                    return {"success": False, "path": "dom", "invalid": submitted["invalid"],
+                            "error": "Missing or invalid required fields",
+                            "message": "Vui lòng bổ sung: " + ", ".join(missing)}
+                if not submitted["ok"]:
+                    forms_submitted_total.labels(form_type=form_type, status="failed").inc()
+                    return {"success": False, "path": "dom", "status": submitted.get("status"),
+                            "error": f"Submission rejected: {submitted.get('message') or submitted.get('status')}"}
+                if not submitted.get("confirmed"):
+                    # Clicked but the page never acknowledged it: keep the session so it can be checked or retried
+                    forms_submitted_total.labels(form_type=form_type, status="unconfirmed").inc()
+                    return {"success": False, "path": "dom", "status": "unconfirmed", "confirmed": False,
+                            "duration_ms": submitted["duration_ms"],
+                            "error": "Submit clicked but no confirmation was observed",
+                            "message": "Chưa xác nhận được biểu mẫu đã gửi thành công, vui lòng kiểm tra lại."}
+                forms_submitted_total.labels(form_type=form_type, status="success").inc()
+                await self._close_session(session_id)
+                return {"success": True, "path": "dom", "confirmed": submitted["confirmed"],
+                        "signal": submitted.get("signal"), "duration_ms": submitted["duration_ms"],
+                        "message": submitted.get("message") or "Form submitted (or finalized)"}
+
             task = """
             IMPORTANT: This is an EXPLICIT user request to submit the form.
             Click the submit/send/register button, confirm any modal if needed, and wait for success message.
             Provide a short summary of fields filled and submit status.
             """
-            agent.add_new_task(task)
+            self._queue_task(session, task)
             await agent.run()
             await asyncio.sleep(1)
             await self._close_session(session_id)
-            return {"success": True, "message": "Form submitted (or finalized)"}
+            return {"success": True, "path": "agent", "message": "Form submitted (or finalized)"}
         except Exception as e:
             logger.error(f"❌ Error submitting form: {e}", exc_info=True)
             return {"success": False, "error": str(e)}
 
+    def _macro_values(self, form_url: str, form_data: dict) -> dict:
+        """Key structured form data by the HTML field names macros are recorded with."""
+        schema = form_schema_cache.get(form_url)
+        values = {}
+        for name, value in form_data.items():
+            field = schema.resolve_field(name) if schema else None
+            values[field.key if field else name] = value
+        return values
+
+    def _record_macro(self, history, form_url: str | None = None) -> None:
+        """Store a successful agent run as a replayable macro (best effort)."""
+        try:
+            macro = record_macro(history, url=form_url)
+            if macro is None:
+                return
+            schema = form_schema_cache.get(macro.url)
+            macro.schema_hash = schema.content_hash if schema else ""
+            macro_cache.store(macro)
+        except Exception as e:
+            logger.warning(f"⚠️ Macro recording skipped: {e}")
+
     @traceable(name="fill_form")
     async def fill_form(self, form_url: str, form_data: dict, form_type: str = "loan") -> dict:
+        """
+        One-shot form fill
+
+        Replays a recorded macro for this form and field set through Playwright
+        when one exists; the LLM agent runs only when there is no macro or a
+        replay step fails, and its successful trace is recorded for next time.
+        """
+        context = None
         try:
-            profile = self._get_profile()
             browser = await self._ensure_browser()
+            context = BrowserContext(browser=browser)
+            page = await context.get_current_page()
+            await page.goto(form_url, wait_until="load")
+
+            try:
+                schema = await form_schema_cache.ensure(page, form_url, form_type=form_type)
+            except Exception as e:
+                logger.warning(f"⚠️ Form schema extraction failed for {form_url}: {e}")
+                schema = form_schema_cache.get(form_url)
+            values = self._macro_values(form_url, form_data)
+            macro = macro_cache.lookup(form_url, schema.content_hash if schema else "", values.keys())
+
+            if macro is not None:
+                replay = await replay_macro(page, macro, values)
+                browser_actions_total.labels(
+                    action_type="macro_replay", status="success" if replay["success"] else "failed"
+                ).inc()
+                if replay["success"]:
+                    macro_cache.record_success(macro)
+                    logger.info(f"📼 Replayed macro for {form_url} in {replay['duration_ms']}ms")
+                    return {
+                        "success": True,
+                        "message": "Form filled from recorded macro",
+                        "result": "",
+                        "path": "macro",
+                        "duration_ms": replay["duration_ms"],
+                    }
+                logger.warning(f"⚠️ Macro step {replay['failed_step']} failed ({replay['error']}), falling back to agent")
+                macro_cache.record_failure(macro)
+
             fields_desc = "\n".join([f"- {k}: {v}" for k, v in form_data.items()])
             task = f"""
             1. Open {form_url}
@@ -398,14 +985,13 @@ class BrowserAgentHandler:
             3. Verify formats (phone 10 digits, valid email, DOB DD/MM/YYYY or similar)
             4. STOP after filling. DO NOT click submit button unless explicitly requested.
             5. Return a short summary of filled fields.
+            {SPEED_OPTIMIZATION_PROMPT}
             """
             agent = BrowserUseAgent(
                 task=task,
-                flash_mode=False,
-                browser_profile=profile,
-                extend_system_message=SPEED_OPTIMIZATION_PROMPT,
-                browser=browser,
                 llm=self._get_llm(),
+                browser=browser,
+                browser_context=context,
             )
             try:
                 result = await agent.run(max_steps=12)
@@ -415,9 +1001,10 @@ class BrowserAgentHandler:
                     logger.warning("⚠️ agent.run() returned no result, treating as success (fill_form)")
                     return {"success": True, "message": "Form filled (no textual result)", "result": ""}
                 raise
+            self._record_macro(agent.history, form_url)
             if result is None or (isinstance(result, str) and not result.strip()):
-                return {"success": True, "message": "Form filled (no textual result)", "result": ""}
-            return {"success": True, "message": "Form filled successfully", "result": str(result)}
+                return {"success": True, "message": "Form filled (no textual result)", "result": "", "path": "agent"}
+            return {"success": True, "message": "Form filled successfully", "result": str(result), "path": "agent"}
         except Exception as e:
             msg = str(e)
             if "No result received from execution" in msg:
@@ -425,8 +1012,15 @@ class BrowserAgentHandler:
                 return {"success": True, "message": "Form filled (no textual result)", "result": ""}
             logger.error(f"❌ Error in one-shot fill: {e}", exc_info=True)
             return {"success": False, "error": str(e)}
+        finally:
+            if context is not None:
+                try:
+                    await context.close()
+                except Exception as e:
+                    logger.warning(f"⚠️ Error closing fill_form context: {e}")
 
     @traceable(name="execute_freeform")
+    @serialized
     async def execute_freeform(self, user_message: str, session_id: str = "default") -> dict:
         """Thực thi dạng freeform theo cấu trúc @sandbox chuẩn của browser-use.
 
@@ -435,11 +1029,27 @@ class BrowserAgentHandler:
         - Chain: navigate -> fill -> submit -> summarize
         """
         try:
-            loan_url = os.getenv("LOAN_FORM_URL", "https://vpbank-shared-form-fastdeploy.vercel.app/")
-            crm_url = os.getenv("CRM_FORM_URL", "https://case2-ten.vercel.app/")
-            hr_url = os.getenv("HR_FORM_URL", "https://case3-seven.vercel.app/")
-            compliance_url = os.getenv("COMPLIANCE_FORM_URL", "https://case4-beta.vercel.app/")
-            operations_url = os.getenv("OPERATIONS_FORM_URL", "https://case5-chi.vercel.app/")
+            form_urls = get_form_urls()
+            loan_url = form_urls["loan"]
+            crm_url = form_urls["crm"]
+            hr_url = form_urls["hr"]
+            compliance_url = form_urls["compliance"]
+            operations_url = form_urls["operations"]
+
+            # Known field layouts spare the agent a discovery pass on each form
+            known_schemas = ""
+            for form_type, url in form_urls.items():
+                schema = form_schema_cache.get(url)
+                if schema:
+                    known_schemas += f"\n[{form_type}] {url}\n{schema.describe()}\n"
+            schema_hint = (
+                f"Known form fields (use these HTML names directly, no need to inspect the page first):{known_schemas}"
+                if known_schemas else ""
+            )
+            keyword_mapping = "".join(
+                f"- {', '.join(repr(kw) for kw in keywords)} → {form_type}\n"
+                for form_type, keywords in FORM_TYPE_KEYWORDS.items()
+            )
 
             # Create a single comprehensive task to avoid session clearing between steps
             comprehensive_task = (
@@ -453,11 +1063,7 @@ class BrowserAgentHandler:
                 f"- compliance (Tuân thủ / AML / báo cáo / compliance): {compliance_url}\n"
                 f"- operations (Giao dịch / transaction / kiểm tra): {operations_url}\n\n"
                 "Keywords mapping:\n"
-                "- 'CRM', 'khách hàng', 'customer' → crm\n"
-                "- 'HR', 'nhân sự', 'nghỉ phép', 'đơn nghỉ' → hr\n"
-                "- 'vay', 'loan', 'KYC' → loan\n"
-                "- 'tuân thủ', 'AML', 'báo cáo' → compliance\n"
-                "- 'giao dịch', 'transaction', 'kiểm tra' → operations\n\n"
+                f"{keyword_mapping}\n"
                 "Select the form URL that matches the FIRST form keyword found in the USER INSTRUCTION, then NAVIGATE to it and wait until fully loaded.\n\n"
                 "STEP 2 - FILL FORM:\n"
                 "From the USER INSTRUCTION below, extract only the fields relevant to the current page and FILL THEM.\n"
@@ -474,7 +1080,8 @@ class BrowserAgentHandler:
                 "1) First try matching by <label> text (contains/equals ignoring accents and case).\n"
                 "2) Fallback to placeholder text contains Vietnamese label.\n"
                 "3) As last resort, match by input/select name/id containing normalized keywords (e.g., name, phone, email, dob, amount, term).\n"
-                "4) Verify each field after filling (value or selection reflects the intended value).\n\n"
+                "4) Verify each field after filling (value or selection reflects the intended value).\n"
+                f"{schema_hint}\n"
                 "STEP 3 - SUBMIT CHECK:\n"
                 "⚠️ CRITICAL RULE: ONLY click submit if the USER INSTRUCTION contains explicit keywords requesting submission.\n"
                 "Examples of explicit submit requests: 'submit', 'gửi', 'đăng ký', 'xác nhận', 'hoàn tất', 'nộp'.\n"
@@ -490,18 +1097,42 @@ class BrowserAgentHandler:
             llm_instance = self._get_llm()
             browser = await self._ensure_browser()
 
+            # Continue on the page a preempted run of this session left behind
+            resume = await self.preemption.take(session_id)
+            if resume:
+                logger.info(f"⏯️ Resuming session {session_id} on {resume.url} ({len(resume.fields)} fields already set)")
+                comprehensive_task = resume.hint() + comprehensive_task
+            context = resume.context if resume else BrowserContext(browser=browser)
+
             # Use a single agent with one comprehensive task
             agent = BrowserUseAgent(
                 task=comprehensive_task,
                 llm=llm_instance,
                 browser=browser,
+                browser_context=context,
             )
+            run = self.preemption.begin(session_id, agent, context, on_step=self._emit_agent_step)
+            keep_context = False
             
             try:
                 result = await agent.run(max_steps=40)
+                self._record_macro(agent.history)
                 if result is None or (isinstance(result, str) and not result.strip()):
                     return {"success": True, "message": "Executed (no textual result)", "result": ""}
                 return {"success": True, "message": "Executed freeform instruction", "result": str(result)}
+            except RunPreempted as e:
+                # Stopped between steps: park the page so the newer request picks up from here
+                url, fields = await observe_form(context)
+                await self.preemption.park(session_id, ResumePoint(context, url, fields, steps=run.steps))
+                keep_context = True
+                return {
+                    "success": False,
+                    "superseded": True,
+                    "error": "Superseded by a newer request",
+                    "reason": e.reason,
+                    "steps": run.steps,
+                    "observed_fields": fields,
+                }
             except Exception as e:
                 msg = str(e)
                 if "No result received from execution" in msg or "BrowserStateRequestEvent" in msg:
@@ -509,10 +1140,80 @@ class BrowserAgentHandler:
                     return {"success": True, "message": "Executed (no textual result)", "result": ""}
                 logger.error(f"❌ Error executing freeform: {e}", exc_info=True)
                 return {"success": False, "error": str(e)}
+            finally:
+                self.preemption.end(run)
+                if not keep_context:
+                    try:
+                        await context.close()
+                    except Exception as e:
+                        logger.warning(f"⚠️ Error closing freeform context: {e}")
+                # The agent may have touched any field; earlier state tokens are stale now
+                self._form_state(session_id).bump()
         except Exception as e:
             logger.error(f"❌ Outer error executing freeform: {e}", exc_info=True)
             return {"success": False, "error": str(e)}
 
+    @staticmethod
+    def _emit_agent_step(run) -> None:
+        """Stream what the agent's last step did to whoever follows the session."""
+        if not progress_hub.has_subscribers(run.session_id):
+            return
+        items = getattr(run.agent.history, "history", None)
+        if not isinstance(items, list) or not items:
+            return
+        previous_url = getattr(items[-2].state, "url", "") if len(items) > 1 else ""
+        for event in step_events(items[-1], run.steps, previous_url=previous_url):
+            emit_progress(run.session_id, **event)
+
+    def preempt_freeform(self, session_id: str = "default", reason: str = "superseded") -> dict:
+        """
+        Stop the session's in-flight freeform run at its next step boundary
+
+        Deliberately not serialized: it must reach the run it is preempting
+        instead of queueing behind it.
+        """
+        return {"success": True, "preempted": self.preemption.preempt(session_id, reason)}
+
+    async def prepare_form(self, form_type: str, session_id: str = "default") -> dict:
+        """
+        Open a form ahead of the session's next freeform run
+
+        Triggered by intents in partial transcripts while the user is still
+        speaking. The page is parked as a speculative resume point, so the
+        run started by the final transcript begins on it instead of
+        navigating. Not serialized, and a no-op while the session has a run
+        in flight or a page parked already.
+        """
+        form_url = get_form_urls().get(form_type)
+        if form_url is None:
+            return {"success": False, "error": f"Unknown form type: {form_type}"}
+        if self.preemption.is_busy(session_id):
+            return {"success": True, "prepared": False, "reason": "busy"}
+
+        context = None
+        try:
+            browser = await self._ensure_browser()
+            context = BrowserContext(browser=browser)
+            page = await context.get_current_page()
+            await page.goto(form_url, wait_until="domcontentloaded")
+        except Exception as e:
+            logger.warning(f"⚠️ Speculative {form_type} form for {session_id} failed: {e}")
+            if context is not None:
+                try:
+                    await context.close()
+                except Exception:
+                    pass
+            return {"success": False, "error": str(e)}
+
+        if self.preemption.is_busy(session_id):
+            # The real run started while the page was loading
+            await context.close()
+            return {"success": True, "prepared": False, "reason": "busy"}
+        await self.preemption.park(session_id, ResumePoint(context, form_url, speculative=True))
+        logger.info(f"🔮 Prepared {form_type} form for session {session_id}")
+        return {"success": True, "prepared": True, "form_type": form_type, "url": form_url}
+
+    @serialized
     async def upload_file_to_field(self, field_name: str, file_description: str, session_id: str = "default") -> dict:
         """Upload file to a specific field"""
         try:
@@ -530,7 +1231,7 @@ class BrowserAgentHandler:
             Return the filename that was uploaded.
             """
             
-            agent.add_new_task(task)
+            self._queue_task(session, task)
             await agent.run(max_steps=5)
             
             return {
@@ -543,6 +1244,7 @@ class BrowserAgentHandler:
             logger.error(f"❌ Error uploading file: {e}", exc_info=True)
             return {"success": False, "error": str(e)}
     
+    @serialized
     async def search_and_focus_field(self, search_query: str, session_id: str = "default") -> dict:
         """Search for fields on form and focus on first match"""
         try:
@@ -551,6 +1253,24 @@ class BrowserAgentHandler:
             
             session = self.sessions[session_id]
             agent = session["agent"]
+
+            found = await self._run_action(session, search_fields, search_query)
+            if found is not None:
+                names = [m["name"] for m in found.get("matches", [])]
+                # Vietnamese synonyms ("số điện thoại" -> phoneNumber) come from the schema
+                schema = session.get("schema")
+                preferred = schema.resolve_field(search_query) if schema else None
+                if preferred and preferred.key:
+                    names = [preferred.key] + [n for n in names if n != preferred.key]
+                if names:
+                    focused = await self._run_action(session, focus_field, names[0])
+                    return {
+                        "success": True,
+                        "fields_found": names,
+                        "focused_field": names[0] if focused and focused.get("found") else None,
+                        "path": "dom",
+                        "message": f"Found and focused field matching '{search_query}'"
+                    }
             
             task = f"""
             Search for form fields that match the query: "{search_query}"
@@ -561,20 +1281,23 @@ class BrowserAgentHandler:
             Return the list of fields found and which one was focused.
             """
             
-            agent.add_new_task(task)
-            await agent.run(max_steps=5)
+            self._queue_task(session, task)
+            result = await agent.run(max_steps=5)
             
-            # Mock response - in real implementation, parse agent output
+            # The agent only reports free text; field names are not known here
             return {
                 "success": True,
-                "fields_found": ["phoneNumber", "mobilePhone"],
-                "focused_field": "phoneNumber",
+                "fields_found": [],
+                "focused_field": None,
+                "path": "agent",
+                "result": str(result) if isinstance(result, str) else "",
                 "message": f"Found and focused field matching '{search_query}'"
             }
         except Exception as e:
             logger.error(f"❌ Error searching field: {e}", exc_info=True)
             return {"success": False, "error": str(e)}
     
+    @serialized
     async def save_form_draft(self, draft_name: str, session_id: str = "default") -> dict:
         """Save current form state as draft to DynamoDB"""
         try:
@@ -613,6 +1336,7 @@ class BrowserAgentHandler:
             logger.error(f"❌ Error saving draft: {e}", exc_info=True)
             return {"success": False, "error": str(e)}
     
+    @serialized
     async def load_form_draft(self, draft_name: str, session_id: str = "default") -> dict:
         """Load draft from DynamoDB and fill form"""
         try:
@@ -653,8 +1377,20 @@ class BrowserAgentHandler:
 
     async def _close_session(self, session_id: str):
         # Do not kill persistent browser; only forget agent memory for that session.
-        if session_id in self.sessions:
-            del self.sessions[session_id]
+        session = self.sessions.pop(session_id, None)
+        self.form_states.pop(session_id, None)
+        await self.preemption.discard(session_id)
+        pooled = session.get("pooled") if session else None
+        if pooled and self.page_pool:
+            await self.page_pool.release(pooled)
+        elif session:
+            # The session's own tab/context goes with it
+            context = getattr(session.get("agent"), "browser_context", None)
+            try:
+                if context is not None and asyncio.iscoroutinefunction(getattr(context, "close", None)):
+                    await context.close()
+            except Exception as e:
+                logger.warning(f"⚠️ Error closing context for session {session_id}: {e}")
 
 
 # Global instance (single)
@@ -0,0 +1,222 @@
+"""
+Browser Service Client
+Long-lived, pooled keep-alive HTTP client for voice bot -> browser service calls
+"""
+import json
+import os
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, List, Optional, Union
+
+import aiohttp
+from loguru import logger
+
+from src.monitoring.metrics import (
+    browser_client_connections_total,
+    browser_client_request_duration_seconds,
+)
+
+
+def browser_client_settings() -> Dict[str, Any]:
+    """Connection pool settings from environment."""
+    return {
+        "base_url": os.getenv("BROWSER_SERVICE_URL", "http://localhost:7863").rstrip("/"),
+        "unix_socket": os.getenv("BROWSER_SERVICE_UDS", ""),
+        "max_connections": int(os.getenv("BROWSER_CLIENT_MAX_CONNECTIONS", "32")),
+        "keepalive": float(os.getenv("BROWSER_CLIENT_KEEPALIVE", "30")),
+        "dns_ttl": int(os.getenv("BROWSER_CLIENT_DNS_TTL", "300")),
+        "connect_timeout": float(os.getenv("BROWSER_CLIENT_CONNECT_TIMEOUT", "10")),
+    }
+
+
+@dataclass
+class BrowserRequest:
+    """Body of /api/execute and /api/jobs: a full user_message or a message delta"""
+    session_id: str
+    request_id: str
+    user_message: Optional[str] = None
+    messages: Optional[List[Dict[str, Any]]] = None
+    base_seq: Optional[int] = None
+    reset: bool = False
+    instructions: List[str] = field(default_factory=list)
+
+    def set_context(self, context: Dict[str, Any]) -> None:
+        """Replace the delta fields (from ContextCursor.delta()/resync())."""
+        self.user_message = None
+        self.messages = context.get("messages", [])
+        self.base_seq = context.get("base_seq")
+        self.reset = bool(context.get("reset"))
+
+    def to_payload(self) -> Dict[str, Any]:
+        payload: Dict[str, Any] = {"session_id": self.session_id, "request_id": self.request_id}
+        if self.messages is not None:
+            payload["messages"] = self.messages
+            if self.base_seq is not None:
+                payload["base_seq"] = self.base_seq
+            if self.reset:
+                payload["reset"] = True
+            if self.instructions:
+                payload["instructions"] = self.instructions
+        else:
+            payload["user_message"] = self.user_message or ""
+        return payload
+
+
+@dataclass
+class BrowserResponse:
+    """Status plus parsed JSON body (or raw text when the body is not JSON)"""
+    status: int
+    data: Optional[Dict[str, Any]] = None
+    text: str = ""
+    headers: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def result(self) -> Union[Dict[str, Any], str]:
+        """(status, result) convention of the voice bot: JSON on 200/409, text otherwise."""
+        if self.status in (200, 409) and self.data is not None:
+            return self.data
+        return self.text
+
+    @property
+    def superseded(self) -> bool:
+        return self.status == 409 and bool(self.data and self.data.get("superseded"))
+
+    @property
+    def resync(self) -> bool:
+        return self.status == 409 and bool(self.data and self.data.get("resync"))
+
+    @property
+    def retry_after(self) -> float:
+        return float(self.headers.get("Retry-After", "2"))
+
+
+class BrowserServiceClient:
+    """
+    One aiohttp ClientSession per process, created on first use
+
+    The connector keeps connections alive between turns, caps concurrent
+    connections and caches DNS; with BROWSER_SERVICE_UDS set it talks to a
+    browser service on the same host over a Unix domain socket instead.
+
+    Example:
+        response = await browser_client.post_json("/api/jobs", request.to_payload())
+        if response.status == 202:
+            job_id = response.data["job_id"]
+    """
+
+    def __init__(self, base_url: Optional[str] = None, unix_socket: Optional[str] = None,
+                 max_connections: Optional[int] = None, keepalive: Optional[float] = None,
+                 dns_ttl: Optional[int] = None, connect_timeout: Optional[float] = None):
+        settings = browser_client_settings()
+        self.unix_socket = unix_socket if unix_socket is not None else settings["unix_socket"]
+        # Over a Unix socket the host part only fills the Host header
+        self.base_url = (base_url or settings["base_url"]).rstrip("/")
+        self.max_connections = max_connections or settings["max_connections"]
+        self.keepalive = keepalive if keepalive is not None else settings["keepalive"]
+        self.dns_ttl = dns_ttl if dns_ttl is not None else settings["dns_ttl"]
+        self.connect_timeout = connect_timeout if connect_timeout is not None else settings["connect_timeout"]
+        self._session: Optional[aiohttp.ClientSession] = None
+        self.stats = {"requests": 0, "connections_new": 0, "connections_reused": 0}
+
+    def _connector(self) -> aiohttp.BaseConnector:
+        if self.unix_socket:
+            return aiohttp.UnixConnector(
+                path=self.unix_socket,
+                limit=self.max_connections,
+                keepalive_timeout=self.keepalive
+            )
+        return aiohttp.TCPConnector(
+            limit=self.max_connections,
+            limit_per_host=self.max_connections,
+            keepalive_timeout=self.keepalive,
+            use_dns_cache=True,
+            ttl_dns_cache=self.dns_ttl
+        )
+
+    def _trace_config(self) -> aiohttp.TraceConfig:
+        trace = aiohttp.TraceConfig()
+
+        async def on_new(session, context, params):
+            self.stats["connections_new"] += 1
+            browser_client_connections_total.labels(kind="new").inc()
+
+        async def on_reuse(session, context, params):
+            self.stats["connections_reused"] += 1
+            browser_client_connections_total.labels(kind="reused").inc()
+
+        trace.on_connection_create_end.append(on_new)
+        trace.on_connection_reuseconn.append(on_reuse)
+        return trace
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=self._connector(),
+                # Per-request timeouts override this; only connecting is bounded by default
+                timeout=aiohttp.ClientTimeout(total=None, sock_connect=self.connect_timeout),
+                trace_configs=[self._trace_config()]
+            )
+            transport = f"unix:{self.unix_socket}" if self.unix_socket else self.base_url
+            logger.info(f"🔌 Browser Service client pool opened ({transport}, max {self.max_connections})")
+        return self._session
+
+    def url(self, path: str) -> str:
+        return f"{self.base_url}{path}"
+
+    @asynccontextmanager
+    async def request(self, method: str, path: str, endpoint: Optional[str] = None,
+                      **kwargs) -> AsyncIterator[aiohttp.ClientResponse]:
+        """
+        Raw pooled request, for streaming bodies (server-sent events)
+
+        Args:
+            method: HTTP method
+            path: Path on the browser service, e.g. "/api/jobs"
+            endpoint: Metrics label (defaults to path)
+            **kwargs: aiohttp request options (json, params, headers, timeout)
+        """
+        self.stats["requests"] += 1
+        start = time.monotonic()
+        async with self.session.request(method, self.url(path), **kwargs) as response:
+            browser_client_request_duration_seconds.labels(
+                endpoint=endpoint or path
+            ).observe(time.monotonic() - start)
+            yield response
+
+    async def call(self, method: str, path: str, endpoint: Optional[str] = None, **kwargs) -> BrowserResponse:
+        """Request and read the whole body into a BrowserResponse."""
+        async with self.request(method, path, endpoint=endpoint, **kwargs) as response:
+            text = await response.text()
+            data = None
+            if text and response.content_type == "application/json":
+                try:
+                    parsed = json.loads(text)
+                    data = parsed if isinstance(parsed, dict) else None
+                except ValueError:
+                    pass
+            return BrowserResponse(status=response.status, data=data, text=text, headers=dict(response.headers))
+
+    async def post_json(self, path: str, payload: Dict[str, Any], **kwargs) -> BrowserResponse:
+        return await self.call("POST", path, json=payload, **kwargs)
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+            logger.info(
+                f"🔌 Browser Service client pool closed "
+                f"({self.stats['connections_new']} connections, {self.stats['connections_reused']} reused)"
+            )
+        self._session = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "transport": "unix" if self.unix_socket else "tcp",
+            "max_connections": self.max_connections,
+        }
+
+
+# Global client used by the voice bot; closed on app cleanup
+browser_client = BrowserServiceClient()
@@ -2,11 +2,32 @@
 Dynamic VAD Configuration
 Automatically adjusts Voice Activity Detection parameters based on conversation context
 """
-from typing import Dict, Optional
+import os
+import time
+from typing import Any, Dict, Optional, Tuple
 from enum import Enum
 from pipecat.audio.vad.silero import VADParams
+from pipecat.frames.frames import (
+    Frame,
+    TranscriptionFrame,
+    UserStartedSpeakingFrame,
+    UserStoppedSpeakingFrame,
+    VADParamsUpdateFrame,
+)
+from pipecat.processors.frame_processor import FrameDirection, FrameProcessor
 from loguru import logger
 
+from src.monitoring.metrics import vad_end_of_turn_seconds, vad_params_updates_total
+
+
+def dynamic_vad_settings() -> Dict[str, Any]:
+    """Per-call VAD tuning switches from environment."""
+    return {
+        "enabled": os.getenv("DYNAMIC_VAD_ENABLED", "true").lower() == "true",
+        # Fixed end-of-turn silence when dynamic VAD is off
+        "stop_secs": float(os.getenv("VAD_STOP_SECS", "5.0")),
+    }
+
 
 class ConversationContext(Enum):
     """Different conversation contexts requiring different VAD parameters"""
@@ -55,10 +76,27 @@ class DynamicVADConfig:
         }
     }
 
+    # Digit slots the DIGIT_SEQUENCE context can be about (see detect_digit_slot)
+    DIGIT_SLOT_KEYWORDS: Dict[str, list] = {
+        "phone": ["số điện thoại", "điện thoại", "sdt"],
+        "national_id": ["căn cước", "cccd", "cmnd", "chứng minh"],
+    }
+
     def __init__(self):
         self.current_context = ConversationContext.DEFAULT
+        # Digit slot the next user turn is expected to fill ("phone", "national_id")
+        self.expected_slot: Optional[str] = None
         self._message_count = 0
 
+    @classmethod
+    def detect_digit_slot(cls, message: str) -> Optional[str]:
+        """Digit slot a message is about, or None."""
+        message_lower = (message or "").lower()
+        for slot, keywords in cls.DIGIT_SLOT_KEYWORDS.items():
+            if any(kw in message_lower for kw in keywords):
+                return slot
+        return None
+
     def detect_context(self, message: str, role: str = "user") -> ConversationContext:
         """
         Detect conversation context from message content
@@ -154,6 +192,9 @@ class DynamicVADConfig:
         if new_context != self.current_context:
             logger.info(f"📍 VAD Context changed: {self.current_context.value} → {new_context.value}")
             self.current_context = new_context
+        self.expected_slot = (
+            self.detect_digit_slot(message) if new_context == ConversationContext.DIGIT_SEQUENCE else None
+        )
 
         if role == "user":
             self._message_count += 1
@@ -161,9 +202,92 @@ class DynamicVADConfig:
     def reset(self):
         """Reset context to default (for new conversation)"""
         self.current_context = ConversationContext.DEFAULT
+        self.expected_slot = None
         self._message_count = 0
         logger.info("🔄 VAD context reset to default")
 
 
-# Global instance
-vad_config = DynamicVADConfig()
+class VADContextController(FrameProcessor):
+    """
+    Retunes one call's VAD between turns and measures its end-of-turn latency
+
+    Place it after the STT service. observe() feeds transcript messages of
+    both roles to the call's DynamicVADConfig; when the context's params
+    change they are pushed upstream as a VADParamsUpdateFrame, which the
+    transport input applies to its live analyzer. Updates wait until the
+    user stops speaking (applying params resets the analyzer's state).
+
+    End-of-turn latency runs from the estimated end of speech (the
+    UserStoppedSpeakingFrame minus the silence the VAD waited for) to the
+    final TranscriptionFrame, labelled with the context that was active.
+
+    With a turn analyzer (endpointer) on the transport, the VAD only marks
+    pauses: pushed params keep its pause_secs as stop_secs, the context's
+    stop_secs becomes the endpointer's silence limit, and the silence
+    waited is read from the endpointer.
+
+    Example:
+        vad = DynamicVADConfig()
+        controller = VADContextController(vad, vad.get_vad_params())
+        await controller.observe("Số điện thoại của bạn là gì?", role="assistant")
+    """
+
+    def __init__(self, config: DynamicVADConfig, params: VADParams, adaptive: bool = True,
+                 endpointer=None, **kwargs):
+        super().__init__(**kwargs)
+        self.config = config
+        self.adaptive = adaptive
+        self.endpointer = endpointer
+        self.params = params
+        self._pending: Optional[VADParams] = None
+        self._user_speaking = False
+        # (estimated end of speech, context) of the turn awaiting its transcript
+        self._turn: Optional[Tuple[float, str]] = None
+
+    @property
+    def context_label(self) -> str:
+        return self.config.current_context.value if self.adaptive else "static"
+
+    async def observe(self, message: str, role: str = "user") -> None:
+        """Update the context from a transcript message and retune the VAD for the next turn."""
+        if not self.adaptive or not message:
+            return
+        self.config.update_context(message, role)
+        params = self.config.get_vad_params()
+        if self.endpointer is not None:
+            params = params.model_copy(update={"stop_secs": self.endpointer.params.pause_secs})
+        if params == self.params:
+            self._pending = None
+            return
+        self._pending = params
+        if not self._user_speaking:
+            await self._apply_pending()
+
+    async def _apply_pending(self) -> None:
+        params, self._pending = self._pending, None
+        if params is None:
+            return
+        self.params = params
+        vad_params_updates_total.labels(context=self.context_label).inc()
+        logger.info(f"🎙️ VAD retuned for {self.context_label}: stop={params.stop_secs}s")
+        await self.push_frame(VADParamsUpdateFrame(params=params), FrameDirection.UPSTREAM)
+
+    async def process_frame(self, frame: Frame, direction: FrameDirection):
+        await super().process_frame(frame, direction)
+        stopped = isinstance(frame, UserStoppedSpeakingFrame) and not frame.emulated
+        if isinstance(frame, UserStartedSpeakingFrame) and not frame.emulated:
+            self._user_speaking = True
+        elif stopped:
+            self._user_speaking = False
+            # The stop is declared after stop_secs of silence (or what the endpointer waited)
+            waited = self.endpointer.last_silence_secs if self.endpointer is not None else self.params.stop_secs
+            self._turn = (time.monotonic() - waited, self.context_label)
+        elif isinstance(frame, TranscriptionFrame) and self._turn is not None:
+            spoke_until, context = self._turn
+            self._turn = None
+            vad_end_of_turn_seconds.labels(context=context).observe(time.monotonic() - spoke_until)
+
+        await self.push_frame(frame, direction)
+
+        if stopped and self._pending is not None:
+            await self._apply_pending()
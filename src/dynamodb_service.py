@@ -6,12 +6,18 @@ import os
 import boto3
 from datetime import datetime, timezone
 from typing import Optional, List, Dict, Any
+from boto3.dynamodb.conditions import Key
 from botocore.exceptions import ClientError
 from loguru import logger
 from dotenv import load_dotenv
 
 load_dotenv(override=True)
 
+# Transcript layouts: "items" = one item per message in the messages table, "list_append" = messages
+# appended to the session item (kept for tables without the messages table; bounded by 400 KB)
+MESSAGE_STORES = ("items", "list_append")
+SESSION_TTL_SECONDS = 90 * 24 * 60 * 60
+
 
 class DynamoDBService:
     """Service quản lý DynamoDB với credential riêng"""
@@ -37,20 +43,43 @@ class DynamoDBService:
         
         self.table_name = table_name
         self.table = self.dynamodb.Table(table_name)
+
+        # Transcript messages: own items (session_id + seq) so a write never rewrites the session
+        self.message_store = os.getenv("DYNAMODB_MESSAGE_STORE", "items").lower()
+        if self.message_store not in MESSAGE_STORES:
+            logger.warning(f"⚠️  Unknown DYNAMODB_MESSAGE_STORE '{self.message_store}', using 'items'")
+            self.message_store = "items"
+        self.messages_table_name = os.getenv("DYNAMODB_MESSAGES_TABLE_NAME", "vpbank-session-messages")
+        self.messages_table = self.dynamodb.Table(self.messages_table_name)
         
         # Kiểm tra table tồn tại
-        try:
-            self.table.load()
-            logger.info(f"✅ DynamoDB table '{table_name}' ready")
-        except ClientError as e:
-            if e.response['Error']['Code'] == 'ResourceNotFoundException':
-                logger.error(f"❌ DynamoDB table '{table_name}' not found. Please create it first.")
-            else:
-                logger.error(f"❌ DynamoDB error: {e}")
+        tables = [self.table] + ([self.messages_table] if self.message_store == "items" else [])
+        for table in tables:
+            try:
+                table.load()
+                logger.info(f"✅ DynamoDB table '{table.name}' ready")
+            except ClientError as e:
+                if e.response['Error']['Code'] == 'ResourceNotFoundException':
+                    logger.error(f"❌ DynamoDB table '{table.name}' not found. Please create it first.")
+                else:
+                    logger.error(f"❌ DynamoDB error: {e}")
+
+    @staticmethod
+    def _ttl() -> int:
+        """TTL: 90 days từ bây giờ"""
+        return int(datetime.now(timezone.utc).timestamp()) + SESSION_TTL_SECONDS
+
+    def _message_item(self, session_id: str, seq: int, message: Dict[str, Any]) -> Dict[str, Any]:
+        return {**message, "session_id": session_id, "seq": seq, "ttl": self._ttl()}
     
     def save_session(self, session_data: Dict[str, Any]) -> bool:
         """
         Lưu hoặc cập nhật session vào DynamoDB
+
+        With the "items" message store the session item is a header
+        (message_count instead of messages) and the given messages are
+        written as their own items. New messages of a running session go
+        through append_message(), not through this.
         
         Args:
             session_data: Dict chứa session_id, started_at, messages, etc.
@@ -65,23 +94,31 @@ class DynamoDBService:
                 return False
             
             # Chuẩn bị item cho DynamoDB
+            messages = session_data.get("messages", [])
             item = {
                 "session_id": session_id,
                 "started_at": session_data.get("started_at", datetime.now(timezone.utc).isoformat()),
-                "messages": session_data.get("messages", []),
                 "workflow_executions": session_data.get("workflow_executions", []),
                 "created_at": int(datetime.now(timezone.utc).timestamp()),
+                "message_store": self.message_store,
+                "message_count": len(messages),
             }
+            if self.message_store == "list_append":
+                item["messages"] = messages
             
             # Thêm ended_at nếu có
             if "ended_at" in session_data:
                 item["ended_at"] = session_data["ended_at"]
             
             # TTL: 90 days từ khi tạo
-            item["ttl"] = int((datetime.now(timezone.utc).timestamp()) + (90 * 24 * 60 * 60))
+            item["ttl"] = self._ttl()
             
             # Put item (upsert)
             self.table.put_item(Item=item)
+            if self.message_store == "items" and messages:
+                with self.messages_table.batch_writer(overwrite_by_pkeys=["session_id", "seq"]) as batch:
+                    for seq, message in enumerate(messages, start=1):
+                        batch.put_item(Item=self._message_item(session_id, seq, message))
             logger.debug(f"💾 Saved session {session_id} to DynamoDB")
             return True
             
@@ -92,12 +129,101 @@ class DynamoDBService:
             logger.error(f"❌ Unexpected error saving session: {e}", exc_info=True)
             return False
     
-    def get_session(self, session_id: str) -> Optional[Dict[str, Any]]:
+    def append_message(self, session_id: str, seq: int, message: Dict[str, Any]) -> bool:
+        """
+        Ghi một message mới của session (constant cost per message)
+
+        "items": the message is its own item and the header's message_count
+        is set to seq; "list_append": the message is appended to the
+        session item's list. Writing the same seq again overwrites it, so
+        retries are safe with the "items" store.
+
+        Args:
+            session_id: Session ID
+            seq: 1-based position of the message in the transcript
+            message: Dict chứa role, content, timestamp
+
+        Returns:
+            bool: True nếu thành công
+        """
+        try:
+            now = datetime.now(timezone.utc).isoformat()
+            if self.message_store == "items":
+                self.messages_table.put_item(Item=self._message_item(session_id, seq, message))
+                self.table.update_item(
+                    Key={"session_id": session_id},
+                    UpdateExpression="SET message_count = :count, updated_at = :now",
+                    ExpressionAttributeValues={":count": seq, ":now": now}
+                )
+            else:
+                self.table.update_item(
+                    Key={"session_id": session_id},
+                    UpdateExpression=(
+                        "SET messages = list_append(if_not_exists(messages, :empty), :message), "
+                        "message_count = :count, updated_at = :now"
+                    ),
+                    ExpressionAttributeValues={":empty": [], ":message": [message], ":count": seq, ":now": now}
+                )
+            logger.debug(f"💾 Appended message {seq} to session {session_id}")
+            return True
+
+        except ClientError as e:
+            logger.error(f"❌ Failed to append message to DynamoDB: {e}")
+            return False
+        except Exception as e:
+            logger.error(f"❌ Unexpected error appending message: {e}", exc_info=True)
+            return False
+
+    def get_messages(self, session_id: str, limit: int = 100, after_seq: int = 0) -> Dict[str, Any]:
+        """
+        Lấy một trang messages của session, theo thứ tự seq
+
+        Args:
+            session_id: Session ID
+            limit: Số messages tối đa của trang
+            after_seq: Trả về messages có seq > after_seq (next_seq của trang trước)
+
+        Returns:
+            Dict chứa items, count và next_seq (None ở trang cuối)
+        """
+        try:
+            if self.message_store == "items":
+                response = self.messages_table.query(
+                    KeyConditionExpression=Key("session_id").eq(session_id) & Key("seq").gt(after_seq),
+                    Limit=limit
+                )
+                items = [
+                    {k: v for k, v in item.items() if k not in ("session_id", "ttl")}
+                    for item in response.get("Items", [])
+                ]
+                if items:
+                    next_seq = int(items[-1]["seq"]) if items and response.get("LastEvaluatedKey") else None
+                    return {"items": items, "count": len(items), "next_seq": next_seq}
+
+            # Messages kept in the session item (list_append store, or written before the messages table)
+            response = self.table.get_item(Key={"session_id": session_id})
+            messages = response.get("Item", {}).get("messages", [])
+            page = [
+                {**message, "seq": seq}
+                for seq, message in enumerate(messages[after_seq:after_seq + limit], start=after_seq + 1)
+            ]
+            next_seq = after_seq + len(page) if after_seq + len(page) < len(messages) else None
+            return {"items": page, "count": len(page), "next_seq": next_seq}
+
+        except ClientError as e:
+            logger.error(f"❌ Failed to get messages from DynamoDB: {e}")
+            return {"items": [], "count": 0, "next_seq": None}
+        except Exception as e:
+            logger.error(f"❌ Unexpected error getting messages: {e}", exc_info=True)
+            return {"items": [], "count": 0, "next_seq": None}
+
+    def get_session(self, session_id: str, page_size: int = 500) -> Optional[Dict[str, Any]]:
         """
-        Lấy session theo session_id
+        Lấy session theo session_id (header + all messages, read page by page)
         
         Args:
             session_id: Session ID cần lấy
+            page_size: Messages per Query page
             
         Returns:
             Dict session data hoặc None nếu không tìm thấy
@@ -109,6 +235,15 @@ class DynamoDBService:
             
             if "Item" in response:
                 item = response["Item"]
+                if "messages" not in item:
+                    messages, after_seq = [], 0
+                    while True:
+                        page = self.get_messages(session_id, limit=page_size, after_seq=after_seq)
+                        messages.extend(page["items"])
+                        if page["next_seq"] is None:
+                            break
+                        after_seq = page["next_seq"]
+                    item["messages"] = messages
                 logger.debug(f"📖 Retrieved session {session_id} from DynamoDB")
                 return item
             else:
@@ -92,6 +92,70 @@ voice_message_processing_duration_seconds = Histogram(
     buckets=(.1, .25, .5, 1.0, 2.5, 5.0, 10.0, float("inf"))
 )
 
+vad_end_of_turn_seconds = Histogram(
+    'vpbank_voice_agent_vad_end_of_turn_seconds',
+    'End of user speech to final transcript (VAD silence wait plus STT), by conversation context',
+    ['context'],
+    buckets=(.5, 1.0, 1.5, 2.0, 2.5, 3.0, 4.0, 5.0, 7.5, float("inf"))
+)
+
+vad_params_updates_total = Counter(
+    'vpbank_voice_agent_vad_params_updates_total',
+    'VAD parameter changes applied to a live call, by the context switched to',
+    ['context']
+)
+
+endpointing_decisions_total = Counter(
+    'vpbank_voice_agent_endpointing_decisions_total',
+    'User turns ended by the endpointer, by reason',
+    ['reason']  # reason: content (slot/cue complete), extended (partial digits), silence
+)
+
+vad_batch_size = Histogram(
+    'vpbank_voice_agent_vad_batch_size',
+    'VAD windows (from all calls) scored together in one shared Silero run',
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128)
+)
+
+vad_inference_seconds = Histogram(
+    'vpbank_voice_agent_vad_inference_seconds',
+    'Duration of one shared Silero VAD batch run',
+    buckets=(.0005, .001, .002, .005, .01, .02, .05, .1, float("inf"))
+)
+
+admission_decisions_total = Counter(
+    'vpbank_voice_agent_admission_decisions_total',
+    'WebRTC offers accepted or rejected by admission control',
+    ['decision', 'reason']  # accepted: accepted/queued; rejected: loop_lag/inference_queue/queue_full/wait_too_long/timeout
+)
+
+admission_active_sessions = Gauge(
+    'vpbank_voice_agent_admission_active_sessions',
+    'Calls holding a session slot on this node'
+)
+
+admission_queue_length = Gauge(
+    'vpbank_voice_agent_admission_queue_length',
+    'Offers waiting for a session slot'
+)
+
+admission_wait_seconds = Histogram(
+    'vpbank_voice_agent_admission_wait_seconds',
+    'Time an accepted offer waited for a session slot',
+    buckets=(0, .5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, float("inf"))
+)
+
+admission_limits = Gauge(
+    'vpbank_voice_agent_admission_limit',
+    'Configured admission limits of this node',
+    ['limit']
+)
+
+event_loop_lag_seconds = Gauge(
+    'vpbank_voice_agent_event_loop_lag_seconds',
+    'Recent event loop scheduling delay of the voice bot process'
+)
+
 webrtc_connections_active = Gauge(
     'vpbank_voice_agent_webrtc_connections_active',
     'Active WebRTC connections'
@@ -102,6 +166,18 @@ websocket_connections_active = Gauge(
     'Active WebSocket connections'
 )
 
+websocket_messages_dropped_total = Counter(
+    'vpbank_voice_agent_websocket_messages_dropped_total',
+    'WebSocket messages not delivered to slow clients or other workers',
+    ['reason']  # queue_full, client_closed, relay_full
+)
+
+websocket_clients_closed_total = Counter(
+    'vpbank_voice_agent_websocket_clients_closed_total',
+    'WebSocket clients disconnected by the server',
+    ['reason']  # slow, timeout, error
+)
+
 
 # ==================== Browser Automation Metrics ====================
 
@@ -143,6 +219,68 @@ browser_form_submissions_total = Counter(
     ['form_type', 'status']  # status: success/failed
 )
 
+browser_shard_sessions = Gauge(
+    'vpbank_voice_agent_browser_shard_sessions',
+    'Sessions pinned to each browser worker process',
+    ['shard']
+)
+
+browser_shard_inflight = Gauge(
+    'vpbank_voice_agent_browser_shard_inflight',
+    'In-flight calls per browser worker process',
+    ['shard']
+)
+
+browser_fill_requests_coalesced_total = Counter(
+    'vpbank_voice_agent_browser_fill_requests_coalesced_total',
+    'Fill requests merged into an already queued fill batch of the same session'
+)
+
+browser_runs_preempted_total = Counter(
+    'vpbank_voice_agent_browser_runs_preempted_total',
+    'Agent runs stopped because a newer request for the same session arrived'
+)
+
+browser_runs_resumed_total = Counter(
+    'vpbank_voice_agent_browser_runs_resumed_total',
+    'Agent runs that continued from the page left by a preempted run'
+)
+
+browser_job_queue_depth = Gauge(
+    'vpbank_voice_agent_browser_job_queue_depth',
+    'Workflow jobs waiting for a browser worker'
+)
+
+browser_jobs_running = Gauge(
+    'vpbank_voice_agent_browser_jobs_running',
+    'Workflow jobs currently executing'
+)
+
+browser_jobs_total = Counter(
+    'vpbank_voice_agent_browser_jobs_total',
+    'Workflow jobs by final status',
+    ['status']  # status: succeeded/failed/cancelled/rejected
+)
+
+browser_job_wait_seconds = Histogram(
+    'vpbank_voice_agent_browser_job_wait_seconds',
+    'Time workflow jobs spend queued before a worker picks them up',
+    buckets=(.1, .5, 1.0, 5.0, 10.0, 30.0, 60.0, 120.0, float("inf"))
+)
+
+
+browser_client_connections_total = Counter(
+    'vpbank_voice_agent_browser_client_connections_total',
+    'Voice bot connections to the Browser Service by kind',
+    ['kind']  # kind: new/reused
+)
+
+browser_client_request_duration_seconds = Histogram(
+    'vpbank_voice_agent_browser_client_request_duration_seconds',
+    'Voice bot request duration to the Browser Service (until response headers)',
+    ['endpoint'],
+    buckets=(.005, .01, .05, .1, .5, 1.0, 5.0, 30.0, float("inf"))
+)
 
 # ==================== AI/LLM Metrics ====================
 
@@ -205,6 +343,44 @@ stt_audio_duration_seconds = Summary(
     ['provider']
 )
 
+stt_queue_depth = Gauge(
+    'vpbank_voice_agent_stt_queue_depth',
+    'Speech segments waiting for a shared STT inference worker',
+    ['model']
+)
+
+stt_batch_size = Histogram(
+    'vpbank_voice_agent_stt_batch_size',
+    'Speech segments transcribed together in one inference batch',
+    ['model'],
+    buckets=(1, 2, 3, 4, 6, 8, 12, 16)
+)
+
+stt_model_load_seconds = Gauge(
+    'vpbank_voice_agent_stt_model_load_seconds',
+    'Time the shared STT model took to load',
+    ['model']
+)
+
+cpu_engine_threads = Gauge(
+    'vpbank_voice_agent_cpu_engine_threads',
+    'CPU threads of the thread budget given to an inference engine',
+    ['engine']  # engine: stt, vad
+)
+
+cpu_engine_slots_in_use = Gauge(
+    'vpbank_voice_agent_cpu_engine_slots_in_use',
+    'Inference jobs currently holding one of an engine\'s CPU slots',
+    ['engine']
+)
+
+cpu_engine_queue_wait_seconds = Histogram(
+    'vpbank_voice_agent_cpu_engine_queue_wait_seconds',
+    'Time an inference job waited for a CPU slot of its engine',
+    ['engine', 'priority'],  # priority: live, background
+    buckets=(.001, .005, .01, .025, .05, .1, .25, .5, 1.0, 2.5, float("inf"))
+)
+
 tts_requests_total = Counter(
     'vpbank_voice_agent_tts_requests_total',
     'Total text-to-speech requests',
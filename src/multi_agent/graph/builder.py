@@ -89,18 +89,11 @@ async def go_to_next_step() -> str:
     if _current_session_id not in browser_agent.sessions:
         return "❌ Không có active session. Hãy start_incremental_form trước."
 
-    session = browser_agent.sessions[_current_session_id]
-    agent = session["agent"]
-
-    task = (
-        "Click nút có text 'Tiếp tục' ở cuối trang để chuyển sang bước tiếp theo. "
-        "Sau khi click, chờ trang tải xong (đợi tiêu đề phần kế tiếp xuất hiện), "
-        "tuyệt đối không đóng trình duyệt."
-    )
-
-    agent.add_new_task(task)
-    await agent.run(max_steps=8)
-
+    result = await browser_agent.go_to_next_step(_current_session_id)
+    if not result.get("success"):
+        return f"❌ Không thể chuyển bước: {result.get('error')}"
+    if result.get("title"):
+        return f"✅ Đã chuyển sang bước {result.get('step')}: {result['title']}"
     return "✅ Đã chuyển sang bước tiếp theo"
 
 
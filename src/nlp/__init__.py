@@ -1,6 +1,6 @@
 """NLP helpers for voice intent detection."""
 
-from .intent_detection import detect_intents
+from .intent_detection import FORM_TYPE_KEYWORDS, detect_form_type, detect_intents
 from .instruction_parser import extract_structured_instructions
 
-__all__ = ["detect_intents", "extract_structured_instructions"]
+__all__ = ["FORM_TYPE_KEYWORDS", "detect_form_type", "detect_intents", "extract_structured_instructions"]
@@ -1,6 +1,7 @@
 """Utility functions to detect structured intents from user voice commands."""
 from __future__ import annotations
 
+import re
 from typing import Dict, List
 
 
@@ -85,6 +86,49 @@ SECTION_SYNONYMS: Dict[str, List[str]] = {
     "employment": ["công việc", "employment"],
 }
 
+# Keywords naming each form. The browser agent's navigation prompt and the
+# service's form detection are both built from this mapping.
+FORM_TYPE_KEYWORDS: Dict[str, List[str]] = {
+    "crm": ["crm", "khách hàng", "customer"],
+    "hr": ["hr", "nhân sự", "nghỉ phép", "đơn nghỉ", "leave request"],
+    "loan": ["vay", "loan", "kyc"],
+    "compliance": ["tuân thủ", "aml", "báo cáo", "compliance"],
+    "operations": ["giao dịch", "transaction", "kiểm tra", "operations"],
+}
+
+# Words that come up in almost any banking conversation. They still pick a
+# form for a full instruction, but are too weak to open one speculatively.
+GENERIC_FORM_KEYWORDS = {"khách hàng", "customer", "báo cáo", "giao dịch", "kiểm tra"}
+
+
+def detect_form_type(message: str, speculative: bool = False) -> str | None:
+    """Form type named in the message, or None.
+
+    Cheap enough to run on every partial transcript. Like the browser
+    agent, the first form mentioned wins when several are. With
+    ``speculative`` only keywords specific to one form count, so a
+    passing "khách hàng" does not open the CRM form.
+    """
+
+    if not message:
+        return None
+
+    msg = message.lower()
+    positions = []
+    for form_type, keywords in FORM_TYPE_KEYWORDS.items():
+        if speculative:
+            keywords = [kw for kw in keywords if kw not in GENERIC_FORM_KEYWORDS]
+        found = [pos for pos in (_keyword_position(msg, kw) for kw in keywords) if pos >= 0]
+        if found:
+            positions.append((min(found), form_type))
+    return min(positions)[1] if positions else None
+
+
+def _keyword_position(msg: str, keyword: str) -> int:
+    # Short keywords ("hr", "vay") must be whole words, not parts of others
+    match = re.search(rf"(?<!\w){re.escape(keyword)}(?!\w)", msg)
+    return match.start() if match else -1
+
 
 def detect_intents(message: str) -> List[str]:
     """Return extra instructions for the browser agent based on user message.
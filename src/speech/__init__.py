@@ -0,0 +1,63 @@
+"""
+Speech processing for the voice bot
+Shared STT models, VAD and inference pools used by every WebRTC session
+"""
+from src.speech.backends import (
+    STT_BACKENDS,
+    OnnxWhisperBackend,
+    WhisperBackend,
+    make_backend,
+    resolve_compute_type,
+)
+from src.speech.cpu_budget import (
+    BACKGROUND,
+    LIVE,
+    CpuBudget,
+    EngineBudget,
+    cpu_budget,
+    cpu_budget_settings,
+)
+from src.speech.stt_pool import (
+    SttCascade,
+    SttInferencePool,
+    SttModelRegistry,
+    stt_registry,
+    stt_settings,
+)
+from src.speech.vad_pool import (
+    SharedSileroVAD,
+    SharedSileroVADAnalyzer,
+    shared_vad,
+    shared_vad_settings,
+)
+from src.speech.benchmark import (
+    benchmark_pool,
+    load_corpus,
+    word_error_rate,
+)
+
+__all__ = [
+    "STT_BACKENDS",
+    "OnnxWhisperBackend",
+    "WhisperBackend",
+    "make_backend",
+    "resolve_compute_type",
+    "BACKGROUND",
+    "LIVE",
+    "CpuBudget",
+    "EngineBudget",
+    "cpu_budget",
+    "cpu_budget_settings",
+    "SttCascade",
+    "SttInferencePool",
+    "SttModelRegistry",
+    "stt_registry",
+    "stt_settings",
+    "SharedSileroVAD",
+    "SharedSileroVADAnalyzer",
+    "shared_vad",
+    "shared_vad_settings",
+    "benchmark_pool",
+    "load_corpus",
+    "word_error_rate",
+]
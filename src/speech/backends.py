@@ -0,0 +1,182 @@
+"""
+STT Inference Backends
+Selectable Whisper runtimes (CTranslate2 via faster-whisper, ONNX Runtime) with CPU int8 defaults
+"""
+import bisect
+import os
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+from loguru import logger
+
+SAMPLE_RATE = 16000
+# Whisper decodes at most 30 s per window; longer segments are not batched
+MAX_BATCH_SAMPLES = 30 * SAMPLE_RATE
+
+
+def _cuda_available() -> bool:
+    try:
+        import ctranslate2
+        return ctranslate2.get_cuda_device_count() > 0
+    except Exception:
+        return False
+
+
+def resolve_device(device: str) -> str:
+    """'auto' -> 'cuda' when a GPU is visible, else 'cpu'."""
+    if device == "auto":
+        return "cuda" if _cuda_available() else "cpu"
+    return device
+
+
+def resolve_compute_type(device: str, compute_type: str) -> str:
+    """'auto'/'default' -> int8 on CPU nodes, float16 on GPU; explicit types pass through."""
+    if compute_type in ("auto", "default"):
+        return "float16" if resolve_device(device) == "cuda" else "int8"
+    return compute_type
+
+
+class WhisperBackend:
+    """
+    faster-whisper (CTranslate2) model loaded once and shared by every session
+
+    The model must be in CTranslate2 format, e.g. converted with
+    `ct2-transformers-converter --model vinai/PhoWhisper-medium
+    --output_dir models/phowhisper-medium-ct2 --quantization int8`.
+
+    transcribe_batch() runs in a pool thread. Several segments are decoded
+    in one batched generate call through BatchedInferencePipeline (each
+    segment becomes one clip of a concatenated buffer); otherwise, or if
+    that fails, they are decoded one after another.
+    """
+
+    name = "ctranslate2"
+
+    def __init__(self, model: str, device: str = "auto", compute_type: str = "default",
+                 workers: int = 1, cpu_threads: int = 0):
+        self.model_name = model
+        self.device = resolve_device(device)
+        self.compute_type = resolve_compute_type(device, compute_type)
+        self.workers = workers
+        self.cpu_threads = cpu_threads
+        self._model = None
+        self._batched = None
+
+    def load(self) -> None:
+        from faster_whisper import WhisperModel
+
+        # num_workers lets the pool threads run generate() in parallel on one copy of the weights
+        self._model = WhisperModel(
+            self.model_name, device=self.device, compute_type=self.compute_type,
+            num_workers=self.workers, cpu_threads=self.cpu_threads
+        )
+        try:
+            from faster_whisper import BatchedInferencePipeline
+            self._batched = BatchedInferencePipeline(model=self._model)
+        except ImportError:
+            self._batched = None
+
+    def transcribe_batch(self, audios: List[np.ndarray], language: Optional[str]) -> List[List[Any]]:
+        if len(audios) > 1 and self._batched is not None and all(len(a) <= MAX_BATCH_SAMPLES for a in audios):
+            try:
+                return self._transcribe_batched(audios, language)
+            except Exception as e:
+                logger.warning(f"⚠️ Batched STT failed, decoding segments one by one: {e}")
+        # Segments are a lazy generator: consume it here, in the pool thread
+        return [list(self._model.transcribe(audio, language=language)[0]) for audio in audios]
+
+    def _transcribe_batched(self, audios: List[np.ndarray], language: Optional[str]) -> List[List[Any]]:
+        starts, clips, offset = [], [], 0
+        for audio in audios:
+            starts.append(offset / SAMPLE_RATE)
+            clips.append({"start": offset, "end": offset + len(audio)})
+            offset += len(audio)
+        segments, _ = self._batched.transcribe(
+            np.concatenate(audios), language=language, vad_filter=False,
+            clip_timestamps=clips, batch_size=len(audios)
+        )
+        results: List[List[Any]] = [[] for _ in audios]
+        for segment in segments:
+            results[max(0, bisect.bisect_right(starts, segment.start + 1e-3) - 1)].append(segment)
+        return results
+
+
+class OnnxWhisperBackend:
+    """
+    Whisper exported to ONNX and run by ONNX Runtime
+
+    The model directory is an optimum export, optionally int8-quantized:
+    `optimum-cli export onnx --model vinai/PhoWhisper-medium models/phowhisper-medium-onnx`
+    followed by `optimum-cli onnxruntime quantize --avx512 -o models/phowhisper-medium-onnx-int8`.
+    A batch is decoded in one generate() call.
+    """
+
+    name = "onnx"
+
+    def __init__(self, model: str, device: str = "auto", compute_type: str = "default",
+                 workers: int = 1, cpu_threads: int = 0):
+        self.model_name = model
+        self.device = resolve_device(device)
+        # Precision is baked into the exported/quantized graph
+        self.compute_type = compute_type
+        self.workers = workers
+        self.cpu_threads = cpu_threads
+        self._model = None
+        self._processor = None
+
+    def load(self) -> None:
+        import onnxruntime
+        from optimum.onnxruntime import ORTModelForSpeechSeq2Seq
+        from transformers import WhisperProcessor
+
+        options = onnxruntime.SessionOptions()
+        if self.cpu_threads:
+            options.intra_op_num_threads = self.cpu_threads
+        provider = "CUDAExecutionProvider" if self.device == "cuda" else "CPUExecutionProvider"
+        self._processor = WhisperProcessor.from_pretrained(self.model_name)
+        self._model = ORTModelForSpeechSeq2Seq.from_pretrained(
+            self.model_name, provider=provider, session_options=options
+        )
+
+    def transcribe_batch(self, audios: List[np.ndarray], language: Optional[str]) -> List[List[Any]]:
+        features = self._processor(
+            list(audios), sampling_rate=SAMPLE_RATE, return_tensors="pt"
+        ).input_features
+        generate_kwargs = {"task": "transcribe"}
+        if language:
+            generate_kwargs["language"] = language
+        token_ids = self._model.generate(features, **generate_kwargs)
+        texts = self._processor.batch_decode(token_ids, skip_special_tokens=True)
+        return [
+            [SimpleNamespace(text=text.strip(), start=0.0, end=len(audio) / SAMPLE_RATE, no_speech_prob=0.0)]
+            for text, audio in zip(texts, audios)
+        ]
+
+
+STT_BACKENDS: Dict[str, Callable[..., Any]] = {
+    "ctranslate2": WhisperBackend,
+    "faster-whisper": WhisperBackend,
+    "onnx": OnnxWhisperBackend,
+}
+
+
+def make_backend(model: str, device: str = "auto", compute_type: str = "default",
+                 workers: int = 1, backend: str = "ctranslate2", cpu_threads: Optional[int] = None):
+    """
+    Build an (unloaded) backend by name
+
+    Args:
+        model: Model id or local model directory
+        device: "cpu", "cuda" or "auto"
+        compute_type: CTranslate2 compute type ("int8", "int8_float16", ...); auto -> int8 on CPU
+        workers: Concurrent decode calls the model should allow
+        backend: Key of STT_BACKENDS
+        cpu_threads: Threads per decode call (0 = runtime default)
+    """
+    if backend not in STT_BACKENDS:
+        raise ValueError(f"Unknown STT backend '{backend}' (choose from {', '.join(STT_BACKENDS)})")
+    if cpu_threads is None:
+        cpu_threads = int(os.getenv("STT_CPU_THREADS", "0"))
+    return STT_BACKENDS[backend](model, device=device, compute_type=compute_type,
+                                 workers=workers, cpu_threads=cpu_threads)
@@ -0,0 +1,144 @@
+"""
+STT Benchmark
+Real-time factor, latency percentiles and WER of an STT pool over a local audio corpus
+"""
+import asyncio
+import json
+import re
+import time
+import unicodedata
+import wave
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from src.speech.backends import SAMPLE_RATE
+
+_PUNCTUATION = re.compile(r"[^\w\s]", re.UNICODE)
+
+
+def normalize_transcript(text: str) -> List[str]:
+    """Lower-cased NFC words without punctuation (Vietnamese diacritics kept)."""
+    text = unicodedata.normalize("NFC", text or "").lower()
+    return _PUNCTUATION.sub(" ", text).split()
+
+
+def word_errors(reference: str, hypothesis: str) -> int:
+    """Word-level edit distance (substitutions + deletions + insertions)."""
+    ref, hyp = normalize_transcript(reference), normalize_transcript(hypothesis)
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        current = [i] + [0] * len(hyp)
+        for j, hyp_word in enumerate(hyp, 1):
+            current[j] = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ref_word != hyp_word),
+            )
+        previous = current
+    return previous[-1]
+
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    words = len(normalize_transcript(reference))
+    errors = word_errors(reference, hypothesis)
+    return errors / words if words else float(errors > 0)
+
+
+def read_wav(path: Path) -> np.ndarray:
+    """16-bit PCM WAV -> float32 mono at 16 kHz."""
+    with wave.open(str(path), "rb") as wav:
+        if wav.getsampwidth() != 2:
+            raise ValueError(f"{path}: only 16-bit PCM WAV is supported")
+        rate, channels = wav.getframerate(), wav.getnchannels()
+        samples = np.frombuffer(wav.readframes(wav.getnframes()), dtype=np.int16).astype(np.float32) / 32768.0
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1)
+    if rate != SAMPLE_RATE and len(samples):
+        target = int(len(samples) * SAMPLE_RATE / rate)
+        samples = np.interp(np.linspace(0, len(samples) - 1, target), np.arange(len(samples)), samples)
+    return samples.astype(np.float32)
+
+
+def load_corpus(directory: str) -> List[Dict[str, Any]]:
+    """
+    Load an audio corpus
+
+    Either a manifest.jsonl with {"audio": "relative.wav", "text": "reference"}
+    lines, or *.wav files each next to a same-named .txt reference.
+
+    Returns:
+        list of {"name", "audio" (float32 16 kHz), "text"}
+    """
+    root = Path(directory)
+    manifest = root / "manifest.jsonl"
+    entries = []
+    if manifest.exists():
+        for line in manifest.read_text(encoding="utf-8").splitlines():
+            if line.strip():
+                item = json.loads(line)
+                entries.append((root / item["audio"], item.get("text", "")))
+    else:
+        for wav_path in sorted(root.glob("*.wav")):
+            reference = wav_path.with_suffix(".txt")
+            entries.append((wav_path, reference.read_text(encoding="utf-8").strip() if reference.exists() else ""))
+    return [{"name": path.name, "audio": read_wav(path), "text": text} for path, text in entries]
+
+
+def _percentile(values: List[float], q: float) -> float:
+    return float(np.percentile(values, q)) if values else 0.0
+
+
+async def benchmark_pool(pool, corpus: List[Dict[str, Any]], language: Optional[str] = "vi",
+                         concurrency: int = 1, label: str = "") -> Dict[str, Any]:
+    """
+    Transcribe the corpus through an SttInferencePool and score it
+
+    Args:
+        pool: SttInferencePool (loaded here if needed; load time is reported separately)
+        corpus: load_corpus() output
+        language: Whisper language code
+        concurrency: Utterances in flight at once (simulated concurrent calls)
+        label: Name of this configuration in the report
+
+    Returns:
+        dict with rtf (processing / audio seconds per utterance), throughput
+        (audio seconds per wall second), latency p50/p95/max, corpus WER
+    """
+    await pool.ensure_loaded()
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    latencies: List[float] = []
+    hypotheses: List[str] = [""] * len(corpus)
+
+    async def run(index: int, item: Dict[str, Any]) -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            segments = await pool.transcribe(item["audio"], language)
+            latencies.append(time.perf_counter() - start)
+            hypotheses[index] = " ".join(segment.text.strip() for segment in segments)
+
+    wall_start = time.perf_counter()
+    await asyncio.gather(*(run(i, item) for i, item in enumerate(corpus)))
+    wall = time.perf_counter() - wall_start
+
+    audio_seconds = sum(len(item["audio"]) for item in corpus) / SAMPLE_RATE
+    reference_words = sum(len(normalize_transcript(item["text"])) for item in corpus)
+    errors = sum(word_errors(item["text"], hyp) for item, hyp in zip(corpus, hypotheses))
+    return {
+        "label": label or pool.label,
+        "utterances": len(corpus),
+        "audio_seconds": round(audio_seconds, 2),
+        "load_seconds": round(pool.load_seconds, 2),
+        "concurrency": concurrency,
+        "rtf": round(sum(latencies) / audio_seconds, 4) if audio_seconds else 0.0,
+        "throughput_x_realtime": round(audio_seconds / wall, 2) if wall else 0.0,
+        "latency_p50_ms": round(_percentile(latencies, 50) * 1000, 1),
+        "latency_p95_ms": round(_percentile(latencies, 95) * 1000, 1),
+        "latency_max_ms": round(max(latencies, default=0.0) * 1000, 1),
+        "wer": round(errors / reference_words, 4) if reference_words else None,
+        "samples": [
+            {"name": item["name"], "reference": item["text"], "hypothesis": hyp}
+            for item, hyp in list(zip(corpus, hypotheses))[:5]
+        ],
+    }
@@ -0,0 +1,219 @@
+"""
+CPU Thread Budget
+One fixed thread budget for the voice bot's inference engines, with live calls served before background work
+"""
+import asyncio
+import bisect
+import itertools
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+from src.monitoring.metrics import cpu_engine_queue_wait_seconds, cpu_engine_slots_in_use, cpu_engine_threads
+
+# Priorities: lower is served first
+LIVE = 0
+BACKGROUND = 1
+PRIORITY_NAMES = {LIVE: "live", BACKGROUND: "background"}
+
+
+def cpu_budget_settings() -> Dict[str, Any]:
+    """CPU thread budget from environment."""
+    return {
+        "enabled": os.getenv("CPU_BUDGET_ENABLED", "true").lower() == "true",
+        # Threads the voice bot may use in total (0 = all cores)
+        "total_threads": int(os.getenv("CPU_THREAD_BUDGET", "0")) or os.cpu_count() or 1,
+        # Kept for the event loop: WebRTC, audio resampling, TTS streaming, HTTP
+        "reserved_threads": int(os.getenv("CPU_RESERVED_THREADS", "1")),
+        "vad_threads": int(os.getenv("CPU_VAD_THREADS", "1")),
+        # Threads of one Whisper decode; the rest of the budget sets how many run at once
+        "stt_threads_per_job": int(os.getenv("CPU_STT_THREADS_PER_JOB", "2")),
+        # Most of an engine's slots background work (partial transcripts) may hold
+        "background_share": float(os.getenv("CPU_BACKGROUND_SHARE", "0.5")),
+    }
+
+
+class EngineBudget:
+    """
+    Slots of one inference engine, handed out by priority
+
+    An engine gets `threads` threads and runs jobs of `threads_per_job`
+    threads each, so at most `slots` jobs run at once. Waiting jobs are
+    served LIVE first, then BACKGROUND, FIFO within a priority, and
+    background jobs never hold more than `background_slots` slots, so a
+    live call always finds one free soon. Time spent waiting is recorded
+    per engine and priority.
+
+    Example:
+        async with budget.engine("stt").slot(LIVE):
+            await loop.run_in_executor(executor, decode, audio)
+    """
+
+    def __init__(self, name: str, threads: int, threads_per_job: int = 1, background_share: float = 0.5):
+        self.name = name
+        self.threads = max(1, threads)
+        self.threads_per_job = max(1, min(threads_per_job, self.threads))
+        self.slots = max(1, self.threads // self.threads_per_job)
+        self.background_slots = min(self.slots, max(1, int(self.slots * background_share)))
+        self.in_use = 0
+        self.background_in_use = 0
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self.stats = {"granted": 0, "waited": 0, "wait_seconds": {name: 0.0 for name in PRIORITY_NAMES.values()}}
+        cpu_engine_threads.labels(engine=name).set(self.threads)
+
+    def _can_run(self, priority: int) -> bool:
+        if self.in_use >= self.slots:
+            return False
+        return priority == LIVE or self.background_in_use < self.background_slots
+
+    def _grant(self, priority: int) -> None:
+        self.in_use += 1
+        if priority != LIVE:
+            self.background_in_use += 1
+        self.stats["granted"] += 1
+        cpu_engine_slots_in_use.labels(engine=self.name).set(self.in_use)
+
+    def _release(self, priority: int) -> None:
+        self.in_use -= 1
+        if priority != LIVE:
+            self.background_in_use -= 1
+        cpu_engine_slots_in_use.labels(engine=self.name).set(self.in_use)
+        self._wake()
+
+    def _wake(self) -> None:
+        # A background waiter over its cap does not block live waiters behind it
+        for waiter in list(self._waiters):
+            priority, _, future = waiter
+            if self.in_use >= self.slots:
+                return
+            if future.done():
+                self._waiters.remove(waiter)
+            elif self._can_run(priority):
+                self._waiters.remove(waiter)
+                self._grant(priority)
+                future.set_result(None)
+
+    async def acquire(self, priority: int = LIVE) -> float:
+        """Wait for a slot; returns the seconds waited."""
+        start = time.monotonic()
+        ahead = any(waiting <= priority for waiting, _, _ in self._waiters)
+        if ahead or not self._can_run(priority):
+            waiter = (priority, next(self._sequence), asyncio.get_running_loop().create_future())
+            bisect.insort(self._waiters, waiter, key=lambda item: item[:2])
+            try:
+                await waiter[2]
+            except asyncio.CancelledError:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                elif waiter[2].done() and not waiter[2].cancelled():
+                    self._release(priority)  # granted just as the caller gave up
+                raise
+            self.stats["waited"] += 1
+        else:
+            self._grant(priority)
+        waited = time.monotonic() - start
+        label = PRIORITY_NAMES.get(priority, "background")
+        self.stats["wait_seconds"][label] += waited
+        cpu_engine_queue_wait_seconds.labels(engine=self.name, priority=label).observe(waited)
+        return waited
+
+    @asynccontextmanager
+    async def slot(self, priority: int = LIVE):
+        await self.acquire(priority)
+        try:
+            yield self
+        finally:
+            self._release(priority)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "wait_seconds": {name: round(value, 3) for name, value in self.stats["wait_seconds"].items()},
+            "threads": self.threads,
+            "threads_per_job": self.threads_per_job,
+            "slots": self.slots,
+            "background_slots": self.background_slots,
+            "in_use": self.in_use,
+            "waiting": len(self._waiters),
+        }
+
+
+class CpuBudget:
+    """
+    Split of the process's CPU threads between the voice bot's inference engines
+
+    reserved threads stay with the event loop (WebRTC, resampling, TTS
+    streaming: ElevenLabs synthesizes remotely), `vad` gets the shared
+    Silero session's threads and `stt` the rest, as `slots` concurrent
+    Whisper decodes of threads_per_job threads. The engines size their
+    thread pools from this split and take a slot per job, so the total
+    never exceeds the budget however many calls are up.
+
+    Example:
+        budget = CpuBudget(total_threads=16)          # stt: 7 decodes x 2 threads, vad: 1
+        budget.estimate_max_calls(stt_rtf=0.25)       # from benchmark_stt.py
+    """
+
+    def __init__(self, total_threads: int, reserved_threads: int = 1, vad_threads: int = 1,
+                 stt_threads_per_job: int = 2, background_share: float = 0.5):
+        self.total_threads = max(1, total_threads)
+        self.reserved_threads = min(max(0, reserved_threads), self.total_threads - 1)
+        available = self.total_threads - self.reserved_threads
+        vad = min(max(1, vad_threads), max(1, available - 1))
+        stt = max(1, available - vad)
+        self.engines: Dict[str, EngineBudget] = {
+            "stt": EngineBudget("stt", stt, stt_threads_per_job, background_share),
+            # One batched VAD run at a time, on all of the engine's threads
+            "vad": EngineBudget("vad", vad, vad, background_share),
+        }
+        logger.info(
+            f"🧮 CPU budget: {self.total_threads} threads = {self.reserved_threads} reserved"
+            f" + stt {stt} ({self.engines['stt'].slots} x {self.engines['stt'].threads_per_job})"
+            f" + vad {vad}"
+        )
+
+    @classmethod
+    def from_settings(cls, settings: Optional[Dict[str, Any]] = None) -> "CpuBudget":
+        settings = settings or cpu_budget_settings()
+        return cls(
+            total_threads=settings["total_threads"],
+            reserved_threads=settings["reserved_threads"],
+            vad_threads=settings["vad_threads"],
+            stt_threads_per_job=settings["stt_threads_per_job"],
+            background_share=settings["background_share"],
+        )
+
+    def engine(self, name: str) -> EngineBudget:
+        return self.engines[name]
+
+    def estimate_max_calls(self, stt_rtf: float, speech_share: float = 0.3) -> int:
+        """
+        Concurrent calls the STT slots can keep up with
+
+        Args:
+            stt_rtf: Decode seconds per audio second of one job at threads_per_job
+                threads (the "rtf" of benchmark_stt.py run with that many threads)
+            speech_share: Fraction of a call's time the user is speaking
+
+        Returns:
+            Calls whose speech the STT engine can transcribe in real time
+        """
+        load_per_call = stt_rtf * speech_share
+        if load_per_call <= 0:
+            return 0
+        return int(self.engines["stt"].slots / load_per_call)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "total_threads": self.total_threads,
+            "reserved_threads": self.reserved_threads,
+            "engines": {name: engine.get_stats() for name, engine in self.engines.items()},
+        }
+
+
+# Process-wide budget; None when CPU_BUDGET_ENABLED=false (engines size themselves from STT_*/VAD_*)
+cpu_budget: Optional[CpuBudget] = CpuBudget.from_settings() if cpu_budget_settings()["enabled"] else None
@@ -0,0 +1,233 @@
+"""
+Content-Aware Endpointing
+End a user turn on what was said (complete slot, digit count, sentence-final cue), not on silence alone
+"""
+import os
+import re
+import unicodedata
+from typing import Any, Dict, Optional, Tuple
+
+from loguru import logger
+
+from pipecat.audio.turn.base_turn_analyzer import BaseTurnAnalyzer, BaseTurnParams, EndOfTurnState
+from pipecat.metrics.metrics import MetricsData, SmartTurnMetricsData
+
+from src.dynamic_vad import ConversationContext, DynamicVADConfig
+from src.monitoring.metrics import endpointing_decisions_total
+
+COMPLETE = "complete"
+PARTIAL = "partial"
+UNKNOWN = "unknown"
+
+# Spoken Vietnamese digits as PhoWhisper writes them
+DIGIT_WORDS = {
+    "không": "0", "linh": "0", "lẻ": "0",
+    "một": "1", "mốt": "1",
+    "hai": "2",
+    "ba": "3",
+    "bốn": "4", "tư": "4",
+    "năm": "5", "lăm": "5",
+    "sáu": "6",
+    "bảy": "7", "bẩy": "7",
+    "tám": "8",
+    "chín": "9",
+}
+
+# A turn ending on these words is mid-sentence ("số của tôi là ...")
+LEAD_IN_WORDS = {"là", "và", "của", "thì", "với", "số", "bằng", "tên", "ở", "tại"}
+
+# Sentence-final particles: the user has finished the thought
+FINAL_PARTICLES = {"ạ", "nhé", "nha", "nhá", "rồi", "xong", "hết", "vậy"}
+
+# Whole-utterance answers in the CONFIRMATION context
+CONFIRMATION_WORDS = {"đúng", "có", "không", "vâng", "dạ", "ừ", "được", "ok", "okay", "sai", "chưa"}
+
+_TOKEN = re.compile(r"[\w]+|[.?!]", re.UNICODE)
+
+
+def endpointing_settings() -> Dict[str, Any]:
+    """Content-aware endpointing switches from environment."""
+    return {
+        "enabled": os.getenv("SMART_ENDPOINTING_ENABLED", "true").lower() == "true",
+        # VAD silence that counts as a pause: triggers a partial transcript and a content check
+        "pause_secs": float(os.getenv("ENDPOINT_PAUSE_SECS", "0.4")),
+        # Extra silence allowed while a digit sequence is still short of its length
+        "extend_secs": float(os.getenv("ENDPOINT_EXTEND_SECS", "2.0")),
+    }
+
+
+def _tokens(text: str) -> list:
+    return _TOKEN.findall(unicodedata.normalize("NFC", text or "").lower())
+
+
+def trailing_digits(text: str) -> str:
+    """Digits of the number the utterance ends with ("0912 345 678", "không chín một hai...")."""
+    run = []
+    for token in reversed([t for t in _tokens(text) if t not in ".?!"]):
+        if token.isdigit():
+            run.append(token)
+        elif token in DIGIT_WORDS:
+            run.append(DIGIT_WORDS[token])
+        else:
+            break
+    return "".join(reversed(run))
+
+
+def expected_digit_count(slot: Optional[str], digits: str) -> Optional[int]:
+    """Digits a complete value of the slot has (None when the slot is unknown)."""
+    if slot == "phone":
+        return 11 if digits.startswith("84") else 10
+    if slot == "national_id":
+        return 12
+    return None
+
+
+def analyze_utterance(text: str, context: ConversationContext = ConversationContext.DEFAULT,
+                      slot: Optional[str] = None) -> str:
+    """
+    Whether an utterance heard so far is a finished turn
+
+    Args:
+        text: Transcript of the turn so far (partial or final)
+        context: Conversation context the turn was expected in
+        slot: Digit slot the turn was expected to fill ("phone", "national_id")
+
+    Returns:
+        "complete" (end the turn at the next pause), "partial" (wait
+        longer than usual) or "unknown" (fall back to silence)
+    """
+    tokens = _tokens(text)
+    words = [t for t in tokens if t not in ".?!"]
+    if not words:
+        return UNKNOWN
+
+    digits = trailing_digits(text)
+    slot = slot or DynamicVADConfig.detect_digit_slot(text)
+    if digits and (slot or context == ConversationContext.DIGIT_SEQUENCE):
+        expected = expected_digit_count(slot, digits)
+        if expected is None:
+            # Unknown length: only a full CCCD is safe to call complete
+            return COMPLETE if len(digits) >= 12 else PARTIAL if len(digits) < 9 else UNKNOWN
+        if len(digits) == expected:
+            return COMPLETE
+        return PARTIAL if len(digits) < expected else UNKNOWN
+
+    if words[-1] in LEAD_IN_WORDS:
+        return PARTIAL
+    if context == ConversationContext.DIGIT_SEQUENCE and not digits:
+        return UNKNOWN
+    if words[-1] in FINAL_PARTICLES:
+        return COMPLETE
+    if context == ConversationContext.CONFIRMATION and len(words) <= 3 and set(words) & CONFIRMATION_WORDS:
+        return COMPLETE
+    if tokens[-1] in ".?!" and context in (ConversationContext.CONFIRMATION, ConversationContext.FORM_FIELD):
+        return COMPLETE
+    return UNKNOWN
+
+
+class EndpointingParams(BaseTurnParams):
+    """Pause that triggers a content check, and extra wait for partial digit sequences"""
+    pause_secs: float = 0.4
+    extend_secs: float = 2.0
+
+
+class TranscriptEndpointer(BaseTurnAnalyzer):
+    """
+    pipecat turn analyzer that ends turns on transcript content
+
+    Give it to the transport (TransportParams.turn_analyzer) with the VAD's
+    stop_secs set to pause_secs: the VAD then only marks pauses, and this
+    class decides when the turn is over. Partial transcripts of the open
+    turn come in through observe_transcript() (the STT emits one at each
+    pause). A "complete" transcript ends the turn as soon as the pause is
+    pause_secs long; otherwise the turn ends after the context's stop_secs
+    of silence (from the call's DynamicVADConfig), extended by extend_secs
+    while a digit sequence is short of its length.
+
+    Example:
+        endpointer = TranscriptEndpointer(session_vad, pause_secs=0.4)
+        TransportParams(vad_analyzer=SileroVADAnalyzer(params=VADParams(stop_secs=0.4)),
+                        turn_analyzer=endpointer)
+    """
+
+    def __init__(self, config: DynamicVADConfig, pause_secs: float = 0.4, extend_secs: float = 2.0,
+                 fixed_stop_secs: Optional[float] = None, sample_rate: Optional[int] = None):
+        super().__init__(sample_rate=sample_rate)
+        self.config = config
+        # Silence limit when the VAD is not retuned per context
+        self.fixed_stop_secs = fixed_stop_secs
+        self._params = EndpointingParams(pause_secs=pause_secs, extend_secs=extend_secs)
+        self._speech_triggered = False
+        self._silence_secs = 0.0
+        self._decision = UNKNOWN
+        # Silence waited and reason of the last ended turn (for end-of-turn metrics)
+        self.last_silence_secs = 0.0
+        self.last_reason = "silence"
+
+    @property
+    def speech_triggered(self) -> bool:
+        return self._speech_triggered
+
+    @property
+    def params(self) -> EndpointingParams:
+        return self._params
+
+    @property
+    def decision(self) -> str:
+        return self._decision
+
+    def silence_limit(self) -> float:
+        """Silence that ends the turn when the content has not ended it already."""
+        stop_secs = self.fixed_stop_secs
+        if stop_secs is None:
+            stop_secs = self.config.VAD_CONFIGS[self.config.current_context]["stop_secs"]
+        return stop_secs + self._params.extend_secs if self._decision == PARTIAL else stop_secs
+
+    def observe_transcript(self, text: str) -> str:
+        """Analyze the latest partial transcript of the open turn."""
+        if self._speech_triggered:
+            self._decision = analyze_utterance(text, self.config.current_context, self.config.expected_slot)
+        return self._decision
+
+    def append_audio(self, buffer: bytes, is_speech: bool) -> EndOfTurnState:
+        if is_speech:
+            # New speech makes any earlier verdict stale
+            self._speech_triggered = True
+            self._silence_secs = 0.0
+            self._decision = UNKNOWN
+            return EndOfTurnState.INCOMPLETE
+        if not self._speech_triggered or not self.sample_rate:
+            return EndOfTurnState.INCOMPLETE
+
+        self._silence_secs += len(buffer) / 2 / self.sample_rate
+        if self._decision == COMPLETE and self._silence_secs >= self._params.pause_secs:
+            return self._complete("content")
+        if self._silence_secs >= self.silence_limit():
+            return self._complete("extended" if self._decision == PARTIAL else "silence")
+        return EndOfTurnState.INCOMPLETE
+
+    async def analyze_end_of_turn(self) -> Tuple[EndOfTurnState, Optional[MetricsData]]:
+        # Called when the VAD marks a pause; the pause's own transcript usually lands a bit later
+        complete = self._decision == COMPLETE
+        state = self._complete("content") if complete else EndOfTurnState.INCOMPLETE
+        return state, SmartTurnMetricsData(
+            processor="TranscriptEndpointer",
+            is_complete=complete,
+            probability=1.0 if complete else 0.0,
+            inference_time_ms=0.0,
+            server_total_time_ms=0.0,
+            e2e_processing_time_ms=0.0,
+        )
+
+    def _complete(self, reason: str) -> EndOfTurnState:
+        self.last_silence_secs = self._silence_secs
+        self.last_reason = reason
+        endpointing_decisions_total.labels(reason=reason).inc()
+        logger.debug(f"🔚 End of turn ({reason}) after {self._silence_secs:.2f}s of silence")
+        self.clear()
+        return EndOfTurnState.COMPLETE
+
+    def clear(self):
+        self._speech_triggered = False
+        self._silence_secs = 0.0
+        self._decision = UNKNOWN
@@ -0,0 +1,338 @@
+"""
+STT Model Host
+Serves the one copy of the STT weights to every voice worker process over a Unix socket
+"""
+import asyncio
+import itertools
+import json
+import os
+import struct
+from types import SimpleNamespace
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from loguru import logger
+
+from src.speech.cpu_budget import LIVE
+from src.speech.stt_pool import SttModelRegistry
+
+_SIZES = struct.Struct("!II")
+
+
+async def write_frame(writer: asyncio.StreamWriter, header: Dict[str, Any], payload: bytes = b"") -> None:
+    """One message: sizes, JSON header, raw payload (written in a single write, so never interleaved)."""
+    head = json.dumps(header, ensure_ascii=False).encode("utf-8")
+    writer.write(_SIZES.pack(len(head), len(payload)) + head + payload)
+    await writer.drain()
+
+
+async def read_frame(reader: asyncio.StreamReader) -> Tuple[Dict[str, Any], bytes]:
+    head_size, payload_size = _SIZES.unpack(await reader.readexactly(_SIZES.size))
+    header = json.loads(await reader.readexactly(head_size))
+    payload = await reader.readexactly(payload_size) if payload_size else b""
+    return header, payload
+
+
+class ModelHostServer:
+    """
+    Model host run by the voice supervisor
+
+    Worker requests ("transcribe", "load", "stats") go to the host's own
+    SttModelRegistry, so all workers share one copy of the weights, one
+    inference pool and one CPU budget. The host also relays "publish"
+    messages from a worker to every other worker's "subscribe" connection
+    (WebSocket broadcasts of calls running in another worker). Publishes
+    share the connection with STT requests, so the read loop only queues
+    them: each subscriber has a bounded queue and its own writer task, and
+    a slow worker loses broadcasts instead of delaying transcriptions.
+    """
+
+    def __init__(self, registry: SttModelRegistry, subscriber_queue: int = 256):
+        self.registry = registry
+        self.subscriber_queue = subscriber_queue
+        self._server: Optional[asyncio.AbstractServer] = None
+        # subscriber connection -> (worker, pending broadcasts, writer task)
+        self._subscribers: Dict[asyncio.StreamWriter, Tuple[Optional[int], asyncio.Queue, asyncio.Task]] = {}
+        self.stats = {"requests": 0, "failed": 0, "published": 0, "dropped": 0}
+
+    async def start(self, path: str) -> None:
+        if os.path.exists(path):
+            os.unlink(path)  # stale socket of a previous run
+        self._server = await asyncio.start_unix_server(self._handle, path=path)
+        logger.info(f"🧠 STT model host listening on {path}")
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        tasks = set()
+        try:
+            while True:
+                header, payload = await read_frame(reader)
+                op = header.get("op")
+                if op == "subscribe":
+                    self._subscribe(writer, header.get("worker"))
+                elif op == "publish":
+                    self._fan_out(header.get("worker"), payload)
+                else:
+                    # Requests run concurrently; replies carry the request id
+                    task = asyncio.create_task(self._serve(header, payload, writer))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            subscriber = self._subscribers.pop(writer, None)
+            if subscriber is not None:
+                subscriber[2].cancel()
+            for task in tasks:
+                task.cancel()
+            writer.close()
+
+    async def _serve(self, header: Dict[str, Any], payload: bytes, writer: asyncio.StreamWriter) -> None:
+        op = header.get("op")
+        reply: Dict[str, Any] = {"id": header.get("id")}
+        self.stats["requests"] += 1
+        try:
+            if op == "stats":
+                reply["stats"] = self.registry.get_stats()
+            elif op in ("load", "transcribe"):
+                pool = self.registry.pool(header.get("model"), header.get("device"),
+                                          header.get("compute_type"), header.get("backend"))
+                if op == "load":
+                    await pool.ensure_loaded()
+                    reply["load_seconds"] = pool.load_seconds
+                else:
+                    segments = await pool.transcribe(np.frombuffer(payload, dtype=np.float32),
+                                                     header.get("language"), priority=header.get("priority", LIVE))
+                    reply["segments"] = [
+                        {"text": segment.text, "no_speech_prob": float(segment.no_speech_prob)}
+                        for segment in segments
+                    ]
+            else:
+                reply["error"] = f"Unknown model host op '{op}'"
+        except Exception as e:
+            self.stats["failed"] += 1
+            reply["error"] = str(e)
+        try:
+            await write_frame(writer, reply)
+        except ConnectionError:
+            pass
+
+    def _subscribe(self, writer: asyncio.StreamWriter, worker: Optional[int]) -> None:
+        if writer in self._subscribers:
+            return
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.subscriber_queue)
+        task = asyncio.create_task(self._write_broadcasts(writer, worker, queue))
+        self._subscribers[writer] = (worker, queue, task)
+
+    def _fan_out(self, worker: Optional[int], payload: bytes) -> None:
+        """Queue a broadcast for every other worker's subscription (never waits)."""
+        self.stats["published"] += 1
+        for subscriber_worker, queue, _ in list(self._subscribers.values()):
+            if worker is not None and subscriber_worker == worker:
+                continue
+            try:
+                queue.put_nowait(payload)
+            except asyncio.QueueFull:
+                self.stats["dropped"] += 1
+                logger.warning(f"⚠️ Dropping broadcast for worker {subscriber_worker}: queue full")
+
+    async def _write_broadcasts(self, writer: asyncio.StreamWriter, worker: Optional[int],
+                                queue: asyncio.Queue) -> None:
+        while True:
+            payload = await queue.get()
+            try:
+                await asyncio.wait_for(write_frame(writer, {"op": "message"}, payload), 1.0)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.stats["dropped"] += 1
+                logger.warning(f"⚠️ Dropping broadcast for worker {worker}: {e}")
+
+    async def close(self) -> None:
+        for _, _, task in self._subscribers.values():
+            task.cancel()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "subscribers": len(self._subscribers)}
+
+
+class ModelHostClient:
+    """
+    A worker's connection to the model host
+
+    request() multiplexes concurrent requests over one connection
+    (reconnected on demand); subscribe() keeps a second connection that
+    receives other workers' broadcasts.
+    """
+
+    def __init__(self, path: str, worker: Optional[int] = None):
+        self.path = path
+        self.worker = worker
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._reader_task: Optional[asyncio.Task] = None
+        self._subscriber_task: Optional[asyncio.Task] = None
+        self._connect_lock: Optional[asyncio.Lock] = None
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._ids = itertools.count(1)
+
+    async def _connection(self) -> asyncio.StreamWriter:
+        if self._connect_lock is None:
+            self._connect_lock = asyncio.Lock()
+        async with self._connect_lock:
+            if self._writer is None or self._writer.is_closing():
+                self._reader, self._writer = await asyncio.open_unix_connection(self.path)
+                self._reader_task = asyncio.create_task(self._read_replies(self._reader))
+            return self._writer
+
+    async def _read_replies(self, reader: asyncio.StreamReader) -> None:
+        try:
+            while True:
+                reply, _ = await read_frame(reader)
+                future = self._pending.pop(reply.get("id"), None)
+                if future is not None and not future.done():
+                    future.set_result(reply)
+        except (asyncio.IncompleteReadError, ConnectionError) as e:
+            self._fail_pending(ConnectionError(f"Model host connection lost: {e}"))
+            if self._writer is not None:
+                self._writer.close()
+
+    def _fail_pending(self, error: Exception) -> None:
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(error)
+        self._pending.clear()
+
+    async def request(self, header: Dict[str, Any], payload: bytes = b"") -> Dict[str, Any]:
+        writer = await self._connection()
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        try:
+            await write_frame(writer, {**header, "id": request_id}, payload)
+            reply = await future
+        finally:
+            self._pending.pop(request_id, None)
+        if "error" in reply:
+            raise RuntimeError(reply["error"])
+        return reply
+
+    async def publish(self, message: Dict[str, Any]) -> None:
+        """Send a JSON message to the other workers' subscribers."""
+        writer = await self._connection()
+        await write_frame(writer, {"op": "publish", "worker": self.worker},
+                          json.dumps(message, ensure_ascii=False, default=str).encode("utf-8"))
+
+    def subscribe(self, on_message: Callable[[Dict[str, Any]], Awaitable[None]]) -> None:
+        """Deliver other workers' broadcasts to on_message (reconnecting until close())."""
+        if self._subscriber_task is None or self._subscriber_task.done():
+            self._subscriber_task = asyncio.create_task(self._subscription(on_message))
+
+    async def _subscription(self, on_message: Callable[[Dict[str, Any]], Awaitable[None]]) -> None:
+        while True:
+            try:
+                reader, writer = await asyncio.open_unix_connection(self.path)
+                await write_frame(writer, {"op": "subscribe", "worker": self.worker})
+                while True:
+                    _, payload = await read_frame(reader)
+                    try:
+                        await on_message(json.loads(payload))
+                    except Exception as e:
+                        logger.warning(f"⚠️ Broadcast from another worker failed: {e}")
+            except (OSError, asyncio.IncompleteReadError) as e:
+                logger.warning(f"⚠️ Model host subscription lost ({e}); reconnecting")
+                await asyncio.sleep(1.0)
+
+    async def close(self) -> None:
+        for task in (self._subscriber_task, self._reader_task):
+            if task is not None:
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+        self._subscriber_task = self._reader_task = None
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        self._fail_pending(ConnectionError("Model host client closed"))
+
+
+class RemoteSttPool:
+    """SttInferencePool stand-in whose segments are transcribed by the model host"""
+
+    def __init__(self, client: ModelHostClient, key: Dict[str, str]):
+        self.client = client
+        self.key = key
+        self.loaded = False
+        self.load_seconds = 0.0
+        self.inflight = 0
+        self.stats = {"segments": 0, "failed": 0}
+
+    @property
+    def label(self) -> str:
+        return self.key["model"]
+
+    async def ensure_loaded(self) -> None:
+        if not self.loaded:
+            reply = await self.client.request({"op": "load", **self.key})
+            self.load_seconds = reply.get("load_seconds", 0.0)
+            self.loaded = True
+
+    async def transcribe(self, audio: np.ndarray, language: Optional[str] = None,
+                         priority: int = LIVE) -> List[Any]:
+        self.inflight += 1
+        try:
+            reply = await self.client.request(
+                {"op": "transcribe", **self.key, "language": language, "priority": priority},
+                np.ascontiguousarray(audio, dtype=np.float32).tobytes(),
+            )
+        except Exception:
+            self.stats["failed"] += 1
+            raise
+        finally:
+            self.inflight -= 1
+        self.stats["segments"] += 1
+        self.loaded = True
+        return [SimpleNamespace(**segment) for segment in reply["segments"]]
+
+    async def close(self) -> None:
+        pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "model": self.label, "loaded": self.loaded, "remote": True, "queued": self.inflight}
+
+
+class RemoteSttRegistry(SttModelRegistry):
+    """
+    SttModelRegistry of a voice worker: every pool lives in the model host
+
+    Example:
+        registry = RemoteSttRegistry(ModelHostClient("/tmp/vpbank-voice-models.sock", worker=0))
+        stt = PooledWhisperSTTService(registry=registry, model="PhoWhisper-medium", language="vi")
+    """
+
+    def __init__(self, client: ModelHostClient, settings: Optional[Dict[str, Any]] = None):
+        super().__init__(settings=settings)
+        self.client = client
+        self._remote_pools: Dict[Tuple[str, str, str, str], RemoteSttPool] = {}
+
+    def pool(self, model: Optional[str] = None, device: Optional[str] = None,
+             compute_type: Optional[str] = None, backend: Optional[str] = None) -> RemoteSttPool:
+        key = (
+            backend or self.settings.get("backend", "ctranslate2"),
+            model or self.settings["model"],
+            device or self.settings["device"],
+            compute_type or self.settings["compute_type"],
+        )
+        pool = self._remote_pools.get(key)
+        if pool is None:
+            pool = RemoteSttPool(self.client, dict(zip(("backend", "model", "device", "compute_type"), key)))
+            self._remote_pools[key] = pool
+        return pool
+
+    async def close(self) -> None:
+        await self.client.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"pools": [pool.get_stats() for pool in self._remote_pools.values()]}
@@ -0,0 +1,90 @@
+"""
+Partial Transcripts
+Relay interim STT hypotheses out of the pipeline and spot intents in them before the turn ends
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+from loguru import logger
+
+from pipecat.frames.frames import Frame, InterimTranscriptionFrame
+from pipecat.processors.frame_processor import FrameDirection, FrameProcessor
+
+from src.nlp import detect_form_type, detect_intents
+
+
+class PartialIntentTracker:
+    """
+    Early intents of one call, from its partial transcripts
+
+    observe() reports the form type and INSTRUCTION lines a partial
+    transcript implies, and flags the ones not seen before in the call so
+    speculative work (opening the form) is triggered once. Nothing here is
+    authoritative: the final transcript still drives the browser agent.
+
+    Example:
+        early = tracker.observe("tôi muốn mở đơn vay")
+        if early["new_form_type"]:
+            prepare(early["new_form_type"])
+    """
+
+    def __init__(self):
+        self.form_type: Optional[str] = None
+        self._seen_intents: Set[str] = set()
+
+    def observe(self, text: str) -> Dict[str, Any]:
+        form_type = detect_form_type(text, speculative=True)
+        intents = detect_intents(text)
+        new_form_type = form_type if form_type and form_type != self.form_type else None
+        if new_form_type:
+            self.form_type = form_type
+        new_intents = [intent for intent in intents if intent not in self._seen_intents]
+        self._seen_intents.update(new_intents)
+        return {
+            "form_type": form_type,
+            "intents": intents,
+            "new_form_type": new_form_type,
+            "new_intents": new_intents,
+        }
+
+
+class PartialTranscriptRelay(FrameProcessor):
+    """
+    Pass-through processor that hands interim transcripts to a callback
+
+    Place it right after the STT service. Every frame is forwarded
+    unchanged; the callback runs outside the pipeline so it never delays
+    audio. While it is busy, only the newest partial is kept for the next
+    call (older ones are stale anyway).
+
+    Example:
+        relay = PartialTranscriptRelay(on_partial=send_partial_to_websocket)
+        Pipeline([transport.input(), stt, relay, ...])
+    """
+
+    def __init__(self, on_partial: Callable[[str], Awaitable[None]], **kwargs):
+        super().__init__(**kwargs)
+        self._on_partial = on_partial
+        self._pending: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def process_frame(self, frame: Frame, direction: FrameDirection):
+        await super().process_frame(frame, direction)
+        if isinstance(frame, InterimTranscriptionFrame) and frame.text.strip():
+            self._pending = frame.text.strip()
+            if self._task is None or self._task.done():
+                self._task = self.create_task(self._drain())
+        await self.push_frame(frame, direction)
+
+    async def _drain(self) -> None:
+        while self._pending is not None:
+            text, self._pending = self._pending, None
+            try:
+                await self._on_partial(text)
+            except Exception as e:
+                logger.warning(f"⚠️ Partial transcript handler failed: {e}")
+
+    async def cleanup(self):
+        if self._task is not None and not self._task.done():
+            await self.cancel_task(self._task)
+        await super().cleanup()
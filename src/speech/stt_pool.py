@@ -0,0 +1,317 @@
+"""
+Shared STT Model Registry
+Process-wide Whisper weights with a bounded, micro-batching inference worker pool
+"""
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from loguru import logger
+
+from src.speech.backends import make_backend
+from src.speech.cpu_budget import BACKGROUND, LIVE, EngineBudget, cpu_budget
+from src.monitoring.metrics import (
+    stt_batch_size,
+    stt_model_load_seconds,
+    stt_queue_depth,
+    stt_request_duration_seconds,
+    stt_requests_total,
+)
+
+
+def stt_settings() -> Dict[str, Any]:
+    """Shared STT model and pool settings from environment."""
+    return {
+        "backend": os.getenv("STT_BACKEND", "ctranslate2"),
+        "model": os.getenv("STT_MODEL", "PhoWhisper-medium"),
+        # Small model for fast partial transcripts; empty disables the cascade
+        "partial_model": os.getenv("STT_PARTIAL_MODEL", ""),
+        # Seconds of new speech between partial transcripts of an open segment; 0 disables them
+        "partial_interval": float(os.getenv("STT_PARTIAL_INTERVAL_SECS", "1.0")),
+        "device": os.getenv("STT_DEVICE", "auto"),
+        "compute_type": os.getenv("STT_COMPUTE_TYPE", "auto"),
+        "workers": int(os.getenv("STT_WORKERS", "2")),
+        "max_batch": int(os.getenv("STT_MAX_BATCH", "4")),
+        "batch_window": float(os.getenv("STT_BATCH_WINDOW_MS", "15")) / 1000.0,
+        "max_queued": int(os.getenv("STT_MAX_QUEUED", "64")),
+        "prewarm": os.getenv("STT_PREWARM", "true").lower() == "true",
+    }
+
+
+@dataclass
+class _SttJob:
+    audio: np.ndarray
+    language: Optional[str]
+    future: asyncio.Future
+    priority: int = LIVE
+    enqueued: float = field(default_factory=time.monotonic)
+
+
+class SttInferencePool:
+    """
+    Bounded inference workers in front of one shared model
+
+    Each worker takes the first queued segment, waits up to batch_window for
+    more (max_batch in total) and transcribes them together in a pool
+    thread. With `workers` workers at most that many batches run at once;
+    past max_queued, callers wait for room (backpressure on the call).
+    With a CPU budget, each batch also holds one of the budget's STT
+    slots while it decodes (shared with the other pools, live batches
+    first).
+
+    Example:
+        segments = await pool.transcribe(audio_float32, language="vi")
+    """
+
+    def __init__(self, backend, workers: int = 2, max_batch: int = 4,
+                 batch_window: float = 0.015, max_queued: int = 64, budget: Optional[EngineBudget] = None):
+        self.backend = backend
+        self.workers = max(1, workers)
+        self.max_batch = max(1, max_batch)
+        self.batch_window = batch_window
+        self.max_queued = max_queued
+        self.budget = budget
+        self.loaded = False
+        self.load_seconds = 0.0
+        self._load_lock: Optional[asyncio.Lock] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.stats = {"segments": 0, "batches": 0, "failed": 0}
+
+    @property
+    def label(self) -> str:
+        return getattr(self.backend, "model_name", type(self.backend).__name__)
+
+    async def ensure_loaded(self) -> None:
+        """Load the weights once (in a thread, off the event loop)."""
+        if self.loaded:
+            return
+        if self._load_lock is None:
+            self._load_lock = asyncio.Lock()
+        async with self._load_lock:
+            if self.loaded:
+                return
+            start = time.monotonic()
+            logger.info(f"🎙️ Loading shared STT model {self.label}...")
+            await asyncio.get_running_loop().run_in_executor(self._pool_executor(), self.backend.load)
+            self.load_seconds = time.monotonic() - start
+            self.loaded = True
+            stt_model_load_seconds.labels(model=self.label).set(self.load_seconds)
+            logger.info(f"✅ Shared STT model {self.label} loaded in {self.load_seconds:.1f}s")
+
+    def _pool_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="stt")
+        return self._executor
+
+    def _start(self) -> None:
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queued)
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+
+    async def transcribe(self, audio: np.ndarray, language: Optional[str] = None,
+                         priority: int = LIVE) -> List[Any]:
+        """
+        Transcribe one speech segment
+
+        Args:
+            audio: float32 mono samples at 16 kHz in [-1, 1]
+            language: Whisper language code ("vi") or None to detect
+            priority: LIVE (a finished user turn) or BACKGROUND (partial transcripts)
+
+        Returns:
+            list of segments (objects with .text and .no_speech_prob)
+        """
+        await self.ensure_loaded()
+        self._start()
+        job = _SttJob(audio=audio, language=language, future=asyncio.get_running_loop().create_future(),
+                      priority=priority)
+        await self._queue.put(job)
+        stt_queue_depth.labels(model=self.label).set(self._queue.qsize())
+        return await job.future
+
+    async def _next_batch(self) -> List[_SttJob]:
+        batch = [await self._queue.get()]
+        deadline = time.monotonic() + self.batch_window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 and self._queue.empty():
+                break
+            try:
+                batch.append(self._queue.get_nowait() if remaining <= 0 else
+                             await asyncio.wait_for(self._queue.get(), remaining))
+            except (asyncio.QueueEmpty, asyncio.TimeoutError):
+                break
+        stt_queue_depth.labels(model=self.label).set(self._queue.qsize())
+        return [job for job in batch if not job.future.done()]
+
+    async def _worker(self, index: int) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._next_batch()
+            # One batched call decodes one language
+            groups: Dict[Optional[str], List[_SttJob]] = {}
+            for job in batch:
+                groups.setdefault(job.language, []).append(job)
+            for language, jobs in groups.items():
+                start = time.monotonic()
+                try:
+                    results = await self._run_batch(loop, jobs, language)
+                    status = "success"
+                except Exception as e:
+                    results, status = None, "failed"
+                    self.stats["failed"] += len(jobs)
+                    logger.error(f"❌ STT batch of {len(jobs)} failed: {e}")
+                    for job in jobs:
+                        if not job.future.done():
+                            job.future.set_exception(e)
+
+                self.stats["batches"] += 1
+                self.stats["segments"] += len(jobs)
+                stt_batch_size.labels(model=self.label).observe(len(jobs))
+                stt_request_duration_seconds.labels(provider="whisper-pool").observe(time.monotonic() - start)
+                stt_requests_total.labels(
+                    provider="whisper-pool", language=language or "auto", status=status
+                ).inc(len(jobs))
+                if results is not None:
+                    for job, segments in zip(jobs, results):
+                        if not job.future.done():
+                            job.future.set_result(segments)
+
+    async def _run_batch(self, loop, jobs: List[_SttJob], language: Optional[str]) -> List[Any]:
+        audios = [job.audio for job in jobs]
+        if self.budget is None:
+            return await loop.run_in_executor(self._pool_executor(), self.backend.transcribe_batch, audios, language)
+        async with self.budget.slot(min(job.priority for job in jobs)):
+            return await loop.run_in_executor(self._pool_executor(), self.backend.transcribe_batch, audios, language)
+
+    async def close(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "model": self.label,
+            "loaded": self.loaded,
+            "load_seconds": round(self.load_seconds, 2),
+            "queued": self._queue.qsize() if self._queue else 0,
+            "workers": self.workers,
+            "max_batch": self.max_batch,
+        }
+
+
+class SttCascade:
+    """
+    Two-tier STT: a small model for fast partials, the main model for finals
+
+    Without a partial tier, partial() returns None and callers fall back to
+    the final pool.
+    """
+
+    def __init__(self, final: SttInferencePool, partial: Optional[SttInferencePool] = None):
+        self.final_pool = final
+        self.partial_pool = partial
+
+    async def partial(self, audio: np.ndarray, language: Optional[str] = None) -> Optional[List[Any]]:
+        if self.partial_pool is None:
+            return None
+        return await self.partial_pool.transcribe(audio, language, priority=BACKGROUND)
+
+    async def final(self, audio: np.ndarray, language: Optional[str] = None, priority: int = LIVE) -> List[Any]:
+        return await self.final_pool.transcribe(audio, language, priority=priority)
+
+
+class SttModelRegistry:
+    """
+    One SttInferencePool (one copy of the weights) per backend/model/device/compute type
+
+    Every call's STT service asks the registry for its pool instead of
+    loading its own model, so concurrent calls share the weights and the
+    inference threads. The backend (STT_BACKEND) picks the runtime:
+    CTranslate2 int8 or ONNX Runtime. With a CPU budget, every pool
+    decodes with the budget's threads per job and the pools together run
+    at most the budget's STT slots at once (STT_WORKERS and
+    STT_CPU_THREADS are then ignored).
+    """
+
+    def __init__(self, backend_factory: Optional[Callable[..., Any]] = None,
+                 settings: Optional[Dict[str, Any]] = None, budget: Optional[EngineBudget] = None):
+        self.settings = settings or stt_settings()
+        self.backend_factory = backend_factory or make_backend
+        self.budget = budget
+        self._pools: Dict[Tuple[str, str, str, str], SttInferencePool] = {}
+        self._lock = threading.Lock()
+
+    def pool(self, model: Optional[str] = None, device: Optional[str] = None,
+             compute_type: Optional[str] = None, backend: Optional[str] = None) -> SttInferencePool:
+        key = (
+            backend or self.settings.get("backend", "ctranslate2"),
+            model or self.settings["model"],
+            device or self.settings["device"],
+            compute_type or self.settings["compute_type"],
+        )
+        with self._lock:
+            pool = self._pools.get(key)
+            if pool is None:
+                name, model_name, device_name, compute = key
+                workers = self.settings["workers"]
+                threads = {}
+                if self.budget is not None:
+                    workers = self.budget.slots
+                    threads = {"cpu_threads": self.budget.threads_per_job}
+                instance = self.backend_factory(
+                    model_name, device_name, compute, workers=workers, backend=name, **threads
+                )
+                pool = SttInferencePool(
+                    instance,
+                    workers=workers,
+                    max_batch=self.settings["max_batch"],
+                    batch_window=self.settings["batch_window"],
+                    max_queued=self.settings["max_queued"],
+                    budget=self.budget,
+                )
+                self._pools[key] = pool
+            return pool
+
+    def cascade(self, model: Optional[str] = None, device: Optional[str] = None,
+                compute_type: Optional[str] = None, backend: Optional[str] = None) -> SttCascade:
+        """Final pool for the given model plus the STT_PARTIAL_MODEL pool, if configured."""
+        final = self.pool(model, device, compute_type, backend)
+        partial_model = self.settings.get("partial_model")
+        partial = self.pool(partial_model, device, compute_type, backend) if partial_model else None
+        return SttCascade(final, partial)
+
+    async def warmup(self) -> None:
+        """Load the default model(s) before the first call arrives."""
+        cascade = self.cascade()
+        for pool in filter(None, (cascade.final_pool, cascade.partial_pool)):
+            try:
+                await pool.ensure_loaded()
+            except Exception as e:
+                logger.error(f"❌ STT warmup of {pool.label} failed (will retry on first call): {e}")
+
+    async def close(self) -> None:
+        for pool in list(self._pools.values()):
+            await pool.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"pools": [pool.get_stats() for pool in self._pools.values()]}
+
+
+# Global registry shared by every voice session in this process
+stt_registry = SttModelRegistry(budget=cpu_budget.engine("stt") if cpu_budget else None)
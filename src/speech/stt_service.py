@@ -0,0 +1,178 @@
+"""
+Pooled Whisper STT Service
+pipecat WhisperSTTService that transcribes through the process-wide STT registry
+"""
+import asyncio
+from typing import AsyncGenerator, Optional
+
+import numpy as np
+from loguru import logger
+
+from pipecat.frames.frames import (
+    AudioRawFrame,
+    ErrorFrame,
+    Frame,
+    InterimTranscriptionFrame,
+    SpeechControlParamsFrame,
+    TranscriptionFrame,
+    UserStartedSpeakingFrame,
+    UserStoppedSpeakingFrame,
+    VADUserStoppedSpeakingFrame,
+)
+from pipecat.processors.frame_processor import FrameDirection
+from pipecat.services.whisper.stt import WhisperSTTService
+from pipecat.utils.time import time_now_iso8601
+
+from src.speech.cpu_budget import BACKGROUND
+from src.speech.stt_pool import SttModelRegistry, stt_registry
+
+
+class PooledWhisperSTTService(WhisperSTTService):
+    """
+    Drop-in WhisperSTTService for one call that owns no weights
+
+    The model is looked up in the registry (loaded once per process, at
+    startup when STT_PREWARM is on) and segments are queued on its shared,
+    micro-batching inference pool. Finals use the main model; with
+    STT_PARTIAL_MODEL set, transcribe_partial() uses the small one.
+
+    While the user is still speaking, every partial_interval seconds of new
+    audio the buffered segment is transcribed again and pushed downstream
+    as an InterimTranscriptionFrame (at most one in flight per call). The
+    TranscriptionFrame pushed when the VAD ends the segment stays
+    authoritative; a partial still running then is cancelled. With a turn
+    analyzer on the transport, each VAD pause inside the turn also gets a
+    partial right away, so the endpointer can judge what was said.
+
+    Example:
+        stt = PooledWhisperSTTService(model="PhoWhisper-medium", language="vi")
+    """
+
+    def __init__(self, *, registry: Optional[SttModelRegistry] = None,
+                 partial_interval: Optional[float] = None, **kwargs):
+        self._registry = registry or stt_registry
+        self._cascade = None
+        self._pool = None
+        self._partial_interval = (
+            partial_interval if partial_interval is not None
+            else self._registry.settings.get("partial_interval", 0.0)
+        )
+        self._partial_task: Optional[asyncio.Task] = None
+        self._partial_mark = 0
+        self._last_partial = ""
+        # Bumped when a segment ends, so partials of a finished segment are dropped
+        self._segment = 0
+        # The transport has a turn analyzer: VAD stops are pauses inside a turn
+        self._turn_analyzer = False
+        super().__init__(**kwargs)
+
+    def _load(self):
+        # Called by WhisperSTTService.__init__: share the registry's model instead of loading one
+        self._cascade = self._registry.cascade(self.model_name, self._device, self._compute_type)
+        self._pool = self._cascade.final_pool
+
+    def _keep_text(self, segments) -> str:
+        return "".join(
+            f"{segment.text} " for segment in segments if segment.no_speech_prob < self._no_speech_prob
+        )
+
+    async def transcribe_partial(self, audio: bytes) -> str:
+        """Interim text of an unfinished segment (partial-tier model, else the main one)."""
+        audio_float = np.frombuffer(audio, dtype=np.int16).astype(np.float32) / 32768.0
+        whisper_lang = self.language_to_service_language(self._settings["language"])
+        segments = await self._cascade.partial(audio_float, whisper_lang)
+        if segments is None:
+            segments = await self._cascade.final(audio_float, whisper_lang, priority=BACKGROUND)
+        return self._keep_text(segments).strip() if segments else ""
+
+    async def process_frame(self, frame: Frame, direction: FrameDirection):
+        await super().process_frame(frame, direction)
+        if isinstance(frame, SpeechControlParamsFrame):
+            self._turn_analyzer = frame.turn_params is not None
+        elif (isinstance(frame, VADUserStoppedSpeakingFrame) and self._turn_analyzer
+              and self._user_speaking and self._partial_interval > 0):
+            # A pause inside the turn: transcribe everything so far now, replacing a periodic partial
+            await self._cancel_partial()
+            self._start_partial(pause=True)
+
+    async def process_audio_frame(self, frame: AudioRawFrame, direction: FrameDirection):
+        await super().process_audio_frame(frame, direction)
+        if not self._user_speaking or self._partial_interval <= 0:
+            return
+        if self._partial_task is not None and not self._partial_task.done():
+            return
+        # 16-bit mono: two bytes per sample
+        if len(self._audio_buffer) - self._partial_mark < self._partial_interval * self.sample_rate * 2:
+            return
+        self._start_partial()
+
+    def _start_partial(self, pause: bool = False) -> None:
+        self._partial_mark = len(self._audio_buffer)
+        self._partial_task = self.create_task(
+            self._emit_partial(bytes(self._audio_buffer), self._segment, pause=pause)
+        )
+
+    async def _emit_partial(self, audio: bytes, segment: int, pause: bool = False) -> None:
+        try:
+            text = await self.transcribe_partial(audio)
+        except Exception as e:
+            logger.debug(f"{self} partial transcript skipped: {e}")
+            return
+        # A pause's partial is pushed even if unchanged: the endpointer needs a verdict after the pause
+        if segment != self._segment or not text or (text == self._last_partial and not pause):
+            return
+        self._last_partial = text
+        logger.debug(f"Partial transcription: [{text}]")
+        await self.push_frame(
+            InterimTranscriptionFrame(text, self._user_id, time_now_iso8601(), self._settings["language"])
+        )
+
+    async def _cancel_partial(self) -> None:
+        if self._partial_task is not None and not self._partial_task.done():
+            await self.cancel_task(self._partial_task)
+        self._partial_task = None
+
+    async def _handle_user_started_speaking(self, frame: UserStartedSpeakingFrame):
+        await super()._handle_user_started_speaking(frame)
+        self._partial_mark = len(self._audio_buffer)
+        self._last_partial = ""
+
+    async def _handle_user_stopped_speaking(self, frame: UserStoppedSpeakingFrame):
+        if not frame.emulated:
+            self._segment += 1
+            await self._cancel_partial()
+        await super()._handle_user_stopped_speaking(frame)
+
+    async def cleanup(self):
+        await self._cancel_partial()
+        await super().cleanup()
+
+    async def run_stt(self, audio: bytes) -> AsyncGenerator[Frame, None]:
+        await self.start_processing_metrics()
+        await self.start_ttfb_metrics()
+
+        # Divide by 32768 because we have signed 16-bit data.
+        audio_float = np.frombuffer(audio, dtype=np.int16).astype(np.float32) / 32768.0
+        whisper_lang = self.language_to_service_language(self._settings["language"])
+        try:
+            segments = await self._pool.transcribe(audio_float, whisper_lang)
+        except Exception as e:
+            logger.error(f"{self} error: shared STT failed: {e}")
+            await self.stop_processing_metrics()
+            yield ErrorFrame(f"STT failed: {e}")
+            return
+
+        text = self._keep_text(segments)
+
+        await self.stop_ttfb_metrics()
+        await self.stop_processing_metrics()
+
+        if text:
+            await self._handle_transcription(text, True, self._settings["language"])
+            logger.debug(f"Transcription: [{text}]")
+            yield TranscriptionFrame(
+                text,
+                self._user_id,
+                time_now_iso8601(),
+                self._settings["language"],
+            )
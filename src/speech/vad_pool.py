@@ -0,0 +1,306 @@
+"""
+Shared Silero VAD
+One process-wide Silero ONNX session that scores the VAD windows of every call in batches
+"""
+import asyncio
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+import numpy as np
+from loguru import logger
+
+from pipecat.audio.vad.vad_analyzer import VADAnalyzer, VADParams, VADState
+
+from src.monitoring.metrics import vad_batch_size, vad_inference_seconds
+from src.speech.cpu_budget import LIVE, EngineBudget, cpu_budget
+
+SAMPLE_RATES = (8000, 16000)
+
+# Silero keeps no useful memory past a few seconds; pipecat resets its state this often too
+STATE_RESET_SECS = 5.0
+
+
+def shared_vad_settings() -> Dict[str, Any]:
+    """Shared VAD inference settings from environment."""
+    return {
+        # false: every call loads its own SileroVADAnalyzer (one ONNX session per call)
+        "enabled": os.getenv("SHARED_VAD_ENABLED", "true").lower() == "true",
+        # ONNX intra-op threads of the one shared session (CPU_VAD_THREADS when the CPU budget is on)
+        "threads": int(os.getenv("VAD_ONNX_THREADS", "1")),
+        "max_batch": int(os.getenv("VAD_MAX_BATCH", "64")),
+        # Extra wait for more calls' windows; 0 batches whatever queued during the last run
+        "batch_window": float(os.getenv("VAD_BATCH_WINDOW_MS", "0")) / 1000.0,
+    }
+
+
+def silero_model_path() -> str:
+    """The Silero VAD model shipped with pipecat."""
+    from importlib import resources
+
+    return str(resources.files("pipecat.audio.vad.data").joinpath("silero_vad.onnx"))
+
+
+def window_samples(sample_rate: int) -> int:
+    return 512 if sample_rate == 16000 else 256
+
+
+def context_samples(sample_rate: int) -> int:
+    return 64 if sample_rate == 16000 else 32
+
+
+@dataclass
+class VadStream:
+    """Recurrent Silero state of one call, kept between its windows"""
+    sample_rate: int
+    state: np.ndarray = field(default_factory=lambda: np.zeros((2, 128), dtype=np.float32))
+    context: Optional[np.ndarray] = None
+    last_reset: float = field(default_factory=time.monotonic)
+
+    def __post_init__(self):
+        if self.context is None:
+            self.context = np.zeros(context_samples(self.sample_rate), dtype=np.float32)
+
+    def reset(self) -> None:
+        self.state = np.zeros((2, 128), dtype=np.float32)
+        self.context = np.zeros(context_samples(self.sample_rate), dtype=np.float32)
+        self.last_reset = time.monotonic()
+
+
+@dataclass
+class _VadJob:
+    stream: VadStream
+    audio: np.ndarray
+    future: asyncio.Future
+
+
+class SharedSileroVAD:
+    """
+    Batched Silero VAD inference for all calls of the process
+
+    Calls submit one window (512 samples at 16 kHz, 32 ms) at a time with
+    their own VadStream. A single worker stacks the queued windows of all
+    calls into one (batch, context + window) input, runs the shared ONNX
+    session once on a dedicated thread and writes each call's new state
+    back to its stream. While a batch runs, the next one fills up, so the
+    batch size grows with the number of live calls and the CPU cost per
+    window drops, instead of N sessions with N thread pools competing for
+    the cores. With a CPU budget, the session gets the budget's VAD
+    threads and each run holds the VAD slot.
+
+    Example:
+        stream = shared_vad.stream(16000)
+        confidence = await shared_vad.confidence(stream, pcm16_window)
+    """
+
+    def __init__(self, threads: int = 1, max_batch: int = 64, batch_window: float = 0.0,
+                 session_factory: Optional[Callable[[], Any]] = None, budget: Optional[EngineBudget] = None):
+        self.budget = budget
+        self.threads = budget.threads if budget is not None else max(1, threads)
+        self.max_batch = max(1, max_batch)
+        self.batch_window = batch_window
+        self._session_factory = session_factory or self._create_session
+        self._session = None
+        self._load_lock: Optional[asyncio.Lock] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.stats = {"windows": 0, "batches": 0, "failed": 0}
+
+    @classmethod
+    def from_settings(cls, settings: Optional[Dict[str, Any]] = None,
+                      budget: Optional[EngineBudget] = None) -> "SharedSileroVAD":
+        settings = settings or shared_vad_settings()
+        return cls(threads=settings["threads"], max_batch=settings["max_batch"],
+                   batch_window=settings["batch_window"], budget=budget)
+
+    @property
+    def loaded(self) -> bool:
+        return self._session is not None
+
+    def _create_session(self):
+        import onnxruntime
+
+        opts = onnxruntime.SessionOptions()
+        opts.inter_op_num_threads = 1
+        opts.intra_op_num_threads = self.threads
+        return onnxruntime.InferenceSession(
+            silero_model_path(), providers=["CPUExecutionProvider"], sess_options=opts
+        )
+
+    def _inference_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="vad")
+        return self._executor
+
+    async def ensure_loaded(self) -> None:
+        """Create the ONNX session once (in the inference thread)."""
+        if self._session is not None:
+            return
+        if self._load_lock is None:
+            self._load_lock = asyncio.Lock()
+        async with self._load_lock:
+            if self._session is None:
+                loop = asyncio.get_running_loop()
+                self._session = await loop.run_in_executor(self._inference_executor(), self._session_factory)
+                logger.info(f"✅ Shared Silero VAD loaded ({self.threads} ONNX thread(s), batches of up to {self.max_batch})")
+
+    def stream(self, sample_rate: int) -> VadStream:
+        if sample_rate not in SAMPLE_RATES:
+            raise ValueError(f"Silero VAD sample rate needs to be 16000 or 8000 (sample rate: {sample_rate})")
+        return VadStream(sample_rate=sample_rate)
+
+    async def confidence(self, stream: VadStream, buffer: bytes) -> float:
+        """
+        Voice confidence of one window of a call
+
+        Args:
+            stream: The call's VadStream (one window in flight per stream)
+            buffer: 16-bit mono PCM, window_samples(stream.sample_rate) samples
+
+        Returns:
+            Speech probability between 0.0 and 1.0
+        """
+        audio = np.frombuffer(buffer, np.int16).astype(np.float32) / 32768.0
+        if audio.shape[0] != window_samples(stream.sample_rate):
+            raise ValueError(f"Silero VAD needs {window_samples(stream.sample_rate)} samples, got {audio.shape[0]}")
+        await self.ensure_loaded()
+        if self._task is None or self._task.done():
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._worker())
+        job = _VadJob(stream=stream, audio=audio, future=asyncio.get_running_loop().create_future())
+        self._queue.put_nowait(job)
+        confidence = await job.future
+        if time.monotonic() - stream.last_reset >= STATE_RESET_SECS:
+            stream.reset()
+        return confidence
+
+    async def _next_batch(self) -> List[_VadJob]:
+        batch = [await self._queue.get()]
+        deadline = time.monotonic() + self.batch_window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get_nowait() if remaining <= 0 else
+                             await asyncio.wait_for(self._queue.get(), remaining))
+            except (asyncio.QueueEmpty, asyncio.TimeoutError):
+                break
+        return [job for job in batch if not job.future.done()]
+
+    async def _worker(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._next_batch()
+            # One run scores one sample rate (window and context sizes differ)
+            groups: Dict[int, List[_VadJob]] = {}
+            for job in batch:
+                groups.setdefault(job.stream.sample_rate, []).append(job)
+            for sample_rate, jobs in groups.items():
+                start = time.monotonic()
+                try:
+                    confidences = await self._run_batch(loop, jobs, sample_rate)
+                except Exception as e:
+                    self.stats["failed"] += len(jobs)
+                    logger.error(f"❌ VAD batch of {len(jobs)} failed: {e}")
+                    for job in jobs:
+                        if not job.future.done():
+                            job.future.set_exception(e)
+                    continue
+                self.stats["batches"] += 1
+                self.stats["windows"] += len(jobs)
+                vad_batch_size.observe(len(jobs))
+                vad_inference_seconds.observe(time.monotonic() - start)
+                for job, confidence in zip(jobs, confidences):
+                    if not job.future.done():
+                        job.future.set_result(confidence)
+
+    async def _run_batch(self, loop, jobs: List[_VadJob], sample_rate: int) -> List[float]:
+        if self.budget is None:
+            return await loop.run_in_executor(self._inference_executor(), self._infer, jobs, sample_rate)
+        async with self.budget.slot(LIVE):
+            return await loop.run_in_executor(self._inference_executor(), self._infer, jobs, sample_rate)
+
+    def _infer(self, jobs: List[_VadJob], sample_rate: int) -> List[float]:
+        """One ONNX run over the windows of several calls; updates each call's state."""
+        x = np.stack([np.concatenate((job.stream.context, job.audio)) for job in jobs])
+        state = np.stack([job.stream.state for job in jobs], axis=1)
+        out, new_state = self._session.run(
+            None, {"input": x, "state": state, "sr": np.array(sample_rate, dtype=np.int64)}
+        )
+        context = context_samples(sample_rate)
+        for i, job in enumerate(jobs):
+            job.stream.state = new_state[:, i].copy()
+            job.stream.context = x[i, -context:].copy()
+        return [float(value) for value in out[:, 0]]
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        self._queue = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "loaded": self.loaded,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "threads": self.threads,
+            "max_batch": self.max_batch,
+        }
+
+
+class SharedSileroVADAnalyzer(VADAnalyzer):
+    """
+    pipecat VAD analyzer backed by the shared Silero session
+
+    Drop-in for SileroVADAnalyzer in TransportParams: the speaking state
+    machine is pipecat's own (_run_analyzer), only the model call goes to
+    SharedSileroVAD. The windows a buffer completes are scored first
+    (awaiting the shared batch), then the state machine consumes the
+    precomputed confidences, so no per-call ONNX session or thread is used.
+
+    Example:
+        TransportParams(vad_analyzer=SharedSileroVADAnalyzer(params=VADParams(stop_secs=0.4)))
+    """
+
+    def __init__(self, *, service: Optional[SharedSileroVAD] = None,
+                 sample_rate: Optional[int] = None, params: Optional[VADParams] = None):
+        super().__init__(sample_rate=sample_rate, params=params)
+        self._service = service or shared_vad
+        self._stream: Optional[VadStream] = None
+        self._confidences: Deque[float] = deque()
+
+    def set_sample_rate(self, sample_rate: int):
+        if sample_rate not in SAMPLE_RATES:
+            raise ValueError(f"Silero VAD sample rate needs to be 16000 or 8000 (sample rate: {sample_rate})")
+        super().set_sample_rate(sample_rate)
+        self._stream = self._service.stream(self.sample_rate)
+
+    def num_frames_required(self) -> int:
+        return window_samples(self.sample_rate)
+
+    def voice_confidence(self, buffer) -> float:
+        # Scored in analyze_audio before the state machine asks for it
+        return self._confidences.popleft() if self._confidences else 0.0
+
+    async def analyze_audio(self, buffer: bytes) -> VADState:
+        pending = self._vad_buffer + buffer
+        size = self._vad_frames_num_bytes
+        for start in range(0, len(pending) - size + 1, size):
+            try:
+                confidence = await self._service.confidence(self._stream, pending[start:start + size])
+            except Exception as e:
+                logger.error(f"Error analyzing audio with shared Silero VAD: {e}")
+                confidence = 0.0
+            self._confidences.append(confidence)
+        return self._run_analyzer(buffer)
+
+
+shared_vad = SharedSileroVAD.from_settings(budget=cpu_budget.engine("vad") if cpu_budget else None)
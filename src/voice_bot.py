@@ -10,10 +10,13 @@ Licensed under the MIT License - see LICENSE file for details
 import asyncio
 import os
 import json
+import re
 import time
 import uuid
 from decimal import Decimal
 from datetime import datetime
+from typing import Optional
+import aiohttp
 from aiohttp import web
 from aiohttp.web import RouteTableDef
 from dotenv import load_dotenv
@@ -26,7 +29,6 @@ from pipecat.pipeline.runner import PipelineRunner
 from pipecat.transports.smallwebrtc.transport import SmallWebRTCTransport
 from pipecat.transports.smallwebrtc.connection import SmallWebRTCConnection, IceServer
 from pipecat.transports.base_transport import TransportParams
-from pipecat.services.whisper.stt import WhisperSTTService
 from pipecat.services.aws.llm import AWSBedrockLLMService
 from pipecat.services.elevenlabs.tts import ElevenLabsTTSService
 from pipecat.transcriptions.language import Language
@@ -38,11 +40,49 @@ load_dotenv(override=True)
 
 from src.dynamodb_service import DynamoDBService
 from src.utils.debouncer import RequestDebouncer
+from src.retry_util import retry_with_exponential_backoff
 from src.nlp.intent_detection import detect_intents
+from src.automation.conversation import ContextCursor
+from src.browser_client import BrowserRequest, browser_client
+from src.speech import (
+    SharedSileroVADAnalyzer,
+    cpu_budget,
+    shared_vad,
+    shared_vad_settings,
+    stt_registry,
+    stt_settings,
+)
+from src.speech.stt_service import PooledWhisperSTTService
+from src.speech.model_host import ModelHostClient, RemoteSttRegistry
+from src.voice_workers import PeerWorkersRelay, worker_index, worker_settings
+from src.ws_hub import ws_hub
+from src.speech.partials import PartialIntentTracker, PartialTranscriptRelay
+from src.admission_control import AdmissionController, admission_settings
+from src.monitoring.middleware import setup_metrics_endpoint
+from src.dynamic_vad import DynamicVADConfig, VADContextController, dynamic_vad_settings
+from src.speech.endpointing import TranscriptEndpointer, endpointing_settings
 
 # Browser Agent Service URL
 BROWSER_SERVICE_URL = os.getenv("BROWSER_SERVICE_URL", "http://localhost:7863")
 
+# Submit workflows as jobs (/api/jobs) instead of holding /api/execute open
+BROWSER_JOB_MODE = os.getenv("BROWSER_JOB_MODE", "true").lower() == "true"
+BROWSER_JOB_DEADLINE = float(os.getenv("BROWSER_JOB_DEADLINE", "300"))
+BROWSER_JOB_POLL_WAIT = float(os.getenv("BROWSER_JOB_POLL_WAIT", "20"))
+# Follow the job's server-sent events and relay them to the frontend as they happen
+BROWSER_JOB_STREAM = os.getenv("BROWSER_JOB_STREAM", "true").lower() == "true"
+# Send only new transcript messages (the Browser Service keeps the conversation per session)
+BROWSER_CONTEXT_DELTA = os.getenv("BROWSER_CONTEXT_DELTA", "true").lower() == "true"
+# Open the form as soon as a partial transcript names it (the final transcript still drives the agent)
+BROWSER_SPECULATIVE_PREPARE = os.getenv("BROWSER_SPECULATIVE_PREPARE", "true").lower() == "true"
+
+# Worker of a multi-worker node (main_voice.py with VOICE_WORKERS > 1): STT runs in the supervisor's model host
+WORKER_INDEX = worker_index()
+model_host_client = None
+if WORKER_INDEX is not None:
+    model_host_client = ModelHostClient(worker_settings()["model_host_socket"], worker=WORKER_INDEX)
+    stt_registry = RemoteSttRegistry(model_host_client)
+
 # Initialize DynamoDB service
 dynamodb_service = DynamoDBService()
 
@@ -208,8 +248,51 @@ async def health_check(request):
         "version": "1.0.0"
     })
 
-# WebSocket connections cho transcript streaming
-ws_connections = set()
+
+@routes.get("/api/capacity")
+async def capacity(request):
+    """CPU thread budget, per-engine slot usage and queue waits, STT/VAD pool stats"""
+    return web.json_response({
+        "success": True,
+        "cpu_budget": cpu_budget.get_stats() if cpu_budget else None,
+        "stt": stt_registry.get_stats(),
+        "vad": shared_vad.get_stats(),
+        "admission": admission.get_stats() if admission else None,
+        "websockets": ws_hub.get_stats(),
+    })
+
+def inference_queue_depth() -> int:
+    """Speech segments and VAD windows waiting for the shared inference engines."""
+    stt_queued = sum(pool["queued"] for pool in stt_registry.get_stats()["pools"])
+    return stt_queued + shared_vad.get_stats()["queued"]
+
+
+# Admission control: per-node session limit, offer queue and overload rejection (503 + Retry-After)
+admission = (
+    AdmissionController.from_settings(inference_depth=inference_queue_depth)
+    if admission_settings()["enabled"] else None
+)
+
+
+async def run_admitted_bot(webrtc_connection, session_id: str):
+    """run_bot for an admitted call; frees its session slot when the call ends"""
+    started = time.monotonic()
+    try:
+        await run_bot(webrtc_connection, session_id)
+    except Exception as e:
+        logger.error(f"❌ Bot pipeline failed: {e}", exc_info=True)
+    finally:
+        ws_hub.end_session(session_id)
+        if admission:
+            admission.release(time.monotonic() - started)
+
+
+def new_session_id() -> str:
+    """Session id of a new call: start time plus a suffix so calls starting in the same second differ"""
+    return f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+
+# Cross-worker fan-out of the WebSocket hub (multi-worker mode only)
+peer_relay = PeerWorkersRelay(ws_hub, model_host_client) if model_host_client is not None else None
 
 # Initialize auth service
 auth_service = CognitoAuthService()
@@ -256,18 +339,170 @@ def _to_jsonable(value):
     return value
 
 
-async def push_to_browser_service(user_message: str, ws_connections: set, session_id: str, processing_flag: dict):
+def describe_progress_event(event: dict) -> str:
+    """Short Vietnamese line for a browser progress event (shown in the frontend)."""
+    kind = event.get("event")
+    if kind == "field":
+        if event.get("status") == "failed":
+            return f"⚠️ Chưa điền được {event.get('field')}"
+        return f"✏️ Đã điền {event.get('field')}: {event.get('value')}"
+    if kind == "navigation":
+        return f"🌐 Đang mở {event.get('url')}"
+    if kind == "step":
+        return f"🤖 Bước {event.get('step')}: {event.get('goal') or 'đang xử lý'}"
+    if kind == "verification":
+        return ("✅ " if event.get("ok") else "⚠️ ") + (event.get("message") or "Đã kiểm tra")
+    return event.get("message") or str(event.get("stage") or kind)
+
+
+def _job_outcome(job: dict):
+    """(status, result) of a finished job, shaped like the /api/execute response."""
+    result = job.get("result") or {}
+    if job.get("status") == "cancelled":
+        superseded = bool(job.get("superseded_by") or result.get("superseded"))
+        return 409, {**result, "success": False, "superseded": superseded, "error": job.get("error")}
+    status = job.get("http_status") or 500
+    return status, result if status == 200 else json.dumps(result, ensure_ascii=False)
+
+
+async def follow_browser_job_events(job_id: str, on_event):
+    """
+    Relay a job's server-sent events to on_event as they arrive
+
+    Returns:
+        (status, result) once the final `result` event arrives, None if the
+        stream ended early (the caller falls back to polling)
+    """
+    timeout = aiohttp.ClientTimeout(total=None, sock_read=BROWSER_JOB_POLL_WAIT + 30)
+    async with browser_client.request(
+        "GET", f"/api/jobs/{job_id}/events",
+        endpoint="/api/jobs/{id}/events",
+        headers={"Accept": "text/event-stream"},
+        timeout=timeout
+    ) as response:
+        if response.status != 200:
+            return None
+        event_name, data_lines = None, []
+        async for raw in response.content:
+            line = raw.decode("utf-8").rstrip("\r\n")
+            if line.startswith(":"):
+                continue  # keepalive
+            if line.startswith("event:"):
+                event_name = line[6:].strip()
+            elif line.startswith("data:"):
+                data_lines.append(line[5:].lstrip())
+            elif not line and data_lines:
+                data = json.loads("\n".join(data_lines))
+                if event_name == "result":
+                    return _job_outcome(data)
+                await on_event(data)
+                event_name, data_lines = None, []
+    return None
+
+
+async def run_browser_job(request: BrowserRequest, processing_flag: dict, on_event=None):
+    """
+    Submit a workflow job to the Browser Service and follow it to its result
+
+    Progress is streamed over server-sent events when on_event is given (and
+    BROWSER_JOB_STREAM is on); otherwise, or if the stream drops, the result is
+    long-polled. Only the overall BROWSER_JOB_DEADLINE bounds the run. A full
+    job queue (429) is retried after the advertised Retry-After.
+
+    Args:
+        request: /api/execute request body
+        processing_flag: Processing state; receives the job id as "job_id"
+        on_event: Optional coroutine function called with each progress event
+
+    Returns:
+        (status, result) like the /api/execute call: parsed JSON on 200, text otherwise
+    """
+    deadline = time.monotonic() + BROWSER_JOB_DEADLINE
+    timeout = aiohttp.ClientTimeout(total=BROWSER_JOB_POLL_WAIT + 10)
+    while True:
+        response = await browser_client.post_json("/api/jobs", request.to_payload(), timeout=timeout)
+        if response.status == 202:
+            job = response.data or {}
+            break
+        if response.status != 429:
+            return response.status, response.result
+        retry_after = response.retry_after
+        if time.monotonic() + retry_after > deadline:
+            raise asyncio.TimeoutError()
+        logger.warning(f"⏳ Browser job queue full, retrying in {retry_after:.0f}s")
+        await asyncio.sleep(retry_after)
+
+    job_id = job["job_id"]
+    processing_flag["job_id"] = job_id
+    logger.info(f"🧾 Browser job {job_id} queued (position {job.get('queue_position')})")
+
+    try:
+        if on_event is not None and BROWSER_JOB_STREAM:
+            try:
+                outcome = await asyncio.wait_for(
+                    follow_browser_job_events(job_id, on_event),
+                    timeout=max(0.0, deadline - time.monotonic())
+                )
+                if outcome is not None:
+                    return outcome
+            except (aiohttp.ClientError, ValueError) as e:
+                logger.warning(f"⚠️  Event stream of browser job {job_id} failed, polling instead: {e}")
+
+        while True:
+            wait = max(0.0, min(BROWSER_JOB_POLL_WAIT, deadline - time.monotonic()))
+            try:
+                response = await browser_client.call(
+                    "GET", f"/api/jobs/{job_id}/result",
+                    endpoint="/api/jobs/{id}/result",
+                    params={"wait": str(wait)},
+                    timeout=timeout
+                )
+                if response.status != 202:
+                    return response.status, response.result
+            except aiohttp.ClientError as e:
+                # The job keeps running server-side; poll again instead of resubmitting
+                logger.warning(f"⚠️  Polling browser job {job_id} failed: {e}")
+                await asyncio.sleep(1.0)
+            if time.monotonic() >= deadline:
+                raise asyncio.TimeoutError()
+    except (asyncio.TimeoutError, asyncio.CancelledError):
+        # Don't leave an abandoned job occupying a browser worker
+        try:
+            await browser_client.call("DELETE", f"/api/jobs/{job_id}", endpoint="/api/jobs/{id}", timeout=timeout)
+        except Exception as e:
+            logger.warning(f"Failed to cancel browser job {job_id}: {e}")
+        raise
+    finally:
+        processing_flag.pop("job_id", None)
+
+
+async def prepare_browser_form(session_id: str, form_type: str) -> bool:
+    """Ask the Browser Service to open a form ahead of the session's next run (best effort)."""
+    try:
+        response = await browser_client.post_json(
+            "/api/prepare", {"session_id": session_id, "form_type": form_type},
+            timeout=aiohttp.ClientTimeout(total=30)
+        )
+        prepared = bool(response.data and response.data.get("prepared"))
+        logger.info(f"🔮 Speculative {form_type} form for {session_id}: {'opened' if prepared else 'skipped'}")
+        return prepared
+    except Exception as e:
+        logger.debug(f"Speculative form prepare failed: {e}")
+        return False
+
+
+async def push_to_browser_service(user_message: str, session_id: str, processing_flag: dict,
+                                  cursor: Optional[ContextCursor] = None):
     """
     Gửi request đến Browser Agent Service qua HTTP API
 
     Args:
-        user_message: Full conversation context từ user
-        ws_connections: WebSocket connections để notify
-        session_id: Current session ID
+        user_message: Full conversation context từ user; with a cursor only the
+            extra instruction lines (the service keeps the conversation)
+        session_id: Current session ID (its WebSocket subscribers are notified)
         processing_flag: Dict để track processing state
+        cursor: Transcript cursor; sends only the messages the service has not acknowledged
     """
-    import aiohttp
-
     logger.info(f"📤 Pushing request to Browser Service for session {session_id}")
     logger.debug(f"   Service URL: {BROWSER_SERVICE_URL}")
     logger.debug(f"   Message length: {len(user_message)} chars")
@@ -276,32 +511,61 @@ async def push_to_browser_service(user_message: str, ws_connections: set, sessio
     request_id = str(uuid.uuid4())
 
     # Prepare request
-    payload = {
-        "user_message": user_message,
-        "session_id": session_id,
-        "request_id": request_id
-    }
+    request = BrowserRequest(session_id=session_id, request_id=request_id, user_message=user_message)
+    if cursor is not None:
+        request.set_context(cursor.delta())
+        request.instructions = [line for line in user_message.split("\n") if line]
+        sent_seq = cursor.sent_seq()
+        logger.debug(f"   Context delta: {len(request.messages)} messages after seq {request.base_seq}")
 
     logger.info(f"📝 Request ID: {request_id} - Sending to Browser Service")
 
+    # Relay browser progress (fields, steps, navigation) to the frontend as it happens
+    async def relay_progress(event: dict):
+        notification = {
+            "type": "task_progress",
+            "event": event.get("event"),
+            "data": event,
+            "message": describe_progress_event(event)
+        }
+        ws_hub.publish(session_id, notification)
+
     # Send HTTP POST request with retry logic
     async def send_to_browser_service():
-        timeout = aiohttp.ClientTimeout(total=300)  # 5 minutes timeout
-        async with aiohttp.ClientSession(timeout=timeout) as session:
-            async with session.post(
-                f"{BROWSER_SERVICE_URL}/api/execute",
-                json=payload
-            ) as response:
-                return response.status, await response.json() if response.status == 200 else await response.text()
+        if BROWSER_JOB_MODE:
+            return await run_browser_job(request, processing_flag, on_event=relay_progress)
+        response = await browser_client.post_json(
+            "/api/execute", request.to_payload(),
+            timeout=aiohttp.ClientTimeout(total=300)  # 5 minutes timeout
+        )
+        return response.status, response.result
 
     try:
         # Retry on network errors (connection refused, timeouts, etc.)
-        status, result = await retry_with_exponential_backoff(
-            send_to_browser_service,
-            max_retries=2,
-            initial_delay=2.0,
-            retry_on_exceptions=(aiohttp.ClientError, asyncio.TimeoutError)
-        )
+        async def send_with_retry():
+            return await retry_with_exponential_backoff(
+                send_to_browser_service,
+                max_retries=2,
+                initial_delay=2.0,
+                # A job that hit its deadline was already cancelled; don't resubmit it
+                retry_on_exceptions=(aiohttp.ClientError,) if BROWSER_JOB_MODE else (aiohttp.ClientError, asyncio.TimeoutError)
+            )
+
+        status, result = await send_with_retry()
+
+        if cursor is not None:
+            if status == 409 and isinstance(result, dict) and result.get("resync"):
+                # Service cursor disagrees with ours: resend from its cursor (or reset) once
+                logger.warning(f"🔁 Browser context resync at seq {result.get('context_seq')}")
+                request.set_context(cursor.resync(int(result.get("context_seq") or 0)))
+                status, result = await send_with_retry()
+            if not (status == 409 and isinstance(result, dict) and result.get("resync")):
+                cursor.ack(sent_seq)
+
+        if status == 409 and isinstance(result, dict) and result.get("superseded"):
+            # A newer request for this session took over; it owns the processing flag now
+            logger.info(f"⏭️ Request ID: {request_id} superseded by a newer browser request")
+            return
 
         if status == 200:
             if result.get("success"):
@@ -310,7 +574,6 @@ async def push_to_browser_service(user_message: str, ws_connections: set, sessio
                 # Filter JSON from response (avoid TTS reading JSON)
                 if isinstance(final_message, str):
                     # Remove JSON code blocks
-                    import re
                     # Remove ```json blocks
                     final_message = re.sub(r'```json\s*\{[^}]*\}\s*```', '', final_message, flags=re.DOTALL)
                     # Remove ``` blocks
@@ -333,12 +596,7 @@ async def push_to_browser_service(user_message: str, ws_connections: set, sessio
                     "message": f"✅ {final_message}"
                 }
 
-                for ws in list(ws_connections):
-                    try:
-                        await ws.send_json(notification)
-                        logger.info(f"📢 Sent completion notification to frontend")
-                    except Exception as e:
-                        logger.warning(f"Failed to send notification: {e}")
+                ws_hub.publish(session_id, notification)
             else:
                 error_msg = result.get("error", "Unknown error")
                 logger.error(f"❌ Browser Service failed: {error_msg}")
@@ -349,11 +607,7 @@ async def push_to_browser_service(user_message: str, ws_connections: set, sessio
                     "message": f"❌ Lỗi khi xử lý: {error_msg}"
                 }
 
-                for ws in list(ws_connections):
-                    try:
-                        await ws.send_json(notification)
-                    except Exception as e:
-                        logger.warning(f"Failed to send error notification to WebSocket: {e}")
+                ws_hub.publish(session_id, notification)
         else:
             # Non-200 status code
             error_text = result if isinstance(result, str) else "Unknown error"
@@ -365,11 +619,7 @@ async def push_to_browser_service(user_message: str, ws_connections: set, sessio
                 "message": f"❌ Lỗi kết nối với Browser Service"
             }
 
-            for ws in list(ws_connections):
-                try:
-                    await ws.send_json(notification)
-                except Exception as e:
-                    logger.warning(f"Failed to send error notification to WebSocket: {e}")
+            ws_hub.publish(session_id, notification)
 
         # Clear processing flag
         processing_flag["active"] = False
@@ -385,11 +635,7 @@ async def push_to_browser_service(user_message: str, ws_connections: set, sessio
             "message": "❌ Browser Service không phản hồi (timeout)"
         }
 
-        for ws in list(ws_connections):
-            try:
-                await ws.send_json(notification)
-            except Exception as e:
-                logger.warning(f"Failed to send timeout notification to WebSocket: {e}")
+        ws_hub.publish(session_id, notification)
 
         processing_flag["active"] = False
         processing_flag["task_id"] = None
@@ -403,19 +649,19 @@ async def push_to_browser_service(user_message: str, ws_connections: set, sessio
             "message": f"❌ Lỗi kết nối: {str(e)}"
         }
 
-        for ws in list(ws_connections):
-            try:
-                await ws.send_json(notification)
-            except Exception as e:
-                logger.warning(f"Failed to send connection error notification to WebSocket: {e}")
+        ws_hub.publish(session_id, notification)
 
         processing_flag["active"] = False
         processing_flag["task_id"] = None
 
 
-async def run_bot(webrtc_connection, ws_connections):
+async def run_bot(webrtc_connection, session_id: str):
     """
     Run bot with multi-agent workflow
+
+    Args:
+        webrtc_connection: Connection of the call
+        session_id: Session of the call (DynamoDB record and WebSocket hub topic)
     """
     logger.info("🚀 Starting voice bot...")
     
@@ -428,10 +674,13 @@ async def run_bot(webrtc_connection, ws_connections):
     logger.info(f"⏳ Browser request debouncer set to {debounce_seconds:.2f}s")
     
     # Initialize services
-    # OpenAI Whisper STT Service for Vietnamese
-    stt = WhisperSTTService(
-        device='auto',
-        model="PhoWhisper-medium",
+    # Whisper STT for Vietnamese: weights and inference workers are shared by all calls
+    stt_config = stt_settings()
+    stt = PooledWhisperSTTService(
+        registry=stt_registry,
+        device=stt_config["device"],
+        model=stt_config["model"],
+        compute_type=stt_config["compute_type"],
         language="vi"  # Vietnamese language code
     )
 
@@ -463,18 +712,66 @@ async def run_bot(webrtc_connection, ws_connections):
     transcript = TranscriptProcessor()
     
     # Create session
-    session_id = datetime.now().strftime("%Y%m%d_%H%M%S")
-    
     transcript_data = {
         "session_id": session_id,
         "started_at": datetime.now().isoformat(),
         "messages": [],
         "workflow_executions": []
     }
+    # What the Browser Service already has of this transcript
+    context_cursor = ContextCursor(transcript_data["messages"]) if BROWSER_CONTEXT_DELTA else None
     
     # Save initial session to DynamoDB
     dynamodb_service.save_session(transcript_data)
     logger.info(f"💾 Created session {session_id} in DynamoDB")
+
+    # VAD of this call: end-of-turn silence follows the conversation context (see dynamic_vad.py)
+    vad_settings = dynamic_vad_settings()
+    session_vad = DynamicVADConfig()
+    if vad_settings["enabled"]:
+        vad_params = session_vad.get_vad_params()
+    else:
+        vad_params = VADParams(stop_secs=vad_settings["stop_secs"], start_secs=0.1, min_volume=0.6)
+    # Content-aware endpointing: the VAD only marks pauses, the transcript decides when the turn ends
+    endpoint_settings = endpointing_settings()
+    endpointer = None
+    if endpoint_settings["enabled"]:
+        endpointer = TranscriptEndpointer(
+            session_vad,
+            pause_secs=endpoint_settings["pause_secs"],
+            extend_secs=endpoint_settings["extend_secs"],
+            fixed_stop_secs=None if vad_settings["enabled"] else vad_settings["stop_secs"],
+        )
+        vad_params = vad_params.model_copy(update={"stop_secs": endpoint_settings["pause_secs"]})
+    # One batched Silero session serves every call unless SHARED_VAD_ENABLED=false
+    if shared_vad_settings()["enabled"]:
+        vad_analyzer = SharedSileroVADAnalyzer(params=vad_params)
+    else:
+        vad_analyzer = SileroVADAnalyzer(params=vad_params)
+    vad_controller = VADContextController(
+        session_vad, vad_params, adaptive=vad_settings["enabled"], endpointer=endpointer
+    )
+
+    # Partial transcripts: shown live and scanned for intents, never stored
+    partial_intents = PartialIntentTracker()
+
+    async def handle_partial_transcript(text: str):
+        if endpointer is not None:
+            endpointer.observe_transcript(text)
+        early = partial_intents.observe(text)
+        if early["new_intents"]:
+            logger.info(f"🧠 Early intents from partial transcript: {early['new_intents']}")
+        payload = {
+            "type": "transcript_partial",
+            "message": {"role": "user", "content": text, "timestamp": datetime.now().isoformat()},
+            "intents": early["intents"],
+            "form_type": early["form_type"],
+        }
+        ws_hub.publish(session_id, payload)
+        if early["new_form_type"] and BROWSER_SPECULATIVE_PREPARE:
+            asyncio.create_task(prepare_browser_form(session_id, early["new_form_type"]))
+
+    partial_relay = PartialTranscriptRelay(on_partial=handle_partial_transcript)
     
     # Transcript handler - Capture cả user và assistant messages
     @transcript.event_handler("on_transcript_update")
@@ -502,22 +799,16 @@ async def run_bot(webrtc_connection, ws_connections):
                 
                 if not is_duplicate:
                     transcript_data["messages"].append(msg_dict)
+
+                    # Retune end-of-turn silence for what the user is expected to say next
+                    await vad_controller.observe(message.content or "", message.role)
                     
-                    # Save to DynamoDB (async update)
-                    dynamodb_service.save_session(transcript_data)
+                    # Save to DynamoDB: one constant-size write per message, not the whole session
+                    dynamodb_service.append_message(session_id, len(transcript_data["messages"]), msg_dict)
                     
                     # Send to WebSocket clients - GỬI TẤT CẢ MESSAGES (user và assistant)
-                    for ws in list(ws_connections):
-                        try:
-                            await ws.send_json({
-                                "type": "transcript",
-                                "message": msg_dict
-                            })
-                            if message.role == "assistant":
-                                logger.info(f"✅ Sent assistant message to WebSocket: {msg_dict['content'][:50]}...")
-                        except Exception as e:
-                            logger.warning(f"Failed to send transcript: {e}")
-                            ws_connections.discard(ws)
+                    # Queued for this session's subscribers only; never waits on a socket
+                    ws_hub.publish(session_id, {"type": "transcript", "message": msg_dict})
                 else:
                     logger.debug(f"⚠️ Duplicate message skipped: {message.role}")
                 
@@ -565,16 +856,7 @@ async def run_bot(webrtc_connection, ws_connections):
                         logger.debug(f"⚠️  No form intent detected in message: {message.content[:100]}")
                 
                 if should_push_task:
-                    # Lấy TOÀN BỘ conversation history để extract thông tin
                     all_messages = transcript_data["messages"]
-                    
-                    # Format: "role: content" for each message
-                    conversation_history = []
-                    for m in all_messages:
-                        conversation_history.append(f"{m['role']}: {m['content']}")
-                    
-                    # Join tất cả messages
-                    full_context = "\n".join(conversation_history)
 
                     # Append structured instructions for explicit commands (clear field, navigate...)
                     extra_instructions = detect_intents(message.content)
@@ -583,12 +865,20 @@ async def run_bot(webrtc_connection, ws_connections):
                             "🧠 Detected special intents: %s",
                             extra_instructions
                         )
-                        full_context = (
-                            full_context + "\n" + "\n".join(extra_instructions)
-                        )
+
+                    if context_cursor is not None:
+                        # The Browser Service keeps the conversation; the delta is taken when the request fires
+                        full_context = "\n".join(extra_instructions or [])
+                    else:
+                        # Lấy TOÀN BỘ conversation history để extract thông tin
+                        # Format: "role: content" for each message
+                        conversation_history = []
+                        for m in all_messages:
+                            conversation_history.append(f"{m['role']}: {m['content']}")
+                        full_context = "\n".join(conversation_history + list(extra_instructions or []))
                     
                     logger.info(f"📤 Pushing request to Browser Service immediately...")
-                    logger.info(f"   Full context ({len(all_messages)} messages) sent to Browser Service")
+                    logger.info(f"   Context: {len(all_messages)} messages ({'delta' if context_cursor is not None else 'full'})")
                     logger.info(f"   Latest user message: {message.content[:100]}...")
                     logger.info(f"   Session ID: {session_id}")
                     
@@ -598,9 +888,9 @@ async def run_bot(webrtc_connection, ws_connections):
                         processing_task["task_id"] = session_id
                         await push_to_browser_service(
                             context,
-                            ws_connections,
                             session_id,
-                            processing_task
+                            processing_task,
+                            cursor=context_cursor
                         )
 
                     try:
@@ -626,13 +916,8 @@ async def run_bot(webrtc_connection, ws_connections):
         params=TransportParams(
             audio_in_enabled=True,
             audio_out_enabled=True,
-            vad_analyzer=SileroVADAnalyzer(
-                params=VADParams(
-                    stop_secs=5.0,  # Increase to 5 seconds to allow longer pauses
-                    start_secs=0.1,
-                    min_volume=0.6
-                )
-            ),
+            vad_analyzer=vad_analyzer,
+            turn_analyzer=endpointer,
         ),
     )
 
@@ -856,6 +1141,8 @@ async def run_bot(webrtc_connection, ws_connections):
     pipeline = Pipeline([
         transport.input(),
         stt,
+        partial_relay,                  # Partial transcripts -> WebSocket + early intents
+        vad_controller,                 # Per-context VAD params + end-of-turn metrics
         transcript.user(),              # Capture user messages từ STT
         context_aggregator.user(),
         llm,
@@ -868,16 +1155,9 @@ async def run_bot(webrtc_connection, ws_connections):
     # Create task
     task = PipelineTask(
         pipeline,
+        # VAD runs in the transport input (vad_analyzer above); PipelineParams has no VAD fields
         params=PipelineParams(
             allow_interruptions=True,
-            enable_vad=True,
-            vad_analyzer=SileroVADAnalyzer(
-                params=VADParams(
-                    stop_secs=5.0,  # Increase to 5 seconds to allow longer pauses
-                    start_secs=0.1,
-                    min_volume=0.6
-                )
-            ),
         ),
     )
 
@@ -885,9 +1165,12 @@ async def run_bot(webrtc_connection, ws_connections):
     runner = PipelineRunner()
     await runner.run(task)
 
-    # Save final transcript to DynamoDB only (no local file)
+    # Close the session in DynamoDB (messages were stored as they came)
     transcript_data["ended_at"] = datetime.now().isoformat()
-    dynamodb_service.save_session(transcript_data)
+    dynamodb_service.update_session(session_id, {
+        "ended_at": transcript_data["ended_at"],
+        "workflow_executions": transcript_data["workflow_executions"],
+    })
 
     logger.info(f"💾 Session completed. Transcript saved to DynamoDB (session: {session_id})")
 
@@ -1038,6 +1321,7 @@ async def auth_options(request):
 async def handle_offer(request):
     """Handle WebRTC offer"""
     headers = get_cors_headers(request)
+    decision = None
     
     try:
         logger.info("📥 Received WebRTC offer request")
@@ -1070,6 +1354,22 @@ async def handle_offer(request):
                 headers=headers
             )
         
+        # Take a session slot first: a full node answers 503 before any WebRTC work
+        decision = await admission.admit() if admission else None
+        if decision and not decision.admitted:
+            return web.json_response(
+                {
+                    "error": "Voice service is at capacity, please retry shortly",
+                    "type": "ServiceOverloaded",
+                    "reason": decision.reason,
+                    "retry_after": decision.retry_after,
+                },
+                status=503,
+                headers={**headers, "Retry-After": str(decision.retry_after)}
+            )
+        if decision and decision.waited:
+            headers = {**headers, "X-Admission-Wait": f"{decision.waited:.1f}"}
+        
         # Create WebRTC connection
         logger.info("🔧 Creating WebRTC connection...")
         webrtc_connection = SmallWebRTCConnection(ice_servers=ice_servers)
@@ -1088,12 +1388,18 @@ async def handle_offer(request):
         
         # Start bot pipeline
         logger.info("🚀 Starting bot pipeline...")
-        asyncio.create_task(run_bot(webrtc_connection, ws_connections))
+        session_id = new_session_id()
+        ws_hub.open_session(session_id)  # replay buffer until run_admitted_bot ends the session
+        asyncio.create_task(run_admitted_bot(webrtc_connection, session_id))
+        decision = None  # the slot now belongs to the bot task
         
-        logger.info("✅ Bot pipeline started successfully, returning answer to client")
-        return web.json_response(answer, headers=headers)
+        logger.info(f"✅ Bot pipeline started successfully (session: {session_id}), returning answer to client")
+        # The client subscribes its /ws connection to this session's transcript
+        return web.json_response({**answer, "session_id": session_id}, headers=headers)
         
     except Exception as e:
+        if decision and decision.admitted:
+            admission.release()
         logger.error(f"❌ Error handling offer: {e}", exc_info=True)
         return web.json_response(
             {"error": str(e), "type": "WebRTCConnectionError"},
@@ -1167,24 +1473,76 @@ async def get_session(request):
         }, status=500)
 
 
+@routes.get("/api/sessions/{session_id}/messages")
+async def get_session_messages(request):
+    """Page through a session's messages (?after=<seq>&limit=N, next page from next_seq)"""
+    try:
+        session_id = request.match_info["session_id"]
+        limit = max(1, min(int(request.query.get("limit", 100)), 500))
+        after_seq = int(request.query.get("after", 0))
+        if after_seq < 0:
+            raise ValueError("after must be non-negative")
+
+        page = dynamodb_service.get_messages(session_id, limit=limit, after_seq=after_seq)
+        page = _to_jsonable(page)
+
+        return web.json_response({
+            "success": True,
+            "session_id": session_id,
+            "messages": page["items"],
+            "count": page["count"],
+            "next_seq": page["next_seq"]
+        })
+    except ValueError:
+        return web.json_response({
+            "success": False,
+            "error": "after must be a non-negative integer and limit an integer"
+        }, status=400)
+    except Exception as e:
+        logger.error(f"❌ Failed to get session messages: {e}", exc_info=True)
+        return web.json_response({
+            "success": False,
+            "error": str(e)
+        }, status=500)
+
+
 @routes.get("/ws")
 async def websocket_handler(request):
-    """WebSocket for transcript streaming"""
+    """
+    WebSocket for transcript streaming
+
+    A client receives the sessions it subscribes to: ?session_id=... on
+    connect, or {"type": "subscribe" | "unsubscribe", "session_id": ...}
+    messages (the session id comes back from POST /offer).
+    """
     ws = web.WebSocketResponse()
     await ws.prepare(request)
     
-    ws_connections.add(ws)
-    logger.info(f"📡 WebSocket connected. Total connections: {len(ws_connections)}")
+    ws_hub.register(ws)
+    if request.query.get("session_id"):
+        ws_hub.subscribe(ws, request.query["session_id"])
+    logger.info(f"📡 WebSocket connected. Total connections: {ws_hub.get_stats()['clients']}")
     
     try:
         async for msg in ws:
             if msg.type == web.WSMsgType.TEXT:
                 logger.debug(f"Received WS message: {msg.data}")
+                try:
+                    data = json.loads(msg.data)
+                except ValueError:
+                    continue
+                if not isinstance(data, dict) or not data.get("session_id"):
+                    continue
+                if data.get("type") == "subscribe":
+                    replayed = ws_hub.subscribe(ws, str(data["session_id"]))
+                    logger.info(f"📡 WebSocket subscribed to session {data['session_id']} ({replayed} replayed)")
+                elif data.get("type") == "unsubscribe":
+                    ws_hub.unsubscribe(ws, str(data["session_id"]))
     except Exception as e:
         logger.error(f"WebSocket error: {e}")
     finally:
-        ws_connections.discard(ws)
-        logger.info(f"📡 WebSocket disconnected. Remaining: {len(ws_connections)}")
+        ws_hub.unregister(ws)
+        logger.info(f"📡 WebSocket disconnected. Remaining: {ws_hub.get_stats()['clients']}")
     
     return ws
 
@@ -1193,6 +1551,8 @@ def create_app():
     """Create aiohttp application"""
     app = web.Application()
     app.add_routes(routes)
+    # Admission, VAD/STT and CPU budget metrics for Prometheus
+    setup_metrics_endpoint(app, path="/metrics")
     
     # CORS middleware
     async def cors_middleware(app, handler):
@@ -1210,6 +1570,32 @@ def create_app():
         return middleware
     
     app.middlewares.append(cors_middleware)
+
+    # Load the shared STT model before the first call instead of on it
+    async def warm_up_stt(app):
+        if stt_settings()["prewarm"]:
+            await stt_registry.warmup()
+        if shared_vad_settings()["enabled"]:
+            await shared_vad.ensure_loaded()
+        if admission:
+            admission.start()
+        if peer_relay is not None:
+            # Calls in other workers publish to WebSockets subscribed here, and the other way round
+            peer_relay.start()
+
+    # Pooled Browser Service connections, STT and VAD workers live as long as the app
+    async def close_shared_clients(app):
+        await browser_client.close()
+        await stt_registry.close()
+        await shared_vad.close()
+        if admission:
+            await admission.stop()
+        if peer_relay is not None:
+            await peer_relay.close()
+        ws_hub.close()
+
+    app.on_startup.append(warm_up_stt)
+    app.on_cleanup.append(close_shared_clients)
     
     return app
 
@@ -0,0 +1,192 @@
+"""
+Multi-worker Voice Bot
+Supervisor that runs N voice bot processes on one SO_REUSEPORT port around a single STT model host
+"""
+import asyncio
+import math
+import multiprocessing
+import os
+import signal
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+
+from src.monitoring.metrics import websocket_messages_dropped_total
+
+
+def worker_settings() -> Dict[str, Any]:
+    """Voice worker processes from environment (VOICE_WORKERS > 1 enables the supervisor)."""
+    return {
+        "workers": int(os.getenv("VOICE_WORKERS", "1")),
+        "model_host_socket": os.getenv("VOICE_MODEL_HOST_SOCKET", "/tmp/vpbank-voice-models.sock"),
+    }
+
+
+def worker_index() -> Optional[int]:
+    """Index of this voice worker process (None outside the supervisor)."""
+    index = os.getenv("VOICE_WORKER_INDEX")
+    return int(index) if index is not None else None
+
+
+def worker_environment(index: int, workers: int, socket_path: str) -> Dict[str, str]:
+    """Environment of one worker: its index, the model host and its share of the node's admission limits."""
+    env = {"VOICE_WORKER_INDEX": str(index), "VOICE_MODEL_HOST_SOCKET": socket_path}
+    # Each worker's inference depth only counts its own requests to the shared model host
+    limits = (("ADMISSION_MAX_SESSIONS", "20"), ("ADMISSION_MAX_QUEUED", "5"), ("ADMISSION_MAX_INFERENCE_QUEUE", "32"))
+    for name, default in limits:
+        env[name] = str(max(1, math.ceil(int(os.getenv(name, default)) / workers)))
+    return env
+
+
+class PeerWorkersRelay:
+    """
+    Fan-out of this worker's WebSocket hub to the other workers
+
+    The kernel spreads /ws connections and calls over the workers, so a
+    call's events must reach clients subscribed in other processes. As the
+    hub's relay, forward() queues every local publish and session open/end
+    (bounded, never blocking the call) for one sender task that publishes
+    them, in order, through the model host; deliver() applies the other
+    workers' envelopes to the local hub without relaying them again, so
+    peers buffer a call's replay only while it runs.
+    """
+
+    def __init__(self, hub, client, max_queued: int = 256):
+        self.hub = hub
+        self.client = client
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queued)
+        self._sender: Optional[asyncio.Task] = None
+        self.dropped = 0
+
+    def start(self) -> None:
+        self.hub.set_relay(self.forward)
+        self.client.subscribe(self.deliver)
+        if self._sender is None or self._sender.done():
+            self._sender = asyncio.create_task(self._send())
+
+    def forward(self, envelope: Dict[str, Any]) -> None:
+        try:
+            self._queue.put_nowait(envelope)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            websocket_messages_dropped_total.labels(reason="relay_full").inc()
+
+    async def _send(self) -> None:
+        while True:
+            envelope = await self._queue.get()
+            try:
+                await self.client.publish(envelope)
+            except Exception as e:
+                logger.debug(f"Broadcast to other workers failed: {e}")
+
+    async def deliver(self, envelope: Dict[str, Any]) -> None:
+        """Apply another worker's publish or session open/end to this worker's hub."""
+        session_id = envelope["session_id"]
+        event = envelope.get("event")
+        if event == "open":
+            self.hub.open_session(session_id, relay=False)
+        elif event == "end":
+            self.hub.end_session(session_id, relay=False)
+        else:
+            self.hub.publish(session_id, envelope["message"], relay=False)
+
+    async def close(self) -> None:
+        self.hub.set_relay(None)
+        if self._sender is not None:
+            self._sender.cancel()
+            await asyncio.gather(self._sender, return_exceptions=True)
+            self._sender = None
+
+
+def _worker_main(env: Dict[str, str], host: str, port: int) -> None:
+    """Worker process entry point: a full voice bot app on the shared port."""
+    os.environ.update(env)
+    from aiohttp import web
+    from src.voice_bot import create_app
+
+    logger.info(f"🎤 Voice worker {env['VOICE_WORKER_INDEX']} (pid {os.getpid()}) serving {host}:{port}")
+    web.run_app(create_app(), host=host, port=port, reuse_port=True, print=None)
+
+
+class VoiceSupervisor:
+    """
+    Runs the STT model host and N voice worker processes
+
+    Each worker is a complete voice bot (WebRTC, pipelines, VAD, TTS,
+    LLM) with its own interpreter and GIL, listening on the same port
+    through SO_REUSEPORT. The STT weights are loaded once, here, and
+    workers transcribe through the model host; Silero VAD (2 MB) stays in
+    each worker. Sessions are read from DynamoDB, so /api/sessions works
+    on any worker, and /ws hub messages are relayed between workers by
+    the model host. Dead workers are restarted.
+
+    Example:
+        VoiceSupervisor("0.0.0.0", 7860, workers=4).run()
+    """
+
+    def __init__(self, host: str, port: int, workers: int, socket_path: str = "/tmp/vpbank-voice-models.sock"):
+        self.host = host
+        self.port = port
+        self.workers = max(1, workers)
+        self.socket_path = socket_path
+        self._mp = multiprocessing.get_context("spawn")
+        self._processes: List[Optional[multiprocessing.Process]] = [None] * self.workers
+        self.restarts = 0
+
+    def _spawn(self, index: int) -> None:
+        env = worker_environment(index, self.workers, self.socket_path)
+        process = self._mp.Process(target=_worker_main, args=(env, self.host, self.port),
+                                   name=f"voice-worker-{index}", daemon=False)
+        process.start()
+        self._processes[index] = process
+
+    def run(self) -> None:
+        # The workers' event loops are reserved out of this process's CPU budget
+        os.environ.setdefault("CPU_RESERVED_THREADS", str(self.workers))
+        asyncio.run(self._run())
+
+    async def _run(self) -> None:
+        from src.speech.model_host import ModelHostServer
+        from src.speech.stt_pool import stt_registry, stt_settings
+
+        host = ModelHostServer(stt_registry)
+        await host.start(self.socket_path)
+        if stt_settings()["prewarm"]:
+            await stt_registry.warmup()
+
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, stop.set)
+
+        for index in range(self.workers):
+            self._spawn(index)
+        logger.info(f"🚀 {self.workers} voice workers on {self.host}:{self.port} (SO_REUSEPORT)")
+
+        try:
+            while not stop.is_set():
+                try:
+                    await asyncio.wait_for(stop.wait(), 1.0)
+                except asyncio.TimeoutError:
+                    pass
+                for index, process in enumerate(self._processes):
+                    if not stop.is_set() and process is not None and not process.is_alive():
+                        logger.error(f"❌ Voice worker {index} exited ({process.exitcode}); restarting")
+                        self.restarts += 1
+                        self._spawn(index)
+        finally:
+            logger.info("🛑 Stopping voice workers...")
+            self.stop_workers()
+            await host.close()
+            await stt_registry.close()
+
+    def stop_workers(self, timeout: float = 10.0) -> None:
+        for process in self._processes:
+            if process is not None and process.is_alive():
+                process.terminate()
+        for process in self._processes:
+            if process is not None:
+                process.join(timeout)
+                if process.is_alive():
+                    process.kill()
+                    process.join(1.0)
@@ -0,0 +1,280 @@
+"""
+WebSocket Hub
+Session-scoped fan-out of call events to /ws clients through bounded per-client send queues
+"""
+import asyncio
+import os
+from collections import OrderedDict, deque
+from typing import Any, Callable, Deque, Dict, Optional, Set
+
+from loguru import logger
+
+from src.monitoring.metrics import (
+    websocket_clients_closed_total,
+    websocket_connections_active,
+    websocket_messages_dropped_total,
+)
+
+SLOW_CLIENT_POLICIES = ("drop_oldest", "close")
+
+
+def ws_hub_settings() -> Dict[str, Any]:
+    """WebSocket fan-out limits from environment."""
+    return {
+        # Messages waiting for one client before the slow-client policy applies
+        "queue_size": int(os.getenv("WS_SEND_QUEUE_SIZE", "64")),
+        # drop_oldest: a full queue sheds its oldest message; close: the client is disconnected
+        "slow_client_policy": os.getenv("WS_SLOW_CLIENT_POLICY", "drop_oldest").lower(),
+        # A single send slower than this disconnects the client
+        "send_timeout_secs": float(os.getenv("WS_SEND_TIMEOUT_SECS", "5")),
+        # Recent messages per session replayed to a client that subscribes mid-call
+        "replay_messages": int(os.getenv("WS_REPLAY_MESSAGES", "20")),
+        # Replay buffers kept at most (oldest evicted first, e.g. when an end-of-session was lost)
+        "replay_sessions": int(os.getenv("WS_REPLAY_SESSIONS", "1000")),
+    }
+
+
+class WsClient:
+    """
+    One /ws connection: its session subscriptions, send queue and writer task
+
+    offer() never waits: the message is queued for the writer task, and a
+    full queue either drops its oldest message or closes the client.
+    """
+
+    def __init__(self, ws, queue_size: int, policy: str, send_timeout: float,
+                 on_close: Callable[["WsClient"], None]):
+        self.ws = ws
+        self.sessions: Set[str] = set()
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, queue_size))
+        self.policy = policy
+        self.send_timeout = send_timeout
+        self.sent = 0
+        self.dropped = 0
+        self.closed = False
+        self._on_close = on_close
+        self._writer = asyncio.create_task(self._write())
+
+    def offer(self, message: Dict[str, Any]) -> bool:
+        """Queue a message; False if it was not queued (client closed or closed for being slow)."""
+        if self.closed:
+            return False
+        try:
+            self.queue.put_nowait(message)
+            return True
+        except asyncio.QueueFull:
+            pass
+        if self.policy == "close":
+            websocket_messages_dropped_total.labels(reason="client_closed").inc()
+            self.close("slow")
+            return False
+        self.queue.get_nowait()
+        self.queue.put_nowait(message)
+        self.dropped += 1
+        websocket_messages_dropped_total.labels(reason="queue_full").inc()
+        return True
+
+    async def _write(self) -> None:
+        try:
+            while True:
+                message = await self.queue.get()
+                await asyncio.wait_for(self.ws.send_json(message), self.send_timeout)
+                self.sent += 1
+        except asyncio.CancelledError:
+            raise
+        except asyncio.TimeoutError:
+            logger.warning(f"⚠️ WebSocket send took over {self.send_timeout:.1f}s; closing client")
+            self.close("timeout")
+        except Exception as e:
+            logger.warning(f"Failed to send to WebSocket: {e}")
+            self.close("error")
+
+    def close(self, reason: Optional[str] = None) -> None:
+        """Stop the writer and detach from the hub; reason closes the socket too (counted in metrics)."""
+        if self.closed:
+            return
+        self.closed = True
+        if self._writer is not asyncio.current_task():
+            self._writer.cancel()
+        self._on_close(self)
+        if reason is not None:
+            websocket_clients_closed_total.labels(reason=reason).inc()
+            # 1013 Try Again Later: the frontend reconnects and subscribes again
+            asyncio.create_task(self._close_socket())
+
+    async def _close_socket(self) -> None:
+        try:
+            await self.ws.close(code=1013, message=b"slow consumer")
+        except Exception as e:
+            logger.debug(f"WebSocket close failed: {e}")
+
+
+class WebSocketHub:
+    """
+    Pub/sub between the calls of this process and its /ws clients
+
+    Clients subscribe to session ids; publish() queues a message for the
+    subscribers of that session only, so one broadcast costs
+    O(subscribers of the session) and never waits on a socket. Each client
+    has its own writer task, so a slow client only delays itself. The last
+    replay_messages of every open session (open_session() to end_session())
+    are kept for clients that subscribe mid-call (the frontend learns the
+    session id from /offer); at most replay_sessions buffers are kept. An
+    optional relay hands every local publish, open and end to other
+    processes.
+
+    Example:
+        hub = WebSocketHub.from_settings()
+        hub.register(ws)
+        hub.open_session(session_id)
+        hub.subscribe(ws, session_id)
+        hub.publish(session_id, {"type": "transcript", "message": msg})
+        hub.end_session(session_id)
+    """
+
+    def __init__(self, queue_size: int = 64, slow_client_policy: str = "drop_oldest",
+                 send_timeout_secs: float = 5.0, replay_messages: int = 20, replay_sessions: int = 1000):
+        if slow_client_policy not in SLOW_CLIENT_POLICIES:
+            raise ValueError(f"Unknown slow client policy '{slow_client_policy}' (use {', '.join(SLOW_CLIENT_POLICIES)})")
+        self.queue_size = queue_size
+        self.slow_client_policy = slow_client_policy
+        self.send_timeout_secs = send_timeout_secs
+        self.replay_messages = replay_messages
+        self.replay_sessions = max(1, replay_sessions)
+        self._clients: Dict[Any, WsClient] = {}
+        self._sessions: Dict[str, Set[WsClient]] = {}
+        self._recent: "OrderedDict[str, Deque[Dict[str, Any]]]" = OrderedDict()
+        self._relay: Optional[Callable[[Dict[str, Any]], None]] = None
+        self.stats = {"published": 0, "delivered": 0, "closed_slow": 0}
+
+    @classmethod
+    def from_settings(cls, settings: Optional[Dict[str, Any]] = None) -> "WebSocketHub":
+        settings = settings or ws_hub_settings()
+        return cls(
+            queue_size=settings["queue_size"],
+            slow_client_policy=settings["slow_client_policy"],
+            send_timeout_secs=settings["send_timeout_secs"],
+            replay_messages=settings["replay_messages"],
+            replay_sessions=settings["replay_sessions"],
+        )
+
+    def register(self, ws) -> WsClient:
+        client = self._clients.get(ws)
+        if client is None:
+            client = WsClient(ws, self.queue_size, self.slow_client_policy,
+                              self.send_timeout_secs, on_close=self._detach)
+            self._clients[ws] = client
+            websocket_connections_active.set(len(self._clients))
+        return client
+
+    def unregister(self, ws) -> None:
+        client = self._clients.get(ws)
+        if client is not None:
+            client.close()
+
+    def _detach(self, client: WsClient) -> None:
+        if self._clients.get(client.ws) is client:
+            del self._clients[client.ws]
+        for session_id in client.sessions:
+            subscribers = self._sessions.get(session_id)
+            if subscribers is not None:
+                subscribers.discard(client)
+                if not subscribers:
+                    del self._sessions[session_id]
+        client.sessions.clear()
+        websocket_connections_active.set(len(self._clients))
+
+    def subscribe(self, ws, session_id: str) -> int:
+        """Subscribe a registered client to a session; returns the number of replayed messages."""
+        client = self.register(ws)
+        if session_id in client.sessions:
+            return 0
+        client.sessions.add(session_id)
+        self._sessions.setdefault(session_id, set()).add(client)
+        replayed = 0
+        for message in list(self._recent.get(session_id, ())):
+            if client.offer(message):
+                replayed += 1
+        return replayed
+
+    def unsubscribe(self, ws, session_id: str) -> None:
+        client = self._clients.get(ws)
+        if client is None or session_id not in client.sessions:
+            return
+        client.sessions.discard(session_id)
+        subscribers = self._sessions.get(session_id)
+        if subscribers is not None:
+            subscribers.discard(client)
+            if not subscribers:
+                del self._sessions[session_id]
+
+    def publish(self, session_id: str, message: Dict[str, Any], relay: bool = True) -> int:
+        """
+        Queue a message for the subscribers of a session (never blocks)
+
+        Args:
+            session_id: Session the message belongs to
+            message: JSON-serializable message
+            relay: Also hand it to the relay (False for messages that came from it)
+
+        Returns:
+            Number of local clients the message was queued for
+        """
+        self.stats["published"] += 1
+        # Only open sessions are buffered: late publishes (after end_session) are not kept
+        recent = self._recent.get(session_id)
+        if recent is not None:
+            recent.append(message)
+        delivered = 0
+        for client in list(self._sessions.get(session_id, ())):
+            if client.offer(message):
+                delivered += 1
+            elif client.closed:
+                self.stats["closed_slow"] += 1
+        self.stats["delivered"] += delivered
+        if relay and self._relay is not None:
+            self._relay({"session_id": session_id, "message": message})
+        return delivered
+
+    def open_session(self, session_id: str, relay: bool = True) -> None:
+        """Start keeping a live session's recent messages for replay (evicting the oldest buffer when full)."""
+        if self.replay_messages > 0 and session_id not in self._recent:
+            self._recent[session_id] = deque(maxlen=self.replay_messages)
+            while len(self._recent) > self.replay_sessions:
+                self._recent.popitem(last=False)
+        if relay and self._relay is not None:
+            self._relay({"session_id": session_id, "event": "open"})
+
+    def end_session(self, session_id: str, relay: bool = True) -> None:
+        """Forget a finished session's replay buffer here and in other processes (subscribers stay)."""
+        self._recent.pop(session_id, None)
+        if relay and self._relay is not None:
+            self._relay({"session_id": session_id, "event": "end"})
+
+    def set_relay(self, relay: Optional[Callable[[Dict[str, Any]], None]]) -> None:
+        """
+        Non-blocking callback for cross-process fan-out
+
+        Receives {"session_id", "message"} for every local publish and
+        {"session_id", "event": "open" | "end"} for session boundaries.
+        """
+        self._relay = relay
+
+    def close(self) -> None:
+        for client in list(self._clients.values()):
+            client.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "clients": len(self._clients),
+            "sessions": len(self._sessions),
+            "replay_buffers": len(self._recent),
+            "dropped": sum(client.dropped for client in self._clients.values()),
+            "queued": sum(client.queue.qsize() for client in self._clients.values()),
+            "policy": self.slow_client_policy,
+        }
+
+
+# Process-wide hub used by the voice bot's /ws endpoint and its calls
+ws_hub = WebSocketHub.from_settings()
@@ -0,0 +1,89 @@
+"""
+Tests for admission control of new WebRTC calls
+"""
+import asyncio
+
+import pytest
+
+from src.admission_control import AdmissionController
+
+
+def make_controller(**overrides) -> AdmissionController:
+    settings = dict(max_sessions=2, max_queued=2, max_wait_secs=1.0, max_inference_queue=10,
+                    max_loop_lag_secs=0.25, session_secs=1.0, retry_after_secs=5)
+    settings.update(overrides)
+    return AdmissionController(**settings)
+
+
+@pytest.mark.asyncio
+async def test_calls_are_accepted_up_to_the_session_limit_then_queued():
+    admission = make_controller()
+    first, second = await admission.admit(), await admission.admit()
+    assert first.admitted and second.admitted and admission.active == 2
+
+    waiting = asyncio.create_task(admission.admit())
+    await asyncio.sleep(0.01)
+    assert admission.get_stats()["queued_now"] == 1
+
+    admission.release(session_secs=1.0)  # a call ends; its slot goes to the queued offer
+    decision = await waiting
+
+    assert decision.admitted and decision.reason == "queued"
+    assert decision.estimated_wait == pytest.approx(0.5)  # 1 position x 1 s call / 2 slots
+    assert admission.active == 2 and admission.get_stats()["queued_now"] == 0
+
+
+@pytest.mark.asyncio
+async def test_offers_are_rejected_with_retry_after_when_the_wait_is_too_long():
+    admission = make_controller(max_sessions=1, session_secs=120.0)
+    await admission.admit()
+
+    decision = await admission.admit()
+
+    assert not decision.admitted and decision.reason == "wait_too_long"
+    assert decision.retry_after == 120  # estimated wait rounded up
+
+
+@pytest.mark.asyncio
+async def test_queue_is_bounded_and_waits_time_out():
+    admission = make_controller(max_sessions=1, max_queued=1, max_wait_secs=0.05, session_secs=0.01)
+    await admission.admit()
+    queued = asyncio.create_task(admission.admit())
+    await asyncio.sleep(0)
+
+    full = await admission.admit()
+    timed_out = await queued
+
+    assert full.reason == "queue_full" and not full.admitted
+    assert timed_out.reason == "timeout" and timed_out.retry_after == 5
+    assert admission.active == 1 and admission.get_stats()["queued_now"] == 0
+
+
+@pytest.mark.asyncio
+async def test_overloaded_node_rejects_new_calls_even_with_free_slots():
+    depth = {"value": 0}
+    admission = make_controller(max_sessions=10, inference_depth=lambda: depth["value"])
+
+    depth["value"] = 11
+    assert (await admission.admit()).reason == "inference_queue"
+
+    depth["value"] = 0
+    admission.loop_lag = 0.5
+    assert (await admission.admit()).reason == "loop_lag"
+    assert admission.active == 0 and admission.stats["rejected"] == 2
+
+
+@pytest.mark.asyncio
+async def test_loop_lag_watch_measures_blocked_loop():
+    import time
+
+    admission = make_controller(lag_interval=0.01)
+    admission.start()
+    try:
+        await asyncio.sleep(0.02)
+        time.sleep(0.1)  # something blocks the event loop
+        await asyncio.sleep(0.02)
+    finally:
+        await admission.stop()
+
+    assert admission.loop_lag >= 0.05
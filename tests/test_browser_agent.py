@@ -70,6 +70,37 @@ class TestBrowserAgentHandler:
                     assert "message" in result
                     assert session_id in browser_agent.sessions
                     assert browser_agent.sessions[session_id]["session_data"]["type"] == form_type
+                    # The session owns the context, so its form page survives agent.run
+                    assert mock_agent.call_args.kwargs["browser_context"] is not None
+
+    @pytest.mark.asyncio
+    async def test_start_form_session_uses_page_pool(self, browser_agent, mock_browser):
+        """Test a pre-loaded pooled context skips the LLM navigation run"""
+        pooled = Mock(context=Mock())
+        browser_agent.page_pool = Mock()
+        browser_agent.page_pool.available = Mock(return_value=1)
+        browser_agent.page_pool.acquire = AsyncMock(return_value=pooled)
+        browser_agent.page_pool.release = AsyncMock()
+
+        with patch.object(browser_agent, '_ensure_browser', return_value=mock_browser):
+            with patch.object(browser_agent, '_get_llm', return_value=Mock()):
+                with patch('src.browser_agent.BrowserUseAgent') as mock_agent:
+                    mock_agent_instance = AsyncMock()
+                    mock_agent.return_value = mock_agent_instance
+
+                    result = await browser_agent.start_form_session(
+                        form_url="https://vpbank-shared-form-fastdeploy.vercel.app/",
+                        form_type="loan",
+                        session_id="pooled-session"
+                    )
+
+                    assert result["success"] is True
+                    assert result["session"]["pooled"] is True
+                    assert mock_agent.call_args.kwargs["browser_context"] is pooled.context
+                    mock_agent_instance.run.assert_not_called()
+
+        await browser_agent._close_session("pooled-session")
+        browser_agent.page_pool.release.assert_awaited_once_with(pooled)
 
     @pytest.mark.asyncio
     async def test_start_form_session_reuse(self, browser_agent):
@@ -101,6 +132,33 @@ class TestBrowserAgentHandler:
         assert "Reusing" in result["message"]
         mock_agent.add_new_task.assert_called_once()
 
+    @pytest.mark.asyncio
+    async def test_load_form_schema_skips_extraction_off_the_form(self, browser_agent):
+        """A page that left the form (e.g. a fresh about:blank tab) is never extracted"""
+        page = Mock(url="about:blank")
+        session = {"page": page}
+
+        with patch('src.browser_agent.form_schema_cache') as cache:
+            cache.ensure = AsyncMock()
+            cache.get.return_value = "cached"
+            schema = await browser_agent._load_form_schema(session, "https://test.com/", "loan")
+
+        assert schema == "cached"
+        cache.ensure.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_start_form_session_reuse_compacts_history(self, browser_agent):
+        """Reopening a form on a reused session goes through history compaction"""
+        mock_agent = AsyncMock()
+        mock_agent.add_new_task = Mock()
+        browser_agent.sessions["s1"] = {"agent": mock_agent, "session_data": {"fields_filled": []}}
+
+        with patch('src.browser_agent.compact_agent_history', return_value=True) as compact:
+            await browser_agent.start_form_session("https://test.com", "loan", session_id="s1")
+
+        compact.assert_called_once()
+        assert browser_agent.sessions["s1"]["compactions"] == 1
+
     @pytest.mark.asyncio
     async def test_fill_field_incremental_success(self, browser_agent):
         """Test filling a single field incrementally"""
@@ -131,6 +189,204 @@ class TestBrowserAgentHandler:
         assert result["value"] == value
         assert len(browser_agent.sessions[session_id]["session_data"]["fields_filled"]) == 1
 
+    @pytest.mark.asyncio
+    async def test_fill_field_incremental_dom_fast_path(self, browser_agent):
+        """Test filling a known selector directly through the Playwright page"""
+        session_id = "dom-session"
+        mock_agent = AsyncMock()
+        mock_agent.add_new_task = Mock()
+        mock_agent.run = AsyncMock()
+        mock_page = AsyncMock()
+        mock_page.evaluate = AsyncMock(return_value={
+            "customerName": {"found": True, "verified": True, "observed": "Nguyen Van An"}
+        })
+
+        browser_agent.sessions[session_id] = {
+            "agent": mock_agent,
+            "page": mock_page,
+            "session_data": {"fields_filled": []}
+        }
+
+        result = await browser_agent.fill_field_incremental(
+            field_name="customerName",
+            value="Nguyen Van An",
+            session_id=session_id
+        )
+
+        assert result["success"] is True
+        assert result["path"] == "dom"
+        mock_page.evaluate.assert_awaited_once()
+        mock_agent.run.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_concurrent_fills_are_serialized_and_coalesced(self, browser_agent):
+        """Fills arriving while the session is busy run as one merged batch"""
+        import asyncio
+
+        session_id = "busy-session"
+        tasks = []
+        runs = []
+        first_started, release_first = asyncio.Event(), asyncio.Event()
+
+        async def gated_run(*args, **kwargs):
+            runs.append(len(tasks))
+            if len(runs) == 1:  # the first batch holds the session until released
+                first_started.set()
+                await release_first.wait()
+
+        mock_agent = AsyncMock()
+        mock_agent.add_new_task = Mock(side_effect=tasks.append)
+        mock_agent.run = AsyncMock(side_effect=gated_run)
+        browser_agent.sessions[session_id] = {"agent": mock_agent, "session_data": {"fields_filled": []}}
+
+        first = asyncio.create_task(browser_agent.fill_field_incremental("customerName", "An", session_id))
+        await asyncio.wait_for(first_started.wait(), 1.0)
+        queued = [
+            asyncio.create_task(browser_agent.fill_field_incremental("phoneNumber", "0901234567", session_id)),
+            asyncio.create_task(browser_agent.fill_field_incremental("customerName", "Bao", session_id)),
+            asyncio.create_task(browser_agent.fill_field_incremental("customerName", "Binh", session_id)),
+        ]
+
+        async def all_queued():
+            while browser_agent.actors.get_stats()[session_id]["coalesced"] < 2:
+                await asyncio.sleep(0)
+
+        # However long tracing takes to get them there, all three wait behind the running batch
+        await asyncio.wait_for(all_queued(), 1.0)
+        assert browser_agent.actors.get_stats()[session_id]["queued"] == 1
+        release_first.set()
+        first_result = await first
+        phone, bao, binh = await asyncio.gather(*queued)
+
+        # The queued fills ran as one merged second batch
+        assert mock_agent.run.await_count == 2
+        assert "An" in tasks[0]
+        assert "phoneNumber" in tasks[1] and "Binh" in tasks[1] and "Bao" not in tasks[1]
+        assert first_result["success"] is True
+        assert bao["superseded"] is True and bao["applied_value"] == "Binh"
+        assert phone["coalesced"] is True and phone["path"] == "agent"
+        assert binh["path"] == "agent"
+
+        filled = browser_agent.sessions[session_id]["session_data"]["fields_filled"]
+        assert {"field": "customerName", "value": "Binh"} in filled
+
+        await browser_agent.fill_field_incremental("customerName", "Chi", session_id)
+        assert mock_agent.run.await_count == 3
+
+    @pytest.mark.asyncio
+    async def test_fill_field_incremental_resolves_name_via_schema(self, browser_agent):
+        """Test Vietnamese field names are mapped through the cached form schema"""
+        from src.automation.form_schema import FormSchema, FormField
+
+        session_id = "schema-session"
+        mock_agent = AsyncMock()
+        mock_agent.add_new_task = Mock()
+        mock_page = AsyncMock()
+        mock_page.evaluate = AsyncMock(return_value={
+            "phoneNumber": {"found": True, "verified": True, "observed": "0901234567"}
+        })
+        schema = FormSchema(
+            url="https://forms.example/loan",
+            content_hash="abc",
+            fields=[FormField(name="phoneNumber", type="tel", label="Số điện thoại")],
+        )
+
+        browser_agent.sessions[session_id] = {
+            "agent": mock_agent,
+            "page": mock_page,
+            "schema": schema,
+            "session_data": {"fields_filled": []}
+        }
+
+        result = await browser_agent.fill_field_incremental(
+            field_name="số điện thoại",
+            value="0901234567",
+            session_id=session_id
+        )
+
+        assert result["path"] == "dom"
+        sent_fields = mock_page.evaluate.await_args.args[1]["fields"]
+        assert list(sent_fields) == ["phoneNumber"]
+        mock_agent.run.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_fill_skips_dom_fast_path_off_the_form_page(self, browser_agent):
+        """A session whose tab is not on its form goes straight to the agent"""
+        session_id = "blank-page"
+        blank = AsyncMock()
+        blank.url = "about:blank"
+        mock_agent = AsyncMock()
+        mock_agent.add_new_task = Mock()
+        mock_agent.browser_context = Mock(get_current_page=AsyncMock(return_value=blank))
+
+        browser_agent.sessions[session_id] = {
+            "agent": mock_agent,
+            "session_data": {"url": "https://test.com/", "fields_filled": []}
+        }
+
+        result = await browser_agent.fill_field_incremental("customerName", "Nguyen Van An", session_id=session_id)
+
+        assert result["path"] == "agent"
+        blank.evaluate.assert_not_awaited()
+        mock_agent.run.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_fill_field_incremental_dom_fallback_to_agent(self, browser_agent):
+        """Test falling back to the LLM agent when the selector is missing"""
+        session_id = "dom-fallback"
+        mock_agent = AsyncMock()
+        mock_agent.add_new_task = Mock()
+        mock_agent.run = AsyncMock()
+        mock_page = AsyncMock()
+        mock_page.evaluate = AsyncMock(return_value={"loanPurpose": {"found": False}})
+
+        browser_agent.sessions[session_id] = {
+            "agent": mock_agent,
+            "page": mock_page,
+            "session_data": {"fields_filled": []}
+        }
+
+        result = await browser_agent.fill_field_incremental(
+            field_name="loanPurpose",
+            value="Mua nhà",
+            session_id=session_id
+        )
+
+        assert result["success"] is True
+        assert result["path"] == "agent"
+        mock_agent.run.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_fill_fields_parallel_mixed_paths(self, browser_agent):
+        """Test that only unresolved fields are sent to the LLM agent"""
+        session_id = "dom-mixed"
+        mock_agent = AsyncMock()
+        mock_agent.add_new_task = Mock()
+        mock_agent.run = AsyncMock()
+        mock_page = AsyncMock()
+        mock_page.evaluate = AsyncMock(return_value={
+            "customerName": {"found": True, "verified": True},
+            "loanPurpose": {"found": True, "verified": False, "reason": "option_not_found"},
+        })
+
+        browser_agent.sessions[session_id] = {
+            "agent": mock_agent,
+            "page": mock_page,
+            "session_data": {"fields_filled": []}
+        }
+
+        result = await browser_agent.fill_fields_parallel(
+            fields={"customerName": "Nguyen Van An", "loanPurpose": "Mua nhà"},
+            session_id=session_id
+        )
+
+        assert result["success"] is True
+        assert result["path"] == "mixed"
+        assert result["paths"] == {"customerName": "dom", "loanPurpose": "agent"}
+        task = mock_agent.add_new_task.call_args[0][0]
+        assert "loanPurpose" in task
+        assert "customerName" not in task
+
     @pytest.mark.asyncio
     async def test_fill_field_no_session(self, browser_agent):
         """Test filling field without active session"""
@@ -236,6 +492,86 @@ class TestBrowserAgentHandler:
         assert result["success"] is True
         assert result["value"] == "0901234567"
 
+    @pytest.mark.asyncio
+    async def test_read_field_value_from_page(self, browser_agent):
+        """Field values are read from the page in one evaluate call"""
+        session_id = "page-read"
+        mock_page = AsyncMock()
+        mock_page.evaluate = AsyncMock(return_value={"fields": {"loanTerm": {
+            "found": True, "name": "loanTerm", "label": "Kỳ hạn vay", "value": "12", "text": "12 tháng"}}})
+        browser_agent.sessions[session_id] = {"agent": AsyncMock(), "page": mock_page, "session_data": {"fields_filled": []}}
+
+        result = await browser_agent.read_field_value(field_name="loanTerm", session_id=session_id)
+
+        assert result["success"] is True
+        assert result["value"] == "12 tháng" and result["path"] == "dom"
+
+    @pytest.mark.asyncio
+    async def test_go_to_next_step_scripted(self, browser_agent):
+        """The wizard is advanced without agent steps"""
+        session_id = "wizard-session"
+        mock_agent = AsyncMock()
+        mock_page = AsyncMock()
+        mock_page.evaluate = AsyncMock(return_value={
+            "found": True, "moved": True, "from_step": 1, "to_step": 2, "steps": [1, 2], "title": "Thông tin khoản vay"})
+        browser_agent.sessions[session_id] = {"agent": mock_agent, "page": mock_page, "session_data": {"fields_filled": []}}
+
+        result = await browser_agent.go_to_next_step(session_id=session_id)
+
+        assert result["success"] is True
+        assert result["step"] == 2 and result["path"] == "dom"
+        mock_agent.run.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_submit_with_missing_fields_keeps_session(self, browser_agent):
+        """Invalid required fields are reported instead of submitting"""
+        session_id = "submit-invalid"
+        mock_agent = AsyncMock()
+        mock_page = MagicMock()
+        mock_page.evaluate = AsyncMock(return_value={"found": True, "submitted": False, "reason": "invalid", "invalid": [
+            {"name": "customerName", "label": "Họ và tên", "step": 1, "message": "required"}]})
+        browser_agent.sessions[session_id] = {"agent": mock_agent, "page": mock_page, "session_data": {"fields_filled": []}}
+
+        result = await browser_agent.submit_form_incremental(session_id=session_id)
+
+        assert result["success"] is False
+        assert "Họ và tên" in result["message"]
+        assert session_id in browser_agent.sessions
+        mock_agent.run.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_unconfirmed_submit_keeps_session(self, browser_agent):
+        """A click the page never acknowledged is not reported as submitted"""
+        session_id = "submit-unconfirmed"
+        browser_agent.sessions[session_id] = {"agent": AsyncMock(), "page": MagicMock(), "session_data": {"fields_filled": []}}
+        outcome = {"found": True, "submitted": True, "confirmed": False, "ok": True, "signal": None,
+                   "message": "", "duration_ms": 5000.0}
+
+        with patch('src.browser_agent.submit_form_dom', AsyncMock(return_value=outcome)):
+            result = await browser_agent.submit_form_incremental(session_id=session_id)
+
+        assert result["success"] is False
+        assert result["status"] == "unconfirmed"
+        assert session_id in browser_agent.sessions
+
+    @pytest.mark.asyncio
+    async def test_summarize_ignores_fields_left_at_page_default(self, browser_agent):
+        """Placeholder selects and unticked boxes are not reported as filled"""
+        session_id = "summary-defaults"
+        mock_page = AsyncMock()
+        mock_page.evaluate = AsyncMock(return_value={"fields": {
+            "customerName": {"found": True, "name": "customerName", "label": "Họ và tên",
+                             "value": "Nguyen Van An", "text": "Nguyen Van An", "changed": True},
+            "loanTerm": {"found": True, "name": "loanTerm", "label": "Kỳ hạn vay",
+                         "value": "12", "text": "12 tháng", "changed": False},
+        }})
+        browser_agent.sessions[session_id] = {"agent": AsyncMock(), "page": mock_page, "session_data": {"fields_filled": []}}
+
+        result = await browser_agent.summarize_filled_fields(session_id=session_id)
+
+        assert [f["field"] for f in result["fields"]] == ["customerName"]
+        assert result["path"] == "dom"
+
     @pytest.mark.asyncio
     async def test_read_field_value_missing(self, browser_agent):
         session_id = "missing-read"
@@ -452,3 +788,128 @@ class TestBrowserAgentHandler:
                     assert result["success"] is False
                     assert "error" in result
 
+
+    @pytest.mark.asyncio
+    async def test_execute_freeform_preempted_run_is_resumed(self, browser_agent, mock_browser):
+        """A superseded run stops between steps and the next run continues on its page"""
+        page = MagicMock()
+        page.url = "https://forms.example/loan"
+        page.evaluate = AsyncMock(return_value={
+            "fields": {"customerName": {"found": True, "value": "Nguyen Van An", "text": "Nguyen Van An"}},
+            "step": 1,
+        })
+        context = MagicMock()
+        context.get_current_page = AsyncMock(return_value=page)
+        context.close = AsyncMock()
+        tasks, steps = [], []
+
+        def make_agent(task, **kwargs):
+            tasks.append(task)
+            agent = MagicMock()
+            first_run = len(tasks) == 1
+
+            async def step():
+                steps.append(len(tasks))
+                if first_run:
+                    # The user corrected themselves while this step was running
+                    browser_agent.preempt_freeform(session_id="s1")
+
+            async def run(max_steps):
+                for _ in range(max_steps):
+                    await agent.step()
+                return "Đã điền"
+
+            agent.step = step
+            agent.run = run
+            agent.history = MagicMock(is_done=Mock(return_value=False))
+            return agent
+
+        with patch.object(browser_agent, '_get_llm', return_value=Mock()), \
+                patch.object(browser_agent, '_ensure_browser', return_value=mock_browser), \
+                patch('src.browser_agent.BrowserContext', return_value=context) as context_class, \
+                patch('src.browser_agent.BrowserUseAgent', side_effect=make_agent):
+            first = await browser_agent.execute_freeform("Điền đơn vay cho An", session_id="s1")
+            context.close.assert_not_awaited()  # parked for the next request
+            second = await browser_agent.execute_freeform("Điền đơn vay cho Bình", session_id="s1")
+
+        assert first["superseded"] is True and first["steps"] == 1
+        assert first["observed_fields"] == {"customerName": "Nguyen Van An"}
+        assert steps.count(1) == 1  # stopped right after the step in flight
+        assert second["success"] is True
+        assert "customerName: Nguyen Van An" in tasks[1]
+        context_class.assert_called_once()  # second run reused the parked context
+        context.close.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_prepare_form_opens_page_for_next_freeform_run(self, browser_agent, mock_browser):
+        """A form opened from a partial transcript is where the final request's run starts"""
+        page = MagicMock()
+        page.goto = AsyncMock()
+        context = MagicMock()
+        context.get_current_page = AsyncMock(return_value=page)
+        context.close = AsyncMock()
+        tasks = []
+
+        def make_agent(task, **kwargs):
+            tasks.append(task)
+            agent = MagicMock()
+            agent.run = AsyncMock(return_value="Đã điền")
+            agent.history = MagicMock(is_done=Mock(return_value=True))
+            return agent
+
+        with patch.object(browser_agent, '_get_llm', return_value=Mock()), \
+                patch.object(browser_agent, '_ensure_browser', return_value=mock_browser), \
+                patch('src.browser_agent.BrowserContext', return_value=context) as context_class, \
+                patch('src.browser_agent.BrowserUseAgent', side_effect=make_agent):
+            prepared = await browser_agent.prepare_form("loan", session_id="s1")
+            again = await browser_agent.prepare_form("crm", session_id="s1")
+            result = await browser_agent.execute_freeform("Điền đơn vay cho An", session_id="s1")
+
+        assert prepared["prepared"] is True
+        page.goto.assert_awaited_once()
+        assert page.goto.await_args.args[0] == prepared["url"]
+        assert again == {"success": True, "prepared": False, "reason": "busy"}
+        assert result["success"] is True
+        assert "opened in advance" in tasks[0] and prepared["url"] in tasks[0]
+        context_class.assert_called_once()  # the run reused the prepared context
+        stats = browser_agent.preemption.get_stats()
+        assert stats["prepared_used"] == 1 and stats["resumed"] == 0
+
+    @pytest.mark.asyncio
+    async def test_prepare_form_rejects_unknown_form_type(self, browser_agent):
+        result = await browser_agent.prepare_form("mortgage", session_id="s1")
+        assert result["success"] is False
+
+    @pytest.mark.asyncio
+    async def test_fill_form_replays_recorded_macro(self, browser_agent, mock_browser):
+        """A recorded macro fills the form without running the LLM agent"""
+        from src.automation.macros import Macro, MacroCache, MacroStep
+
+        url = "https://forms.example/loan"
+        cache = MacroCache()
+        cache.store(Macro(url=url, schema_hash="", slots=["customerName"], steps=[
+            MacroStep("fill", selector='[name="customerName"]', slot="customerName"),
+        ]))
+        page = MagicMock()
+        page.url = url
+        page.goto = AsyncMock()
+        page.locator.return_value.first.fill = AsyncMock()
+        context = MagicMock()
+        context.get_current_page = AsyncMock(return_value=page)
+        context.close = AsyncMock()
+
+        with patch.object(browser_agent, '_ensure_browser', return_value=mock_browser), \
+                patch('src.browser_agent.BrowserContext', return_value=context), \
+                patch('src.browser_agent.macro_cache', cache), \
+                patch('src.browser_agent.form_schema_cache') as schema_cache, \
+                patch('src.browser_agent.BrowserUseAgent') as mock_agent_class:
+            schema_cache.ensure = AsyncMock(side_effect=Exception("no schema"))
+            schema_cache.get.return_value = None
+
+            result = await browser_agent.fill_form(url, {"customerName": "Nguyen Van An"})
+
+        assert result["success"] is True
+        assert result["path"] == "macro"
+        mock_agent_class.assert_not_called()
+        page.locator.return_value.first.fill.assert_awaited_once_with("Nguyen Van An", timeout=5000.0)
+        context.close.assert_awaited_once()
@@ -0,0 +1,75 @@
+"""
+Tests for the pooled Browser Service client used by the voice bot
+"""
+import os
+import tempfile
+
+import pytest
+from aiohttp import web
+
+from src.browser_client import BrowserRequest, BrowserServiceClient
+
+
+def make_app():
+    async def execute(request):
+        body = await request.json()
+        if body["session_id"] == "stale":
+            return web.json_response({"success": False, "resync": True, "context_seq": 3}, status=409)
+        return web.json_response({"success": True, "echo": body})
+
+    async def broken(request):
+        return web.Response(text="upstream exploded", status=502)
+
+    app = web.Application()
+    app.router.add_post("/api/execute", execute)
+    app.router.add_get("/api/broken", broken)
+    return app
+
+
+def test_request_payload_carries_either_full_message_or_delta():
+    full = BrowserRequest(session_id="s1", request_id="r1", user_message="user: vay 500 triệu")
+    assert full.to_payload() == {"session_id": "s1", "request_id": "r1", "user_message": "user: vay 500 triệu"}
+
+    delta = BrowserRequest(session_id="s1", request_id="r2", user_message="INSTRUCTION: x", instructions=["INSTRUCTION: x"])
+    delta.set_context({"messages": [{"seq": 3, "role": "user", "content": "a"}], "base_seq": 2})
+    assert delta.to_payload() == {
+        "session_id": "s1", "request_id": "r2", "base_seq": 2,
+        "messages": [{"seq": 3, "role": "user", "content": "a"}],
+        "instructions": ["INSTRUCTION: x"],
+    }
+
+
+@pytest.mark.asyncio
+async def test_requests_reuse_pooled_connections(aiohttp_server):
+    server = await aiohttp_server(make_app())
+    client = BrowserServiceClient(base_url=str(server.make_url("")), unix_socket="")
+    try:
+        first = await client.post_json("/api/execute", {"session_id": "s1"})
+        second = await client.post_json("/api/execute", {"session_id": "s1"})
+        stale = await client.post_json("/api/execute", {"session_id": "stale"})
+        broken = await client.call("GET", "/api/broken")
+    finally:
+        await client.close()
+
+    assert first.status == 200 and second.result["echo"] == {"session_id": "s1"}
+    assert stale.resync and stale.result["context_seq"] == 3
+    assert broken.status == 502 and broken.result == "upstream exploded"
+    assert client.get_stats()["connections_new"] == 1
+    assert client.get_stats()["connections_reused"] == 3
+
+
+@pytest.mark.asyncio
+async def test_unix_socket_transport():
+    path = os.path.join(tempfile.mkdtemp(), "browser.sock")
+    runner = web.AppRunner(make_app())
+    await runner.setup()
+    await web.UnixSite(runner, path).start()
+    client = BrowserServiceClient(base_url="http://browser-service", unix_socket=path)
+    try:
+        response = await client.post_json("/api/execute", {"session_id": "s1"})
+    finally:
+        await client.close()
+        await runner.cleanup()
+
+    assert response.status == 200 and response.data["success"] is True
+    assert client.get_stats()["transport"] == "unix"
@@ -0,0 +1,126 @@
+"""
+Tests for multi-process browser sharding
+"""
+import asyncio
+import os
+import pytest
+
+from src.automation.sharding import ShardedBrowserAgent
+
+
+HANDLER = "tests.test_browser_sharding:EchoHandler"
+
+
+class EchoHandler:
+    """Minimal stand-in for BrowserAgentHandler running inside a shard"""
+
+    def __init__(self):
+        self.sessions = {}
+        self.on_session_closed = None
+
+    async def fill_field_incremental(self, field_name: str, value: str, session_id: str = "default") -> dict:
+        self.sessions.setdefault(session_id, []).append(field_name)
+        return {"success": True, "pid": os.getpid(), "fields": self.sessions[session_id]}
+
+    async def submit_form_incremental(self, session_id: str = "default") -> dict:
+        self.sessions.pop(session_id, None)
+        return {"success": True, "pid": os.getpid()}
+
+    async def explode(self, session_id: str = "default") -> dict:
+        raise ValueError("boom")
+
+    async def evict_session(self, session_id: str, reason: str = "evicted") -> bool:
+        self.sessions.pop(session_id, None)
+        self.on_session_closed(session_id)
+        return True
+
+    def form_state_token(self, session_id: str = "default") -> str:
+        return "0"
+
+    async def whoami(self) -> dict:
+        return {"pid": os.getpid()}
+
+
+@pytest.fixture
+async def sharded():
+    agent = ShardedBrowserAgent(shards=2, handler_path=HANDLER)
+    await agent.start()
+    yield agent
+    await agent.stop()
+
+
+class TestShardedBrowserAgent:
+    @pytest.mark.asyncio
+    async def test_sessions_are_sticky_to_one_process(self, sharded):
+        first = await sharded.fill_field_incremental("customerName", "An", "s1")
+        second = await sharded.fill_field_incremental("phoneNumber", "0901234567", session_id="s1")
+
+        assert first["pid"] == second["pid"]
+        assert second["fields"] == ["customerName", "phoneNumber"]
+
+    @pytest.mark.asyncio
+    async def test_new_sessions_go_to_least_loaded_shard(self, sharded):
+        a = await sharded.fill_field_incremental("customerName", "An", session_id="a")
+        b = await sharded.fill_field_incremental("customerName", "Binh", session_id="b")
+
+        assert a["pid"] != b["pid"]
+        assert sorted(s["sessions"] for s in sharded.get_stats()["shards"]) == [1, 1]
+
+    @pytest.mark.asyncio
+    async def test_submit_releases_assignment(self, sharded):
+        await sharded.fill_field_incremental("customerName", "An", session_id="s1")
+        await sharded.submit_form_incremental(session_id="s1")
+
+        assert "s1" not in sharded.assignments
+
+    @pytest.mark.asyncio
+    async def test_shard_evictions_release_assignment(self, sharded):
+        await sharded.fill_field_incremental("customerName", "An", session_id="s1")
+        await sharded.evict_session("s1")
+        await asyncio.sleep(0.2)  # the close notice trails the reply on the pipe
+
+        assert "s1" not in sharded.assignments
+        assert sum(s["sessions"] for s in sharded.get_stats()["shards"]) == 0
+
+    @pytest.mark.asyncio
+    async def test_idle_assignments_are_reaped(self, sharded):
+        await sharded.fill_field_incremental("customerName", "An", session_id="s1")
+        sharded.idle_ttl = 0
+
+        assert sharded.reap_idle_assignments() == ["s1"]
+        assert "s1" not in sharded.assignments
+
+    @pytest.mark.asyncio
+    async def test_read_only_probes_do_not_assign(self, sharded):
+        assert await sharded.form_state_token(session_id="unknown") == "0"
+
+        assert "unknown" not in sharded.assignments
+
+    @pytest.mark.asyncio
+    async def test_stateless_calls_are_spread_across_shards(self, sharded):
+        pids = {(await sharded.whoami())["pid"] for _ in range(4)}
+
+        assert len(pids) == 2
+        assert sharded.assignments == {}
+
+    @pytest.mark.asyncio
+    async def test_omitted_session_id_pins_the_default_session(self, sharded):
+        first = await sharded.fill_field_incremental("customerName", "An")
+        second = await sharded.fill_field_incremental("phoneNumber", "0901234567")
+
+        assert first["pid"] == second["pid"]
+        assert second["fields"] == ["customerName", "phoneNumber"]
+        assert "default" in sharded.assignments
+
+    @pytest.mark.asyncio
+    async def test_worker_errors_return_error_dict(self, sharded):
+        result = await sharded.explode(session_id="s1")
+
+        assert result["success"] is False
+        assert "boom" in result["error"]
+
+    def test_unknown_methods_are_not_proxied(self):
+        agent = ShardedBrowserAgent(shards=1, handler_path=HANDLER)
+
+        with pytest.raises(AttributeError):
+            agent.does_not_exist
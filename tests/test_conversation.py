@@ -0,0 +1,66 @@
+"""
+Tests for the delta-based conversation context protocol
+"""
+import pytest
+
+from src.automation.conversation import ContextCursor, ContextResync, ConversationStore
+
+
+def msgs(*pairs, start=1):
+    return [{"seq": start + i, "role": role, "content": content} for i, (role, content) in enumerate(pairs)]
+
+
+def test_deltas_extend_the_conversation_and_overlap_is_ignored():
+    store = ConversationStore(window=10, max_chars=0)
+    store.apply("s1", msgs(("user", "Tên tôi là An"), ("assistant", "Chào anh An")), base_seq=0)
+    # Retried request resends seq 2 together with the new message
+    conversation = store.apply("s1", msgs(("assistant", "Chào anh An"), ("user", "Vay 500 triệu"), start=2), base_seq=1)
+
+    assert conversation.seq == 3
+    assert store.render("s1") == "user: Tên tôi là An\nassistant: Chào anh An\nuser: Vay 500 triệu"
+
+
+def test_gap_or_unknown_session_requires_resync():
+    store = ConversationStore(window=10)
+    with pytest.raises(ContextResync) as unknown:
+        store.apply("s1", msgs(("user", "b"), start=5), base_seq=4)
+    assert unknown.value.context_seq == 0
+
+    store.apply("s1", msgs(("user", "a")))
+    with pytest.raises(ContextResync) as gap:
+        store.apply("s1", msgs(("user", "c"), start=3), base_seq=2)
+    assert gap.value.context_seq == 1
+    assert store.get_stats()["resyncs"] == 2
+
+
+def test_reset_replaces_conversation_and_window_bounds_render():
+    store = ConversationStore(window=2, max_chars=0)
+    store.apply("s1", msgs(("user", "old")))
+    store.apply("s1", msgs(("user", "x"), ("assistant", "y"), ("user", "z"), start=8), reset=True)
+
+    assert store.cursor("s1") == 10
+    assert store.render("s1") == "assistant: y\nuser: z"
+
+
+def test_malformed_messages_are_rejected():
+    store = ConversationStore()
+    with pytest.raises(ValueError):
+        store.apply("s1", [{"seq": 1, "role": "user", "content": "a"}, {"seq": 3, "role": "user", "content": "b"}])
+    with pytest.raises(ValueError):
+        store.apply("s1", [{"seq": "1", "role": "user", "content": "a"}])
+
+
+def test_cursor_sends_only_unacknowledged_messages_and_resyncs():
+    transcript = [{"role": "user", "content": "a"}, {"role": "assistant", "content": "b"}]
+    cursor = ContextCursor(transcript, window=2)
+
+    assert cursor.delta() == {"messages": msgs(("user", "a"), ("assistant", "b")), "base_seq": 0}
+    cursor.ack(cursor.sent_seq())
+    transcript.append({"role": "user", "content": "c"})
+    assert cursor.delta() == {"messages": msgs(("user", "c"), start=3), "base_seq": 2}
+
+    # Service lost one message: resend from its cursor
+    assert cursor.resync(1)["messages"][0]["seq"] == 2
+    # Service is ahead of anything we sent: replace its copy with our latest window
+    reset = cursor.resync(7)
+    assert reset["reset"] is True and [m["seq"] for m in reset["messages"]] == [2, 3]
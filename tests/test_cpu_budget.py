@@ -0,0 +1,100 @@
+"""
+Tests for the CPU thread budget shared by the STT and VAD engines
+"""
+import asyncio
+
+import numpy as np
+import pytest
+
+from src.speech.cpu_budget import BACKGROUND, LIVE, CpuBudget, EngineBudget
+from src.speech.stt_pool import SttModelRegistry
+from tests.test_stt_pool import SETTINGS, FakeBackend
+
+
+def test_budget_splits_threads_between_engines():
+    budget = CpuBudget(total_threads=16, reserved_threads=1, vad_threads=1, stt_threads_per_job=2)
+
+    stt, vad = budget.engine("stt"), budget.engine("vad")
+    assert (stt.threads, stt.threads_per_job, stt.slots, stt.background_slots) == (14, 2, 7, 3)
+    assert (vad.threads, vad.slots) == (1, 1)
+    # 7 slots / (rtf 0.25 x 30% speech) = 93 calls
+    assert budget.estimate_max_calls(stt_rtf=0.25, speech_share=0.3) == 93
+
+    tiny = CpuBudget(total_threads=2, reserved_threads=1, stt_threads_per_job=4)
+    assert tiny.engine("stt").slots == 1 and tiny.engine("vad").threads == 1
+
+
+@pytest.mark.asyncio
+async def test_live_jobs_are_served_before_waiting_background_jobs():
+    engine = EngineBudget("test", threads=1)
+    order = []
+
+    async def job(name, priority):
+        async with engine.slot(priority):
+            order.append(name)
+            await asyncio.sleep(0.01)
+
+    await engine.acquire(LIVE)  # engine busy
+    tasks = [asyncio.create_task(job("partial", BACKGROUND)), asyncio.create_task(job("final", LIVE))]
+    await asyncio.sleep(0.01)
+    engine._release(LIVE)
+    await asyncio.gather(*tasks)
+
+    assert order == ["final", "partial"]
+    stats = engine.get_stats()
+    assert stats["waited"] == 2 and stats["wait_seconds"]["background"] > stats["wait_seconds"]["live"] > 0
+
+
+@pytest.mark.asyncio
+async def test_background_work_leaves_slots_for_live_calls():
+    engine = EngineBudget("test", threads=4, background_share=0.5)
+    await engine.acquire(BACKGROUND)
+    await engine.acquire(BACKGROUND)
+
+    third = asyncio.create_task(engine.acquire(BACKGROUND))
+    await asyncio.sleep(0.01)
+    assert not third.done()  # background cap (2 of 4) reached
+
+    assert await engine.acquire(LIVE) < 0.01  # a live job still gets a slot at once
+    engine._release(BACKGROUND)
+    await third
+    assert engine.in_use == 3 and engine.background_in_use == 2
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_gives_up_its_place():
+    engine = EngineBudget("test", threads=1)
+    await engine.acquire(LIVE)
+    waiter = asyncio.create_task(engine.acquire(LIVE))
+    await asyncio.sleep(0)
+    waiter.cancel()
+    await asyncio.gather(waiter, return_exceptions=True)
+
+    engine._release(LIVE)
+    assert engine.in_use == 0 and engine.get_stats()["waiting"] == 0
+
+
+@pytest.mark.asyncio
+async def test_registry_pools_share_the_stt_slots():
+    budget = CpuBudget(total_threads=4, reserved_threads=1, vad_threads=1, stt_threads_per_job=2)
+    built = []
+
+    def factory(model, device, compute_type, workers=1, backend="fake", cpu_threads=0):
+        built.append((workers, cpu_threads))
+        return FakeBackend(model)
+
+    registry = SttModelRegistry(backend_factory=factory, settings={**SETTINGS, "partial_model": "PhoWhisper-small"},
+                                budget=budget.engine("stt"))
+    cascade = registry.cascade()
+    try:
+        await asyncio.gather(
+            cascade.partial(np.zeros(160, np.float32), "vi"),
+            cascade.final(np.zeros(160, np.float32), "vi"),
+        )
+    finally:
+        await registry.close()
+
+    # 2 STT threads = one decode of 2 threads, for both the partial and the final model
+    assert built == [(1, 2), (1, 2)]
+    stats = budget.engine("stt").get_stats()
+    assert stats["granted"] == 2 and stats["waited"] == 1 and stats["in_use"] == 0
@@ -0,0 +1,84 @@
+"""
+Tests for per-call VAD retuning and end-of-turn latency metrics
+"""
+from unittest.mock import AsyncMock
+
+import pytest
+
+from pipecat.frames.frames import (
+    TranscriptionFrame,
+    UserStartedSpeakingFrame,
+    UserStoppedSpeakingFrame,
+    VADParamsUpdateFrame,
+)
+from pipecat.processors.frame_processor import FrameDirection
+
+from src.dynamic_vad import DynamicVADConfig, VADContextController
+from src.monitoring.metrics import vad_end_of_turn_seconds
+
+
+def make_controller(adaptive: bool = True) -> VADContextController:
+    config = DynamicVADConfig()
+    controller = VADContextController(config, config.get_vad_params(), adaptive=adaptive)
+    controller.push_frame = AsyncMock()
+    return controller
+
+
+def pushed_updates(controller):
+    return [
+        call.args[0] for call in controller.push_frame.await_args_list
+        if isinstance(call.args[0], VADParamsUpdateFrame)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_bot_question_retunes_vad_upstream_for_next_turn():
+    controller = make_controller()
+
+    await controller.observe("Thông tin này có đúng không ạ?", role="assistant")
+
+    [update] = pushed_updates(controller)
+    assert update.params.stop_secs == 1.5  # confirmation
+    assert controller.push_frame.await_args.args[1] == FrameDirection.UPSTREAM
+    assert controller.params.stop_secs == 1.5
+
+    # Same context again: nothing to apply
+    await controller.observe("Vậy có đúng không?", role="assistant")
+    assert len(pushed_updates(controller)) == 1
+
+
+@pytest.mark.asyncio
+async def test_update_waits_until_user_stops_speaking():
+    controller = make_controller()
+    await controller.process_frame(UserStartedSpeakingFrame(), FrameDirection.DOWNSTREAM)
+
+    await controller.observe("Cho tôi xin số điện thoại của anh", role="assistant")
+    assert pushed_updates(controller) == []
+
+    await controller.process_frame(UserStoppedSpeakingFrame(), FrameDirection.DOWNSTREAM)
+    [update] = pushed_updates(controller)
+    assert update.params.min_volume == 0.65  # digit sequence
+
+
+@pytest.mark.asyncio
+async def test_end_of_turn_latency_is_recorded_per_context():
+    controller = make_controller()
+    await controller.observe("Thông tin này có đúng không ạ?", role="assistant")
+    before = vad_end_of_turn_seconds.labels(context="confirmation")._sum.get()
+
+    await controller.process_frame(UserStartedSpeakingFrame(), FrameDirection.DOWNSTREAM)
+    await controller.process_frame(UserStoppedSpeakingFrame(), FrameDirection.DOWNSTREAM)
+    await controller.process_frame(TranscriptionFrame("đúng rồi", "u1", "t"), FrameDirection.DOWNSTREAM)
+
+    observed = vad_end_of_turn_seconds.labels(context="confirmation")._sum.get() - before
+    assert 1.5 <= observed < 2.5  # the 1.5 s silence wait plus (near-instant) transcription
+
+
+@pytest.mark.asyncio
+async def test_static_vad_is_never_retuned():
+    controller = make_controller(adaptive=False)
+
+    await controller.observe("Thông tin này có đúng không ạ?", role="assistant")
+
+    assert pushed_updates(controller) == []
+    assert controller.context_label == "static"
@@ -231,3 +231,85 @@ class TestDynamoDBService:
         # Should not make API call with empty updates
         assert result is True or result is False  # Implementation dependent
 
+
+
+class TestAppendOnlyMessages:
+    """Transcript messages stored as their own items (session_id + seq)"""
+
+    @pytest.fixture
+    def service(self, mock_env_vars, monkeypatch):
+        monkeypatch.delenv("DYNAMODB_MESSAGE_STORE", raising=False)
+        with patch('src.dynamodb_service.boto3.resource'):
+            service = DynamoDBService()
+        service.table = MagicMock()
+        service.messages_table = MagicMock()
+        return service
+
+    def test_session_item_is_a_header(self, service, sample_session_data):
+        """The session item keeps a count, the messages go to the messages table"""
+        assert service.save_session(sample_session_data) is True
+
+        item = service.table.put_item.call_args[1]['Item']
+        assert "messages" not in item
+        assert item["message_count"] == 2 and item["message_store"] == "items"
+        batch = service.messages_table.batch_writer.return_value.__enter__.return_value
+        assert [c[1]['Item']['seq'] for c in batch.put_item.call_args_list] == [1, 2]
+
+    def test_append_message_writes_only_the_new_message(self, service):
+        """Per-message cost does not depend on the transcript length"""
+        message = {"role": "user", "content": "Số điện thoại 0912345678", "timestamp": "2025-01-01T00:10:00Z"}
+
+        assert service.append_message("session-1", 250, message) is True
+
+        item = service.messages_table.put_item.call_args[1]['Item']
+        assert item["session_id"] == "session-1" and item["seq"] == 250 and "ttl" in item
+        update = service.table.update_item.call_args[1]
+        assert update["Key"] == {"session_id": "session-1"}
+        assert update["ExpressionAttributeValues"][":count"] == 250
+        service.table.put_item.assert_not_called()
+
+    def test_list_append_store_appends_to_the_session_item(self, service, monkeypatch):
+        """DYNAMODB_MESSAGE_STORE=list_append keeps the messages in the session item"""
+        monkeypatch.setenv("DYNAMODB_MESSAGE_STORE", "list_append")
+        with patch('src.dynamodb_service.boto3.resource'):
+            service = DynamoDBService()
+        service.table = MagicMock()
+
+        assert service.append_message("session-1", 3, {"role": "assistant", "content": "Dạ"}) is True
+
+        update = service.table.update_item.call_args[1]
+        assert "list_append(if_not_exists(messages, :empty), :message)" in update["UpdateExpression"]
+        assert update["ExpressionAttributeValues"][":message"] == [{"role": "assistant", "content": "Dạ"}]
+
+    def test_get_session_pages_through_messages(self, service):
+        """get_session reads the transcript one Query page at a time"""
+        service.table.get_item.return_value = {"Item": {"session_id": "session-1", "message_count": Decimal(3)}}
+        service.messages_table.query.side_effect = [
+            {
+                "Items": [
+                    {"session_id": "session-1", "seq": Decimal(1), "role": "user", "content": "a", "ttl": 1},
+                    {"session_id": "session-1", "seq": Decimal(2), "role": "assistant", "content": "b", "ttl": 1},
+                ],
+                "LastEvaluatedKey": {"session_id": "session-1", "seq": Decimal(2)},
+            },
+            {"Items": [{"session_id": "session-1", "seq": Decimal(3), "role": "user", "content": "c", "ttl": 1}]},
+        ]
+
+        session = service.get_session("session-1", page_size=2)
+
+        assert [m["content"] for m in session["messages"]] == ["a", "b", "c"]
+        assert "ttl" not in session["messages"][0]
+        assert service.messages_table.query.call_count == 2
+        assert service.messages_table.query.call_args_list[0][1]["Limit"] == 2
+
+    def test_sessions_stored_before_the_messages_table_are_still_paged(self, service):
+        """A session item with an inline messages list is paged from the item"""
+        messages = [{"role": "user", "content": str(i)} for i in range(5)]
+        service.table.get_item.return_value = {"Item": {"session_id": "old", "messages": messages}}
+        service.messages_table.query.return_value = {"Items": []}
+
+        first = service.get_messages("old", limit=2)
+        last = service.get_messages("old", limit=2, after_seq=4)
+
+        assert [m["seq"] for m in first["items"]] == [1, 2] and first["next_seq"] == 2
+        assert [m["content"] for m in last["items"]] == ["4"] and last["next_seq"] is None
@@ -0,0 +1,118 @@
+"""
+Tests for content-aware endpointing
+"""
+import pytest
+
+from pipecat.audio.turn.base_turn_analyzer import EndOfTurnState
+
+from src.dynamic_vad import ConversationContext, DynamicVADConfig
+from src.speech.endpointing import TranscriptEndpointer, analyze_utterance, trailing_digits
+
+SAMPLE_RATE = 16000
+CHUNK = bytes(2 * SAMPLE_RATE // 50)  # 20 ms of 16-bit audio
+
+
+def make_endpointer(bot_question: str = "") -> TranscriptEndpointer:
+    config = DynamicVADConfig()
+    if bot_question:
+        config.update_context(bot_question, role="assistant")
+    endpointer = TranscriptEndpointer(config, pause_secs=0.4, extend_secs=2.0)
+    endpointer.set_sample_rate(SAMPLE_RATE)
+    return endpointer
+
+
+def feed(endpointer, seconds: float, is_speech: bool) -> int:
+    """Chunks fed until the turn completed (-1 if it did not)."""
+    for i in range(int(seconds * 50)):
+        if endpointer.append_audio(CHUNK, is_speech) == EndOfTurnState.COMPLETE:
+            return i + 1
+    return -1
+
+
+def test_spoken_and_written_digits_are_counted():
+    assert trailing_digits("số của tôi là 0912 345 678") == "0912345678"
+    assert trailing_digits("không chín một hai ba") == "09123"
+    assert trailing_digits("tôi ở quận ba") == "3"
+    assert trailing_digits("xin chào") == ""
+
+
+@pytest.mark.parametrize("text,context,slot,expected", [
+    ("0912 345 678", ConversationContext.DIGIT_SEQUENCE, "phone", "complete"),
+    ("0912 345", ConversationContext.DIGIT_SEQUENCE, "phone", "partial"),
+    ("84 912 345 678", ConversationContext.DIGIT_SEQUENCE, "phone", "complete"),
+    ("0912 345 678 9", ConversationContext.DIGIT_SEQUENCE, "phone", "unknown"),
+    ("001 099 012 345", ConversationContext.DIGIT_SEQUENCE, "national_id", "complete"),
+    ("số điện thoại của tôi là 0912345678", ConversationContext.DEFAULT, None, "complete"),
+    ("số điện thoại của tôi là", ConversationContext.DEFAULT, None, "partial"),
+    ("đúng rồi", ConversationContext.CONFIRMATION, None, "complete"),
+    ("có", ConversationContext.CONFIRMATION, None, "complete"),
+    ("tôi muốn vay tiền để mua nhà", ConversationContext.LONG_ANSWER, None, "unknown"),
+])
+def test_analyze_utterance(text, context, slot, expected):
+    assert analyze_utterance(text, context, slot) == expected
+
+
+def test_complete_phone_number_ends_turn_at_the_pause():
+    endpointer = make_endpointer("Cho tôi xin số điện thoại của anh")
+    assert endpointer.config.expected_slot == "phone"
+
+    feed(endpointer, 2.0, is_speech=True)
+    assert feed(endpointer, 0.2, is_speech=False) == -1
+    assert endpointer.observe_transcript("không chín một hai ba bốn năm sáu bảy tám") == "complete"
+
+    chunks = feed(endpointer, 3.0, is_speech=False)
+    assert chunks == 10  # 0.2 s already silent + 0.2 s more = pause_secs
+    assert endpointer.last_reason == "content" and not endpointer.speech_triggered
+
+
+def test_partial_digit_sequence_extends_silence_limit():
+    endpointer = make_endpointer("Cho tôi xin số căn cước công dân")
+    feed(endpointer, 1.0, is_speech=True)
+    endpointer.observe_transcript("001 099")
+
+    # digit_sequence stop_secs (3.0) + extend_secs (2.0)
+    assert endpointer.silence_limit() == pytest.approx(5.0)
+    assert feed(endpointer, 4.9, is_speech=False) == -1
+    assert feed(endpointer, 0.2, is_speech=False) > 0
+    assert endpointer.last_reason == "extended"
+
+
+def test_new_speech_discards_earlier_verdict():
+    endpointer = make_endpointer("Thông tin này có đúng không?")
+    feed(endpointer, 0.5, is_speech=True)
+    endpointer.observe_transcript("đúng")
+    feed(endpointer, 0.1, is_speech=True)  # user keeps talking
+
+    assert endpointer.decision == "unknown"
+    # Falls back to the confirmation context's 1.5 s of silence
+    assert feed(endpointer, 1.6, is_speech=False) == 75
+    assert endpointer.last_reason == "silence"
+
+
+@pytest.mark.asyncio
+async def test_vad_pause_reports_complete_verdict():
+    endpointer = make_endpointer("Thông tin này có đúng không?")
+    feed(endpointer, 0.5, is_speech=True)
+    endpointer.observe_transcript("vâng đúng rồi")
+
+    state, metrics = await endpointer.analyze_end_of_turn()
+
+    assert state == EndOfTurnState.COMPLETE and metrics.is_complete
+    assert not endpointer.speech_triggered
+
+
+@pytest.mark.asyncio
+async def test_vad_controller_keeps_pause_detection_when_endpointing():
+    from unittest.mock import AsyncMock
+    from src.dynamic_vad import VADContextController
+
+    endpointer = make_endpointer()
+    params = endpointer.config.get_vad_params().model_copy(update={"stop_secs": 0.4})
+    controller = VADContextController(endpointer.config, params, endpointer=endpointer)
+    controller.push_frame = AsyncMock()
+
+    await controller.observe("Cho tôi xin số điện thoại của anh", role="assistant")
+
+    update = controller.push_frame.await_args.args[0]
+    assert update.params.stop_secs == 0.4 and update.params.min_volume == 0.65
+    assert endpointer.silence_limit() == 3.0  # the context's stop_secs moved to the endpointer
@@ -0,0 +1,121 @@
+"""
+Tests for scripted form actions (wizard, submit detection, reads)
+"""
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+from src.automation.actions import go_to_step, read_fields, submit_form_dom
+
+
+def make_page(evaluate_result):
+    page = MagicMock()
+    page.evaluate = AsyncMock(return_value=evaluate_result)
+    page.wait_for_function = AsyncMock()
+    listeners = {}
+    page.on.side_effect = lambda event, fn: listeners.setdefault(event, fn)
+    page.listeners = listeners
+    return page
+
+
+def response(url, status=200, method="POST"):
+    return SimpleNamespace(url=url, status=status, request=SimpleNamespace(method=method))
+
+
+@pytest.mark.asyncio
+async def test_go_to_step_returns_structured_result():
+    page = make_page({"found": True, "moved": True, "from_step": 1, "to_step": 2, "steps": [1, 2], "title": "Bước 2"})
+
+    result = await go_to_step(page, "next")
+
+    assert result["moved"] is True and result["to_step"] == 2
+    assert "duration_ms" in result
+    assert page.evaluate.await_args.args[1] == {"direction": "next", "step": None}
+
+
+@pytest.mark.asyncio
+async def test_read_fields_rejects_unexpected_result():
+    page = make_page(None)
+
+    with pytest.raises(TypeError):
+        await read_fields(page, ["phoneNumber"])
+
+
+@pytest.mark.asyncio
+async def test_submit_reports_invalid_fields_without_waiting():
+    invalid = [{"name": "customerName", "label": "Họ và tên", "step": 1, "message": "required"}]
+    page = make_page({"found": True, "submitted": False, "reason": "invalid", "invalid": invalid})
+
+    result = await submit_form_dom(page, timeout=0.2)
+
+    assert result["submitted"] is False and result["invalid"] == invalid
+    page.wait_for_function.assert_not_awaited()
+    page.remove_listener.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_submit_confirmed_by_toast():
+    page = make_page({"found": True, "submitted": True, "action": None, "toasts_before": [], "filled_before": 3})
+    handle = MagicMock()
+    handle.json_value = AsyncMock(return_value={"signal": "toast", "message": "✓ Đăng ký vay thành công", "ok": True})
+    page.wait_for_function.return_value = handle
+
+    result = await submit_form_dom(page, timeout=0.5)
+
+    assert result["confirmed"] is True and result["ok"] is True
+    assert result["signal"] == "toast"
+    assert "thành công" in result["message"]
+
+
+@pytest.mark.asyncio
+async def test_submit_signal_compares_against_toasts_shown_before_click():
+    before = [{"text": "Đã lưu nháp", "shown": True}]
+    page = make_page({"found": True, "submitted": True, "action": None, "toasts_before": before, "filled_before": 3})
+    page.wait_for_function.side_effect = TimeoutError("no signal")
+
+    result = await submit_form_dom(page, timeout=0.2)
+
+    assert result["confirmed"] is False
+    assert page.wait_for_function.await_args.kwargs["arg"]["toasts_before"] == before
+
+
+@pytest.mark.asyncio
+async def test_submit_confirmed_by_intercepted_response():
+    page = make_page(None)
+
+    async def evaluate(script, args):
+        # The form posts while the click is still being dispatched
+        page.listeners["response"](response("https://forms.example/api/loan", status=201))
+        return {"found": True, "submitted": True, "action": "https://forms.example/api/loan",
+                "toasts_before": [], "filled_before": 2}
+
+    async def never(*args, **kwargs):
+        import asyncio
+        await asyncio.sleep(10)
+
+    page.evaluate = AsyncMock(side_effect=evaluate)
+    page.wait_for_function = AsyncMock(side_effect=never)
+
+    result = await submit_form_dom(page, timeout=0.5)
+
+    assert result["signal"] == "response"
+    assert result["status"] == 201 and result["ok"] is True
+
+
+@pytest.mark.asyncio
+async def test_submit_without_signal_is_unconfirmed_and_flags_http_errors():
+    page = make_page(None)
+
+    async def evaluate(script, args):
+        page.listeners["response"](response("https://db.example/rest/v1/forms", status=500))
+        page.listeners["response"](response("https://cdn.example/app.js", method="GET"))
+        return {"found": True, "submitted": True, "action": None, "toasts_before": [], "filled_before": 2}
+
+    page.evaluate = AsyncMock(side_effect=evaluate)
+    page.wait_for_function = AsyncMock(side_effect=TimeoutError("no signal"))
+
+    result = await submit_form_dom(page, timeout=0.2)
+
+    assert result["confirmed"] is False
+    assert result["ok"] is False and result["status"] == 500
+    assert len(result["responses"]) == 1
@@ -0,0 +1,138 @@
+"""
+Tests for form schema extraction and caching
+"""
+import pytest
+from unittest.mock import AsyncMock
+
+from src.automation.form_schema import FormSchema, FormSchemaCache
+
+
+URL = "https://forms.example/loan"
+
+RAW = {
+    "fields": [
+        {"name": "customerName", "id": "customerName", "tag": "input", "type": "text",
+         "label": "Họ và tên", "placeholder": "Nguyễn Văn A", "required": True, "step": 1, "options": []},
+        {"name": "phoneNumber", "id": "phoneNumber", "tag": "input", "type": "tel",
+         "label": "Số điện thoại", "placeholder": "", "required": True, "step": 1, "options": []},
+        {"name": "loanTerm", "id": "loanTerm", "tag": "select", "type": "select-one",
+         "label": "Kỳ hạn vay", "placeholder": "", "required": False, "step": 3,
+         "options": [{"value": "", "text": "Chọn"}, {"value": "12", "text": "12 tháng"}]},
+        {"name": "gender", "id": "male", "tag": "input", "type": "radio",
+         "label": "Nam", "placeholder": "", "required": False, "step": 1,
+         "options": [{"value": "male", "text": "Nam"}]},
+        {"name": "gender", "id": "female", "tag": "input", "type": "radio",
+         "label": "Nữ", "placeholder": "", "required": False, "step": 1,
+         "options": [{"value": "female", "text": "Nữ"}]},
+    ],
+    "steps": [1, 2, 3],
+    "form_ids": ["loanForm"],
+    "title": "Đơn vay vốn",
+}
+
+
+def make_page(raw=RAW):
+    page = AsyncMock()
+    page.url = URL
+    page.evaluate.return_value = raw
+    return page
+
+
+class TestFormSchema:
+    def test_from_extraction_merges_radio_groups(self):
+        schema = FormSchema.from_extraction(URL, RAW, form_type="loan")
+
+        assert schema.field_names == ["customerName", "phoneNumber", "loanTerm", "gender"]
+        assert [o["value"] for o in schema.get_field("gender").options] == ["male", "female"]
+        assert schema.steps == [1, 2, 3]
+        assert [f.key for f in schema.fields_for_step(3)] == ["loanTerm"]
+
+    def test_resolve_field_by_label_and_mapper(self):
+        schema = FormSchema.from_extraction(URL, RAW)
+
+        assert schema.resolve_field("customerName").key == "customerName"
+        assert schema.resolve_field("ho va ten").key == "customerName"
+        assert schema.resolve_field("số điện thoại").key == "phoneNumber"
+        assert schema.resolve_field("kỳ hạn").key == "loanTerm"
+        assert schema.resolve_field("không tồn tại") is None
+
+    def test_content_hash_ignores_extraction_time(self):
+        first = FormSchema.from_extraction(URL, RAW)
+        second = FormSchema.from_extraction(URL, RAW)
+        changed = FormSchema.from_extraction(URL, {**RAW, "steps": [1, 2]})
+
+        assert first.content_hash == second.content_hash
+        assert first.content_hash != changed.content_hash
+
+    def test_round_trip_dict(self):
+        schema = FormSchema.from_extraction(URL, RAW, form_type="loan")
+        restored = FormSchema.from_dict(schema.to_dict())
+
+        assert restored.content_hash == schema.content_hash
+        assert restored.resolve_field("Họ và tên").key == "customerName"
+        assert "options: 12" in restored.describe()
+
+
+class TestFormSchemaCache:
+    @pytest.mark.asyncio
+    async def test_ensure_extracts_once_and_hits_on_same_hash(self, tmp_path):
+        cache = FormSchemaCache(cache_dir=str(tmp_path))
+        page = make_page()
+
+        first = await cache.ensure(page, form_type="loan")
+        second = await cache.ensure(page, form_type="loan")
+
+        assert second is first
+        assert cache.misses == 1
+        assert cache.hits == 1
+
+    @pytest.mark.asyncio
+    async def test_ensure_refreshes_when_hash_changes(self, tmp_path):
+        cache = FormSchemaCache(cache_dir=str(tmp_path))
+        await cache.ensure(make_page(), URL)
+
+        extended = {**RAW, "fields": RAW["fields"] + [{
+            "name": "email", "id": "email", "tag": "input", "type": "email", "label": "Email",
+            "placeholder": "", "required": False, "step": 1, "options": [],
+        }]}
+        schema = await cache.ensure(make_page(extended), URL)
+
+        assert cache.refreshes == 1
+        assert "email" in schema.field_names
+
+    @pytest.mark.asyncio
+    async def test_empty_extraction_never_replaces_cached_schema(self, tmp_path):
+        cache = FormSchemaCache(cache_dir=str(tmp_path))
+        good = await cache.ensure(make_page(), URL)
+
+        blank = make_page({"fields": [], "steps": [], "form_ids": [], "title": ""})
+        blank.url = "about:blank"
+        schema = await cache.ensure(blank, URL)
+
+        assert schema is good
+        assert FormSchemaCache(cache_dir=str(tmp_path)).get(URL).content_hash == good.content_hash
+
+    @pytest.mark.asyncio
+    async def test_disk_snapshot_survives_restart(self, tmp_path):
+        schema = await FormSchemaCache(cache_dir=str(tmp_path)).ensure(make_page(), URL)
+
+        restarted = FormSchemaCache(cache_dir=str(tmp_path))
+        loaded = restarted.get(URL)
+
+        assert loaded is not None
+        assert loaded.content_hash == schema.content_hash
+        assert restarted.get(URL, content_hash="deadbeef") is None
+
+    def test_corrupt_snapshot_is_ignored(self, tmp_path):
+        cache = FormSchemaCache(cache_dir=str(tmp_path))
+        cache._path_for(URL).write_text("{not json", encoding="utf-8")
+
+        assert cache.get(URL) is None
+
+    @pytest.mark.asyncio
+    async def test_ensure_rejects_non_dict_result(self):
+        cache = FormSchemaCache(cache_dir=None)
+        page = make_page(raw=None)
+
+        with pytest.raises(TypeError):
+            await cache.ensure(page, URL)
@@ -0,0 +1,120 @@
+"""
+Tests for the form state reconciler
+"""
+import pytest
+from unittest.mock import AsyncMock, Mock
+
+from src.automation.form_state import FormState, ReconcileOp, FILL, REPLACE, CLEAR
+from src.browser_agent import BrowserAgentHandler
+
+
+class TestFormState:
+    def test_plan_produces_minimal_ops(self):
+        state = FormState.from_fields_filled([
+            {"field": "customerName", "value": "An"},
+            {"field": "phoneNumber", "value": "0901234567"},
+        ])
+
+        state.desire("customerName", "An")
+        state.desire("phoneNumber", "0912345678")
+        state.desire("email", "an@example.com")
+        state.desire_clear("address")
+
+        ops = state.plan()
+
+        assert ops == [
+            ReconcileOp(REPLACE, "phoneNumber", "0912345678"),
+            ReconcileOp(FILL, "email", "an@example.com"),
+            ReconcileOp(CLEAR, "address"),
+        ]
+
+    def test_mark_applied_cleans_dirty_set_and_bumps_version(self):
+        state = FormState()
+        state.desire("customerName", "An")
+        state.desire_clear("email")
+
+        state.mark_applied(state.plan())
+
+        assert state.dirty == set()
+        assert state.plan() == []
+        assert state.version == 1
+        assert state.to_fields_filled() == [{"field": "customerName", "value": "An"}]
+
+    def test_unchanged_fields_do_not_bump_version(self):
+        state = FormState()
+        state.desire("customerName", "An")
+
+        state.mark_applied(state.plan(), changed=[])
+
+        assert state.version == 0
+        assert state.is_applied("customerName", "An")
+
+
+class TestHandlerReconcile:
+    @pytest.fixture
+    def handler(self, mock_env_vars):
+        return BrowserAgentHandler()
+
+    def make_session(self, handler, evaluate_result, filled=None):
+        agent = Mock(add_new_task=Mock(), run=AsyncMock())
+        page = AsyncMock()
+        page.evaluate = AsyncMock(return_value=evaluate_result)
+        handler.sessions["s1"] = {
+            "agent": agent,
+            "page": page,
+            "session_data": {"fields_filled": list(filled or [])},
+        }
+        return agent, page
+
+    @pytest.mark.asyncio
+    async def test_reconcile_sends_only_dirty_fields_in_one_evaluate(self, handler):
+        agent, page = self.make_session(
+            handler,
+            {
+                "phoneNumber": {"found": True, "verified": True},
+                "address": {"found": True, "verified": True},
+            },
+            filled=[{"field": "customerName", "value": "An"}, {"field": "address", "value": "HN"}],
+        )
+
+        result = await handler.reconcile_form_state(
+            {"customerName": "An", "phoneNumber": "0901234567", "address": None},
+            session_id="s1",
+        )
+
+        assert result["success"] is True
+        assert [op["op"] for op in result["ops"]] == ["fill", "clear"]
+        sent = page.evaluate.await_args.args[1]["fields"]
+        assert set(sent) == {"phoneNumber", "address"}
+        assert sent["address"]["clear"] is True
+        assert handler.sessions["s1"]["session_data"]["fields_filled"] == [
+            {"field": "customerName", "value": "An"},
+            {"field": "phoneNumber", "value": "0901234567"},
+        ]
+        agent.run.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_repeated_target_state_costs_nothing(self, handler):
+        _, page = self.make_session(handler, {"customerName": {"found": True, "verified": True}})
+
+        await handler.reconcile_form_state({"customerName": "An"}, session_id="s1")
+        token = handler.form_state_token("s1")
+        repeat = await handler.reconcile_form_state({"customerName": "An"}, session_id="s1")
+
+        assert repeat["ops"] == []
+        assert page.evaluate.await_count == 1
+        assert handler.form_state_token("s1") == token
+
+    def test_token_of_unknown_session_does_not_take_a_form_state_slot(self, handler):
+        assert handler.form_state_token("never-seen") == "0"
+        assert "never-seen" not in handler.form_states
+
+    @pytest.mark.asyncio
+    async def test_remove_unknown_field_still_clears_on_page(self, handler):
+        agent, page = self.make_session(handler, {"email": {"found": True, "verified": True}})
+
+        result = await handler.remove_field_incremental("email", session_id="s1")
+
+        assert result["success"] is True
+        assert page.evaluate.await_args.args[1]["fields"]["email"]["clear"] is True
+        agent.run.assert_not_called()
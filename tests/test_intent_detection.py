@@ -1,5 +1,5 @@
 """Tests for NLP intent detection utilities."""
-from src.nlp.intent_detection import detect_intents
+from src.nlp.intent_detection import detect_form_type, detect_intents
 
 
 def test_detect_clear_phone_field():
@@ -42,3 +42,21 @@ def test_detect_intents_none():
     message = "Xin chào, tôi muốn tạo hồ sơ mới"
     intents = detect_intents(message)
     assert intents == []
+
+
+def test_detect_form_type_first_mention_wins():
+    assert detect_form_type("Tôi muốn mở đơn vay vốn") == "loan"
+    assert detect_form_type("Mở form CRM rồi làm đơn vay") == "crm"
+    assert detect_form_type("đơn nghỉ phép cho nhân viên") == "hr"
+
+
+def test_detect_form_type_ignores_partial_words():
+    assert detect_form_type("tôi tên là Thrang") is None
+    assert detect_form_type("") is None
+
+
+def test_detect_form_type_speculative_skips_generic_words():
+    message = "Số điện thoại của khách hàng là 0901234567"
+    assert detect_form_type(message) == "crm"
+    assert detect_form_type(message, speculative=True) is None
+    assert detect_form_type("khách hàng muốn mở đơn vay", speculative=True) == "loan"
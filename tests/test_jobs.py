@@ -0,0 +1,205 @@
+"""
+Tests for the browser workflow job pool
+"""
+import asyncio
+import pytest
+
+from src.automation.jobs import JobManager, JobQueueFull
+
+
+def runner_for(log, name, delay=0.0, status=200):
+    async def runner(job):
+        log.append(f"start {name}")
+        job.report("browser_agent", name)
+        await asyncio.sleep(delay)
+        log.append(f"end {name}")
+        return {"success": status < 400, "result": name}, status
+    return runner
+
+
+@pytest.mark.asyncio
+async def test_jobs_of_one_session_run_in_order_while_sessions_run_in_parallel():
+    manager = JobManager(workers=2, max_queued=10, result_ttl=60)
+    log = []
+    try:
+        a1 = manager.submit("s1", runner_for(log, "a1", 0.03))
+        a2 = manager.submit("s1", runner_for(log, "a2"))
+        b1 = manager.submit("s2", runner_for(log, "b1", 0.01))
+
+        assert all([await job.wait(1) for job in (a1, a2, b1)])
+    finally:
+        await manager.stop()
+
+    assert log.index("end a1") < log.index("start a2")
+    assert log.index("start b1") < log.index("end a1")  # other session did not wait
+    assert a2.status == "succeeded" and a2.result == {"success": True, "result": "a2"}
+    assert a2.progress["stage"] == "succeeded"
+
+
+@pytest.mark.asyncio
+async def test_error_status_marks_job_failed_with_payload():
+    manager = JobManager(workers=1, max_queued=10)
+    try:
+        job = manager.submit("s1", runner_for([], "x", status=500))
+        await job.wait(1)
+    finally:
+        await manager.stop()
+
+    assert job.status == "failed"
+    assert job.to_dict(include_result=True)["http_status"] == 500
+
+
+@pytest.mark.asyncio
+async def test_full_queue_rejects_with_retry_after():
+    manager = JobManager(workers=1, max_queued=1)
+    release = asyncio.Event()
+
+    async def blocker(job):
+        await release.wait()
+        return {"success": True}, 200
+
+    try:
+        manager.submit("s1", blocker)
+        await asyncio.sleep(0)  # worker picks up the first job
+        manager.submit("s1", blocker)
+        with pytest.raises(JobQueueFull) as exc:
+            manager.submit("s2", blocker)
+        assert exc.value.retry_after >= 1
+        assert manager.get_stats()["queued"] == 1
+    finally:
+        release.set()
+        await manager.stop()
+
+
+@pytest.mark.asyncio
+async def test_cancel_queued_and_running_jobs():
+    manager = JobManager(workers=1, max_queued=10)
+    log = []
+    started = asyncio.Event()
+
+    async def slow(job):
+        started.set()
+        await asyncio.sleep(10)
+        return {"success": True}, 200
+
+    try:
+        running = manager.submit("s1", slow)
+        queued = manager.submit("s1", runner_for(log, "queued"))
+        after = manager.submit("s1", runner_for(log, "after"))
+        await started.wait()
+
+        assert manager.queue_position(queued) == 1
+        await manager.cancel(queued.id)
+        await manager.cancel(running.id, timeout=1)
+        await after.wait(1)
+    finally:
+        await manager.stop()
+
+    assert queued.status == "cancelled" and running.status == "cancelled"
+    assert after.status == "succeeded"
+    assert log == ["start after", "end after"]
+
+
+@pytest.mark.asyncio
+async def test_newer_job_supersedes_queued_jobs_of_the_session():
+    manager = JobManager(workers=1, max_queued=10)
+    release = asyncio.Event()
+    log = []
+
+    async def preempted(job):
+        await release.wait()
+        return {"success": False, "superseded": True, "error": "Superseded by a newer request"}, 409
+
+    try:
+        running = manager.submit("s1", preempted)
+        await asyncio.sleep(0)
+        stale = manager.submit("s1", runner_for(log, "stale"))
+        other = manager.submit("s2", runner_for(log, "other"))
+        latest = manager.submit("s1", runner_for(log, "latest"), supersede=True)
+        release.set()
+        assert all([await job.wait(1) for job in (running, latest, other)])
+    finally:
+        await manager.stop()
+
+    assert stale.status == "cancelled" and stale.superseded_by == latest.id
+    assert running.status == "cancelled" and running.superseded_by == latest.id
+    assert other.status == "succeeded" and latest.status == "succeeded"
+    assert "start stale" not in log
+
+
+@pytest.mark.asyncio
+async def test_superseding_counts_replaced_jobs_and_keeps_them_when_rejected():
+    manager = JobManager(workers=1, max_queued=1)
+    release = asyncio.Event()
+
+    async def blocker(job):
+        await release.wait()
+        return {"success": True}, 200
+
+    try:
+        running = manager.submit("s1", blocker)
+        await asyncio.sleep(0)  # worker picks up the first job
+        stale = manager.submit("s1", blocker)
+
+        # The newer request replaces the queued one, so it fits in the full queue
+        latest = manager.submit("s1", blocker, supersede=True)
+        assert stale.status == "cancelled" and stale.superseded_by == latest.id
+
+        # Another session cannot supersede s1's work: rejected, nothing of s1 cancelled
+        with pytest.raises(JobQueueFull):
+            manager.submit("s2", blocker, supersede=True)
+        assert latest.status == "queued" and latest.superseded_by is None
+        assert running.superseded_by == latest.id and manager.get(latest.id) is latest
+    finally:
+        release.set()
+        await manager.stop()
+
+
+@pytest.mark.asyncio
+async def test_rejected_superseding_request_leaves_earlier_jobs_alone():
+    manager = JobManager(workers=1, max_queued=2)
+    release = asyncio.Event()
+
+    async def blocker(job):
+        await release.wait()
+        return {"success": True}, 200
+
+    try:
+        manager.submit("s1", blocker)
+        await asyncio.sleep(0)
+        other = manager.submit("s2", blocker)
+        another = manager.submit("s3", blocker)
+        running = manager.running_job("s1")
+
+        # s1 has nothing queued to replace, so superseding does not make room either
+        with pytest.raises(JobQueueFull):
+            manager.submit("s1", blocker, supersede=True)
+
+        assert running.superseded_by is None
+        assert other.status == "queued" and another.status == "queued"
+    finally:
+        release.set()
+        await manager.stop()
+
+
+@pytest.mark.asyncio
+async def test_followers_receive_published_events_until_the_job_finishes():
+    manager = JobManager(workers=1, max_queued=10)
+
+    async def runner(job):
+        await asyncio.sleep(0.01)
+        job.publish({"event": "field", "field": "customerName", "value": "An"})
+        return {"success": True}, 200
+
+    try:
+        job = manager.submit("s1", runner)
+        seen = [event async for event in job.follow(keepalive=1)]
+    finally:
+        await manager.stop()
+
+    kinds = [(e["event"], e.get("stage") or e.get("field")) for e in seen]
+    assert kinds == [("stage", "running"), ("field", "customerName"), ("stage", "succeeded")]
+    assert [e["seq"] for e in seen] == [1, 2, 3]
+
+    # A reconnecting follower only gets what it missed
+    assert [e["seq"] async for e in job.follow(after=2)] == [3]
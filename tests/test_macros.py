@@ -0,0 +1,150 @@
+"""
+Tests for browser macro recording, caching and replay
+"""
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+from src.automation.macros import Macro, MacroCache, MacroStep, record_macro, replay_macro
+
+
+URL = "https://forms.example/loan"
+
+
+class FakeAction:
+    def __init__(self, **data):
+        self.data = data
+
+    def model_dump(self, exclude_none=True):
+        return self.data
+
+
+def element(tag="input", **attributes):
+    return SimpleNamespace(tag_name=tag, xpath="html/body/form/input[1]", attributes=attributes)
+
+
+def step(actions, elements, url=URL, error=None):
+    return SimpleNamespace(
+        model_output=SimpleNamespace(action=actions),
+        result=[SimpleNamespace(error=error, is_done=False)],
+        state=SimpleNamespace(url=url, interacted_element=elements),
+    )
+
+
+def make_history(done=True, error=None):
+    items = [
+        step([FakeAction(go_to_url={"url": URL})], [None], url="about:blank"),
+        step(
+            [
+                FakeAction(input_text={"index": 3, "text": "Nguyen Van An"}),
+                FakeAction(select_dropdown_option={"index": 5, "text": "12 tháng"}),
+                FakeAction(click_element={"index": 7}),
+                FakeAction(click_element={"index": 9}),
+                FakeAction(click_element={"index": 11}),
+            ],
+            [
+                element(name="customerName", type="text"),
+                element(tag="select", name="loanTerm"),
+                element(name="gender", type="radio", value="male"),
+                element(tag="button", id="nextStep", type="button"),
+                element(tag="button", id="submitBtn", type="submit"),
+            ],
+            error=error,
+        ),
+        step([FakeAction(done={"text": "filled"})], [None]),
+    ]
+    return SimpleNamespace(history=items, is_done=lambda: done)
+
+
+def make_page():
+    page = MagicMock()
+    page.url = URL
+    page.goto = AsyncMock()
+    locators = {}
+
+    def locator(selector):
+        if selector not in locators:
+            loc = locators[selector] = MagicMock()
+            for method in ("fill", "click", "check", "select_option"):
+                setattr(loc.first, method, AsyncMock())
+        return locators[selector]
+
+    page.locator.side_effect = locator
+    return page
+
+
+def test_record_macro_builds_typed_slots():
+    macro = record_macro(make_history(), schema_hash="abc")
+
+    assert macro.url == URL
+    assert macro.slots == ["customerName", "gender", "loanTerm"]
+    ops = [(s.op, s.selector, s.slot) for s in macro.steps]
+    assert ops == [
+        ("goto", "", None),
+        ("fill", '[name="customerName"]', "customerName"),
+        ("select", '[name="loanTerm"]', "loanTerm"),
+        ("check", '[name="gender"]', "gender"),
+        ("click", '[id="nextStep"]', None),
+    ]
+
+
+def test_record_macro_skips_untyped_buttons_as_submits():
+    history = make_history()
+    history.history[1].model_output.action.append(FakeAction(click_element={"index": 13}))
+    history.history[1].state.interacted_element.append(element(tag="button", id="sendBtn"))
+
+    macro = record_macro(history)
+
+    assert [s.selector for s in macro.steps if s.op == "click"] == ['[id="nextStep"]']
+
+
+def test_record_macro_rejects_unfinished_or_failed_runs():
+    assert record_macro(make_history(done=False)) is None
+    assert record_macro(make_history(error="Element not found")) is None
+
+
+@pytest.mark.asyncio
+async def test_replay_macro_fills_new_values():
+    macro = record_macro(make_history())
+    page = make_page()
+
+    result = await replay_macro(page, macro, {"customerName": "Tran Thi B", "loanTerm": "24", "gender": "female"})
+
+    assert result["success"] is True
+    page.goto.assert_not_awaited()  # already on the form
+    page.locator('[name="customerName"]').first.fill.assert_awaited_once()
+    assert page.locator('[name="customerName"]').first.fill.await_args.args[0] == "Tran Thi B"
+    page.locator('[name="gender"][value="female"]').first.check.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_replay_macro_reports_failed_step():
+    macro = Macro(url=URL, schema_hash="", slots=["customerName"], steps=[
+        MacroStep("fill", selector='[name="customerName"]', slot="customerName"),
+    ])
+    page = MagicMock()
+    page.url = URL
+    page.locator.return_value.first.fill = AsyncMock(side_effect=TimeoutError("not visible"))
+
+    result = await replay_macro(page, macro, {"customerName": "An"})
+
+    assert result["success"] is False
+    assert result["failed_step"] == 0
+    assert "not visible" in result["error"]
+
+
+def test_macro_cache_persists_and_drops_failing_macros(tmp_path):
+    cache = MacroCache(cache_dir=str(tmp_path), max_failures=2)
+    macro = record_macro(make_history(), schema_hash="abc")
+    cache.store(macro)
+
+    reloaded = MacroCache(cache_dir=str(tmp_path))
+    assert reloaded.lookup(URL, "abc", ["loanTerm", "gender", "customerName"]) is not None
+    assert reloaded.lookup(URL, "changed", ["loanTerm", "gender", "customerName"]) is None
+    assert reloaded.lookup(URL, "abc", ["customerName"]) is None
+
+    cache.record_failure(macro)
+    assert cache.lookup(URL, "abc", macro.slots) is not None
+    cache.record_failure(macro)
+    assert cache.lookup(URL, "abc", macro.slots) is None
+    assert list(tmp_path.glob("*.json")) == []
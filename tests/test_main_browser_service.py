@@ -1,6 +1,6 @@
 """Integration tests for main_browser_service execute workflow"""
 import pytest
-from unittest.mock import AsyncMock
+from unittest.mock import AsyncMock, Mock
 from aiohttp import web
 
 from main_browser_service import create_app
@@ -70,3 +70,211 @@ async def test_execute_workflow_cache_miss(aiohttp_client, monkeypatch, setup_en
     assert data["success"] is True
     assert data.get("cached") is False
     assert mock_execute.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_execute_workflow_cache_invalidated_by_form_change(aiohttp_client, monkeypatch, setup_env):
+    """A cached result must not be replayed once the session's form has changed"""
+    from main_browser_service import browser_agent
+
+    mock_execute = AsyncMock(return_value={
+        "success": True,
+        "result": "Đã điền thành công"
+    })
+    monkeypatch.setattr("main_browser_service.browser_agent.execute_freeform", mock_execute)
+
+    app: web.Application = create_app()
+    client = await aiohttp_client(app)
+
+    payload = {
+        "user_message": "Điền đơn vay cho khách hàng Lê Văn C",
+        "session_id": "session-cache-state"
+    }
+
+    resp1 = await client.post("/api/execute", json=payload)
+    assert (await resp1.json()).get("cached") is False
+
+    # Something else changed the form in between
+    browser_agent._form_state("session-cache-state").bump()
+
+    resp2 = await client.post("/api/execute", json=payload)
+    assert (await resp2.json()).get("cached") is False
+    assert mock_execute.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_job_api_returns_id_then_status_and_result(aiohttp_client, monkeypatch, setup_env):
+    """Submitting a job returns 202 immediately; the result endpoint serves the workflow payload"""
+    mock_execute = AsyncMock(return_value={
+        "success": True,
+        "result": "Đã điền thành công"
+    })
+    monkeypatch.setattr("main_browser_service.browser_agent.execute_freeform", mock_execute)
+
+    app: web.Application = create_app()
+    client = await aiohttp_client(app)
+
+    resp = await client.post("/api/jobs", json={
+        "user_message": "Điền đơn vay cho khách hàng Phạm Văn D",
+        "session_id": "session-job-api"
+    })
+    assert resp.status == 202
+    job_id = (await resp.json())["job_id"]
+
+    result = await client.get(f"/api/jobs/{job_id}/result", params={"wait": "5"})
+    assert result.status == 200
+    data = await result.json()
+    assert data["success"] is True and data["result"] == "Đã điền thành công"
+
+    status = await (await client.get(f"/api/jobs/{job_id}")).json()
+    assert status["status"] == "succeeded"
+
+    assert (await client.delete(f"/api/jobs/{job_id}")).status == 409
+    assert (await client.get("/api/jobs/missing")).status == 404
+
+
+@pytest.mark.asyncio
+async def test_job_api_rejects_invalid_input(aiohttp_client, setup_env):
+    app: web.Application = create_app()
+    client = await aiohttp_client(app)
+
+    resp = await client.post("/api/jobs", json={"session_id": "session-job-api"})
+    assert resp.status == 400
+
+
+@pytest.mark.asyncio
+async def test_execute_workflow_reports_superseded_run(aiohttp_client, monkeypatch, setup_env):
+    """A run preempted by a newer request answers 409 instead of counting as a failure"""
+    mock_execute = AsyncMock(return_value={
+        "success": False,
+        "superseded": True,
+        "error": "Superseded by a newer request",
+        "steps": 3,
+        "observed_fields": {"customerName": "Nguyễn Văn E"}
+    })
+    mock_preempt = Mock(return_value={"success": True, "preempted": False})
+    monkeypatch.setattr("main_browser_service.browser_agent.execute_freeform", mock_execute)
+    monkeypatch.setattr("main_browser_service.browser_agent.preempt_freeform", mock_preempt)
+
+    app: web.Application = create_app()
+    client = await aiohttp_client(app)
+
+    resp = await client.post("/api/execute", json={
+        "user_message": "Điền đơn vay cho khách hàng Nguyễn Văn E",
+        "session_id": "session-superseded"
+    })
+    assert resp.status == 409
+    data = await resp.json()
+    assert data["superseded"] is True
+    assert data["observed_fields"] == {"customerName": "Nguyễn Văn E"}
+    mock_preempt.assert_called_once_with(session_id="session-superseded", reason="superseded")
+
+
+@pytest.mark.asyncio
+async def test_job_events_stream_progress_then_result(aiohttp_client, monkeypatch, setup_env):
+    """Field events emitted by the browser agent are streamed over SSE before the result"""
+    from src.automation.progress import emit_progress
+
+    async def execute(user_message, session_id):
+        emit_progress(session_id, "field", field="customerName", value="Hoàng Văn F", status="filled", path="dom")
+        return {"success": True, "result": "Đã điền thành công"}
+
+    monkeypatch.setattr("main_browser_service.browser_agent.execute_freeform", execute)
+
+    app: web.Application = create_app()
+    client = await aiohttp_client(app)
+
+    resp = await client.post("/api/jobs", json={
+        "user_message": "Điền đơn vay cho khách hàng Hoàng Văn F",
+        "session_id": "session-job-events"
+    })
+    job_id = (await resp.json())["job_id"]
+
+    stream = await client.get(f"/api/jobs/{job_id}/events")
+    assert stream.headers["Content-Type"].startswith("text/event-stream")
+    body = (await stream.read()).decode("utf-8")
+
+    assert "event: field" in body and "Hoàng Văn F" in body
+    assert body.index("event: field") < body.index("event: result")
+    assert '"http_status": 200' in body
+
+
+@pytest.mark.asyncio
+async def test_job_without_session_id_runs_under_default_session(aiohttp_client, monkeypatch, setup_env):
+    """The agent run, its events and preemption share the key jobs are queued under"""
+    from src.automation.progress import emit_progress
+
+    seen = []
+
+    async def execute(user_message, session_id):
+        seen.append(session_id)
+        emit_progress(session_id, "field", field="customerName", value="Lê Văn G", status="filled", path="dom")
+        return {"success": True, "result": "Đã điền thành công"}
+
+    monkeypatch.setattr("main_browser_service.browser_agent.execute_freeform", execute)
+
+    app: web.Application = create_app()
+    client = await aiohttp_client(app)
+
+    resp = await client.post("/api/jobs", json={"user_message": "Điền đơn vay cho khách hàng Lê Văn G"})
+    job_id = (await resp.json())["job_id"]
+    body = (await (await client.get(f"/api/jobs/{job_id}/events")).read()).decode("utf-8")
+
+    assert seen == ["default"]
+    assert "event: field" in body and "Lê Văn G" in body
+
+
+@pytest.mark.asyncio
+async def test_execute_accepts_message_deltas_and_asks_for_resync(aiohttp_client, monkeypatch, setup_env):
+    """The service keeps the conversation; senders post only new messages"""
+    mock_execute = AsyncMock(return_value={"success": True, "result": "Đã điền thành công"})
+    mock_clear = AsyncMock(return_value={"success": True, "message": "Đã xóa form"})
+    monkeypatch.setattr("main_browser_service.browser_agent.execute_freeform", mock_execute)
+    monkeypatch.setattr("main_browser_service.browser_agent.clear_all_fields_incremental", mock_clear)
+
+    client = await aiohttp_client(create_app())
+
+    first = {
+        "session_id": "session-delta",
+        "base_seq": 0,
+        "messages": [{"seq": 1, "role": "user", "content": "Tên khách hàng là Nguyễn Văn An"}],
+    }
+    assert (await client.post("/api/execute", json=first)).status == 200
+
+    second = {
+        "session_id": "session-delta",
+        "base_seq": 1,
+        "messages": [{"seq": 2, "role": "user", "content": "Số tiền vay 500 triệu"}],
+        "instructions": ["INSTRUCTION: Reset or clear the entire form."],
+    }
+    assert (await client.post("/api/execute", json=second)).status == 200
+    assert mock_execute.call_args.args[0] == "user: Tên khách hàng là Nguyễn Văn An\nuser: Số tiền vay 500 triệu"
+    assert mock_clear.await_count == 1
+
+    gap = {
+        "session_id": "session-delta",
+        "base_seq": 3,
+        "messages": [{"seq": 4, "role": "user", "content": "Kỳ hạn 12 tháng"}],
+    }
+    resp = await client.post("/api/execute", json=gap)
+    assert resp.status == 409
+    data = await resp.json()
+    assert data["resync"] is True and data["context_seq"] == 2
+    assert mock_execute.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_prepare_endpoint_opens_form_speculatively(aiohttp_client, monkeypatch, setup_env):
+    mock_prepare = AsyncMock(return_value={"success": True, "prepared": True, "form_type": "loan"})
+    monkeypatch.setattr("main_browser_service.browser_agent.prepare_form", mock_prepare)
+
+    app: web.Application = create_app()
+    client = await aiohttp_client(app)
+
+    resp = await client.post("/api/prepare", json={"session_id": "session-prepare", "form_type": "loan"})
+    assert resp.status == 200
+    assert (await resp.json())["prepared"] is True
+    mock_prepare.assert_awaited_once_with("loan", session_id="session-prepare")
+
+    resp = await client.post("/api/prepare", json={"session_id": "session-prepare", "form_type": "mortgage"})
+    assert resp.status == 400
@@ -0,0 +1,171 @@
+"""
+Tests for the pre-warmed form page pool
+"""
+import asyncio
+import pytest
+
+from src.automation.page_pool import FormPagePool
+
+
+URLS = {"loan": "https://forms.example/loan/", "hr": "https://forms.example/hr/"}
+
+
+class FakePage:
+    def __init__(self):
+        self.url = "about:blank"
+        self.closed = False
+        self.ready_state = "complete"
+        self.gotos = 0
+
+    def is_closed(self):
+        return self.closed
+
+    async def goto(self, url, wait_until=None):
+        self.gotos += 1
+        self.url = url
+
+    async def evaluate(self, script):
+        return self.ready_state
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeContext:
+    def __init__(self):
+        self.page = FakePage()
+        self.pages = [self.page]
+        self.cookies = []
+        self.permissions = []
+        self.closed = False
+
+    async def get_current_page(self):
+        return self.page
+
+    async def clear_cookies(self):
+        self.cookies.clear()
+
+    async def clear_permissions(self):
+        self.permissions.clear()
+
+    async def close(self):
+        self.closed = True
+
+
+def make_pool(**kwargs):
+    created = []
+
+    async def factory():
+        ctx = FakeContext()
+        created.append(ctx)
+        return ctx
+
+    return FormPagePool(factory, URLS, **kwargs), created
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+class TestFormPagePool:
+    @pytest.mark.asyncio
+    async def test_start_preloads_every_form(self):
+        pool, created = make_pool(size_per_form=2)
+        await pool.start()
+
+        assert pool.available("loan") == 2
+        assert pool.available("hr") == 2
+        assert all(ctx.page.url in URLS.values() for ctx in created)
+
+    @pytest.mark.asyncio
+    async def test_acquire_returns_loaded_page_and_refills(self):
+        pool, created = make_pool(size_per_form=1)
+        await pool.start()
+
+        pooled = await pool.acquire("loan")
+        await settle()
+
+        assert pooled is not None
+        assert (await pooled.get_page()).url == URLS["loan"]
+        assert pool.available("loan") == 1
+        assert pool.get_stats()["checked_out"] == 1
+
+    @pytest.mark.asyncio
+    async def test_acquire_skips_unhealthy_contexts(self):
+        pool, created = make_pool(size_per_form=1)
+        await pool.start()
+        pool._idle["loan"][0].context.page.closed = True
+
+        pooled = await pool.acquire("loan")
+        await settle()
+
+        assert pooled is None
+        assert pool.unhealthy == 1
+        assert pool.misses == 1
+
+    @pytest.mark.asyncio
+    async def test_acquire_bypassed_for_unknown_or_mismatched_url(self):
+        pool, _ = make_pool(size_per_form=1)
+        await pool.start()
+
+        assert await pool.acquire("crm") is None
+        assert await pool.acquire("loan", "https://other.example/") is None
+        assert pool.available("loan") == 1
+
+    @pytest.mark.asyncio
+    async def test_release_resets_and_requeues(self):
+        pool, _ = make_pool(size_per_form=1)
+        await pool.start()
+        pooled = await pool.acquire("loan")
+        await settle()
+        pool._idle["loan"].clear()
+
+        await pool.release(pooled)
+
+        assert pool.available("loan") == 1
+        assert pooled.context.page.gotos == 2
+        assert not pooled.context.closed
+
+    @pytest.mark.asyncio
+    async def test_release_clears_previous_session_state(self):
+        pool, _ = make_pool(size_per_form=1)
+        await pool.start()
+        pooled = await pool.acquire("loan")
+        await settle()
+        pool._idle["loan"].clear()
+        context = pooled.context
+        context.cookies.append({"name": "sid", "value": "customer-a", "url": URLS["loan"]})
+        context.permissions.append("geolocation")
+        popup = FakePage()
+        context.pages.append(popup)
+
+        await pool.release(pooled)
+
+        assert context.cookies == []
+        assert context.permissions == []
+        assert popup.closed
+        assert not context.page.closed
+
+    @pytest.mark.asyncio
+    async def test_release_recycles_after_max_uses(self):
+        pool, _ = make_pool(size_per_form=1, max_uses=1)
+        await pool.start()
+        pooled = await pool.acquire("loan")
+        await settle()
+
+        await pool.release(pooled)
+        await settle()
+
+        assert pooled.context.closed
+        assert pool.recycled == 1
+
+    @pytest.mark.asyncio
+    async def test_close_disposes_idle_contexts(self):
+        pool, created = make_pool(size_per_form=1)
+        await pool.start()
+
+        await pool.close()
+
+        assert all(ctx.closed for ctx in created)
+        assert await pool.acquire("loan") is None
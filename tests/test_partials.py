@@ -0,0 +1,136 @@
+"""
+Tests for partial transcripts: interim STT frames, the relay processor and early intents
+"""
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import numpy as np
+import pytest
+
+from src.speech.partials import PartialIntentTracker
+from src.speech.stt_pool import SttModelRegistry
+from tests.test_stt_pool import SETTINGS, FakeBackend
+
+
+def test_tracker_flags_form_type_and_intents_once_per_call():
+    tracker = PartialIntentTracker()
+
+    first = tracker.observe("tôi muốn mở đơn vay")
+    second = tracker.observe("tôi muốn mở đơn vay và xoá số điện thoại")
+
+    assert first["form_type"] == "loan" and first["new_form_type"] == "loan"
+    assert second["form_type"] == "loan" and second["new_form_type"] is None
+    assert any("phoneNumber" in line for line in second["new_intents"])
+    assert tracker.observe("tôi muốn mở đơn vay và xoá số điện thoại")["new_intents"] == []
+
+
+def test_tracker_does_not_open_a_form_on_generic_words():
+    tracker = PartialIntentTracker()
+
+    assert tracker.observe("tên khách hàng là Nguyễn Văn An")["new_form_type"] is None
+
+
+@pytest.mark.asyncio
+async def test_relay_passes_frames_through_and_reports_partials():
+    from pipecat.frames.frames import InterimTranscriptionFrame, TranscriptionFrame
+    from pipecat.tests.utils import SleepFrame, run_test
+    from src.speech.partials import PartialTranscriptRelay
+
+    seen = []
+
+    async def on_partial(text):
+        seen.append(text)
+
+    relay = PartialTranscriptRelay(on_partial=on_partial)
+    await run_test(
+        relay,
+        frames_to_send=[
+            InterimTranscriptionFrame("mở đơn", "u1", "t0"),
+            SleepFrame(0.05),
+            TranscriptionFrame("mở đơn vay", "u1", "t1"),
+        ],
+        expected_down_frames=[InterimTranscriptionFrame, TranscriptionFrame],
+    )
+
+    assert seen == ["mở đơn"]
+
+
+@pytest.mark.asyncio
+async def test_stt_service_emits_partials_while_speaking_and_drops_stale_ones():
+    from pipecat.frames.frames import InterimTranscriptionFrame, UserStartedSpeakingFrame, UserStoppedSpeakingFrame
+    from src.speech.stt_service import PooledWhisperSTTService
+
+    registry = SttModelRegistry(backend_factory=FakeBackend, settings=SETTINGS)
+    stt = PooledWhisperSTTService(registry=registry, partial_interval=0.5, model="PhoWhisper-medium",
+                                  device="cpu", language="vi")
+    stt._sample_rate = 16000
+    stt.create_task = lambda coroutine, name=None: asyncio.create_task(coroutine)
+    stt.cancel_task = AsyncMock()
+    stt.push_frame = AsyncMock()
+    chunk = SimpleNamespace(audio=(np.ones(1600, np.int16) * 1000).tobytes())  # 100 ms
+
+    try:
+        await stt._handle_user_started_speaking(UserStartedSpeakingFrame())
+        for _ in range(4):
+            await stt.process_audio_frame(chunk, None)
+        assert stt._partial_task is None  # under 0.5 s of speech so far
+
+        await stt.process_audio_frame(chunk, None)
+        await stt._partial_task
+        pushed = stt.push_frame.await_args.args[0]
+        assert isinstance(pushed, InterimTranscriptionFrame)
+        assert pushed.text == "vi:8000"
+
+        # A partial finishing after the segment ended is dropped
+        stt.push_frame.reset_mock()
+        stt.run_stt = lambda audio: _no_frames()
+        stt._segment += 1
+        await stt._emit_partial(bytes(16000), segment=stt._segment - 1)
+        await stt._handle_user_stopped_speaking(UserStoppedSpeakingFrame())
+    finally:
+        await registry.close()
+
+    stt.push_frame.assert_not_awaited()
+
+
+async def _no_frames():
+    return
+    yield
+
+
+@pytest.mark.asyncio
+async def test_stt_service_transcribes_at_each_pause_when_turn_analyzer_decides():
+    from pipecat.frames.frames import (
+        InterimTranscriptionFrame,
+        SpeechControlParamsFrame,
+        UserStartedSpeakingFrame,
+        VADUserStoppedSpeakingFrame,
+    )
+    from pipecat.processors.frame_processor import FrameDirection
+    from src.speech.endpointing import EndpointingParams
+    from src.speech.stt_service import PooledWhisperSTTService
+
+    registry = SttModelRegistry(backend_factory=FakeBackend, settings=SETTINGS)
+    stt = PooledWhisperSTTService(registry=registry, partial_interval=5.0, model="PhoWhisper-medium",
+                                  device="cpu", language="vi")
+    stt._sample_rate = 16000
+    stt.create_task = lambda coroutine, name=None: asyncio.create_task(coroutine)
+    stt.cancel_task = AsyncMock()
+    stt.push_frame = AsyncMock()
+    chunk = SimpleNamespace(audio=(np.ones(1600, np.int16) * 1000).tobytes())
+
+    try:
+        await stt.process_frame(SpeechControlParamsFrame(turn_params=EndpointingParams()), FrameDirection.DOWNSTREAM)
+        await stt._handle_user_started_speaking(UserStartedSpeakingFrame())
+        await stt.process_audio_frame(chunk, None)
+        assert stt._partial_task is None  # well under the 5 s interval
+
+        for _ in range(2):  # the same text after each pause is still reported
+            await stt.process_frame(VADUserStoppedSpeakingFrame(), FrameDirection.DOWNSTREAM)
+            await stt._partial_task
+    finally:
+        await registry.close()
+
+    partials = [c.args[0] for c in stt.push_frame.await_args_list if isinstance(c.args[0], InterimTranscriptionFrame)]
+    assert [frame.text for frame in partials] == ["vi:1600", "vi:1600"]
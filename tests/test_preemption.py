@@ -0,0 +1,63 @@
+"""
+Tests for preemptible agent runs and resume points
+"""
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from src.automation.preemption import PreemptionRegistry, ResumePoint, RunPreempted
+
+
+def make_agent():
+    agent = MagicMock()
+    agent.step = AsyncMock()
+    return agent
+
+
+@pytest.mark.asyncio
+async def test_preempted_run_stops_before_next_step():
+    registry = PreemptionRegistry()
+    agent = make_agent()
+    original_step = agent.step
+    run = registry.begin("s1", agent, MagicMock())
+
+    await agent.step()
+    assert registry.preempt("s1", reason="superseded") is True
+    assert registry.preempt("s1") is False  # already preempted
+
+    with pytest.raises(RunPreempted) as exc:
+        await agent.step()
+    assert exc.value.reason == "superseded"
+    assert original_step.await_count == 1 and run.steps == 1
+
+    registry.end(run)
+    assert registry.preempt("s1") is False
+
+
+@pytest.mark.asyncio
+async def test_parked_context_is_taken_once_and_expires():
+    registry = PreemptionRegistry(resume_ttl=60)
+    context = MagicMock(close=AsyncMock())
+    await registry.park("s1", ResumePoint(context, "https://forms.example/loan", {"customerName": "An"}))
+
+    point = await registry.take("s1")
+    assert point.context is context
+    assert "customerName: An" in point.hint()
+    assert await registry.take("s1") is None
+
+    registry.resume_ttl = 0
+    stale = MagicMock(close=AsyncMock())
+    await registry.park("s2", ResumePoint(stale))
+    assert await registry.expire() == ["s2"]
+    stale.close.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_parking_again_closes_the_previous_context():
+    registry = PreemptionRegistry()
+    old, new = MagicMock(close=AsyncMock()), MagicMock(close=AsyncMock())
+
+    await registry.park("s1", ResumePoint(old))
+    await registry.park("s1", ResumePoint(new))
+
+    old.close.assert_awaited_once()
+    new.close.assert_not_awaited()
@@ -0,0 +1,72 @@
+"""
+Tests for browser progress events
+"""
+from types import SimpleNamespace
+
+from src.automation.progress import ProgressHub, step_events
+
+
+class Action:
+    def __init__(self, **data):
+        self.data = data
+
+    def model_dump(self, exclude_none=True):
+        return self.data
+
+
+def history_item(actions, elements, url, errors=(), goal="Fill customer name", evaluation="Success - page loaded"):
+    return SimpleNamespace(
+        model_output=SimpleNamespace(
+            action=actions,
+            current_state=SimpleNamespace(next_goal=goal, evaluation_previous_goal=evaluation),
+        ),
+        result=[SimpleNamespace(error=e) for e in errors] or [SimpleNamespace(error=None) for _ in actions],
+        state=SimpleNamespace(url=url, title="Đơn vay", interacted_element=elements),
+    )
+
+
+def test_step_events_report_step_navigation_fields_and_verification():
+    item = history_item(
+        [Action(input_text={"index": 3, "text": "Nguyễn Văn An"}), Action(click_element={"index": 7})],
+        [SimpleNamespace(attributes={"name": "customerName"}), SimpleNamespace(attributes={"id": "next"})],
+        url="https://forms.example/loan",
+    )
+
+    events = step_events(item, 2, previous_url="about:blank")
+
+    assert [e["event"] for e in events] == ["step", "navigation", "field", "verification"]
+    assert events[0]["actions"] == ["input_text", "click_element"]
+    assert events[2] == {"event": "field", "step": 2, "field": "customerName", "value": "Nguyễn Văn An",
+                         "status": "filled", "path": "agent"}
+    assert events[3]["ok"] is True
+
+
+def test_step_events_flag_failed_actions():
+    item = history_item(
+        [Action(input_text={"index": 3, "text": "0901"})],
+        [SimpleNamespace(attributes={"name": "phoneNumber"})],
+        url="https://forms.example/loan",
+        errors=["Element not found"],
+        evaluation="",
+    )
+
+    events = step_events(item, 1, previous_url="https://forms.example/loan")
+
+    assert [e["event"] for e in events] == ["step", "field", "verification"]
+    assert events[1]["status"] == "failed"
+    assert events[2] == {"event": "verification", "step": 1, "ok": False, "message": "Element not found"}
+
+
+def test_hub_delivers_to_session_subscribers_and_taps():
+    hub = ProgressHub()
+    session_events, all_events = [], []
+    unsubscribe = hub.subscribe("s1", session_events.append)
+    hub.tap(all_events.append)
+
+    hub.emit("s1", "field", field="customerName")
+    hub.emit("s2", "field", field="phoneNumber")
+    unsubscribe()
+    hub.emit("s1", "field", field="email")
+
+    assert [e["field"] for e in session_events] == ["customerName"]
+    assert [e["field"] for e in all_events] == ["customerName", "phoneNumber", "email"]
@@ -0,0 +1,112 @@
+"""
+Tests for per-session operation serialization and fill coalescing
+"""
+import asyncio
+import pytest
+
+from src.automation.session_actor import SessionActors, serialized
+
+
+@pytest.mark.asyncio
+async def test_operations_run_one_at_a_time_in_order():
+    actors = SessionActors()
+    log = []
+
+    async def op(name, delay):
+        log.append(f"start {name}")
+        await asyncio.sleep(delay)
+        log.append(f"end {name}")
+        return name
+
+    results = await asyncio.gather(
+        actors.run("s1", op, "a", 0.02),
+        actors.run("s1", op, "b", 0.0),
+        actors.run("s1", op, "c", 0.01),
+    )
+
+    assert results == ["a", "b", "c"]
+    assert log == ["start a", "end a", "start b", "end b", "start c", "end c"]
+    assert actors.get_stats() == {}  # idle actors are dropped
+
+
+@pytest.mark.asyncio
+async def test_pending_fills_merge_with_last_value_winning():
+    actors = SessionActors()
+    batches = []
+    release = asyncio.Event()
+
+    async def blocker():
+        await release.wait()
+
+    async def apply(fields, session_id):
+        batches.append((session_id, fields))
+        return {"batch": fields}
+
+    first = asyncio.ensure_future(actors.run("s1", blocker))
+    await asyncio.sleep(0)
+    fills = [
+        asyncio.ensure_future(actors.fill("s1", {"customerName": "An"}, apply, session_id="s1")),
+        asyncio.ensure_future(actors.fill("s1", {"phoneNumber": "0901234567"}, apply, session_id="s1")),
+        asyncio.ensure_future(actors.fill("s1", {"customerName": "Binh"}, apply, session_id="s1")),
+    ]
+    await asyncio.sleep(0)
+    assert actors.get_stats()["s1"]["queued"] == 1
+    release.set()
+    results = await asyncio.gather(first, *fills)
+
+    assert batches == [("s1", {"customerName": "Binh", "phoneNumber": "0901234567"})]
+    assert all(r == {"batch": batches[0][1]} for r in results[1:])
+
+
+@pytest.mark.asyncio
+async def test_fills_do_not_merge_across_other_operations():
+    actors = SessionActors()
+    order = []
+
+    async def apply(fields):
+        order.append(("fill", dict(fields)))
+
+    async def clear():
+        order.append(("clear", None))
+
+    await asyncio.gather(
+        actors.fill("s1", {"a": "1"}, apply),
+        actors.run("s1", clear),
+        actors.fill("s1", {"a": "2"}, apply),
+    )
+
+    assert order == [("fill", {"a": "1"}), ("clear", None), ("fill", {"a": "2"})]
+
+
+@pytest.mark.asyncio
+async def test_errors_reach_caller_and_queue_keeps_running():
+    actors = SessionActors()
+
+    async def boom():
+        raise ValueError("bad field")
+
+    async def ok():
+        return "ok"
+
+    results = await asyncio.gather(actors.run("s1", boom), actors.run("s1", ok), return_exceptions=True)
+
+    assert isinstance(results[0], ValueError)
+    assert results[1] == "ok"
+
+
+@pytest.mark.asyncio
+async def test_serialized_methods_are_reentrant_per_session():
+    class Handler:
+        def __init__(self):
+            self.actors = SessionActors()
+
+        @serialized
+        async def outer(self, session_id: str = "default"):
+            return await self.inner(session_id=session_id)
+
+        @serialized
+        async def inner(self, session_id: str = "default"):
+            return session_id
+
+    handler = Handler()
+    assert await asyncio.wait_for(handler.outer(session_id="s1"), timeout=1) == "s1"
@@ -0,0 +1,127 @@
+"""
+Tests for browser session lifecycle: LRU store, reaping and history compaction
+"""
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from browser_use.agent.message_manager.views import MessageHistory, MessageMetadata
+
+from src.automation.session_store import SessionStore, compact_agent_history, session_footprint
+from src.browser_agent import BrowserAgentHandler
+
+
+def make_agent(turns: int):
+    history = MessageHistory()
+    history.add_message(SystemMessage(content="system"), MessageMetadata(input_tokens=500))
+    history.add_message(AIMessage(content="example"), MessageMetadata(input_tokens=50))
+    for i in range(turns):
+        history.add_message(HumanMessage(content=f"state {i}"), MessageMetadata(input_tokens=1000))
+        history.add_message(AIMessage(content=f"action {i}"), MessageMetadata(input_tokens=100))
+    steps = [SimpleNamespace(state=SimpleNamespace(screenshot="x" * 100)) for _ in range(turns)]
+    return SimpleNamespace(
+        message_manager=SimpleNamespace(history=history),
+        history=SimpleNamespace(history=steps),
+        add_new_task=Mock(),
+    )
+
+
+class TestSessionStore:
+    def test_getitem_marks_recently_used(self):
+        store = SessionStore()
+        store["a"] = {}
+        store["b"] = {}
+        store.last_used["a"] -= 10
+        store.last_used["b"] -= 5
+
+        store["a"]
+
+        assert store.lru_overflow(max_sessions=1) == ["b"]
+
+    def test_idle_sessions_and_pop(self):
+        store = SessionStore()
+        store["a"] = {}
+        store["b"] = {}
+        store.last_used["a"] -= 100
+
+        assert store.idle_sessions(ttl=50) == ["a"]
+        assert store.pop("a") == {}
+        assert "a" not in store.last_used
+        assert store.pop("missing", None) is None
+
+
+class TestCompaction:
+    def test_compacts_to_summary_and_recent_messages(self):
+        agent = make_agent(turns=10)
+
+        stats = compact_agent_history(agent, "Context summary: customerName=An", keep_last=4)
+
+        messages = agent.message_manager.history.messages
+        assert stats["messages_before"] == 22
+        assert len(messages) == 2 + 1 + 4
+        assert messages[2].message.content == "Context summary: customerName=An"
+        assert messages[3].message.type == "human"
+        assert stats["tokens_after"] < stats["tokens_before"]
+        assert len(agent.history.history) == 4
+
+    def test_skips_small_histories(self):
+        agent = make_agent(turns=2)
+
+        assert compact_agent_history(agent, "summary", keep_last=6) is None
+        assert compact_agent_history(make_agent(turns=10), "summary", keep_last=4, min_tokens=10 ** 6) is None
+
+    def test_footprint_reports_tokens_and_bytes(self):
+        agent = make_agent(turns=3)
+
+        footprint = session_footprint({"agent": agent, "session_data": {"fields_filled": [{"field": "a", "value": 1}]}})
+
+        assert footprint["messages"] == 8
+        assert footprint["prompt_tokens"] == 550 + 3 * 1100
+        assert footprint["approx_bytes"] >= 300
+        assert footprint["fields_filled"] == 1
+
+
+class TestHandlerLifecycle:
+    @pytest.fixture
+    def handler(self, mock_env_vars):
+        handler = BrowserAgentHandler()
+        handler.session_limits.update(idle_ttl=60, max_sessions=2, keep_messages=4, compact_tokens=0)
+        return handler
+
+    @pytest.mark.asyncio
+    async def test_reap_idle_sessions_closes_context(self, handler):
+        agent = Mock(browser_context=Mock(close=AsyncMock()))
+        handler.sessions["old"] = {"agent": agent, "session_data": {}}
+        handler.sessions["new"] = {"agent": Mock(), "session_data": {}}
+        handler.sessions.last_used["old"] -= 120
+
+        evicted = await handler.reap_idle_sessions()
+
+        assert evicted == ["old"]
+        assert "new" in handler.sessions
+        agent.browser_context.close.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_session_cap_evicts_least_recently_used(self, handler):
+        for sid in ("a", "b"):
+            handler.sessions[sid] = {"agent": Mock(), "session_data": {}}
+        handler.sessions.last_used["a"] -= 10
+
+        evicted = await handler._enforce_session_cap()
+
+        assert evicted == ["a"]
+        assert list(handler.sessions) == ["b"]
+
+    def test_queue_task_compacts_history(self, handler):
+        agent = make_agent(turns=10)
+        session = {"agent": agent, "session_data": {"type": "loan", "fields_filled": [{"field": "customerName", "value": "An"}]}}
+        handler.sessions["s1"] = session
+
+        handler._queue_task(session, "fill phoneNumber")
+
+        agent.add_new_task.assert_called_once_with("fill phoneNumber")
+        assert "customerName=An" in agent.message_manager.history.messages[2].message.content
+        stats = handler.get_session_stats("s1")["sessions"]["s1"]
+        assert stats["compactions"] == 1
+        assert stats["messages"] == 7
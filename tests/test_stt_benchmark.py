@@ -0,0 +1,69 @@
+"""
+Tests for the STT benchmark (WER, corpus loading, RTF/latency report)
+"""
+import json
+import wave
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from src.speech.benchmark import benchmark_pool, load_corpus, word_error_rate
+from src.speech.stt_pool import SttInferencePool
+
+
+def write_wav(path, seconds, rate=16000, channels=1):
+    samples = (np.sin(np.linspace(0, 100, int(seconds * rate) * channels)) * 3000).astype(np.int16)
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(samples.tobytes())
+
+
+def test_word_error_rate_ignores_case_and_punctuation():
+    assert word_error_rate("Số tiền vay là 500 triệu.", "số tiền vay là 500 triệu") == 0.0
+    assert word_error_rate("tên tôi là An", "tên tôi là Anh") == 0.25
+    assert word_error_rate("vay 500 triệu", "vay triệu") == pytest.approx(1 / 3)
+    assert word_error_rate("", "") == 0.0
+
+
+def test_load_corpus_from_manifest_or_sidecar_texts(tmp_path):
+    write_wav(tmp_path / "a.wav", 1.0)
+    write_wav(tmp_path / "b.wav", 0.5, rate=8000, channels=2)
+    (tmp_path / "a.txt").write_text("xin chào", encoding="utf-8")
+    corpus = load_corpus(str(tmp_path))
+    assert [item["name"] for item in corpus] == ["a.wav", "b.wav"]
+    assert corpus[0]["text"] == "xin chào" and corpus[1]["text"] == ""
+    assert len(corpus[1]["audio"]) == 8000  # resampled to 16 kHz mono
+
+    (tmp_path / "manifest.jsonl").write_text(json.dumps({"audio": "b.wav", "text": "một hai"}) + "\n", encoding="utf-8")
+    assert [(i["name"], i["text"]) for i in load_corpus(str(tmp_path))] == [("b.wav", "một hai")]
+
+
+class EchoBackend:
+    model_name = "echo"
+
+    def load(self):
+        pass
+
+    def transcribe_batch(self, audios, language):
+        return [[SimpleNamespace(text="xin chào", no_speech_prob=0.0)] for _ in audios]
+
+
+@pytest.mark.asyncio
+async def test_benchmark_reports_rtf_latency_and_wer():
+    corpus = [
+        {"name": "a.wav", "audio": np.zeros(16000, np.float32), "text": "xin chào"},
+        {"name": "b.wav", "audio": np.zeros(32000, np.float32), "text": "xin chào anh"},
+    ]
+    pool = SttInferencePool(EchoBackend(), workers=2, batch_window=0)
+    try:
+        report = await benchmark_pool(pool, corpus, concurrency=2, label="echo")
+    finally:
+        await pool.close()
+
+    assert report["label"] == "echo" and report["audio_seconds"] == 3.0
+    assert report["wer"] == pytest.approx(1 / 5, abs=1e-4)
+    assert report["rtf"] >= 0 and report["latency_p95_ms"] >= report["latency_p50_ms"]
+    assert report["samples"][1]["hypothesis"] == "xin chào"
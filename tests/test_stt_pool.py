@@ -0,0 +1,134 @@
+"""
+Tests for the shared STT model registry and micro-batching inference pool
+"""
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from src.speech.stt_pool import SttInferencePool, SttModelRegistry
+
+SETTINGS = {
+    "backend": "fake", "model": "PhoWhisper-medium", "partial_model": "", "device": "cpu", "compute_type": "int8",
+    "workers": 1, "max_batch": 4, "batch_window": 0.05, "max_queued": 16, "prewarm": True,
+}
+
+
+class FakeBackend:
+    loads = 0
+
+    def __init__(self, model, device="cpu", compute_type="int8", workers=1, backend="fake", fail=False):
+        self.model_name = model
+        self.batches = []
+        self.fail = fail
+        self.threads = set()
+
+    def load(self):
+        FakeBackend.loads += 1
+
+    def transcribe_batch(self, audios, language):
+        self.threads.add(threading.current_thread().name)
+        if self.fail:
+            raise RuntimeError("decoder crashed")
+        self.batches.append((len(audios), language))
+        return [[SimpleNamespace(text=f"{language}:{len(a)}", no_speech_prob=0.0)] for a in audios]
+
+
+@pytest.mark.asyncio
+async def test_registry_loads_each_model_once_for_all_sessions():
+    FakeBackend.loads = 0
+    registry = SttModelRegistry(backend_factory=FakeBackend, settings=SETTINGS)
+    try:
+        pools = [registry.pool() for _ in range(5)]
+        assert all(pool is pools[0] for pool in pools)
+        await asyncio.gather(registry.warmup(), pools[0].transcribe(np.zeros(160, np.float32), "vi"))
+    finally:
+        await registry.close()
+
+    assert FakeBackend.loads == 1
+    assert registry.get_stats()["pools"][0]["loaded"] is True
+
+
+@pytest.mark.asyncio
+async def test_concurrent_segments_are_micro_batched_per_language():
+    backend = FakeBackend("m")
+    pool = SttInferencePool(backend, workers=1, max_batch=3, batch_window=0.05)
+    try:
+        results = await asyncio.gather(
+            pool.transcribe(np.zeros(100, np.float32), "vi"),
+            pool.transcribe(np.zeros(200, np.float32), "vi"),
+            pool.transcribe(np.zeros(300, np.float32), "en"),
+            pool.transcribe(np.zeros(400, np.float32), "vi"),
+        )
+    finally:
+        await pool.close()
+
+    # Each caller gets its own segment back
+    assert [r[0].text for r in results] == ["vi:100", "vi:200", "en:300", "vi:400"]
+    # First three fill one batch (split by language), the fourth runs next
+    assert backend.batches == [(2, "vi"), (1, "en"), (1, "vi")]
+    assert all(name.startswith("stt") for name in backend.threads)
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_fails_its_callers_and_pool_keeps_serving():
+    pool = SttInferencePool(FakeBackend("m", fail=True), workers=1, batch_window=0)
+    try:
+        with pytest.raises(RuntimeError):
+            await pool.transcribe(np.zeros(10, np.float32), "vi")
+        pool.backend.fail = False
+        assert (await pool.transcribe(np.zeros(10, np.float32), "vi"))[0].text == "vi:10"
+    finally:
+        await pool.close()
+    assert pool.get_stats()["failed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_pooled_stt_service_transcribes_through_shared_pool():
+    from pipecat.frames.frames import TranscriptionFrame
+    from src.speech.stt_service import PooledWhisperSTTService
+
+    registry = SttModelRegistry(backend_factory=FakeBackend, settings=SETTINGS)
+    try:
+        first = PooledWhisperSTTService(registry=registry, model="PhoWhisper-medium", device="cpu", language="vi")
+        second = PooledWhisperSTTService(registry=registry, model="PhoWhisper-medium", device="cpu", language="vi")
+        assert first._pool is second._pool
+
+        audio = (np.ones(320, np.int16) * 1000).tobytes()
+        frames = [frame async for frame in first.run_stt(audio)]
+    finally:
+        await registry.close()
+
+    assert isinstance(frames[0], TranscriptionFrame)
+    assert frames[0].text.strip() == "vi:320"
+
+
+@pytest.mark.asyncio
+async def test_cascade_uses_small_model_for_partials_and_main_model_for_finals():
+    FakeBackend.loads = 0
+    registry = SttModelRegistry(backend_factory=FakeBackend, settings={**SETTINGS, "partial_model": "PhoWhisper-small"})
+    try:
+        await registry.warmup()
+        cascade = registry.cascade()
+        partial = await cascade.partial(np.zeros(80, np.float32), "vi")
+        final = await cascade.final(np.zeros(80, np.float32), "vi")
+    finally:
+        await registry.close()
+
+    assert FakeBackend.loads == 2  # both tiers pre-warmed
+    assert cascade.partial_pool.label == "PhoWhisper-small" and cascade.final_pool.label == "PhoWhisper-medium"
+    assert partial[0].text == final[0].text == "vi:80"
+    assert await SttModelRegistry(backend_factory=FakeBackend, settings=SETTINGS).cascade().partial(np.zeros(1)) is None
+
+
+def test_backends_default_to_int8_on_cpu():
+    from src.speech.backends import make_backend, resolve_compute_type
+
+    assert resolve_compute_type("cpu", "auto") == "int8"
+    assert resolve_compute_type("cuda", "default") == "float16"
+    assert resolve_compute_type("cpu", "int8_float32") == "int8_float32"
+    assert make_backend("m", device="cpu", backend="onnx").name == "onnx"
+    with pytest.raises(ValueError):
+        make_backend("m", backend="tensorrt")
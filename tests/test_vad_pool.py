@@ -0,0 +1,78 @@
+"""
+Tests for the shared, batched Silero VAD
+"""
+import asyncio
+
+import numpy as np
+import pytest
+
+from pipecat.audio.vad.silero import SileroOnnxModel
+from pipecat.audio.vad.vad_analyzer import VADParams, VADState
+
+from src.speech.vad_pool import SharedSileroVAD, SharedSileroVADAnalyzer, silero_model_path
+
+SAMPLE_RATE = 16000
+WINDOW = 512
+
+
+def make_call_audio(seed: int, windows: int = 6) -> np.ndarray:
+    """Noise bursts of different loudness per call (int16)."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(windows * WINDOW) / SAMPLE_RATE
+    tone = np.sin(2 * np.pi * (120 + 40 * seed) * t) * (0.2 + 0.1 * seed)
+    return ((tone + rng.normal(0, 0.05, t.shape)) * 32767 * 0.5).astype(np.int16)
+
+
+@pytest.mark.asyncio
+async def test_batched_confidences_match_one_model_per_call():
+    vad = SharedSileroVAD()
+    calls = [make_call_audio(seed) for seed in range(3)]
+    streams = [vad.stream(SAMPLE_RATE) for _ in calls]
+    references = [SileroOnnxModel(silero_model_path()) for _ in calls]
+
+    try:
+        await vad.ensure_loaded()  # as the app's startup warm-up does
+        for w in range(6):
+            windows = [audio[w * WINDOW:(w + 1) * WINDOW] for audio in calls]
+            shared = await asyncio.gather(*(
+                vad.confidence(stream, window.tobytes()) for stream, window in zip(streams, windows)
+            ))
+            expected = [
+                float(model(window.astype(np.float32) / 32768.0, SAMPLE_RATE)[0][0])
+                for model, window in zip(references, windows)
+            ]
+            assert shared == pytest.approx(expected, abs=1e-4)
+    finally:
+        await vad.close()
+
+    # All three calls were scored in the same runs
+    assert vad.stats["windows"] == 18 and vad.stats["batches"] == 6
+
+
+@pytest.mark.asyncio
+async def test_wrong_window_size_is_rejected():
+    vad = SharedSileroVAD()
+    with pytest.raises(ValueError):
+        await vad.confidence(vad.stream(SAMPLE_RATE), bytes(2 * 100))
+    with pytest.raises(ValueError):
+        vad.stream(44100)
+
+
+@pytest.mark.asyncio
+async def test_analyzer_runs_pipecat_state_machine_on_shared_confidences():
+    class FixedVAD(SharedSileroVAD):
+        async def confidence(self, stream, buffer):
+            return 0.9 if np.frombuffer(buffer, np.int16).any() else 0.0
+
+    analyzer = SharedSileroVADAnalyzer(service=FixedVAD(), params=VADParams(start_secs=0.064, stop_secs=0.064,
+                                                                              min_volume=0.0))
+    analyzer.set_sample_rate(SAMPLE_RATE)
+    speech = (np.ones(320, np.int16) * 3000).tobytes()  # 20 ms frames, as the transport sends them
+
+    states = [await analyzer.analyze_audio(speech) for _ in range(8)]
+    assert states[0] == VADState.QUIET  # first window not complete yet
+    assert states[-1] == VADState.SPEAKING
+
+    states = [await analyzer.analyze_audio(bytes(640)) for _ in range(8)]
+    assert states[-1] == VADState.QUIET
+    assert not analyzer._confidences  # every score was consumed by its window
@@ -0,0 +1,138 @@
+"""
+Tests for multi-worker voice bot support: the STT model host and cross-worker WebSocket fan-out
+"""
+import asyncio
+
+import numpy as np
+import pytest
+
+from src.speech.cpu_budget import BACKGROUND
+from src.speech.model_host import ModelHostClient, ModelHostServer, RemoteSttRegistry, write_frame
+from src.speech.stt_pool import SttModelRegistry
+from src.voice_workers import PeerWorkersRelay, worker_environment
+from src.ws_hub import WebSocketHub
+from tests.test_stt_pool import SETTINGS, FakeBackend
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def send_json(self, data):
+        self.sent.append(data)
+
+
+@pytest.fixture
+async def model_host(tmp_path):
+    FakeBackend.loads = 0
+    registry = SttModelRegistry(backend_factory=FakeBackend, settings=SETTINGS)
+    server = ModelHostServer(registry)
+    path = str(tmp_path / "models.sock")
+    await server.start(path)
+    yield server, path
+    await server.close()
+    await registry.close()
+
+
+@pytest.mark.asyncio
+async def test_workers_transcribe_through_one_model_in_the_host(model_host):
+    server, path = model_host
+    workers = [RemoteSttRegistry(ModelHostClient(path, worker=i), settings=SETTINGS) for i in range(2)]
+    try:
+        await asyncio.gather(*(registry.warmup() for registry in workers))
+        results = await asyncio.gather(
+            workers[0].cascade().final(np.zeros(1600, np.float32), "vi"),
+            workers[1].cascade().final(np.zeros(800, np.float32), "vi", priority=BACKGROUND),
+        )
+    finally:
+        for registry in workers:
+            await registry.close()
+
+    assert FakeBackend.loads == 1  # one copy of the weights for both workers
+    assert [[s.text for s in segments] for segments in results] == [["vi:1600"], ["vi:800"]]
+    assert results[0][0].no_speech_prob == 0.0
+    assert workers[0].get_stats()["pools"][0]["segments"] == 1
+    assert server.registry.get_stats()["pools"][0]["segments"] == 2
+
+
+@pytest.mark.asyncio
+async def test_host_errors_reach_the_worker(model_host):
+    _, path = model_host
+    client = ModelHostClient(path, worker=0)
+    try:
+        with pytest.raises(RuntimeError, match="Unknown model host op"):
+            await client.request({"op": "explode"})
+    finally:
+        await client.close()
+
+
+@pytest.mark.asyncio
+async def test_session_messages_reach_subscribers_in_other_workers(model_host):
+    _, path = model_host
+    clients = [ModelHostClient(path, worker=i) for i in range(2)]
+    hubs = [WebSocketHub(replay_messages=5) for _ in clients]
+    relays = [PeerWorkersRelay(hub, client) for hub, client in zip(hubs, clients)]
+    subscriber, other_call, local = FakeWebSocket(), FakeWebSocket(), FakeWebSocket()
+    hubs[1].subscribe(subscriber, "call-1")
+    hubs[1].subscribe(other_call, "call-2")
+    hubs[0].subscribe(local, "call-1")
+    try:
+        for relay in relays:
+            relay.start()
+        await asyncio.sleep(0.05)  # subscriptions registered
+
+        # What handle_offer and run_bot do for a call in worker 0
+        hubs[0].open_session("call-1")
+        hubs[0].publish("call-1", {"type": "transcript", "message": {"role": "user", "content": "xin chào"}})
+        await asyncio.sleep(0.05)
+        buffered_in_peer = len(hubs[1]._recent.get("call-1", ()))
+        hubs[0].end_session("call-1")
+        await asyncio.sleep(0.05)
+    finally:
+        for relay, client, hub in zip(relays, clients, hubs):
+            await relay.close()
+            await client.close()
+            hub.close()
+
+    assert len(local.sent) == 1  # worker 0 directly
+    assert [m["message"]["content"] for m in subscriber.sent] == ["xin chào"]  # worker 1 through the host
+    assert other_call.sent == []
+    assert hubs[1].stats["published"] == 1  # delivered once, not relayed back
+    assert buffered_in_peer == 1 and "call-1" not in hubs[1]._recent  # peer replay freed with the call
+
+
+@pytest.mark.asyncio
+async def test_stalled_subscriber_does_not_delay_transcription(model_host):
+    server, path = model_host
+    # A worker subscription that stops reading: its socket buffer fills up
+    _, stalled = await asyncio.open_unix_connection(path)
+    await write_frame(stalled, {"op": "subscribe", "worker": 1})
+    client = ModelHostClient(path, worker=0)
+    registry = RemoteSttRegistry(client, settings=SETTINGS)
+    try:
+        await asyncio.sleep(0.05)
+        for _ in range(400):
+            await client.publish({"type": "transcript_partial", "text": "x" * 65536})
+        segments = await asyncio.wait_for(registry.cascade().final(np.zeros(1600, np.float32), "vi"), 0.5)
+    finally:
+        await registry.close()
+        stalled.close()
+
+    assert [s.text for s in segments] == ["vi:1600"]
+    assert server.stats["dropped"] > 0  # the stalled worker loses broadcasts, not the others' latency
+
+
+def test_admission_limits_are_split_between_workers(monkeypatch):
+    monkeypatch.setenv("ADMISSION_MAX_SESSIONS", "20")
+    monkeypatch.delenv("ADMISSION_MAX_QUEUED", raising=False)
+    monkeypatch.delenv("ADMISSION_MAX_INFERENCE_QUEUE", raising=False)
+
+    env = worker_environment(2, workers=3, socket_path="/tmp/models.sock")
+
+    assert env == {
+        "VOICE_WORKER_INDEX": "2",
+        "VOICE_MODEL_HOST_SOCKET": "/tmp/models.sock",
+        "ADMISSION_MAX_SESSIONS": "7",
+        "ADMISSION_MAX_QUEUED": "2",
+        "ADMISSION_MAX_INFERENCE_QUEUE": "11",
+    }
@@ -0,0 +1,132 @@
+"""
+Tests for the session-scoped WebSocket hub
+"""
+import asyncio
+
+import pytest
+
+from src.ws_hub import WebSocketHub
+
+
+class FakeWebSocket:
+    def __init__(self, delay: float = 0.0):
+        self.sent = []
+        self.delay = delay
+        self.closed_with = None
+
+    async def send_json(self, data):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.sent.append(data)
+
+    async def close(self, code=None, message=b""):
+        self.closed_with = code
+
+
+def transcript(text: str) -> dict:
+    return {"type": "transcript", "message": {"role": "user", "content": text}}
+
+
+@pytest.mark.asyncio
+async def test_messages_reach_only_subscribers_of_their_session():
+    hub = WebSocketHub(replay_messages=0)
+    alice, bob, idle = FakeWebSocket(), FakeWebSocket(), FakeWebSocket()
+    for ws in (alice, bob, idle):
+        hub.register(ws)
+    hub.subscribe(alice, "call-a")
+    hub.subscribe(bob, "call-b")
+
+    assert hub.publish("call-a", transcript("xin chào")) == 1
+    assert hub.publish("call-b", transcript("tôi muốn vay")) == 1
+    await asyncio.sleep(0.01)
+    hub.close()
+
+    assert [m["message"]["content"] for m in alice.sent] == ["xin chào"]
+    assert [m["message"]["content"] for m in bob.sent] == ["tôi muốn vay"]
+    assert idle.sent == []
+
+
+@pytest.mark.asyncio
+async def test_slow_client_does_not_delay_publish_or_other_clients():
+    hub = WebSocketHub(queue_size=3, replay_messages=0)
+    slow, fast = FakeWebSocket(delay=10.0), FakeWebSocket()
+    for ws in (slow, fast):
+        hub.subscribe(ws, "call")
+
+    for i in range(5):
+        hub.publish("call", transcript(str(i)))  # returns at once
+        await asyncio.sleep(0)  # the fast client's writer keeps up
+    await asyncio.sleep(0.01)
+
+    assert [m["message"]["content"] for m in fast.sent] == ["0", "1", "2", "3", "4"]
+    slow_client = hub._clients[slow]
+    # the writer holds "0"; the full queue dropped its oldest message for the newest
+    assert [m["message"]["content"] for m in list(slow_client.queue._queue)] == ["2", "3", "4"]
+    assert slow_client.dropped == 1 and hub.get_stats()["dropped"] == 1
+    hub.close()
+
+
+@pytest.mark.asyncio
+async def test_close_policy_disconnects_a_client_that_falls_behind():
+    hub = WebSocketHub(queue_size=1, slow_client_policy="close", replay_messages=0)
+    slow = FakeWebSocket(delay=10.0)
+    hub.subscribe(slow, "call")
+
+    delivered = []
+    for i in range(3):
+        delivered.append(hub.publish("call", transcript(str(i))))
+        await asyncio.sleep(0)
+    await asyncio.sleep(0.01)
+
+    assert delivered == [1, 1, 0]
+    assert slow.closed_with == 1013
+    assert hub.get_stats()["clients"] == 0 and hub.publish("call", transcript("late")) == 0
+
+
+@pytest.mark.asyncio
+async def test_send_timeout_closes_the_client():
+    hub = WebSocketHub(send_timeout_secs=0.01, replay_messages=0)
+    stuck = FakeWebSocket(delay=1.0)
+    hub.subscribe(stuck, "call")
+
+    hub.publish("call", transcript("xin chào"))
+    await asyncio.sleep(0.05)
+
+    assert stuck.closed_with == 1013 and hub.get_stats()["clients"] == 0
+
+
+@pytest.mark.asyncio
+async def test_late_subscriber_gets_recent_messages_until_the_session_ends():
+    hub = WebSocketHub(replay_messages=2)
+    hub.open_session("call")
+    for text in ("một", "hai", "ba"):
+        hub.publish("call", transcript(text))
+
+    late = FakeWebSocket()
+    assert hub.subscribe(late, "call") == 2
+    hub.end_session("call")
+    assert hub.subscribe(FakeWebSocket(), "call") == 0
+    await asyncio.sleep(0.01)
+    hub.close()
+
+    assert [m["message"]["content"] for m in late.sent] == ["hai", "ba"]
+
+
+def test_replay_buffers_are_kept_only_for_open_sessions():
+    hub = WebSocketHub(replay_messages=5, replay_sessions=2)
+    relayed = []
+    hub.set_relay(relayed.append)
+
+    hub.publish("unknown", transcript("không mở"))  # e.g. a notification after the call ended
+    for session_id in ("call-1", "call-2", "call-3"):
+        hub.open_session(session_id)
+    hub.end_session("call-3")
+    hub.publish("call-3", transcript("muộn"))
+
+    assert list(hub._recent) == ["call-2"]  # call-1 evicted by the cap, call-3 ended
+    assert {"session_id": "call-3", "event": "end"} in relayed
+
+
+def test_unknown_slow_client_policy_is_rejected():
+    with pytest.raises(ValueError, match="slow client policy"):
+        WebSocketHub(slow_client_policy="block")